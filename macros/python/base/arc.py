@@ -158,19 +158,9 @@ def execute(context, command):
         context.comment("Arc >180 - using IJK format")
 
     # =========================================================================
-    # Step 4: Update context registers
+    # Step 4: Store arc parameters
     # =========================================================================
 
-    # Update endpoint registers
-    context.registers.x = x_end
-    context.registers.y = y_end
-    context.registers.z = z_end
-
-    # Update arc center registers (for IJK format)
-    context.registers.i = i_center
-    context.registers.j = j_center
-    context.registers.k = k_center
-
     # Store radius for potential R format output
     if r_radius is not None:
         context.globalVars.SetDouble("ARC_RADIUS", r_radius)
@@ -185,26 +175,18 @@ def execute(context, command):
     # Select G-code for arc direction
     g_code = "G2" if arc_direction == DIRECTION_CW else "G3"
 
-    # Write G-code prefix
-    context.write(f"{g_code} ")
-
-    # Force output of arc-related registers
-    context.show("X")
-    context.show("Y")
-    context.show("Z")
-
     if use_r_format and r_radius is not None:
-        # R format output
-        context.write(f"R{r_radius:.3f}")
-        # Write endpoint coordinates
-        context.writeBlock()
+        # R format: endpoint and radius in one call
+        context.emitArc(g_code, x_end, y_end, z_end, r=r_radius)
     else:
-        # IJK format output
-        context.show("I")
-        context.show("J")
-        context.show("K")
-        # Write endpoint coordinates and center offsets
-        context.writeBlock()
+        # IJK format: endpoint and center offsets of the working plane
+        plane = _get_current_plane(context)
+        if plane == PLANE_G17:
+            context.emitArc(g_code, x_end, y_end, z_end, i=i_center, j=j_center)
+        elif plane == PLANE_G18:
+            context.emitArc(g_code, x_end, y_end, z_end, i=i_center, k=k_center)
+        else:
+            context.emitArc(g_code, x_end, y_end, z_end, j=j_center, k=k_center)
 
     # =========================================================================
     # Step 6: Update motion state
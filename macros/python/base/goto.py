@@ -37,12 +37,7 @@ def execute(context, command):
     j = command.numeric[4] if len(command.numeric) > 4 else None
     k = command.numeric[5] if len(command.numeric) > 5 else None
 
-    # Update linear registers
-    context.registers.x = x
-    context.registers.y = y
-    context.registers.z = z
-
-    # Update rotary registers if present
+    # Update tool direction registers if present (not output by BlockWriter)
     if i is not None:
         context.registers.i = i
     if j is not None:
@@ -58,36 +53,20 @@ def execute(context, command):
                 motion_type == 'RAPID_BREAK' or
                 context.currentMotionType == 'RAPID')
 
-    if is_rapid:
-        # Rapid move G0
-        context.write("G0")
-        
-        # Add rotary axes for 5-axis (convert IJK to ABC)
-        if i is not None and j is not None and k is not None:
-            a, b, c = ijk_to_abc(i, j, k)
-            context.registers.a = a
-            context.registers.b = b
-
-        # Write block with modal checking (only changed registers)
-        context.writeBlock()
+    # Rotary axes for 5-axis (convert IJK to ABC)
+    a = None
+    b = None
+    if i is not None and j is not None and k is not None:
+        a, b, c = ijk_to_abc(i, j, k)
+
+    # Registers, modal checking and block output in one call
+    context.emitMotion("G0" if is_rapid else "G1", x, y, z, a, b)
 
+    if is_rapid:
         # Reset motion type after rapid
         context.system.MOTION = 'LINEAR'
         context.currentMotionType = 'LINEAR'
 
-    else:
-        # Linear move G1
-        context.write("G1")
-        
-        # Add rotary axes for 5-axis
-        if i is not None and j is not None and k is not None:
-            a, b, c = ijk_to_abc(i, j, k)
-            context.registers.a = a
-            context.registers.b = b
-        
-        # Write block with modal checking
-        context.writeBlock()
-
 
 def ijk_to_abc(i, j, k):
     """
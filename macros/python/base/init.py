@@ -95,7 +95,7 @@ def execute(context, command):
     context.setBlockNumbering(start=1, increment=2, enabled=True)
     
     # === Optional: Print tool list at start ===
-    if context.config.get("printToolListAtStart", False):
+    if context.config.getParameterBool("printToolListAtStart", False):
         _print_tool_list(context)
 
 
@@ -108,16 +108,14 @@ def _print_tool_list(context):
     """
     context.comment("TOOL LIST")
     
-    # Get tools from project (if available)
-    tools = context.get_project_tools() if hasattr(context, 'get_project_tools') else []
+    # Tools found by the APT pre-scan (in order of first use)
+    tools = list(context.getProjectTools())
     
     if tools:
         # Sort by tool number
-        sorted_tools = sorted(tools, key=lambda t: t.get('number', 0))
+        sorted_tools = sorted(tools, key=lambda t: t.number)
         
         for tool in sorted_tools:
-            number = tool.get('number', 0)
-            name = tool.get('name', 'UNKNOWN')
-            context.comment(f"T{number} - {name}")
+            context.comment(f"T{tool.number} - {tool.name}")
         
         context.comment("END TOOL LIST")
@@ -25,11 +25,5 @@ def execute(context, command):
         y = command.numeric[1] if len(command.numeric) > 1 else context.registers.y
         z = command.numeric[2] if len(command.numeric) > 2 else context.registers.z
 
-        # Update registers
-        context.registers.x = x
-        context.registers.y = y
-        context.registers.z = z
-
-        # Write G0 with modal checking
-        context.write("G0")
-        context.writeBlock()
+        # Update registers and write G0 with modal checking
+        context.emitMotion("G0", x, y, z)
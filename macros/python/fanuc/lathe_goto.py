@@ -8,7 +8,7 @@ def execute(context, command):
     Process GOTO linear motion command for lathe
 
     Fanuc Lathe format:
-    G0/G1 X###.### Z###.###
+    G00/G01 X###.### Z###.### [F##.##]
     Note: Lathe uses X (diameter) and Z (length)
 
     APT format: GOTO/X, Z
@@ -32,9 +32,8 @@ def execute(context, command):
                 context.currentMotionType == 'RAPID')
 
     if is_rapid:
-        # Rapid move G00
-        line = "G00 X" + format_num(x) + " Z" + format_num(z)
-        context.write(line)
+        # Rapid move G00 (no feed)
+        line = "G00 X" + format_value("X", x, 3) + " Z" + format_value("Z", z, 3)
 
         # Reset motion type
         context.system.MOTION = 'LINEAR'
@@ -42,22 +41,25 @@ def execute(context, command):
 
     else:
         # Linear move G01
-        line = "G01 X" + format_num(x) + " Z" + format_num(z)
+        line = "G01 X" + format_value("X", x, 3) + " Z" + format_value("Z", z, 3)
 
         # Add feedrate (modal)
         if context.registers.f and context.registers.f > 0:
             last_feed = context.globalVars.GetDouble("LAST_FEED", 0.0)
             if last_feed != context.registers.f:
-                line += " F" + format_feed(context.registers.f)
+                line += " F" + format_value("F", context.registers.f, 2)
                 context.globalVars.SetDouble("LAST_FEED", context.registers.f)
 
-        context.write(line)
+    # One block per line: roughing passes can be folded into G71/G70 by --lathe-cycles
+    context.writeLine(line)
 
-def format_num(value):
-    """Format number with 3 decimal places for Fanuc Lathe"""
-    rounded = round(value, 3)
-    return str(rounded)
-
-def format_feed(value):
-    """Format feedrate with 2 decimal places for lathe"""
-    return str(round(value, 2))
+def format_value(address, value, decimals):
+    """Format value with the register precision from the controller config (F3.2 -> 2 decimals)"""
+    tables = globals().get('CONFIG')
+    if tables is not None:
+        register = tables.registerFormats.get(address)
+        if register is not None:
+            digits = register['format'][1:].split('.')[-1]
+            if digits.isdigit():
+                decimals = int(digits)
+    return "%.*f" % (decimals, value)
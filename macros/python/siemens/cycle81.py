@@ -3,7 +3,8 @@
 SIEMENS CYCLE81 MACRO - Drilling Cycle for Siemens 840D
 
 Handles CYCLE81 drilling/centering cycle.
-Supports modal parameter caching for efficient output.
+Holes sharing one cycle definition are batched into a controller-native
+pattern (modal G8x, MCALL/HOLES1/HOLES2, PATTERN DEF) by context.drillHole().
 
 Examples:
     CYCLE81/RTP,RFP,SDIS,DP,DPR
@@ -30,67 +31,9 @@ def execute(context, command):
     if not command.numeric or len(command.numeric) == 0:
         return
 
-    # Get cycle parameters with defaults
-    # CYCLE81(RTP, RFP, SDIS, DP, DPR)
-    rtp = command.numeric[0] if len(command.numeric) > 0 else 0.0
-    rfp = command.numeric[1] if len(command.numeric) > 1 else 0.0
-    sdis = command.numeric[2] if len(command.numeric) > 2 else 2.0
-    dp = command.numeric[3] if len(command.numeric) > 3 else 0.0
-    dpr = command.numeric[4] if len(command.numeric) > 4 else 0.0
-
-    # Check for modal caching
-    use_cache = context.globalVars.Get("CYCLE_CACHE_ENABLED", 1)
-
-    # Get cached parameters
-    cached_rtp = context.globalVars.GetDouble("CYCLE81_RTP", -999.0)
-    cached_rfp = context.globalVars.GetDouble("CYCLE81_RFP", -999.0)
-    cached_sdis = context.globalVars.GetDouble("CYCLE81_SDIS", -999.0)
-    cached_dp = context.globalVars.GetDouble("CYCLE81_DP", -999.0)
-    cached_dpr = context.globalVars.GetDouble("CYCLE81_DPR", -999.0)
-
-    # Check if parameters changed (modal optimization)
-    params_changed = (
-        abs(rtp - cached_rtp) > 0.001 or
-        abs(rfp - cached_rfp) > 0.001 or
-        abs(sdis - cached_sdis) > 0.001 or
-        abs(dp - cached_dp) > 0.001 or
-        abs(dpr - cached_dpr) > 0.001
-    )
-
-    # If caching enabled and no change, skip full output
-    if use_cache and not params_changed and cached_rtp != -999.0:
-        # Output simplified call or skip if already active
-        cycle_active = context.globalVars.Get("CYCLE81_ACTIVE", 0)
-        if cycle_active:
-            return  # Already active with same parameters
-
-    # Build CYCLE81 call
-    # Siemens format: CYCLE81(RTP, RFP, SDIS, DP, DPR)
-    cycle_parts = []
-
-    # Check if we need to output the full cycle or just position
-    cycle_call_needed = params_changed or not use_cache
-
-    if cycle_call_needed:
-        # Full cycle definition
-        cycle_str = f"CYCLE81({rtp:.1f},{rfp:.1f},{sdis:.1f},{dp:.1f},{dpr:.1f})"
-        cycle_parts.append(cycle_str)
-
-        # Cache parameters
-        context.globalVars.SetDouble("CYCLE81_RTP", rtp)
-        context.globalVars.SetDouble("CYCLE81_RFP", rfp)
-        context.globalVars.SetDouble("CYCLE81_SDIS", sdis)
-        context.globalVars.SetDouble("CYCLE81_DP", dp)
-        context.globalVars.SetDouble("CYCLE81_DPR", dpr)
-        context.globalVars.Set("CYCLE81_ACTIVE", 1)
-    else:
-        # Use cached parameters - output position only
-        # The cycle is already active, just move to position
-        pass
-
-    # Output cycle call
-    if cycle_parts:
-        context.write(" ".join(cycle_parts))
+    # Hole at the current position; the following GOTO/CYCLE81 pairs with
+    # the same parameters join the pattern without calling this macro again
+    context.drillHole(command)
 
     # Store current cycle state
     context.globalVars.Set("ACTIVE_CYCLE", "CYCLE81")
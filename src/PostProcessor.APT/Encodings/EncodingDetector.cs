@@ -1,10 +1,20 @@
 ﻿using System.Text;
-using System.Text.RegularExpressions;
 
 namespace PostProcessor.APT.Encodings;
 
 public class EncodingDetector : IEncodingDetector
 {
+    /// <summary>
+    /// Размер анализируемого начала файла
+    /// </summary>
+    public const int SniffSize = 4096;
+
+    private static readonly Lazy<Encoding> Cp1251 = new(() =>
+    {
+        Encoding.RegisterProvider(CodePagesEncodingProvider.Instance);
+        return Encoding.GetEncoding(1251);
+    });
+
     public Encoding Detect(string filePath)
     {
         using var stream = new FileStream(
@@ -20,53 +30,104 @@ public class EncodingDetector : IEncodingDetector
 
     public Encoding DetectFromStream(Stream stream)
     {
-        var bom = new byte[4];
-        var read = stream.Read(bom, 0, 4);
-        stream.Seek(0, SeekOrigin.Begin);
+        var start = stream.CanSeek ? stream.Position : 0;
+
+        Span<byte> buffer = stackalloc byte[SniffSize];
+        var read = stream.ReadAtLeast(buffer, buffer.Length, throwOnEndOfStream: false);
+
+        if (stream.CanSeek)
+            stream.Position = start;
+
+        return DetectFromBytes(buffer[..read]);
+    }
 
+    /// <summary>
+    /// Определить кодировку по первым байтам: BOM, затем проверка UTF-8 по байтам;
+    /// некорректный UTF-8 с байтами кириллицы CP1251 (0xC0-0xFF, Ё/ё) - CP1251.
+    /// По умолчанию - UTF-8 (в том числе для чистого ASCII).
+    /// </summary>
+    public static Encoding DetectFromBytes(ReadOnlySpan<byte> prefix)
+    {
         // Проверка BOM
-        if (read >= 3 && bom[0] == 0xEF && bom[1] == 0xBB && bom[2] == 0xBF)
+        if (prefix.Length >= 3 && prefix[0] == 0xEF && prefix[1] == 0xBB && prefix[2] == 0xBF)
             return Encoding.UTF8;
-        if (read >= 2 && bom[0] == 0xFE && bom[1] == 0xFF)
+        if (prefix.Length >= 4 && prefix[0] == 0x00 && prefix[1] == 0x00 && prefix[2] == 0xFE && prefix[3] == 0xFF)
+            return Encoding.UTF32;
+        if (prefix.Length >= 2 && prefix[0] == 0xFE && prefix[1] == 0xFF)
             return Encoding.BigEndianUnicode;
-        if (read >= 2 && bom[0] == 0xFF && bom[1] == 0xFE)
+        if (prefix.Length >= 2 && prefix[0] == 0xFF && prefix[1] == 0xFE)
             return Encoding.Unicode;
-        if (read >= 4 && bom[0] == 0x00 && bom[1] == 0x00 && bom[2] == 0xFE && bom[3] == 0xFF)
-            return Encoding.UTF32;
 
-        // Эвристика для первых 4 КБ
-        var buffer = new byte[Math.Min(4096, (int)stream.Length)];
-        var bytesRead = stream.Read(buffer, 0, buffer.Length);
-        stream.Seek(0, SeekOrigin.Begin);
+        var validUtf8 = true;
+        var cyrillic1251 = 0;
 
-        Encoding.RegisterProvider(CodePagesEncodingProvider.Instance);
-
-        // Проверка на кириллицу в UTF-8
-        try
-        {
-            var utf8 = Encoding.UTF8.GetString(buffer.AsSpan(0, bytesRead));
-            if (Regex.IsMatch(utf8, @"[аА-яЯёЁ]"))
-                return Encoding.UTF8;
-        }
-        catch
+        for (int i = 0; i < prefix.Length; i++)
         {
-            // Игнорируем ошибки декодирования
-        }
+            var b = prefix[i];
+            if (b < 0x80)
+                continue;
 
-        // Проверка на CP1251
-        try
-        {
-            var cp1251 = Encoding.GetEncoding(1251);
-            var decoded = cp1251.GetString(buffer.AsSpan(0, bytesRead));
-            if (Regex.IsMatch(decoded, @"[аА-яЯёЁ]"))
-                return cp1251;
+            if (b >= 0xC0 || b == 0xA8 || b == 0xB8)
+                cyrillic1251++;
+
+            if (!validUtf8)
+                continue;
+
+            var length = b switch
+            {
+                >= 0xC2 and <= 0xDF => 2,
+                >= 0xE0 and <= 0xEF => 3,
+                >= 0xF0 and <= 0xF4 => 4,
+                _ => 0
+            };
+
+            if (length == 0)
+            {
+                validUtf8 = false;
+                continue;
+            }
+
+            // Последовательность, обрезанная границей буфера, не считается ошибкой
+            var end = Math.Min(i + length, prefix.Length);
+            for (int j = i + 1; j < end; j++)
+            {
+                if ((prefix[j] & 0xC0) != 0x80)
+                {
+                    validUtf8 = false;
+                    break;
+                }
+            }
+
+            if (validUtf8)
+                i = end - 1;
         }
-        catch
+
+        if (!validUtf8 && cyrillic1251 > 0)
+            return Cp1251.Value;
+
+        return Encoding.UTF8;
+    }
+
+    /// <summary>
+    /// Определить кодировку потока без перемотки (stdin, pipe): начало потока читается
+    /// для анализа и затем воспроизводится возвращаемым потоком.
+    /// Поток с перемоткой возвращается как есть.
+    /// </summary>
+    /// <param name="stream">Входной поток</param>
+    /// <param name="detector">Детектор кодировки</param>
+    /// <param name="encoding">Определённая кодировка</param>
+    /// <returns>Поток для чтения с начала</returns>
+    public static Stream Sniff(Stream stream, IEncodingDetector detector, out Encoding encoding)
+    {
+        if (stream.CanSeek)
         {
-            // Игнорируем ошибки декодирования
+            encoding = detector.DetectFromStream(stream);
+            return stream;
         }
 
-        // По умолчанию — UTF-8
-        return Encoding.UTF8;
+        var prefix = new byte[SniffSize];
+        var read = stream.ReadAtLeast(prefix, prefix.Length, throwOnEndOfStream: false);
+        encoding = detector.DetectFromStream(new MemoryStream(prefix, 0, read, writable: false));
+        return new PrefixReplayStream(prefix.AsMemory(0, read), stream);
     }
 }
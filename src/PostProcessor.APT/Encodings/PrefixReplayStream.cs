@@ -0,0 +1,78 @@
+namespace PostProcessor.APT.Encodings;
+
+/// <summary>
+/// Поток только для чтения: сначала уже прочитанное начало, затем остаток исходного потока
+/// </summary>
+internal sealed class PrefixReplayStream : Stream
+{
+    private readonly Stream _inner;
+    private ReadOnlyMemory<byte> _prefix;
+
+    public PrefixReplayStream(ReadOnlyMemory<byte> prefix, Stream inner)
+    {
+        _prefix = prefix;
+        _inner = inner;
+    }
+
+    public override bool CanRead => true;
+    public override bool CanSeek => false;
+    public override bool CanWrite => false;
+    public override long Length => throw new NotSupportedException();
+
+    /// <summary>
+    /// Выдано байт (начало и остаток исходного потока)
+    /// </summary>
+    public long BytesRead { get; private set; }
+
+    public override long Position
+    {
+        get => throw new NotSupportedException();
+        set => throw new NotSupportedException();
+    }
+
+    public override int Read(byte[] buffer, int offset, int count) => Read(buffer.AsSpan(offset, count));
+
+    public override int Read(Span<byte> buffer)
+    {
+        var read = _prefix.IsEmpty ? _inner.Read(buffer) : ReadPrefix(buffer);
+        BytesRead += read;
+        return read;
+    }
+
+    public override Task<int> ReadAsync(byte[] buffer, int offset, int count, CancellationToken cancellationToken)
+    {
+        return ReadAsync(buffer.AsMemory(offset, count), cancellationToken).AsTask();
+    }
+
+    public override async ValueTask<int> ReadAsync(Memory<byte> buffer, CancellationToken cancellationToken = default)
+    {
+        var read = _prefix.IsEmpty
+            ? await _inner.ReadAsync(buffer, cancellationToken).ConfigureAwait(false)
+            : ReadPrefix(buffer.Span);
+        BytesRead += read;
+        return read;
+    }
+
+    private int ReadPrefix(Span<byte> buffer)
+    {
+        var count = Math.Min(buffer.Length, _prefix.Length);
+        _prefix.Span[..count].CopyTo(buffer);
+        _prefix = _prefix[count..];
+        return count;
+    }
+
+    public override void Flush()
+    {
+    }
+
+    public override long Seek(long offset, SeekOrigin origin) => throw new NotSupportedException();
+    public override void SetLength(long value) => throw new NotSupportedException();
+    public override void Write(byte[] buffer, int offset, int count) => throw new NotSupportedException();
+
+    protected override void Dispose(bool disposing)
+    {
+        if (disposing)
+            _inner.Dispose();
+        base.Dispose(disposing);
+    }
+}
@@ -0,0 +1,351 @@
+using System.Globalization;
+
+namespace PostProcessor.APT.Generation;
+
+/// <summary>
+/// Тип синтетической программы
+/// </summary>
+public enum SyntheticProgramKind
+{
+    /// <summary>Фрезерная: поверхности, 5 осей, дуги, сверление</summary>
+    Mill,
+
+    /// <summary>Токарная: GOTO/X, Z для fanuc/lathe_goto.py</summary>
+    Lathe
+}
+
+/// <summary>
+/// Параметры генератора синтетических APT-программ
+/// </summary>
+public record SyntheticAptOptions
+{
+    /// <summary>Тип программы</summary>
+    public SyntheticProgramKind Kind { get; init; } = SyntheticProgramKind.Mill;
+
+    /// <summary>Примерное количество команд APT (без комментариев)</summary>
+    public int TargetCommands { get; init; } = 10_000;
+
+    /// <summary>Количество операций (каждая начинается со смены инструмента)</summary>
+    public int Operations { get; init; } = 20;
+
+    /// <summary>Количество разных инструментов (повторно используются по кругу)</summary>
+    public int Tools { get; init; } = 10;
+
+    /// <summary>Начальное значение генератора случайных чисел (одинаковое - одинаковый файл)</summary>
+    public int Seed { get; init; } = 1;
+
+    /// <summary>Вес 3-осевой обработки поверхностей (плотные GOTO)</summary>
+    public int SurfacingWeight { get; init; } = 50;
+
+    /// <summary>Вес 5-осевой обработки (MULTAX, GOTO с вектором IJK)</summary>
+    public int FiveAxisWeight { get; init; } = 20;
+
+    /// <summary>Вес контурной обработки дугами (CIRCLE)</summary>
+    public int ArcWeight { get; init; } = 15;
+
+    /// <summary>Вес сверления (CYCLE81/CYCLE83)</summary>
+    public int DrillingWeight { get; init; } = 15;
+
+    /// <summary>Доля 5-осевых GOTO, записанных с переносом строки '$'</summary>
+    public double ContinuationRate { get; init; } = 0.1;
+
+    /// <summary>Доля команд с комментарием '$$' в конце строки</summary>
+    public double CommentRate { get; init; } = 0.02;
+}
+
+/// <summary>
+/// Результат генерации
+/// </summary>
+/// <param name="Commands">Записано команд APT</param>
+/// <param name="Lines">Записано строк (с комментариями и переносами)</param>
+/// <param name="Operations">Записано операций</param>
+public record SyntheticAptResult(int Commands, int Lines, int Operations);
+
+/// <summary>
+/// Генератор воспроизводимых APT/CL-программ в стиле CATIA для нагрузочных тестов и замеров:
+/// плотные 3-осевые GOTO, 5-осевые GOTO с IJK и MULTAX, дуги CIRCLE, циклы сверления,
+/// смены инструмента, переносы '$' и комментарии '$$'; токарные программы для lathe_goto.py.
+/// Вывод потоковый, размер файла ограничен только TargetCommands.
+/// </summary>
+public sealed class SyntheticAptGenerator
+{
+    private readonly SyntheticAptOptions _options;
+    private readonly Random _random;
+    private TextWriter _writer = TextWriter.Null;
+    private int _commands;
+    private int _lines;
+
+    public SyntheticAptGenerator(SyntheticAptOptions? options = null)
+    {
+        _options = options ?? new SyntheticAptOptions();
+        if (_options.TargetCommands <= 0)
+            throw new ArgumentOutOfRangeException(nameof(options), "TargetCommands must be positive");
+        if (_options.Operations <= 0 || _options.Tools <= 0)
+            throw new ArgumentOutOfRangeException(nameof(options), "Operations and Tools must be positive");
+
+        _random = new Random(_options.Seed);
+    }
+
+    /// <summary>
+    /// Записать программу в файл
+    /// </summary>
+    public static SyntheticAptResult GenerateFile(string path, SyntheticAptOptions? options = null)
+    {
+        using var writer = new StreamWriter(path, append: false, new System.Text.UTF8Encoding(false), bufferSize: 65536);
+        writer.NewLine = "\n";
+        return new SyntheticAptGenerator(options).Generate(writer);
+    }
+
+    /// <summary>
+    /// Записать программу в поток
+    /// </summary>
+    public SyntheticAptResult Generate(TextWriter writer)
+    {
+        _writer = writer;
+        _commands = 0;
+        _lines = 0;
+
+        var isLathe = _options.Kind == SyntheticProgramKind.Lathe;
+        Comment("-----------------------------------------------------------------");
+        Comment($"SYNTHETIC {(isLathe ? "LATHE" : "MILL")} PROGRAM, SEED {_options.Seed}");
+        Comment("-----------------------------------------------------------------");
+        Command(isLathe ? "PARTNO/SYNTHETIC_LATHE" : "PARTNO/SYNTHETIC_MILL");
+        Command(isLathe ? "MACHIN/LATHE, 1" : "MACHIN/MILL, 1");
+        Command("UNITS/MM");
+
+        var perOperation = Math.Max(8, _options.TargetCommands / _options.Operations);
+        int operation = 0;
+        while (_commands < _options.TargetCommands)
+        {
+            operation++;
+            var budget = Math.Min(perOperation, _options.TargetCommands - _commands);
+            var tool = (operation - 1) % _options.Tools + 1;
+
+            if (isLathe)
+                WriteLatheOperation(operation, tool, budget);
+            else
+                WriteMillOperation(operation, tool, budget);
+        }
+
+        Command("RAPID");
+        Command(isLathe ? $"GOTO/{F(150)}, {F(100)}" : $"GOTO/{F(0)}, {F(0)}, {F(200)}");
+        Command("SPINDL/OFF");
+        Command("COOLNT/OFF");
+        Command("END");
+        Command("FINI");
+
+        _writer.Flush();
+        return new SyntheticAptResult(_commands, _lines, operation);
+    }
+
+    private void WriteMillOperation(int operation, int tool, int budget)
+    {
+        var kind = PickMillOperation();
+        var diameter = 2 + tool * 2;
+
+        Comment($"OPERATION {operation}: {kind.ToUpperInvariant()}");
+        Command($"OP_NAME/{kind.ToUpperInvariant()}_{operation}");
+        Command($"TOOLINF/T{tool}_D{diameter}, {diameter}, 75.0, 0.0");
+        Command($"LOADTL/{tool}, ADJUST, {tool}, MILL");
+        Command($"SPINDL/RPM, {2000 + 500 * (tool % 12)}, CLW");
+        Command("COOLNT/ON");
+        Command($"FEDRAT/MMPM, {F(500 + 100 * (tool % 10))}");
+
+        var end = _commands + budget;
+        switch (kind)
+        {
+            case "surfacing":
+                WriteSurfacing(end);
+                break;
+            case "multiaxis":
+                WriteFiveAxis(end);
+                break;
+            case "contour":
+                WriteArcs(end);
+                break;
+            default:
+                WriteDrilling(end, peck: operation % 2 == 0);
+                break;
+        }
+
+        Command("RAPID");
+        Command($"GOTO/{F(0)}, {F(0)}, {F(100)}");
+    }
+
+    private string PickMillOperation()
+    {
+        var total = _options.SurfacingWeight + _options.FiveAxisWeight + _options.ArcWeight + _options.DrillingWeight;
+        if (total <= 0)
+            return "surfacing";
+
+        var pick = _random.Next(total);
+        if ((pick -= _options.SurfacingWeight) < 0) return "surfacing";
+        if ((pick -= _options.FiveAxisWeight) < 0) return "multiaxis";
+        if ((pick -= _options.ArcWeight) < 0) return "contour";
+        return "drilling";
+    }
+
+    // Растровая обработка волнистой поверхности с мелким шагом
+    private void WriteSurfacing(int end)
+    {
+        var stepover = 0.5 + _random.NextDouble();
+        var step = 0.2 + _random.NextDouble() * 0.3;
+        var y = 0.0;
+        var forward = true;
+
+        Command("RAPID");
+        Command($"GOTO/{F(0)}, {F(0)}, {F(Surface(0, 0) + 5)}");
+        while (_commands < end)
+        {
+            for (var i = 0; i <= 400 && _commands < end; i++)
+            {
+                var x = forward ? i * step : (400 - i) * step;
+                Command($"GOTO/{F(x)}, {F(y)}, {F(Surface(x, y))}", commentable: true);
+            }
+            y += stepover;
+            forward = !forward;
+        }
+    }
+
+    // 5-осевая обработка: вектор оси инструмента по нормали к поверхности
+    private void WriteFiveAxis(int end)
+    {
+        Command("MULTAX/ON");
+        var t = _random.NextDouble() * 100;
+        while (_commands < end - 1)
+        {
+            t += 0.25;
+            var x = 60 * Math.Cos(t / 10);
+            var y = 60 * Math.Sin(t / 10);
+            var z = Surface(x, y);
+
+            var (i, j, k) = Normal(x, y);
+            var position = $"GOTO/{F(x)}, {F(y)}, {F(z)},";
+            var vector = $"{V(i)}, {V(j)}, {V(k)}";
+            if (_random.NextDouble() < _options.ContinuationRate)
+            {
+                Line(position + "$");
+                Command("   " + vector);
+            }
+            else
+            {
+                Command(position + " " + vector, commentable: true);
+            }
+        }
+        Command("MULTAX/OFF");
+    }
+
+    // Контур из дуг: CIRCLE с центром, осью и радиусом, затем конечная точка дуги
+    private void WriteArcs(int end)
+    {
+        var cx = _random.Next(-50, 50);
+        var cy = _random.Next(-50, 50);
+        double z = -_random.Next(1, 20);
+        var radius = 5.0 + _random.Next(0, 30);
+
+        Command("RAPID");
+        Command($"GOTO/{F(cx + radius)}, {F(cy)}, {F(z + 5)}");
+        Command($"GOTO/{F(cx + radius)}, {F(cy)}, {F(z)}");
+        var angle = 0.0;
+        while (_commands < end - 1)
+        {
+            angle += Math.PI / 4;
+            Command($"CIRCLE/{F(cx)}, {F(cy)}, {F(z)}, {V(0)}, {V(0)}, {V(1)}, {F(radius)}");
+            Command($"GOTO/{F(cx + radius * Math.Cos(angle))}, {F(cy + radius * Math.Sin(angle))}, {F(z)}", commentable: true);
+
+            // Следующий проход - чуть глубже
+            if (angle >= 2 * Math.PI)
+            {
+                angle = 0;
+                z -= 0.5;
+                Command($"GOTO/{F(cx + radius)}, {F(cy)}, {F(z)}");
+            }
+        }
+    }
+
+    // Сетка отверстий: позиционирование + цикл на каждое отверстие
+    private void WriteDrilling(int end, bool peck)
+    {
+        var depth = -(5 + _random.Next(0, 40));
+        var pitch = 10 + _random.Next(0, 20);
+        var columns = 5 + _random.Next(0, 10);
+        var hole = 0;
+
+        Command("RAPID");
+        Command($"GOTO/{F(0)}, {F(0)}, {F(20)}");
+        while (_commands < end - 1)
+        {
+            var x = (hole % columns) * pitch;
+            var y = (hole / columns) * pitch;
+            Command($"GOTO/{F(x)}, {F(y)}, {F(10)}");
+            Command(peck
+                ? $"CYCLE83/10, 0, 2, {depth}, 0, -5, 0, 2, 0.5, 0.5, 1, 3, 0, 0"
+                : $"CYCLE81/10, 0, 2, {depth}, 0");
+            hole++;
+        }
+    }
+
+    private void WriteLatheOperation(int operation, int tool, int budget)
+    {
+        var finishing = operation % 3 == 0;
+
+        Comment($"OPERATION {operation}: {(finishing ? "FINISH" : "ROUGH")} TURNING");
+        Command($"OP_NAME/{(finishing ? "FINISH" : "ROUGH")}_{operation}");
+        Command($"LOADTL/{tool}, ADJUST, {tool}, LATHE");
+        Command($"SPINDL/RPM, {800 + 100 * (tool % 10)}, CLW");
+        Command("COOLNT/ON");
+        Command($"FEDRAT/MMPR, {F(finishing ? 0.1 : 0.25)}");
+
+        var end = _commands + budget;
+        var diameter = 80.0 - (operation % 4) * 5;
+        var length = 40.0 + _random.Next(0, 60);
+        var depthOfCut = finishing ? 0.2 : 1.5;
+
+        while (_commands < end)
+        {
+            diameter -= 2 * depthOfCut;
+            if (diameter < 10)
+                diameter = 80.0;
+
+            Command("RAPID");
+            Command($"GOTO/{F(diameter)}, {F(2)}");
+            Command($"GOTO/{F(diameter)}, {F(-length)}", commentable: true);
+            Command($"GOTO/{F(diameter + 2)}, {F(-length)}");
+            Command("RAPID");
+            Command($"GOTO/{F(diameter + 2)}, {F(2)}");
+        }
+    }
+
+    private static double Surface(double x, double y)
+    {
+        return -5 + 3 * Math.Sin(x / 15) * Math.Cos(y / 20);
+    }
+
+    private static (double I, double J, double K) Normal(double x, double y)
+    {
+        var dzdx = 3 * Math.Cos(x / 15) / 15 * Math.Cos(y / 20);
+        var dzdy = -3 * Math.Sin(x / 15) * Math.Sin(y / 20) / 20;
+        var length = Math.Sqrt(dzdx * dzdx + dzdy * dzdy + 1);
+        return (-dzdx / length, -dzdy / length, 1 / length);
+    }
+
+    private void Command(string text, bool commentable = false)
+    {
+        _commands++;
+        if (commentable && _random.NextDouble() < _options.CommentRate)
+            text += $" $$ PT {_commands}";
+        Line(text);
+    }
+
+    private void Comment(string text) => Line("$$ " + text);
+
+    private void Line(string text)
+    {
+        _writer.WriteLine(text);
+        _lines++;
+    }
+
+    private static string F(double value) => value.ToString("F5", CultureInfo.InvariantCulture);
+
+    private static string V(double value) => value.ToString("F6", CultureInfo.InvariantCulture);
+}
@@ -0,0 +1,107 @@
+using PostProcessor.Core.Models;
+
+namespace PostProcessor.APT.Lexer;
+
+/// <summary>
+/// Таблица интернирования слов APT для лексера.
+/// Возвращает один и тот же экземпляр строки в нижнем регистре для одинаковых слов
+/// без выделения памяти на каждое вхождение. Заполнена известными словами <see cref="APTWords"/>;
+/// новые слова добавляются до <see cref="MaxEntries"/>, после чего строки создаются как обычно
+/// (защита от роста таблицы на уникальных именах инструментов/операций).
+/// </summary>
+public sealed class APTWordTable
+{
+    /// <summary>
+    /// Максимальное количество слов в таблице
+    /// </summary>
+    public const int MaxEntries = 4096;
+
+    private const int MaxWordLength = 64;
+
+    private int[] _buckets = new int[256];
+    private Entry[] _entries = new Entry[128];
+    private int _count;
+
+    private struct Entry
+    {
+        public int HashCode;
+        public int Next;
+        public string Value;
+    }
+
+    public APTWordTable()
+    {
+        foreach (var word in APTWords.KnownWords)
+            Intern(word.AsSpan());
+    }
+
+    /// <summary>
+    /// Количество слов в таблице
+    /// </summary>
+    public int Count => _count;
+
+    /// <summary>
+    /// Получить каноническую строку слова в нижнем регистре
+    /// </summary>
+    public string Intern(ReadOnlySpan<char> word)
+    {
+        if (word.Length > MaxWordLength)
+            return word.ToString().ToLowerInvariant();
+
+        var hashCode = GetHashCode(word);
+        for (var i = _buckets[hashCode & (_buckets.Length - 1)] - 1; i >= 0; i = _entries[i].Next)
+        {
+            if (_entries[i].HashCode == hashCode && EqualsLower(word, _entries[i].Value))
+                return _entries[i].Value;
+        }
+
+        var value = word.ToString().ToLowerInvariant();
+        if (_count < MaxEntries)
+            Add(value, hashCode);
+        return value;
+    }
+
+    private void Add(string value, int hashCode)
+    {
+        if (_count == _entries.Length)
+            Resize();
+
+        ref var bucket = ref _buckets[hashCode & (_buckets.Length - 1)];
+        _entries[_count] = new Entry { HashCode = hashCode, Next = bucket - 1, Value = value };
+        bucket = ++_count;
+    }
+
+    private void Resize()
+    {
+        Array.Resize(ref _entries, _entries.Length * 2);
+        _buckets = new int[_buckets.Length * 2];
+        for (int i = 0; i < _count; i++)
+        {
+            ref var bucket = ref _buckets[_entries[i].HashCode & (_buckets.Length - 1)];
+            _entries[i].Next = bucket - 1;
+            bucket = i + 1;
+        }
+    }
+
+    // FNV-1a по символам в нижнем регистре
+    private static int GetHashCode(ReadOnlySpan<char> word)
+    {
+        uint hash = 2166136261;
+        foreach (var c in word)
+            hash = (hash ^ char.ToLowerInvariant(c)) * 16777619;
+        return (int)hash;
+    }
+
+    private static bool EqualsLower(ReadOnlySpan<char> word, string lower)
+    {
+        if (word.Length != lower.Length)
+            return false;
+
+        for (int i = 0; i < word.Length; i++)
+        {
+            if (char.ToLowerInvariant(word[i]) != lower[i])
+                return false;
+        }
+        return true;
+    }
+}
@@ -0,0 +1,190 @@
+using PostProcessor.APT.Encodings;
+using PostProcessor.Core.Config.Models;
+using PostProcessor.Core.Context;
+using System.Globalization;
+using System.Text;
+
+namespace PostProcessor.APT.Lexer;
+
+/// <summary>
+/// Быстрый предварительный просмотр APT-файла: список инструментов программы
+/// до основной обработки (для списка инструментов в заголовке и данных LOADTL).
+/// Разбираются только строки LOADTL/TOOLNO/TOOLINF, остальные пропускаются без токенизации.
+/// </summary>
+public static class AptToolPreScanner
+{
+    /// <summary>
+    /// Найти инструменты программы в порядке первого использования.
+    /// TOOLINF/имя, диаметр, длина, радиус относится к следующему LOADTL/TOOLNO;
+    /// недостающие параметры берутся из библиотеки инструментов.
+    /// </summary>
+    /// <param name="filePath">Путь к APT-файлу</param>
+    /// <param name="library">Библиотека инструментов станка</param>
+    /// <param name="cancellationToken">Токен отмены</param>
+    public static async Task<List<ToolInfo>> ScanAsync(
+        string filePath,
+        ToolLibraryConfig? library = null,
+        CancellationToken cancellationToken = default)
+    {
+        var stream = new FileStream(filePath, FileMode.Open, FileAccess.Read, FileShare.Read, 8192, FileOptions.SequentialScan);
+        var encoding = new EncodingDetector().DetectFromStream(stream);
+        using var reader = new StreamReader(stream, encoding, detectEncodingFromByteOrderMarks: true, bufferSize: 8192);
+
+        var collector = new ToolCollector(library);
+
+        string? line;
+        while ((line = await reader.ReadLineAsync(cancellationToken).ConfigureAwait(false)) != null)
+            collector.ReadLine(line);
+
+        collector.Complete();
+        return collector.Tools;
+    }
+
+    private static bool IsToolCommand(ReadOnlySpan<char> line)
+    {
+        var delimiterIndex = line.IndexOf('/');
+        var major = (delimiterIndex >= 0 ? line[..delimiterIndex] : line).Trim().TrimEnd(',');
+
+        return major.Equals("loadtl", StringComparison.OrdinalIgnoreCase) ||
+               major.Equals("toolno", StringComparison.OrdinalIgnoreCase) ||
+               major.Equals("toolinf", StringComparison.OrdinalIgnoreCase);
+    }
+
+    /// <summary>
+    /// Сбор инструментов по разобранным командам
+    /// </summary>
+    private sealed class ToolCollector
+    {
+        private readonly ToolLibraryConfig? _library;
+        private readonly HashSet<int> _seen = new();
+
+        // Последний TOOLINF, ещё не привязанный к номеру инструмента
+        private string? _name;
+        private string? _type;
+        private List<double>? _info;
+
+        // Склейка строк с '$' в конце; строки других команд не собираются
+        private StringBuilder? _continuation;
+        private bool _skipContinuation;
+
+        public ToolCollector(ToolLibraryConfig? library)
+        {
+            _library = library;
+        }
+
+        public List<ToolInfo> Tools { get; } = new();
+
+        public void ReadLine(string line)
+        {
+            var span = line.AsSpan();
+
+            // Комментарий '$$' до конца строки
+            var commentIndex = span.IndexOf("$$", StringComparison.Ordinal);
+            if (commentIndex >= 0)
+                span = span[..commentIndex];
+
+            span = span.Trim();
+            if (span.IsEmpty)
+                return;
+
+            var continues = span[^1] == '$';
+            if (continues)
+                span = span[..^1].TrimEnd();
+
+            if (_skipContinuation)
+            {
+                _skipContinuation = continues;
+                return;
+            }
+
+            if (_continuation != null)
+            {
+                _continuation.Append(span);
+                if (continues)
+                {
+                    _continuation.Append(' ');
+                    return;
+                }
+
+                Accept(_continuation.ToString());
+                _continuation = null;
+                return;
+            }
+
+            if (!IsToolCommand(span))
+            {
+                _skipContinuation = continues;
+                return;
+            }
+
+            if (continues)
+                _continuation = new StringBuilder().Append(span).Append(' ');
+            else
+                Accept(span.ToString());
+        }
+
+        public void Complete()
+        {
+            if (_continuation != null)
+                Accept(_continuation.ToString());
+            _continuation = null;
+        }
+
+        private void Accept(string line)
+        {
+            var delimiterIndex = line.IndexOf('/');
+            if (delimiterIndex < 0)
+                return;
+
+            var major = line[..delimiterIndex].Trim().TrimEnd(',');
+            var numerics = new List<double>();
+            var words = new List<string>();
+
+            foreach (var token in line[(delimiterIndex + 1)..].Split(','))
+            {
+                var trimmed = token.Trim().Trim('\'', '"');
+                if (trimmed.Length == 0)
+                    continue;
+
+                if (double.TryParse(trimmed, NumberStyles.Float, CultureInfo.InvariantCulture, out var value))
+                    numerics.Add(value);
+                else
+                    words.Add(trimmed);
+            }
+
+            if (major.Equals("toolinf", StringComparison.OrdinalIgnoreCase))
+            {
+                _name = words.Count > 0 ? words[0] : null;
+                _type = words.Count > 1 ? words[1].ToLowerInvariant() : null;
+                _info = numerics;
+                return;
+            }
+
+            if (numerics.Count == 0)
+                return;
+
+            var number = (int)Math.Round(numerics[0]);
+            if (_seen.Add(number))
+                Tools.Add(Build(number));
+
+            _name = null;
+            _type = null;
+            _info = null;
+        }
+
+        private ToolInfo Build(int number)
+        {
+            var definition = _library?.FindTool(number);
+            var info = _info ?? new List<double>();
+
+            return new ToolInfo(
+                Number: number,
+                Diameter: info.Count > 0 ? info[0] : definition?.Diameter ?? 0,
+                Length: info.Count > 1 ? info[1] : definition?.Length ?? 0,
+                Comment: _name ?? definition?.Name ?? definition?.Comment,
+                Type: _type ?? definition?.ToToolInfo().Type,
+                Flutes: definition?.Flutes,
+                CornerRadius: info.Count > 2 ? info[2] : definition?.CornerRadius);
+        }
+    }
+}
@@ -8,26 +8,51 @@ namespace PostProcessor.APT.Lexer;
 public class StreamingAPTLexer : IAsyncDisposable
 {
     private readonly StreamReader _reader;
+    private readonly Stream _content;
+    private readonly APTWordTable _words = new();
     private readonly int _lineNumberStart;
     private int _currentLine;
     private bool _disposed = false;
     private string _continuationBuffer = string.Empty;
 
     public StreamingAPTLexer(string filePath, IEncodingDetector? detector = null, int lineNumberStart = 1)
+        : this(
+            new FileStream(filePath, FileMode.Open, FileAccess.Read, FileShare.Read, 8192, FileOptions.SequentialScan),
+            detector,
+            lineNumberStart)
+    {
+    }
+
+    /// <summary>
+    /// Лексер поверх потока; кодировка определяется по началу того же потока,
+    /// поэтому подходят и потоки без перемотки (stdin, pipe)
+    /// </summary>
+    public StreamingAPTLexer(Stream stream, IEncodingDetector? detector = null, int lineNumberStart = 1, bool leaveOpen = false)
     {
         detector ??= new EncodingDetector();
-        var encoding = detector.Detect(filePath);
+        _content = EncodingDetector.Sniff(stream, detector, out var encoding);
 
         _reader = new StreamReader(
-            filePath,
+            _content,
             encoding,
             detectEncodingFromByteOrderMarks: true,
-            bufferSize: 8192
+            bufferSize: 8192,
+            leaveOpen: leaveOpen
         );
         _lineNumberStart = lineNumberStart;
         _currentLine = lineNumberStart;
     }
 
+    /// <summary>
+    /// Прочитано байт входного потока (с точностью до буфера чтения)
+    /// </summary>
+    public long BytesRead => _content is PrefixReplayStream replay ? replay.BytesRead : _content.Position;
+
+    /// <summary>
+    /// Прочитано строк
+    /// </summary>
+    public long LinesRead => _currentLine - _lineNumberStart;
+
     public async IAsyncEnumerable<APTCommand> ParseStreamAsync()
     {
         string? line;
@@ -141,12 +166,12 @@ public class StreamingAPTLexer : IAsyncDisposable
             }
         }
 
-        string majorWord;
+        ReadOnlySpan<char> majorSpan;
         string paramsPart;
 
         if (delimiterIndex > 0)
         {
-            majorWord = line.Substring(0, delimiterIndex).Trim();
+            majorSpan = line.AsSpan(0, delimiterIndex).Trim();
             paramsPart = (delimiterIndex + 1 < line.Length)
                 ? line.Substring(delimiterIndex + 1).Trim()
                 : string.Empty;
@@ -154,19 +179,18 @@ public class StreamingAPTLexer : IAsyncDisposable
         else
         {
             // Альтернативный синтаксис без '/'
-            majorWord = line.Trim();
+            majorSpan = line.AsSpan().Trim();
             paramsPart = string.Empty;
         }
 
-        if (string.IsNullOrWhiteSpace(majorWord))
+        if (majorSpan.IsWhiteSpace())
             throw new FormatException($"Empty major word at line {lineNumber}");
 
         // CATIA-специфика: удаление завершающей запятой из имени команды
-        if (majorWord.EndsWith(','))
-            majorWord = majorWord.TrimEnd(',');
+        majorSpan = majorSpan.TrimEnd(',');
 
-        // Унификация регистра
-        majorWord = majorWord.ToLowerInvariant();
+        // Унификация регистра через таблицу интернирования
+        var majorWord = _words.Intern(majorSpan);
 
         var parameters = ParseParameters(paramsPart, lineNumber);
 
@@ -222,8 +246,8 @@ public class StreamingAPTLexer : IAsyncDisposable
                 continue;
             }
 
-            // Minor word → lowercase
-            minors.Add(trimmed.ToLowerInvariant());
+            // Minor word → lowercase (интернированная строка)
+            minors.Add(_words.Intern(trimmed));
         }
 
         return (minors, numerics, strings);
@@ -1,5 +1,8 @@
 ﻿using PostProcessor.APT.Lexer;
 using PostProcessor.Core.Context;
+using PostProcessor.Core.Diagnostics;
+using PostProcessor.Core.Incremental;
+using PostProcessor.Core.Models;
 using PostProcessor.Macros.Interfaces;
 
 namespace PostProcessor.APT.Parser;
@@ -10,14 +13,334 @@ public static class APTParser
         string inputPath,
         PostContext context,
         IMacroEngine macroEngine,
-        CancellationToken cancellationToken = default)
+        CancellationToken cancellationToken = default,
+        ProgressReporter? progress = null)
     {
         await using var lexer = new StreamingAPTLexer(inputPath);
+        await ParseWithMacrosAsync(lexer, context, macroEngine, cancellationToken, progress).ConfigureAwait(false);
+    }
+
+    /// <summary>
+    /// Обработать APT из потока (в том числе stdin/pipe без перемотки)
+    /// </summary>
+    /// <param name="input">Входной поток APT; закрывается по окончании</param>
+    /// <param name="context">Контекст постпроцессора</param>
+    /// <param name="macroEngine">Движок макросов</param>
+    /// <param name="cancellationToken">Токен отмены</param>
+    /// <param name="progress">Отчёт о ходе обработки (необязательно)</param>
+    public static async Task ParseWithMacrosAsync(
+        Stream input,
+        PostContext context,
+        IMacroEngine macroEngine,
+        CancellationToken cancellationToken = default,
+        ProgressReporter? progress = null)
+    {
+        await using var lexer = new StreamingAPTLexer(input);
+        await ParseWithMacrosAsync(lexer, context, macroEngine, cancellationToken, progress).ConfigureAwait(false);
+    }
 
+    private static async Task ParseWithMacrosAsync(
+        StreamingAPTLexer lexer,
+        PostContext context,
+        IMacroEngine macroEngine,
+        CancellationToken cancellationToken,
+        ProgressReporter? progress)
+    {
         await foreach (var command in lexer.ParseStreamAsync().ConfigureAwait(false))
         {
             cancellationToken.ThrowIfCancellationRequested();
             await macroEngine.ExecuteAsync(context, command, cancellationToken).ConfigureAwait(false);
+
+            if (progress != null && progress.Track(command))
+                progress.Report(lexer.BytesRead, lexer.LinesRead, context.BlockWriter.BlocksWritten);
+        }
+
+        // Команды, поставленные движком в очередь, выполнены до чтения состояния;
+        // незакрытая серия отверстий - в конце программы
+        await macroEngine.FlushAsync(cancellationToken).ConfigureAwait(false);
+        context.Holes.Flush();
+        progress?.Complete(lexer.BytesRead, lexer.LinesRead, context.BlockWriter.BlocksWritten);
+    }
+
+    /// <summary>
+    /// Воспроизвести прогон по трассировке: команды берутся из файла трассировки
+    /// в исходном порядке и передаются макросам (например, новой версии)
+    /// </summary>
+    /// <param name="tracePath">Трассировка, записанная ChromeTraceSink</param>
+    /// <param name="context">Контекст постпроцессора</param>
+    /// <param name="macroEngine">Движок макросов</param>
+    /// <param name="cancellationToken">Токен отмены</param>
+    public static async Task ReplayTraceAsync(
+        string tracePath,
+        PostContext context,
+        IMacroEngine macroEngine,
+        CancellationToken cancellationToken = default)
+    {
+        await foreach (var traceEvent in TraceReader.ReadAsync(tracePath, cancellationToken).ConfigureAwait(false))
+        {
+            cancellationToken.ThrowIfCancellationRequested();
+            await macroEngine.ExecuteAsync(context, traceEvent.Command, cancellationToken).ConfigureAwait(false);
         }
+
+        await macroEngine.FlushAsync(cancellationToken).ConfigureAwait(false);
+        context.Holes.Flush();
+    }
+
+    /// <summary>
+    /// Инкрементальная обработка: поток APT делится на сегменты по операциям
+    /// (op_name/start_op/loadtl), неизменённые сегменты с тем же входным
+    /// состоянием берутся из кэша без запуска макросов.
+    /// </summary>
+    /// <param name="inputPath">Путь к APT-файлу</param>
+    /// <param name="context">Контекст; Output должен быть SegmentCaptureWriter</param>
+    /// <param name="macroEngine">Движок макросов</param>
+    /// <param name="cache">Кэш сегментов</param>
+    /// <param name="capture">Writer, через который идёт вывод контекста</param>
+    /// <param name="cancellationToken">Токен отмены</param>
+    /// <returns>Статистика использования кэша</returns>
+    public static async Task<IncrementalPostResult> ParseIncrementalAsync(
+        string inputPath,
+        PostContext context,
+        IMacroEngine macroEngine,
+        IncrementalPostCache cache,
+        SegmentCaptureWriter capture,
+        CancellationToken cancellationToken = default)
+    {
+        await using var lexer = new StreamingAPTLexer(inputPath);
+
+        var segment = new List<APTCommand>();
+        var segments = 0;
+        var reused = 0;
+
+        async Task FlushSegmentAsync()
+        {
+            if (segment.Count == 0)
+                return;
+
+            segments++;
+            if (await PostSegmentAsync(segment, context, macroEngine, cache, capture, cancellationToken).ConfigureAwait(false))
+                reused++;
+            segment.Clear();
+        }
+
+        await foreach (var command in lexer.ParseStreamAsync().ConfigureAwait(false))
+        {
+            cancellationToken.ThrowIfCancellationRequested();
+
+            // Граница сегмента; подряд идущие OP_NAME/START_OP/LOADTL остаются в одном сегменте
+            if (IsSegmentBoundary(command) && segment.Any(c => !IsSegmentBoundary(c)))
+                await FlushSegmentAsync().ConfigureAwait(false);
+
+            segment.Add(command);
+        }
+
+        await FlushSegmentAsync().ConfigureAwait(false);
+        return new IncrementalPostResult(segments, reused);
+    }
+
+    /// <summary>
+    /// Прочитать APT-файл и разделить его на сегменты по операциям (как в ParseIncrementalAsync)
+    /// </summary>
+    public static async Task<List<List<APTCommand>>> ReadSegmentsAsync(
+        string inputPath,
+        CancellationToken cancellationToken = default)
+    {
+        await using var lexer = new StreamingAPTLexer(inputPath);
+
+        var segments = new List<List<APTCommand>>();
+        var segment = new List<APTCommand>();
+
+        await foreach (var command in lexer.ParseStreamAsync().ConfigureAwait(false))
+        {
+            cancellationToken.ThrowIfCancellationRequested();
+
+            if (IsSegmentBoundary(command) && segment.Any(c => !IsSegmentBoundary(c)))
+            {
+                segments.Add(segment);
+                segment = new List<APTCommand>();
+            }
+
+            segment.Add(command);
+        }
+
+        if (segment.Count > 0)
+            segments.Add(segment);
+
+        return segments;
+    }
+
+    /// <summary>
+    /// Обработать диапазон сегментов в рабочем процессе параллельного режима.
+    /// Входное состояние первого сегмента предсказывается: с чистого контекста
+    /// прогоняется предыдущий сегмент (вывод отбрасывается). Остальные сегменты
+    /// диапазона идут подряд, как при обычной обработке.
+    /// </summary>
+    /// <param name="segments">Все сегменты программы</param>
+    /// <param name="firstSegment">Первый сегмент диапазона</param>
+    /// <param name="lastSegment">Последний сегмент диапазона (включительно)</param>
+    /// <param name="context">Чистый контекст; Output должен быть SegmentCaptureWriter</param>
+    /// <param name="macroEngine">Движок макросов</param>
+    /// <param name="capture">Writer, через который идёт вывод контекста</param>
+    /// <param name="cancellationToken">Токен отмены</param>
+    public static async Task<List<SegmentPostResult>> PostSegmentRangeAsync(
+        IReadOnlyList<IReadOnlyList<APTCommand>> segments,
+        int firstSegment,
+        int lastSegment,
+        PostContext context,
+        IMacroEngine macroEngine,
+        SegmentCaptureWriter capture,
+        CancellationToken cancellationToken = default)
+    {
+        if (firstSegment > 0)
+        {
+            foreach (var command in segments[firstSegment - 1])
+            {
+                cancellationToken.ThrowIfCancellationRequested();
+                await macroEngine.ExecuteAsync(context, command, cancellationToken).ConfigureAwait(false);
+            }
+            await macroEngine.FlushAsync(cancellationToken).ConfigureAwait(false);
+            context.Holes.Flush();
+        }
+
+        var results = new List<SegmentPostResult>();
+        for (int index = firstSegment; index <= lastSegment; index++)
+        {
+            var entering = PostStateSnapshot.Capture(context);
+
+            capture.BeginCapture();
+            try
+            {
+                foreach (var command in segments[index])
+                {
+                    cancellationToken.ThrowIfCancellationRequested();
+                    await macroEngine.ExecuteAsync(context, command, cancellationToken).ConfigureAwait(false);
+                }
+
+                // Серия отверстий не переходит через границу сегмента
+                await macroEngine.FlushAsync(cancellationToken).ConfigureAwait(false);
+                context.Holes.Flush();
+            }
+            catch
+            {
+                capture.EndCapture();
+                throw;
+            }
+
+            var output = capture.EndCapture();
+            results.Add(new SegmentPostResult(index, entering.ToJson(), PostStateSnapshot.Capture(context).ToJson(), output));
+        }
+
+        return results;
+    }
+
+    /// <summary>
+    /// Собрать вывод параллельной обработки по порядку сегментов.
+    /// Результат сегмента принимается, только если его предсказанное входное состояние
+    /// совпадает с фактическим состоянием после предыдущего сегмента; иначе (или при
+    /// отсутствии результата) сегмент обрабатывается заново в текущем процессе.
+    /// Нумерация кадров должна восстанавливаться writer'ом контекста (BlockRenumberingWriter).
+    /// </summary>
+    /// <param name="segments">Все сегменты программы</param>
+    /// <param name="results">Результаты рабочих процессов</param>
+    /// <param name="context">Чистый контекст, Output - итоговый writer</param>
+    /// <param name="macroEngine">Движок макросов для повторной обработки</param>
+    /// <param name="cancellationToken">Токен отмены</param>
+    /// <returns>Количество сегментов, обработанных заново</returns>
+    public static async Task<int> StitchSegmentsAsync(
+        IReadOnlyList<IReadOnlyList<APTCommand>> segments,
+        IEnumerable<SegmentPostResult> results,
+        PostContext context,
+        IMacroEngine macroEngine,
+        CancellationToken cancellationToken = default)
+    {
+        var byIndex = new Dictionary<int, SegmentPostResult>();
+        foreach (var result in results)
+            byIndex[result.Index] = result;
+
+        var expected = PostStateSnapshot.Capture(context);
+        var reposted = 0;
+
+        for (int index = 0; index < segments.Count; index++)
+        {
+            cancellationToken.ThrowIfCancellationRequested();
+
+            if (byIndex.TryGetValue(index, out var result) && expected.IsCacheable)
+            {
+                var entering = PostStateSnapshot.FromJson(result.EnteringState);
+                if (entering.IsCacheable && entering.Hash == expected.Hash)
+                {
+                    await context.Output.WriteAsync(result.Output).ConfigureAwait(false);
+                    expected = PostStateSnapshot.FromJson(result.ExitState);
+                    continue;
+                }
+            }
+
+            // Предсказание не подтвердилось - последовательная обработка от фактического состояния
+            expected.RestoreTo(context);
+            foreach (var command in segments[index])
+            {
+                cancellationToken.ThrowIfCancellationRequested();
+                await macroEngine.ExecuteAsync(context, command, cancellationToken).ConfigureAwait(false);
+            }
+
+            // Серия отверстий не переходит через границу сегмента (как у рабочих процессов)
+            await macroEngine.FlushAsync(cancellationToken).ConfigureAwait(false);
+            context.Holes.Flush();
+            expected = PostStateSnapshot.Capture(context);
+            reposted++;
+        }
+
+        expected.RestoreTo(context);
+        return reposted;
+    }
+
+    private static bool IsSegmentBoundary(APTCommand command)
+    {
+        return command.Word is APTMajorWord.OpName or APTMajorWord.StartOp or APTMajorWord.Loadtl;
+    }
+
+    private static async Task<bool> PostSegmentAsync(
+        List<APTCommand> segment,
+        PostContext context,
+        IMacroEngine macroEngine,
+        IncrementalPostCache cache,
+        SegmentCaptureWriter capture,
+        CancellationToken cancellationToken)
+    {
+        var entering = PostStateSnapshot.Capture(context);
+        var key = entering.IsCacheable ? cache.ComputeKey(entering, segment) : null;
+
+        if (key != null && cache.TryGet(key, out var entry))
+        {
+            await capture.WriteAsync(entry.Output).ConfigureAwait(false);
+            entry.ExitState.RestoreTo(context);
+            return true;
+        }
+
+        capture.BeginCapture();
+        try
+        {
+            foreach (var command in segment)
+            {
+                cancellationToken.ThrowIfCancellationRequested();
+                await macroEngine.ExecuteAsync(context, command, cancellationToken).ConfigureAwait(false);
+            }
+
+            // Серия отверстий не переходит через границу сегмента
+            await macroEngine.FlushAsync(cancellationToken).ConfigureAwait(false);
+            context.Holes.Flush();
+        }
+        catch
+        {
+            capture.EndCapture();
+            throw;
+        }
+
+        var output = capture.EndCapture();
+        var exit = PostStateSnapshot.Capture(context);
+        if (key != null && exit.IsCacheable)
+            cache.Store(key, new IncrementalCacheEntry(output, exit));
+
+        return false;
     }
 }
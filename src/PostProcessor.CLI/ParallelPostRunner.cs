@@ -0,0 +1,230 @@
+using System.Diagnostics;
+using System.Reflection;
+using System.Text.Json;
+using PostProcessor.APT.Lexer;
+using PostProcessor.APT.Parser;
+using PostProcessor.Core.Config.Models;
+using PostProcessor.Core.Context;
+using PostProcessor.Core.Incremental;
+using PostProcessor.Macros.Interfaces;
+using PostProcessor.Macros.Python;
+
+namespace PostProcessor.CLI;
+
+/// <summary>
+/// Параллельное постпроцессирование: сегменты (операции) раздаются рабочим процессам
+/// (скрытая подкоманда post-worker), затем вывод собирается по порядку с проверкой
+/// входного состояния каждого сегмента. Несовпавшие сегменты обрабатываются заново.
+/// Отдельные процессы нужны из-за GIL: Python-макросы в одном процессе не параллелятся.
+/// </summary>
+internal static class ParallelPostRunner
+{
+    /// <summary>
+    /// Имя скрытой подкоманды рабочего процесса
+    /// </summary>
+    public const string WorkerCommandName = "post-worker";
+
+    private static readonly JsonSerializerOptions JsonOptions = new() { WriteIndented = false };
+
+    /// <summary>
+    /// Выполнить программу в параллельном режиме
+    /// </summary>
+    /// <param name="inputPath">APT-файл</param>
+    /// <param name="configPath">Файл конфигурации контроллера</param>
+    /// <param name="toolLibraryPath">Библиотека инструментов</param>
+    /// <param name="machine">Станок</param>
+    /// <param name="macroPaths">Каталоги Python-макросов</param>
+    /// <param name="workers">Запрошенное число рабочих процессов</param>
+    /// <param name="context">Чистый контекст; Output - BlockRenumberingWriter итогового файла</param>
+    /// <param name="macroEngine">Загруженный движок для повторной обработки сегментов</param>
+    /// <param name="debug">Выводить stderr рабочих процессов</param>
+    /// <param name="cancellationToken">Токен отмены</param>
+    public static async Task<ParallelPostResult> RunAsync(
+        string inputPath,
+        string configPath,
+        string? toolLibraryPath,
+        string machine,
+        IReadOnlyList<string> macroPaths,
+        int workers,
+        PostContext context,
+        IMacroEngine macroEngine,
+        bool debug,
+        CancellationToken cancellationToken)
+    {
+        var segments = await APTParser.ReadSegmentsAsync(inputPath, cancellationToken).ConfigureAwait(false);
+        workers = Math.Min(workers, segments.Count);
+
+        var results = new List<SegmentPostResult>();
+        if (workers > 1)
+        {
+            var jobs = SplitJobs(segments.Count, workers)
+                .Select(range => new ParallelPostJob(inputPath, configPath, machine, macroPaths, range.First, range.Last, toolLibraryPath))
+                .ToList();
+
+            var tasks = jobs.Select(job => RunWorkerProcessAsync(job, debug, cancellationToken)).ToList();
+            foreach (var workerResults in await Task.WhenAll(tasks).ConfigureAwait(false))
+                results.AddRange(workerResults);
+        }
+        else
+        {
+            workers = 0;
+        }
+
+        var reposted = await APTParser.StitchSegmentsAsync(
+            segments,
+            results,
+            context,
+            macroEngine,
+            cancellationToken).ConfigureAwait(false);
+
+        return new ParallelPostResult(segments.Count, workers, reposted);
+    }
+
+    /// <summary>
+    /// Точка входа рабочего процесса: прочитать задание, обработать сегменты, записать результат
+    /// </summary>
+    public static async Task<int> RunWorkerAsync(string jobPath, string resultPath)
+    {
+        try
+        {
+            var job = JsonSerializer.Deserialize<ParallelPostJob>(await File.ReadAllTextAsync(jobPath).ConfigureAwait(false), JsonOptions)
+                ?? throw new InvalidDataException($"Empty job file: {jobPath}");
+
+            var config = Core.Config.Loaders.ConfigSnapshotCache.Shared.GetOrLoad(job.ConfigPath).Controller;
+            var toolLibrary = job.ToolLibraryPath != null
+                ? Core.Config.Loaders.JsonConfigLoader.LoadToolLibrary(job.ToolLibraryPath)
+                : null;
+            var segments = await APTParser.ReadSegmentsAsync(job.InputPath).ConfigureAwait(false);
+
+            await using var pythonEngine = new PythonMacroEngine(job.Machine, job.MacroPaths.ToArray()) { PipelineCommands = true };
+            await pythonEngine.LoadAsync(job.MacroPaths).ConfigureAwait(false);
+
+            // Вывод нужен только перехваченный по сегментам
+            var capture = new SegmentCaptureWriter(TextWriter.Null);
+            var context = new PostContext(capture)
+            {
+                Config = config,
+                ToolLibrary = toolLibrary,
+                ProjectTools = await AptToolPreScanner.ScanAsync(job.InputPath, toolLibrary).ConfigureAwait(false)
+            };
+
+            var results = await APTParser.PostSegmentRangeAsync(
+                segments,
+                job.FirstSegment,
+                Math.Min(job.LastSegment, segments.Count - 1),
+                context,
+                pythonEngine,
+                capture).ConfigureAwait(false);
+
+            await File.WriteAllTextAsync(resultPath, JsonSerializer.Serialize(results, JsonOptions)).ConfigureAwait(false);
+            return 0;
+        }
+        catch (Exception ex)
+        {
+            Console.Error.WriteLine($"Worker error: {ex.Message}");
+            return 1;
+        }
+    }
+
+    /// <summary>
+    /// Разбить сегменты на непрерывные диапазоны примерно равного размера
+    /// </summary>
+    internal static List<(int First, int Last)> SplitJobs(int segmentCount, int workers)
+    {
+        var ranges = new List<(int First, int Last)>();
+        var first = 0;
+        for (int worker = 0; worker < workers; worker++)
+        {
+            var size = (segmentCount - first) / (workers - worker);
+            if (size == 0)
+                continue;
+
+            ranges.Add((first, first + size - 1));
+            first += size;
+        }
+        return ranges;
+    }
+
+    // Запуск рабочего процесса; при ошибке результатов нет - сегменты будут обработаны заново
+    private static async Task<List<SegmentPostResult>> RunWorkerProcessAsync(
+        ParallelPostJob job,
+        bool debug,
+        CancellationToken cancellationToken)
+    {
+        var jobPath = Path.Combine(Path.GetTempPath(), $"postjob_{Guid.NewGuid():N}.json");
+        var resultPath = Path.ChangeExtension(jobPath, ".result.json");
+
+        try
+        {
+            await File.WriteAllTextAsync(jobPath, JsonSerializer.Serialize(job, JsonOptions), cancellationToken).ConfigureAwait(false);
+
+            var startInfo = CreateStartInfo();
+            startInfo.ArgumentList.Add(WorkerCommandName);
+            startInfo.ArgumentList.Add("--job");
+            startInfo.ArgumentList.Add(jobPath);
+            startInfo.ArgumentList.Add("--result");
+            startInfo.ArgumentList.Add(resultPath);
+
+            using var process = Process.Start(startInfo)
+                ?? throw new InvalidOperationException("Failed to start worker process");
+
+            var stdout = process.StandardOutput.ReadToEndAsync(cancellationToken);
+            var stderr = process.StandardError.ReadToEndAsync(cancellationToken);
+
+            try
+            {
+                await process.WaitForExitAsync(cancellationToken).ConfigureAwait(false);
+            }
+            catch (OperationCanceledException)
+            {
+                process.Kill(entireProcessTree: true);
+                throw;
+            }
+
+            await stdout.ConfigureAwait(false);
+            var errors = await stderr.ConfigureAwait(false);
+
+            if (process.ExitCode != 0 || !File.Exists(resultPath))
+            {
+                Console.Error.WriteLine($"Warning: worker for segments {job.FirstSegment}-{job.LastSegment} failed (exit code {process.ExitCode}), segments will be reposted");
+                if (debug && !string.IsNullOrWhiteSpace(errors))
+                    Console.Error.WriteLine(errors.TrimEnd());
+                return new List<SegmentPostResult>();
+            }
+
+            return JsonSerializer.Deserialize<List<SegmentPostResult>>(
+                await File.ReadAllTextAsync(resultPath, cancellationToken).ConfigureAwait(false), JsonOptions)
+                ?? new List<SegmentPostResult>();
+        }
+        catch (Exception ex) when (ex is IOException or JsonException or InvalidOperationException or System.ComponentModel.Win32Exception)
+        {
+            Console.Error.WriteLine($"Warning: worker for segments {job.FirstSegment}-{job.LastSegment} failed ({ex.Message}), segments will be reposted");
+            return new List<SegmentPostResult>();
+        }
+        finally
+        {
+            File.Delete(jobPath);
+            File.Delete(resultPath);
+        }
+    }
+
+    // Тот же исполняемый файл; при запуске через "dotnet PostProcessor.CLI.dll" - с путём к сборке
+    private static ProcessStartInfo CreateStartInfo()
+    {
+        var processPath = Environment.ProcessPath
+            ?? throw new InvalidOperationException("Cannot determine current process path");
+
+        var startInfo = new ProcessStartInfo(processPath)
+        {
+            UseShellExecute = false,
+            RedirectStandardOutput = true,
+            RedirectStandardError = true,
+            CreateNoWindow = true
+        };
+
+        if (Path.GetFileNameWithoutExtension(processPath).Equals("dotnet", StringComparison.OrdinalIgnoreCase))
+            startInfo.ArgumentList.Add(Assembly.GetEntryAssembly()!.Location);
+
+        return startInfo;
+    }
+}
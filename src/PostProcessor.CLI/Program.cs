@@ -1,8 +1,16 @@
+using PostProcessor.APT.Generation;
+using PostProcessor.APT.Lexer;
 using PostProcessor.APT.Parser;
 using PostProcessor.Core.Config;
 using PostProcessor.Core.Config.Models;
 using PostProcessor.Core.Context;
+using PostProcessor.Core.Diagnostics;
+using PostProcessor.Core.Incremental;
+using PostProcessor.Core.Models;
+using PostProcessor.Core.Optimization;
+using PostProcessor.Core.Writers;
 using PostProcessor.Macros.Engine;
+using PostProcessor.Macros.Interfaces;
 using PostProcessor.Macros.Python;
 using System.CommandLine;
 using System.CommandLine.Invocation;
@@ -13,17 +21,22 @@ namespace PostProcessor.CLI;
 
 public static class Program
 {
+    /// <summary>
+    /// Путь, означающий стандартный поток (stdin для --input, stdout для --output)
+    /// </summary>
+    private const string StandardStreamPath = "-";
+
     public static async Task<int> Main(string[] args)
     {
         CultureInfo.DefaultThreadCurrentCulture = CultureInfo.InvariantCulture;
         CultureInfo.DefaultThreadCurrentUICulture = CultureInfo.InvariantCulture;
 
-        var inputOption = new Option<string>(["--input", "-i"], "Input APT/CL file path")
+        var inputOption = new Option<string>(["--input", "-i"], "Input APT/CL file path (- for stdin)")
         {
             IsRequired = true
         };
 
-        var outputOption = new Option<string>(["--output", "-o"], "Output NC file path")
+        var outputOption = new Option<string>(["--output", "-o"], "Output NC file path (- for stdout)")
         {
             IsRequired = true
         };
@@ -53,6 +66,64 @@ public static class Program
             getDefaultValue: () => false,
             description: "Validate APT syntax only (no G-code generation)");
 
+        var extractSubprogramsOption = new Option<bool>(["--extract-subprograms", "-xs"],
+            getDefaultValue: () => false,
+            description: "Move repeated motion sequences into subprograms (M98/L calls)");
+
+        var latheCyclesOption = new Option<bool>(["--lathe-cycles", "-lc"],
+            getDefaultValue: () => false,
+            description: "Replace turning roughing passes with canned cycles (G71/G72 + G70, CYCLE95) for turning machines");
+
+        var highSpeedOption = new Option<bool>(["--high-speed", "-hsm"],
+            getDefaultValue: () => false,
+            description: "Wrap dense short-segment operations in high-speed mode (G05.1 Q1, CYCLE832, CYCL DEF 32, G187)");
+
+        var compressOption = new Option<NcCompression>(["--compress", "-z"],
+            getDefaultValue: () => NcCompression.None,
+            description: "Output compression (none, gzip, brotli)");
+
+        var splitOption = new Option<NcSplitMode>(["--split"],
+            getDefaultValue: () => NcSplitMode.None,
+            description: "Split output into several programs (none, toolchange, size)");
+
+        var maxPartSizeOption = new Option<int>(["--max-part-kb"],
+            getDefaultValue: () => 512,
+            description: "Part size in KB for --split size (split at the next tool change)");
+
+        var incrementalOption = new Option<string?>(["--incremental"],
+            "Cache directory for incremental posting (unchanged operations are reused)");
+
+        var traceOption = new Option<string?>(["--trace"],
+            "Write a per-command trace (Chrome trace JSON: chrome://tracing, Perfetto, speedscope)");
+
+        var replayOption = new Option<bool>(["--replay"],
+            getDefaultValue: () => false,
+            description: "Treat --input as a trace file: replay its commands and compare output with it");
+
+        var parallelOption = new Option<int>(["--parallel"],
+            getDefaultValue: () => 0,
+            description: "Post operations in N worker processes (output is verified against sequential state; 0 - off)");
+
+        var toolLibraryOption = new Option<string?>(["--tool-library", "-tl"],
+            "Tool library JSON (tool data for LOADTL and the header tool list)");
+
+        var backgroundOutputOption = new Option<bool>(["--background-output"],
+            getDefaultValue: () => false,
+            description: "Encode and write output on a dedicated thread (macros do not wait for disk I/O)");
+
+        var progressOption = new Option<ProgressFormat>(["--progress"],
+            getDefaultValue: () => ProgressFormat.None,
+            description: "Report progress every few seconds (none, console, json - JSON lines for job dashboards)");
+
+        var progressFileOption = new Option<string?>(["--progress-file"],
+            "Append progress reports to this file instead of the console");
+
+        var cacheSpillOption = new Option<string?>(["--cache-spill"],
+            "Spill geometry/tool cache entries evicted by LRU to memory-mapped files in this directory");
+
+        var metricsFileOption = new Option<string?>(["--metrics-file"],
+            "Add cumulative job metrics to a Prometheus text file (textfile collector *.prom), updated periodically and at job end");
+
         var rootCommand = new RootCommand("PostProcessor v1.1 - APT/CL to G-code converter for CNC machines")
         {
             inputOption,
@@ -62,24 +133,171 @@ public static class Program
             configOption,
             macroPathOption,
             debugOption,
-            validateOnlyOption
+            validateOnlyOption,
+            extractSubprogramsOption,
+            latheCyclesOption,
+            highSpeedOption,
+            compressOption,
+            splitOption,
+            maxPartSizeOption,
+            incrementalOption,
+            traceOption,
+            replayOption,
+            parallelOption,
+            toolLibraryOption,
+            backgroundOutputOption,
+            progressOption,
+            progressFileOption,
+            cacheSpillOption,
+            metricsFileOption
         };
 
-        rootCommand.SetHandler(
-            ExecuteAsync,
-            inputOption,
-            outputOption,
-            controllerOption,
-            machineOption,
-            configOption,
-            macroPathOption,
-            debugOption,
-            validateOnlyOption
-        );
+        rootCommand.SetHandler(async (InvocationContext invocation) =>
+        {
+            var parsed = invocation.ParseResult;
+            var metricsFile = parsed.GetValueForOption(metricsFileOption);
+            var metrics = metricsFile != null ? new PrometheusMetricsFile(metricsFile) : null;
+            var jobClock = System.Diagnostics.Stopwatch.StartNew();
+
+            invocation.ExitCode = await ExecuteAsync(
+                parsed.GetValueForOption(inputOption)!,
+                parsed.GetValueForOption(outputOption)!,
+                parsed.GetValueForOption(controllerOption)!,
+                parsed.GetValueForOption(machineOption)!,
+                parsed.GetValueForOption(configOption),
+                parsed.GetValueForOption(macroPathOption) ?? [],
+                parsed.GetValueForOption(debugOption),
+                parsed.GetValueForOption(validateOnlyOption),
+                parsed.GetValueForOption(extractSubprogramsOption),
+                parsed.GetValueForOption(latheCyclesOption),
+                parsed.GetValueForOption(highSpeedOption),
+                parsed.GetValueForOption(compressOption),
+                parsed.GetValueForOption(splitOption),
+                parsed.GetValueForOption(maxPartSizeOption),
+                parsed.GetValueForOption(incrementalOption),
+                parsed.GetValueForOption(traceOption),
+                parsed.GetValueForOption(replayOption),
+                parsed.GetValueForOption(parallelOption),
+                parsed.GetValueForOption(toolLibraryOption),
+                parsed.GetValueForOption(backgroundOutputOption),
+                parsed.GetValueForOption(progressOption),
+                parsed.GetValueForOption(progressFileOption),
+                parsed.GetValueForOption(cacheSpillOption),
+                metrics);
+
+            if (metrics != null)
+                WriteJobMetrics(metrics, invocation.ExitCode == 0, jobClock.Elapsed);
+        });
+
+        rootCommand.AddCommand(BuildGenerateCommand());
+        rootCommand.AddCommand(BuildWorkerCommand());
 
         return await rootCommand.InvokeAsync(args);
     }
 
+    /// <summary>
+    /// Подкоманда generate-apt: синтетическая APT-программа для нагрузочных тестов и замеров
+    /// </summary>
+    private static Command BuildGenerateCommand()
+    {
+        var outputOption = new Option<string>(["--output", "-o"], "Output APT/CL file path")
+        {
+            IsRequired = true
+        };
+
+        var kindOption = new Option<SyntheticProgramKind>(["--kind", "-k"],
+            getDefaultValue: () => SyntheticProgramKind.Mill,
+            description: "Program kind (mill, lathe)");
+
+        var commandsOption = new Option<int>(["--commands", "-n"],
+            getDefaultValue: () => 10_000,
+            description: "Approximate number of APT commands");
+
+        var operationsOption = new Option<int>(["--operations"],
+            getDefaultValue: () => 20,
+            description: "Number of operations (each starts with a tool change)");
+
+        var toolsOption = new Option<int>(["--tools"],
+            getDefaultValue: () => 10,
+            description: "Number of distinct tools");
+
+        var seedOption = new Option<int>(["--seed"],
+            getDefaultValue: () => 1,
+            description: "Random seed (same seed - same file)");
+
+        var command = new Command("generate-apt", "Generate a synthetic CATIA-style APT/CL program for load and timing tests")
+        {
+            outputOption,
+            kindOption,
+            commandsOption,
+            operationsOption,
+            toolsOption,
+            seedOption
+        };
+
+        command.SetHandler((InvocationContext invocation) =>
+        {
+            var parsed = invocation.ParseResult;
+            var output = parsed.GetValueForOption(outputOption)!;
+            var options = new SyntheticAptOptions
+            {
+                Kind = parsed.GetValueForOption(kindOption),
+                TargetCommands = parsed.GetValueForOption(commandsOption),
+                Operations = parsed.GetValueForOption(operationsOption),
+                Tools = parsed.GetValueForOption(toolsOption),
+                Seed = parsed.GetValueForOption(seedOption)
+            };
+
+            try
+            {
+                var stopwatch = System.Diagnostics.Stopwatch.StartNew();
+                var result = SyntheticAptGenerator.GenerateFile(output, options);
+                stopwatch.Stop();
+
+                Console.WriteLine($"Generated: {output}");
+                Console.WriteLine($"  Commands:   {result.Commands}");
+                Console.WriteLine($"  Lines:      {result.Lines}");
+                Console.WriteLine($"  Operations: {result.Operations}");
+                Console.WriteLine($"  Size:       {new FileInfo(output).Length / 1024.0:F1} KB");
+                Console.WriteLine($"  Time:       {stopwatch.ElapsedMilliseconds} ms");
+                invocation.ExitCode = 0;
+            }
+            catch (Exception ex) when (ex is IOException or UnauthorizedAccessException or ArgumentException)
+            {
+                Console.Error.WriteLine($"Error: {ex.Message}");
+                invocation.ExitCode = 1;
+            }
+        });
+
+        return command;
+    }
+
+    /// <summary>
+    /// Скрытая подкоманда рабочего процесса для --parallel
+    /// </summary>
+    private static Command BuildWorkerCommand()
+    {
+        var jobOption = new Option<string>(["--job"], "Job file (JSON)") { IsRequired = true };
+        var resultOption = new Option<string>(["--result"], "Result file (JSON)") { IsRequired = true };
+
+        var command = new Command(ParallelPostRunner.WorkerCommandName, "Internal: post a range of segments for --parallel")
+        {
+            jobOption,
+            resultOption
+        };
+        command.IsHidden = true;
+
+        command.SetHandler(async (InvocationContext invocation) =>
+        {
+            var parsed = invocation.ParseResult;
+            invocation.ExitCode = await ParallelPostRunner.RunWorkerAsync(
+                parsed.GetValueForOption(jobOption)!,
+                parsed.GetValueForOption(resultOption)!);
+        });
+
+        return command;
+    }
+
     private static async Task<int> ExecuteAsync(
         string input,
         string output,
@@ -88,8 +306,31 @@ public static class Program
         string? configPath,
         string[] macroPaths,
         bool debug,
-        bool validateOnly)
+        bool validateOnly,
+        bool extractSubprograms,
+        bool latheCycles,
+        bool highSpeed,
+        NcCompression compression,
+        NcSplitMode split,
+        int maxPartKb,
+        string? incrementalCache,
+        string? tracePath,
+        bool replay,
+        int parallel,
+        string? toolLibraryPath,
+        bool backgroundOutput,
+        ProgressFormat progressFormat,
+        string? progressFile,
+        string? cacheSpillDirectory,
+        PrometheusMetricsFile? metrics)
     {
+        // УП в stdout: все сообщения переводятся в stderr, чтобы не смешиваться с выводом
+        var fromStdin = input == StandardStreamPath;
+        var toStdout = output == StandardStreamPath;
+        var stdout = toStdout ? Console.OpenStandardOutput() : null;
+        if (toStdout)
+            Console.SetOut(Console.Error);
+
         try
         {
             Console.WriteLine("PostProcessor v1.1 - APT/CL to G-code Converter");
@@ -114,15 +355,29 @@ public static class Program
             }
 
             // �������� ������������� �������� �����
-            var inputFullPath = Path.IsPathRooted(input) ? input : Path.GetFullPath(input, solutionDir);
-            if (!File.Exists(inputFullPath))
+            var inputFullPath = fromStdin || Path.IsPathRooted(input) ? input : Path.GetFullPath(input, solutionDir);
+            if (!fromStdin && !File.Exists(inputFullPath))
             {
                 Console.Error.WriteLine($"\nInput file not found: {inputFullPath}");
                 return 1;
             }
 
+            // Режимы, которым нужен повторный проход по входу или несколько выходных файлов
+            if (fromStdin && (replay || !string.IsNullOrWhiteSpace(incrementalCache)))
+            {
+                Console.Error.WriteLine("\n--replay and --incremental require an input file, not stdin");
+                return 1;
+            }
+            if (toStdout && split != NcSplitMode.None)
+            {
+                Console.Error.WriteLine("\n--split requires an output file, not stdout");
+                return 1;
+            }
+
             // �������� ������������ �����������
+            var configClock = System.Diagnostics.Stopwatch.StartNew();
             ControllerConfig config;
+            string configFile;
             if (!string.IsNullOrWhiteSpace(configPath))
             {
                 var configFullPath = Path.IsPathRooted(configPath)
@@ -132,7 +387,8 @@ public static class Program
                 if (!File.Exists(configFullPath))
                     throw new FileNotFoundException($"Config file not found: {configFullPath}");
 
-                config = ConfigLoader.Load(configFullPath);
+                config = Core.Config.Loaders.ConfigSnapshotCache.Shared.GetOrLoad(configFullPath).Controller;
+                configFile = configFullPath;
                 Console.WriteLine($"Loaded custom config: {Path.GetFileName(configFullPath)}");
             }
             else
@@ -150,10 +406,10 @@ public static class Program
 
                     if (Directory.Exists(searchPath))
                     {
-                        var jsonFiles = Directory.GetFiles(searchPath, "*.json", SearchOption.TopDirectoryOnly);
-                        if (jsonFiles.Length > 0)
+                        foundPath = SelectControllerConfig(searchPath, controller);
+                        if (foundPath != null)
                         {
-                            foundPath = jsonFiles[0];
+                            if (debug) Console.WriteLine($"[DEBUG] Selected config: {Path.GetFileName(foundPath)}");
                             break;
                         }
                     }
@@ -170,9 +426,20 @@ public static class Program
                     return 1;
                 }
 
-                config = ConfigLoader.Load(foundPath);
+                config = Core.Config.Loaders.ConfigSnapshotCache.Shared.GetOrLoad(foundPath).Controller;
+                configFile = foundPath;
                 Console.WriteLine($"Loaded config: {controller} ({Path.GetFileName(foundPath)})");
             }
+            metrics?.Add("postprocessor_config_load_seconds_total", "Controller config resolve and load time", configClock.Elapsed.TotalSeconds);
+
+            // Библиотека инструментов (индекс строится один раз при загрузке)
+            ToolLibraryConfig? toolLibrary = null;
+            if (!string.IsNullOrWhiteSpace(toolLibraryPath))
+            {
+                toolLibraryPath = Path.GetFullPath(toolLibraryPath, solutionDir);
+                toolLibrary = Core.Config.Loaders.JsonConfigLoader.LoadToolLibrary(toolLibraryPath);
+                Console.WriteLine($"Loaded tool library: {toolLibrary.Name} ({toolLibrary.Index.Count} tools)");
+            }
 
             // ����������� ����� �������� ��������
             var defaultMacroPaths = new List<string>
@@ -215,7 +482,11 @@ public static class Program
             foreach (var path in validMacroPaths)
                 Console.WriteLine($"  {path.Replace(baseDir, "{bin}").Replace(solutionDir, "{solution}")}");
 
-            var pythonEngine = new PostProcessor.Macros.Python.PythonMacroEngine(machine, pythonMacroPaths.ToArray());
+            // Лексер читает следующие команды, пока макросы выполняются в потоке Python
+            var pythonEngine = new PostProcessor.Macros.Python.PythonMacroEngine(machine, pythonMacroPaths.ToArray())
+            {
+                PipelineCommands = true
+            };
 
             Console.WriteLine("\nLoading Python macros...");
             var stopwatch = System.Diagnostics.Stopwatch.StartNew();
@@ -224,6 +495,7 @@ public static class Program
             await pythonEngine.LoadAsync(validMacroPaths).ConfigureAwait(false);
 
             stopwatch.Stop();
+            metrics?.Add("postprocessor_python_init_seconds_total", "Python runtime and macro load time", stopwatch.Elapsed.TotalSeconds);
 
             var totalMacros = pythonEngine.GetMacroCount();
             Console.WriteLine($"Loaded {totalMacros} Python macros in {stopwatch.ElapsedMilliseconds} ms");
@@ -251,38 +523,120 @@ public static class Program
             Console.WriteLine("Generating G-code...");
             stopwatch.Restart();
 
-            await using var writer = new StreamWriter(output, false, Encoding.UTF8);
-            
-            // Вывод header из конфигурации контроллера
-            if (config.HeaderFooterEnabled)
+            var outputOptions = new NcOutputOptions
             {
-                foreach (var line in config.Header)
+                Compression = compression,
+                SplitMode = split,
+                MaxPartBytes = maxPartKb * 1024L
+            };
+            if (!toStdout)
+                output = NcOutput.ResolvePath(output, outputOptions);
+
+            // Список инструментов программы до обработки (для заголовка и LOADTL);
+            // stdin читается один раз, поэтому без предварительного просмотра
+            IReadOnlyList<ToolInfo> projectTools = replay || fromStdin
+                ? Array.Empty<ToolInfo>()
+                : await AptToolPreScanner.ScanAsync(inputFullPath, toolLibrary).ConfigureAwait(false);
+
+            // Заголовок с итогами программы ({blockCount}, {cycleTime}, {maxZ}...) выводится
+            // после обработки: тело УП временно пишется во вспомогательный файл
+            var header = BuildHeader(config, fromStdin ? "stdin" : input);
+            DeferredHeaderWriter? deferredHeader = null;
+
+            // Проходы, переписывающие готовый файл (только обычный вывод в один файл)
+            var rewriteOutput = extractSubprograms || latheCycles || highSpeed;
+            var rewriteFile = rewriteOutput && compression == NcCompression.None && split == NcSplitMode.None && !toStdout;
+
+            // Итоги для заголовка при переписывании считаются по окончательному файлу
+            var headerAfterRewrite = rewriteFile && DeferredHeaderWriter.HasDeferredPlaceholders(header);
+            NcProgramStatistics? headerStatistics = null;
+
+            var fileWriter = toStdout
+                ? NcOutput.Open(stdout!, compression, new UTF8Encoding(false))
+                : NcOutput.Open(
+                    output,
+                    outputOptions,
+                    Encoding.UTF8,
+                    header: _ => deferredHeader?.Header ?? header,
+                    footer: BuildFooter(config));
+
+            if (!headerAfterRewrite && DeferredHeaderWriter.HasDeferredPlaceholders(header))
+            {
+                deferredHeader = new DeferredHeaderWriter(
+                    fileWriter,
+                    statistics => DeferredHeaderWriter.ResolvePlaceholders(
+                        header, statistics, projectTools, config.Formatting.Coordinates.Decimals),
+                    new NcProgramStatistics(config.Safety.MaxRapidRate),
+                    toStdout ? null : Path.GetDirectoryName(Path.GetFullPath(output)));
+            }
+            var bodyWriter = (TextWriter?)deferredHeader ?? fileWriter;
+
+            // Фоновая запись: отложенный заголовок, кодирование, сжатие и файловый
+            // ввод-вывод выполняются в отдельном потоке, макросы пишут в сегменты в памяти
+            if (backgroundOutput)
+                bodyWriter = new BackgroundNcWriter(bodyWriter);
+
+            // Инкрементальный режим: вывод сегментов перехватывается для кэша,
+            // номера кадров сквозные независимо от того, откуда взят сегмент
+            SegmentCaptureWriter? capture = null;
+            if (!string.IsNullOrWhiteSpace(incrementalCache))
+                capture = new SegmentCaptureWriter(new BlockRenumberingWriter(bodyWriter, config.Formatting.BlockNumber));
+
+            // Параллельный режим: номера кадров из рабочих процессов перенумеровываются сквозным образом
+            var runParallel = parallel > 1 && capture == null && tracePath == null && !replay && !fromStdin;
+            if (parallel > 1 && !runParallel)
+                Console.WriteLine("--parallel is ignored with --incremental, --trace, --replay or stdin input");
+            TextWriter? renumbering = runParallel ? new BlockRenumberingWriter(bodyWriter, config.Formatting.BlockNumber) : null;
+            if (progressFormat != ProgressFormat.None && (runParallel || capture != null || replay))
+                Console.WriteLine("--progress is reported only for sequential posting");
+
+            // Трассировка: счётчик вывода команд и приёмник событий
+            TraceOutputWriter? traceOutput = null;
+            ITraceSink? traceSink = null;
+            TraceComparisonSink? comparison = null;
+            if (tracePath != null || replay)
+            {
+                traceOutput = new TraceOutputWriter(capture ?? bodyWriter);
+                traceSink = tracePath != null ? new ChromeTraceSink(tracePath) : null;
+                if (replay)
                 {
-                    var processedLine = line
-                        .Replace("{name}", config.Name)
-                        .Replace("{machine}", config.MachineProfile ?? "Unknown")
-                        .Replace("{inputFile}", Path.GetFileName(input))
-                        .Replace("{dateTime}", DateTime.Now.ToString("yyyy-MM-dd HH:mm:ss"));
-                    
-                    await writer.WriteLineAsync(processedLine);
+                    // Эталон - та же трассировка, по которой идёт воспроизведение
+                    comparison = new TraceComparisonSink(
+                        TraceReader.ReadAsync(inputFullPath).ToBlockingEnumerable(),
+                        traceSink);
+                    traceSink = comparison;
                 }
-                await writer.WriteLineAsync();
             }
-            else
+
+            await using TextWriter writer = traceOutput ?? capture ?? renumbering ?? bodyWriter;
+
+            IMacroEngine macroEngine = traceSink != null
+                ? new TracingMacroEngine(pythonEngine, traceSink, traceOutput!)
+                : pythonEngine;
+
+            // Метрики: время макросов и счётчики контекста, файл обновляется по ходу обработки
+            MetricsMacroEngine? metricsEngine = null;
+            if (metrics != null)
+                macroEngine = metricsEngine = new MetricsMacroEngine(macroEngine, metrics);
+
+            // Вывод header из конфигурации контроллера (отложенный - при закрытии файла)
+            if (deferredHeader == null && !headerAfterRewrite)
             {
-                // Header по умолчанию если не указан в конфиге
-                await writer.WriteLineAsync("(==================================================)");
-                await writer.WriteLineAsync($"(; PostProcessor v1.1 for {config.Name} ;)");
-                await writer.WriteLineAsync($"(; Input: {Path.GetFileName(input)} ;)");
-                await writer.WriteLineAsync($"(; Generated: {DateTime.Now:yyyy-MM-dd HH:mm:ss} ;)");
-                await writer.WriteLineAsync("(==================================================)");
-                await writer.WriteLineAsync();
+                foreach (var line in header)
+                {
+                    await writer.WriteLineAsync(line);
+                }
             }
+            await writer.WriteLineAsync();
 
             var context = new PostContext(writer)
             {
-                Config = config
+                Config = config,
+                ToolLibrary = toolLibrary,
+                ProjectTools = projectTools
             };
+            if (cacheSpillDirectory != null)
+                context.EnableCacheSpill(cacheSpillDirectory);
 
             var cancellationTokenSource = new CancellationTokenSource();
             Console.CancelKeyPress += (s, e) =>
@@ -294,39 +648,140 @@ public static class Program
 
             try
             {
-                await APT.Parser.APTParser.ParseWithMacrosAsync(
-                    inputFullPath,
-                    context,
-                    pythonEngine,
-                    cancellationTokenSource.Token
-                ).ConfigureAwait(false);
+                if (replay)
+                {
+                    await APT.Parser.APTParser.ReplayTraceAsync(
+                        inputFullPath,
+                        context,
+                        macroEngine,
+                        cancellationTokenSource.Token
+                    ).ConfigureAwait(false);
+                }
+                else if (capture != null)
+                {
+                    var macroFiles = validMacroPaths
+                        .SelectMany(p => Directory.GetFiles(p, "*.py", SearchOption.AllDirectories));
+                    var cache = new IncrementalPostCache(
+                        Path.GetFullPath(incrementalCache!, solutionDir),
+                        IncrementalPostCache.ComputeFingerprint(macroFiles.Append(configFile)));
+
+                    var result = await APT.Parser.APTParser.ParseIncrementalAsync(
+                        inputFullPath,
+                        context,
+                        macroEngine,
+                        cache,
+                        capture,
+                        cancellationTokenSource.Token
+                    ).ConfigureAwait(false);
+
+                    Console.WriteLine($"Incremental: {result.ReusedSegments} of {result.Segments} segments reused from cache");
+                }
+                else if (runParallel)
+                {
+                    var result = await ParallelPostRunner.RunAsync(
+                        inputFullPath,
+                        configFile,
+                        toolLibraryPath,
+                        machine,
+                        validMacroPaths,
+                        parallel,
+                        context,
+                        macroEngine,
+                        debug,
+                        cancellationTokenSource.Token
+                    ).ConfigureAwait(false);
+
+                    Console.WriteLine($"Parallel: {result.Segments} segments in {result.Workers} workers, {result.RepostedSegments} reposted sequentially");
+                }
+                else
+                {
+                    // Ход обработки: в консоль (stderr при выводе УП в stdout) или в файл
+                    await using var progressWriter = progressFile != null
+                        ? new StreamWriter(progressFile, append: true)
+                        : null;
+                    var progress = progressFormat == ProgressFormat.None
+                        ? null
+                        : new ProgressReporter(
+                            progressWriter ?? Console.Out,
+                            progressFormat,
+                            totalBytes: fromStdin ? 0 : new FileInfo(inputFullPath).Length);
+
+                    await APT.Parser.APTParser.ParseWithMacrosAsync(
+                        OpenInput(inputFullPath),
+                        context,
+                        macroEngine,
+                        cancellationTokenSource.Token,
+                        progress
+                    ).ConfigureAwait(false);
+                }
             }
             catch (OperationCanceledException)
             {
+                // Команды из очереди потока Python не должны писать после этой строки
+                await macroEngine.DiscardPendingAsync();
                 Console.WriteLine("\nProcessing cancelled by user");
                 await writer.WriteLineAsync("(PROCESSING CANCELLED BY USER)");
                 return 1;
             }
             finally
             {
+                // При ошибке поток Python останавливается до записи окончания и закрытия writer'а
+                await macroEngine.DiscardPendingAsync();
+
+                // Незакрытая серия отверстий выводится до окончания программы
+                context.Holes.Flush();
+
                 // Output footer from controller config
-                if (config.HeaderFooterEnabled)
+                await writer.WriteLineAsync();
+                foreach (var line in BuildFooter(config))
                 {
-                    await writer.WriteLineAsync();
-                    foreach (var line in config.Footer)
-                    {
-                        await writer.WriteLineAsync(line);
-                    }
+                    await writer.WriteLineAsync(line);
                 }
-                else
+
+                traceSink?.Dispose();
+                metricsEngine?.Collect(context);
+            }
+
+            if (comparison != null)
+            {
+                Console.WriteLine();
+                Console.WriteLine($"Replay: {comparison.ComparedCount} commands compared, {comparison.DifferenceCount} differ");
+                foreach (var difference in comparison.Differences.Take(20))
+                    Console.WriteLine($"  #{difference.Sequence} line {difference.LineNumber} {difference.MajorWord.ToUpperInvariant()}: {difference.Reason}");
+            }
+
+            if (rewriteOutput && !rewriteFile)
+            {
+                Console.WriteLine("\nSubprogram extraction, lathe cycles and high-speed mode require plain single-file output, skipped");
+            }
+            else if (rewriteOutput)
+            {
+                // Файл должен быть закрыт до второго прохода;
+                // циклы - до выноса подпрограмм, чтобы повторы искались в уже сжатой программе;
+                // режим HSM - по сжатой программе, до выноса, чтобы операции не разрывались вызовами
+                await writer.DisposeAsync();
+                if (latheCycles)
+                    CompactLatheCycles(output, config);
+                if (highSpeed)
+                    InsertHighSpeedMode(output, config);
+                if (extractSubprograms)
+                    ExtractSubprograms(output, config);
+                if (headerAfterRewrite)
                 {
-                    // Default footer if not specified in config
-                    await writer.WriteLineAsync();
-                    await writer.WriteLineAsync("(==================================================)");
-                    await writer.WriteLineAsync("( END OF PROGRAM )");
-                    await writer.WriteLineAsync("(==================================================)");
+                    headerStatistics = DeferredHeaderWriter.PrependHeader(
+                        output,
+                        statistics => DeferredHeaderWriter.ResolvePlaceholders(
+                            header, statistics, projectTools, config.Formatting.Coordinates.Decimals),
+                        new NcProgramStatistics(config.Safety.MaxRapidRate));
                 }
             }
+            else
+            {
+                // Заголовок и тело (или очередь фоновой записи) попадают в файл только при закрытии,
+                // а размер файла и метрика байт вывода читаются ниже - цепочка записи закрывается здесь;
+                // ошибки записи выводятся здесь, а не после итогов
+                await writer.DisposeAsync();
+            }
 
             stopwatch.Stop();
 
@@ -334,13 +789,39 @@ public static class Program
             var stats = context.GetStatistics();
             Console.WriteLine();
             Console.WriteLine("  G-code generation completed successfully");
-            Console.WriteLine($"  Output file: {output}");
-            Console.WriteLine($"  Size: {new FileInfo(output).Length / 1024} KB");
+            Console.WriteLine($"  Output file: {(toStdout ? "stdout" : output)}");
+            if (fileWriter is SplittingNcWriter splitWriter)
+            {
+                foreach (var partPath in splitWriter.PartPaths)
+                    Console.WriteLine($"  Part: {Path.GetFileName(partPath)} ({new FileInfo(partPath).Length / 1024} KB)");
+            }
+            else if (!toStdout)
+            {
+                Console.WriteLine($"  Size: {new FileInfo(output).Length / 1024} KB");
+            }
             Console.WriteLine($"  Commands processed: {stats.CommandCount}");
             Console.WriteLine($"  Motion blocks: {stats.MotionCount}");
             Console.WriteLine($"  Tool changes: {stats.ToolChanges}");
+            // Кэш геометрии конвейер не заполняет (лексер не разбирает определения P1=POINT/...) - строки только при обращениях
+            var (geometryCache, toolCache) = context.GetCacheStatistics();
+            foreach (var (name, cache) in new[] { ("Geometry cache", geometryCache), ("Tool cache", toolCache) })
+            {
+                if (cache.Hits + cache.Misses + cache.SpillHits > 0)
+                    Console.WriteLine($"  {name}: {cache.Hits} hits, {cache.Misses} misses, {cache.Evictions} evictions");
+            }
+            headerStatistics ??= deferredHeader?.Statistics;
+            if (headerStatistics != null)
+                Console.WriteLine($"  Cycle time (estimate): {headerStatistics.CycleTime:hh\\:mm\\:ss}");
             Console.WriteLine($"  Processing time: {stopwatch.ElapsedMilliseconds} ms");
 
+            if (metrics != null && !toStdout)
+            {
+                var outputBytes = fileWriter is SplittingNcWriter parts
+                    ? parts.PartPaths.Sum(partPath => new FileInfo(partPath).Length)
+                    : new FileInfo(output).Length;
+                metrics.Add("postprocessor_output_bytes_total", "NC output bytes written", outputBytes);
+            }
+
             return 0;
         }
         catch (Exception ex)
@@ -352,12 +833,147 @@ public static class Program
         }
     }
 
+    /// <summary>
+    /// Итог задания в файле метрик; ошибка записи метрик не меняет результат задания
+    /// </summary>
+    private static void WriteJobMetrics(PrometheusMetricsFile metrics, bool succeeded, TimeSpan elapsed)
+    {
+        metrics.Add("postprocessor_jobs_total", "Posting jobs by result", 1, "result", succeeded ? "success" : "failure");
+        metrics.Add("postprocessor_job_seconds_total", "Posting job wall time", elapsed.TotalSeconds);
+        if (!succeeded)
+            metrics.Add("postprocessor_errors_total", "Errors by kind", 1, "kind", "job");
+        metrics.Set("postprocessor_last_job_timestamp_seconds", "Unix time of the last finished job", DateTimeOffset.UtcNow.ToUnixTimeSeconds());
+
+        try
+        {
+            metrics.Flush();
+        }
+        catch (Exception ex) when (ex is IOException or UnauthorizedAccessException)
+        {
+            Console.Error.WriteLine($"Metrics file not updated: {ex.Message}");
+        }
+    }
+
+    private static List<string> BuildHeader(ControllerConfig config, string input)
+    {
+        if (!config.HeaderFooterEnabled)
+        {
+            // Header по умолчанию если не указан в конфиге
+            return new List<string>
+            {
+                "(==================================================)",
+                $"(; PostProcessor v1.1 for {config.Name} ;)",
+                $"(; Input: {Path.GetFileName(input)} ;)",
+                $"(; Generated: {DateTime.Now:yyyy-MM-dd HH:mm:ss} ;)",
+                "(==================================================)"
+            };
+        }
+
+        return config.Header
+            .Select(line => line
+                .Replace("{name}", config.Name)
+                .Replace("{machine}", config.MachineProfile ?? "Unknown")
+                .Replace("{inputFile}", Path.GetFileName(input))
+                .Replace("{dateTime}", DateTime.Now.ToString("yyyy-MM-dd HH:mm:ss")))
+            .ToList();
+    }
+
+    private static string[] BuildFooter(ControllerConfig config)
+    {
+        if (config.HeaderFooterEnabled)
+            return config.Footer;
+
+        // Default footer if not specified in config
+        return new[]
+        {
+            "(==================================================)",
+            "( END OF PROGRAM )",
+            "(==================================================)"
+        };
+    }
+
+    private static void CompactLatheCycles(string output, ControllerConfig config)
+    {
+        var dialect = SubprogramExtractionOptions.DetectDialect(config.Name);
+        if (config.MachineType != MachineType.Turning || dialect == null)
+        {
+            Console.WriteLine($"\nLathe cycles are not supported for {config.Name} ({config.MachineType}), skipped");
+            return;
+        }
+
+        var options = new LatheCycleOptions
+        {
+            Dialect = dialect.Value,
+            TurningCycle = config.GetCustomGCode("G71", "turningRoughCycle"),
+            FacingCycle = config.GetCustomGCode("G72", "facingRoughCycle"),
+            FinishingCycle = config.GetCustomGCode("G70", "finishCycle"),
+            Decimals = config.Formatting.Coordinates.Decimals
+        };
+
+        var tempPath = output + ".tmp";
+        var result = LatheCycleCompactor.CompactFile(output, tempPath, options);
+        File.Move(tempPath, output, overwrite: true);
+
+        Console.WriteLine($"\nLathe cycles: {result.CycleCount} ({result.ReplacedBlocks} roughing blocks replaced)");
+        Console.WriteLine($"  Lines: {result.InputLines} -> {result.OutputLines}");
+    }
+
+    private static void InsertHighSpeedMode(string output, ControllerConfig config)
+    {
+        var dialect = HighSpeedMachiningOptions.DetectDialect(config.Name);
+        if (dialect == null)
+        {
+            Console.WriteLine($"\nHigh-speed mode is not supported for {config.Name}, skipped");
+            return;
+        }
+
+        var options = new HighSpeedMachiningOptions
+        {
+            Dialect = dialect.Value,
+            Tolerance = config.GetCustomDouble("highSpeedTolerance", 0.01),
+            MaxSegmentLength = config.GetCustomDouble("highSpeedMaxSegment", 0.5),
+            MinBlockRate = config.GetCustomDouble("highSpeedMinBlockRate", 50),
+            OnBlock = config.CustomGCodes?.GetValueOrDefault("highSpeedOn"),
+            OffBlock = config.CustomGCodes?.GetValueOrDefault("highSpeedOff"),
+            Decimals = config.Formatting.Coordinates.Decimals
+        };
+
+        var tempPath = output + ".tmp";
+        var result = HighSpeedMachiningInserter.InsertFile(output, tempPath, options);
+        File.Move(tempPath, output, overwrite: true);
+
+        Console.WriteLine($"\nHigh-speed mode: {result.WrappedOperations} of {result.OperationCount} operations ({result.WrappedBlocks} cutting blocks)");
+    }
+
+    private static void ExtractSubprograms(string output, ControllerConfig config)
+    {
+        var dialect = SubprogramExtractionOptions.DetectDialect(config.Name);
+        if (dialect == null)
+        {
+            Console.WriteLine($"\nSubprogram extraction is not supported for {config.Name}, skipped");
+            return;
+        }
+
+        var options = new SubprogramExtractionOptions
+        {
+            Dialect = dialect.Value,
+            Decimals = config.Formatting.Coordinates.Decimals
+        };
+
+        var tempPath = output + ".tmp";
+        var result = SubprogramExtractor.ExtractFile(output, tempPath, options);
+        File.Move(tempPath, output, overwrite: true);
+
+        Console.WriteLine($"\nSubprograms extracted: {result.SubprogramCount} ({result.CallCount} calls, {result.ReplacedBlocks} blocks replaced)");
+        Console.WriteLine($"  Lines: {result.InputLines} -> {result.OutputLines}");
+    }
+
     private static async Task<bool> ValidateSyntaxAsync(string inputPath)
     {
         try
         {
             int commandCount = 0;
-            await using var lexer = new PostProcessor.APT.Lexer.StreamingAPTLexer(inputPath);
+            await using var lexer = new PostProcessor.APT.Lexer.StreamingAPTLexer(OpenInput(inputPath));
 
             await foreach (var command in lexer.ParseStreamAsync().ConfigureAwait(false))
             {
@@ -371,7 +987,7 @@ public static class Program
                 }
 
                 // �������� ��������� ��� ��������
-                if (command.MajorWord is "goto" or "rapid" && command.NumericValues.Count < 2)
+                if (command.Word is APTMajorWord.Goto or APTMajorWord.Rapid && command.NumericValues.Count < 2)
                 {
                     Console.Error.WriteLine($"Line {command.LineNumber}: {command.MajorWord.ToUpperInvariant()} requires at least 2 coordinates");
                     return false;
@@ -388,6 +1004,30 @@ public static class Program
         }
     }
 
+    /// <summary>
+    /// Входной поток APT: файл или stdin ("-")
+    /// </summary>
+    private static Stream OpenInput(string inputPath)
+    {
+        return inputPath == StandardStreamPath
+            ? Console.OpenStandardInput()
+            : new FileStream(inputPath, FileMode.Open, FileAccess.Read, FileShare.Read, 8192, FileOptions.SequentialScan);
+    }
+
+    /// <summary>
+    /// Выбор конфигурации в каталоге контроллера: {controller}.json, затем default.json,
+    /// иначе первый по имени файл (порядок Directory.GetFiles зависит от файловой системы)
+    /// </summary>
+    private static string? SelectControllerConfig(string directory, string controller)
+    {
+        var jsonFiles = Directory.GetFiles(directory, "*.json", SearchOption.TopDirectoryOnly);
+        Array.Sort(jsonFiles, StringComparer.Ordinal);
+
+        return jsonFiles.FirstOrDefault(f => Path.GetFileNameWithoutExtension(f).Equals(controller, StringComparison.OrdinalIgnoreCase))
+            ?? jsonFiles.FirstOrDefault(f => Path.GetFileName(f).Equals("default.json", StringComparison.OrdinalIgnoreCase))
+            ?? jsonFiles.FirstOrDefault();
+    }
+
     private static string? FindSolutionDirectory(string startPath)
     {
         var currentDir = new DirectoryInfo(startPath);
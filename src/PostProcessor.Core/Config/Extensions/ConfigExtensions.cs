@@ -1,3 +1,4 @@
+using PostProcessor.Core.Config.Loaders;
 using PostProcessor.Core.Config.Models;
 using PostProcessor.Core.Context;
 
@@ -73,11 +74,12 @@ public static class ConfigExtensions
     public static string FormatMotionBlock(this ControllerConfig config, PostContext context, bool isRapid = false)
     {
         var parts = new List<string>();
+        var snapshot = ConfigSnapshot.For(config);
 
         //    (G00/G01)
         var motionFunc = isRapid
-            ? config.FunctionCodes.GetValueOrDefault("rapid")?.Code ?? "G00"
-            : config.FunctionCodes.GetValueOrDefault("linear")?.Code ?? "G01";
+            ? snapshot.GetFunctionCode("rapid")?.Code ?? "G00"
+            : snapshot.GetFunctionCode("linear")?.Code ?? "G01";
         parts.Add(motionFunc);
 
         //  
@@ -86,7 +88,7 @@ public static class ConfigExtensions
             var reg = context.Registers.GetOrAdd(axis, 0.0, true, "F4.3");
             if (reg.HasChanged || !reg.IsModal || Math.Abs(reg.Value) > 1e-6)
             {
-                var format = config.GetRegisterFormat(axis);
+                var format = snapshot.GetRegisterFormat(axis);
                 parts.Add($"{axis}{format.FormatValue(reg.Value)}");
             }
         }
@@ -97,7 +99,7 @@ public static class ConfigExtensions
             var fReg = context.Registers.F;
             if (fReg.HasChanged || !fReg.IsModal)
             {
-                var format = config.GetRegisterFormat("F");
+                var format = snapshot.GetRegisterFormat("F");
                 parts.Add($"F{format.FormatValue(fReg.Value)}");
             }
         }
@@ -111,6 +113,8 @@ public static class ConfigExtensions
     /// </summary>
     public static async Task FormatToolChangeBlockAsync(this ControllerConfig config, PostContext context, int toolNumber)
     {
+        var snapshot = ConfigSnapshot.For(config);
+
         //     Z
         if (config.Safety.AutoToolChangeRetract)
         {
@@ -118,14 +122,14 @@ public static class ConfigExtensions
             var safeZ = Math.Max(currentZ, config.Safety.ClearancePlane);
 
             context.Registers.Z.SetValue(safeZ);
-            var zFormat = config.GetRegisterFormat("Z");
+            var zFormat = snapshot.GetRegisterFormat("Z");
             await context.Output.WriteLineAsync($"G0 G90 Z{zFormat.FormatValue(safeZ)}");
             context.Registers.ResetChangeFlags();
         }
 
         //  
-        var tFormat = config.GetRegisterFormat("T");
-        var m06 = config.FunctionCodes.GetValueOrDefault("tool_change")?.Code ?? "M06";
+        var tFormat = snapshot.GetRegisterFormat("T");
+        var m06 = snapshot.GetFunctionCode("tool_change")?.Code ?? "M06";
         await context.Output.WriteLineAsync($"T{tFormat.FormatValue(toolNumber)} {m06}");
 
         //    Z (    )
@@ -133,7 +137,7 @@ public static class ConfigExtensions
         {
             var currentZ = context.Registers.Z.Value;
             context.Registers.Z.SetValue(currentZ);
-            var zFormat = config.GetRegisterFormat("Z");
+            var zFormat = snapshot.GetRegisterFormat("Z");
             await context.Output.WriteLineAsync($"G0 Z{zFormat.FormatValue(currentZ)}");
             context.Registers.ResetChangeFlags();
         }
@@ -0,0 +1,93 @@
+using System.Collections.Frozen;
+using System.Runtime.CompilerServices;
+using PostProcessor.Core.Config.Models;
+
+namespace PostProcessor.Core.Config.Loaders;
+
+/// <summary>
+/// Скомпилированная конфигурация: контроллер и (необязательно) станок, разобранные один раз,
+/// с разрешёнными форматами регистров (включая стандартные) и таблицей кодов функций.
+/// Неизменяема после создания и может разделяться между заданиями.
+/// Снимок связан с экземпляром ControllerConfig: форматирование и таблицы Python-макросов
+/// берут готовые таблицы через For(config), а не строят их заново.
+/// </summary>
+public sealed class ConfigSnapshot
+{
+    private static readonly ConditionalWeakTable<ControllerConfig, ConfigSnapshot> ByController = new();
+
+    internal ConfigSnapshot(string hash, ControllerConfig controller, MachineConfig? machine)
+    {
+        Hash = hash;
+        Controller = controller;
+        Machine = machine;
+
+        var formats = new Dictionary<string, RegisterFormat>(JsonConfigLoader.DefaultRegisterFormats, StringComparer.OrdinalIgnoreCase);
+        foreach (var (address, format) in controller.RegisterFormats)
+            formats[address] = format;
+
+        RegisterFormats = formats.ToFrozenDictionary(StringComparer.OrdinalIgnoreCase);
+        FunctionCodes = controller.FunctionCodes.ToFrozenDictionary(StringComparer.OrdinalIgnoreCase);
+
+        ByController.AddOrUpdate(controller, this);
+    }
+
+    /// <summary>
+    /// Снимок для конфигурации контроллера: загруженный через ConfigSnapshotCache
+    /// или построенный один раз для конфигурации, созданной иначе (без хэша)
+    /// </summary>
+    public static ConfigSnapshot For(ControllerConfig controller)
+    {
+        return ByController.GetValue(controller, config => new ConfigSnapshot(string.Empty, config, null));
+    }
+
+    /// <summary>
+    /// SHA-256 содержимого файлов конфигурации
+    /// </summary>
+    public string Hash { get; }
+
+    /// <summary>
+    /// Конфигурация контроллера
+    /// </summary>
+    public ControllerConfig Controller { get; }
+
+    /// <summary>
+    /// Конфигурация станка (если задана)
+    /// </summary>
+    public MachineConfig? Machine { get; }
+
+    /// <summary>
+    /// Форматы регистров: из конфигурации контроллера, недостающие - стандартные
+    /// </summary>
+    public FrozenDictionary<string, RegisterFormat> RegisterFormats { get; }
+
+    /// <summary>
+    /// Коды функций по имени (rapid, linear, spindle_cw...)
+    /// </summary>
+    public FrozenDictionary<string, FunctionCode> FunctionCodes { get; }
+
+    /// <summary>
+    /// Формат регистра по адресу
+    /// </summary>
+    public RegisterFormat GetRegisterFormat(string address)
+    {
+        return RegisterFormats.TryGetValue(address, out var format)
+            ? format
+            : new RegisterFormat { Address = address };
+    }
+
+    /// <summary>
+    /// Код функции по имени
+    /// </summary>
+    public FunctionCode? GetFunctionCode(string name)
+    {
+        return FunctionCodes.GetValueOrDefault(name);
+    }
+
+    /// <summary>
+    /// Форматировать значение регистра
+    /// </summary>
+    public string FormatValue(string address, double value)
+    {
+        return GetRegisterFormat(address).FormatValue(value);
+    }
+}
@@ -0,0 +1,103 @@
+using System.Collections.Concurrent;
+using System.Security.Cryptography;
+using System.Text.Json;
+using PostProcessor.Core.Config.Models;
+
+namespace PostProcessor.Core.Config.Loaders;
+
+/// <summary>
+/// Кэш скомпилированных конфигураций, ключ - SHA-256 содержимого файлов.
+/// При каждом обращении файлы перечитываются и хэшируются, разбор JSON выполняется
+/// только при изменении содержимого. На один набор путей хранится один снимок,
+/// поэтому память не растёт при правке конфигурации между заданиями.
+/// </summary>
+public sealed class ConfigSnapshotCache
+{
+    private static ReadOnlySpan<byte> Utf8Bom => new byte[] { 0xEF, 0xBB, 0xBF };
+
+    private readonly ConcurrentDictionary<string, ConfigSnapshot> _snapshots = new(StringComparer.Ordinal);
+    private int _hits;
+    private int _misses;
+
+    /// <summary>
+    /// Общий кэш процесса (пакетная обработка нескольких заданий)
+    /// </summary>
+    public static ConfigSnapshotCache Shared { get; } = new();
+
+    /// <summary>
+    /// Обращений, обслуженных из кэша
+    /// </summary>
+    public int Hits => _hits;
+
+    /// <summary>
+    /// Обращений с разбором конфигурации
+    /// </summary>
+    public int Misses => _misses;
+
+    /// <summary>
+    /// Получить снимок конфигурации, разобрав файлы только при изменении их содержимого
+    /// </summary>
+    /// <param name="controllerPath">Путь к конфигурации контроллера</param>
+    /// <param name="machinePath">Путь к конфигурации станка</param>
+    public ConfigSnapshot GetOrLoad(string controllerPath, string? machinePath = null)
+    {
+        controllerPath = Path.GetFullPath(controllerPath);
+        machinePath = machinePath != null ? Path.GetFullPath(machinePath) : null;
+
+        if (!File.Exists(controllerPath))
+            throw new FileNotFoundException($"Config file not found: {controllerPath}");
+        if (machinePath != null && !File.Exists(machinePath))
+            throw new FileNotFoundException($"Machine config not found: {machinePath}");
+
+        var controllerJson = File.ReadAllBytes(controllerPath);
+        var machineJson = machinePath != null ? File.ReadAllBytes(machinePath) : null;
+        var hash = ComputeHash(controllerJson, machineJson);
+
+        var key = machinePath == null ? controllerPath : controllerPath + "|" + machinePath;
+        if (_snapshots.TryGetValue(key, out var cached) && cached.Hash == hash)
+        {
+            Interlocked.Increment(ref _hits);
+            return cached;
+        }
+
+        Interlocked.Increment(ref _misses);
+
+        var controller = JsonSerializer.Deserialize<ControllerConfig>(StripBom(controllerJson), JsonConfigLoader.Options)
+            ?? throw new InvalidOperationException($"Failed to deserialize config: {controllerPath}");
+        var machine = machineJson != null
+            ? JsonSerializer.Deserialize<MachineConfig>(StripBom(machineJson), JsonConfigLoader.Options)
+              ?? throw new InvalidOperationException($"Failed to deserialize machine config: {machinePath}")
+            : null;
+
+        var snapshot = new ConfigSnapshot(hash, controller, machine);
+        _snapshots[key] = snapshot;
+        return snapshot;
+    }
+
+    /// <summary>
+    /// Очистить кэш
+    /// </summary>
+    public void Clear()
+    {
+        _snapshots.Clear();
+    }
+
+    private static string ComputeHash(byte[] controllerJson, byte[]? machineJson)
+    {
+        using var sha = IncrementalHash.CreateHash(HashAlgorithmName.SHA256);
+        sha.AppendData(controllerJson);
+        if (machineJson != null)
+        {
+            // Разделитель, чтобы перенос байтов между файлами менял хэш
+            sha.AppendData(BitConverter.GetBytes(controllerJson.Length));
+            sha.AppendData(machineJson);
+        }
+        return Convert.ToHexString(sha.GetHashAndReset());
+    }
+
+    private static ReadOnlySpan<byte> StripBom(byte[] json)
+    {
+        var span = json.AsSpan();
+        return span.StartsWith(Utf8Bom) ? span[Utf8Bom.Length..] : span;
+    }
+}
@@ -10,14 +10,38 @@ namespace PostProcessor.Core.Config.Loaders;
 /// </summary>
 public static class JsonConfigLoader
 {
-    private static readonly JsonSerializerOptions _options = new()
+    /// <summary>
+    ///    .     
+    /// JsonSerializerOptions,       .
+    ///  System.Text.Json (.NET 8)  :  init-  
+    ///    (null)       JSON.
+    /// </summary>
+    internal static readonly JsonSerializerOptions Options = new()
     {
         PropertyNameCaseInsensitive = true,
         AllowTrailingCommas = true,
         ReadCommentHandling = JsonCommentHandling.Skip,
+        NumberHandling = JsonNumberHandling.AllowReadingFromString,
         Converters = { new JsonStringEnumConverter() }
     };
 
+    /// <summary>
+    ///       (  Fanuc)
+    /// </summary>
+    internal static readonly IReadOnlyDictionary<string, RegisterFormat> DefaultRegisterFormats =
+        new Dictionary<string, RegisterFormat>
+        {
+            ["X"] = new RegisterFormat { Address = "X", Format = "F4.3", IsModal = true },
+            ["Y"] = new RegisterFormat { Address = "Y", Format = "F4.3", IsModal = true },
+            ["Z"] = new RegisterFormat { Address = "Z", Format = "F4.3", IsModal = true },
+            ["A"] = new RegisterFormat { Address = "A", Format = "F3.2", IsModal = true },
+            ["B"] = new RegisterFormat { Address = "B", Format = "F3.2", IsModal = true },
+            ["C"] = new RegisterFormat { Address = "C", Format = "F3.2", IsModal = true },
+            ["F"] = new RegisterFormat { Address = "F", Format = "F3.1", IsModal = false },
+            ["S"] = new RegisterFormat { Address = "S", Format = "F0", IsModal = false },
+            ["T"] = new RegisterFormat { Address = "T", Format = "F0", IsModal = false }
+        };
+
     /// <summary>
     ///     JSON 
     /// </summary>
@@ -27,7 +51,7 @@ public static class JsonConfigLoader
             throw new FileNotFoundException($"Controller config not found: {filePath}");
 
         var json = File.ReadAllText(filePath);
-        var config = JsonSerializer.Deserialize<ControllerConfig>(json, _options);
+        var config = JsonSerializer.Deserialize<ControllerConfig>(json, Options);
 
         if (config == null)
             throw new InvalidOperationException($"Failed to deserialize controller config: {filePath}");
@@ -50,7 +74,7 @@ public static class JsonConfigLoader
             throw new FileNotFoundException($"Machine config not found: {filePath}");
 
         var json = File.ReadAllText(filePath);
-        var config = JsonSerializer.Deserialize<MachineConfig>(json, _options);
+        var config = JsonSerializer.Deserialize<MachineConfig>(json, Options);
 
         if (config == null)
             throw new InvalidOperationException($"Failed to deserialize machine config: {filePath}");
@@ -58,6 +82,24 @@ public static class JsonConfigLoader
         return config;
     }
 
+    /// <summary>
+    ///     JSON  (  )
+    /// </summary>
+    public static ToolLibraryConfig LoadToolLibrary(string filePath)
+    {
+        if (!File.Exists(filePath))
+            throw new FileNotFoundException($"Tool library not found: {filePath}");
+
+        var json = File.ReadAllText(filePath);
+        var library = JsonSerializer.Deserialize<ToolLibraryConfig>(json, Options);
+
+        if (library == null)
+            throw new InvalidOperationException($"Failed to deserialize tool library: {filePath}");
+
+        _ = library.Index;
+        return library;
+    }
+
     private static void ValidateControllerConfig(ControllerConfig config, string filePath)
     {
         if (string.IsNullOrWhiteSpace(config.Name))
@@ -84,21 +126,7 @@ public static class JsonConfigLoader
 
     private static void ApplyDefaultRegisterFormats(ControllerConfig config)
     {
-        //      (  Fanuc)
-        var defaults = new Dictionary<string, RegisterFormat>
-        {
-            ["X"] = new RegisterFormat { Address = "X", Format = "F4.3", IsModal = true },
-            ["Y"] = new RegisterFormat { Address = "Y", Format = "F4.3", IsModal = true },
-            ["Z"] = new RegisterFormat { Address = "Z", Format = "F4.3", IsModal = true },
-            ["A"] = new RegisterFormat { Address = "A", Format = "F3.2", IsModal = true },
-            ["B"] = new RegisterFormat { Address = "B", Format = "F3.2", IsModal = true },
-            ["C"] = new RegisterFormat { Address = "C", Format = "F3.2", IsModal = true },
-            ["F"] = new RegisterFormat { Address = "F", Format = "F3.1", IsModal = false },
-            ["S"] = new RegisterFormat { Address = "S", Format = "F0", IsModal = false },
-            ["T"] = new RegisterFormat { Address = "T", Format = "F0", IsModal = false }
-        };
-
-        foreach (var (key, def) in defaults)
+        foreach (var (key, def) in DefaultRegisterFormats)
         {
             if (!config.RegisterFormats.ContainsKey(key))
                 config.RegisterFormats[key] = def;
@@ -172,6 +172,29 @@ public record ControllerConfig
             return typedValue;
         return defaultValue;
     }
+
+    /// <summary>
+    /// Получить числовой пользовательский параметр (число или строка в JSON)
+    /// </summary>
+    public double GetCustomDouble(string key, double defaultValue = 0)
+    {
+        if (!CustomParameters.TryGetValue(key, out var value))
+            return defaultValue;
+
+        return value switch
+        {
+            double d => d,
+            int i => i,
+            JsonElement { ValueKind: JsonValueKind.Number } element => element.GetDouble(),
+            JsonElement { ValueKind: JsonValueKind.String } element when double.TryParse(
+                element.GetString(), System.Globalization.NumberStyles.Float,
+                System.Globalization.CultureInfo.InvariantCulture, out var parsed) => parsed,
+            string text when double.TryParse(
+                text, System.Globalization.NumberStyles.Float,
+                System.Globalization.CultureInfo.InvariantCulture, out var parsed) => parsed,
+            _ => defaultValue
+        };
+    }
 }
 
 /// <summary>
@@ -407,12 +430,7 @@ public static class ConfigLoader
             throw new FileNotFoundException($"Config file not found: {filePath}");
 
         var json = File.ReadAllText(filePath);
-        return JsonSerializer.Deserialize<ControllerConfig>(json, new JsonSerializerOptions
-        {
-            PropertyNameCaseInsensitive = true,
-            AllowTrailingCommas = true,
-            ReadCommentHandling = JsonCommentHandling.Skip,
-            NumberHandling = JsonNumberHandling.AllowReadingFromString
-        }) ?? throw new InvalidOperationException($"Failed to deserialize config: {filePath}");
+        return JsonSerializer.Deserialize<ControllerConfig>(json, Loaders.JsonConfigLoader.Options)
+            ?? throw new InvalidOperationException($"Failed to deserialize config: {filePath}");
     }
 }
@@ -20,6 +20,11 @@ public record SafetyParameters
     /// </summary>
     public double MaxFeedRate { get; init; } = 10000.0;
 
+    /// <summary>
+    ///    (/),     
+    /// </summary>
+    public double MaxRapidRate { get; init; } = 20000.0;
+
     /// <summary>
     ///    (/)
     /// </summary>
@@ -1,4 +1,5 @@
 using System.Text.Json.Serialization;
+using PostProcessor.Core.Context;
 
 namespace PostProcessor.Core.Config.Models;
 
@@ -17,12 +18,21 @@ public record ToolLibraryConfig
     /// </summary>
     public List<ToolDefinition> Tools { get; init; } = new();
 
+    private ToolLibraryIndex? _index;
+
+    /// <summary>
+    ///     (   ;
+    ///   Tools    )
+    /// </summary>
+    [JsonIgnore]
+    public ToolLibraryIndex Index => _index ??= new ToolLibraryIndex(this);
+
     /// <summary>
     ///    
     /// </summary>
     public ToolDefinition? FindTool(int toolNumber)
     {
-        return Tools.FirstOrDefault(t => t.Number == toolNumber);
+        return Index.FindTool(toolNumber);
     }
 
     /// <summary>
@@ -30,9 +40,7 @@ public record ToolLibraryConfig
     /// </summary>
     public ToolDefinition? FindToolByName(string name)
     {
-        return Tools.FirstOrDefault(t =>
-            t.Name?.Equals(name, StringComparison.OrdinalIgnoreCase) == true ||
-            t.Comment?.Contains(name, StringComparison.OrdinalIgnoreCase) == true);
+        return Index.FindToolByName(name);
     }
 }
 
@@ -130,6 +138,22 @@ public record ToolDefinition
     ///   (    )
     /// </summary>
     public int? AlternateTool { get; init; }
+
+    /// <summary>
+    ///   ToolInfo  
+    /// </summary>
+    public ToolInfo ToToolInfo()
+    {
+        var type = Type switch
+        {
+            ToolType.EndMill => "endmill",
+            ToolType.BallNose => "ballnose",
+            ToolType.FaceMill => "face_mill",
+            _ => Type.ToString().ToLowerInvariant()
+        };
+
+        return new ToolInfo(Number, Diameter, Length, Name ?? Comment, type, Flutes, CornerRadius);
+    }
 }
 
 public enum ToolType
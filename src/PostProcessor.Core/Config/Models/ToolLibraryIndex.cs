@@ -0,0 +1,71 @@
+namespace PostProcessor.Core.Config.Models;
+
+/// <summary>
+/// Индекс библиотеки инструментов: поиск по номеру, имени и альтернативному инструменту
+/// без перебора списка. Строится один раз по загруженной библиотеке;
+/// при совпадении номеров или имён действует первый инструмент в списке.
+/// </summary>
+public sealed class ToolLibraryIndex
+{
+    private readonly Dictionary<int, ToolDefinition> _byNumber = new();
+    private readonly Dictionary<string, ToolDefinition> _byName = new(StringComparer.OrdinalIgnoreCase);
+    private readonly List<ToolDefinition> _withComment = new();
+
+    public ToolLibraryIndex(ToolLibraryConfig library)
+    {
+        foreach (var tool in library.Tools)
+        {
+            _byNumber.TryAdd(tool.Number, tool);
+
+            if (!string.IsNullOrWhiteSpace(tool.Name))
+                _byName.TryAdd(tool.Name, tool);
+
+            if (!string.IsNullOrWhiteSpace(tool.Comment))
+                _withComment.Add(tool);
+        }
+    }
+
+    /// <summary>
+    /// Количество инструментов с уникальными номерами
+    /// </summary>
+    public int Count => _byNumber.Count;
+
+    /// <summary>
+    /// Поиск инструмента по номеру
+    /// </summary>
+    public ToolDefinition? FindTool(int toolNumber)
+    {
+        return _byNumber.GetValueOrDefault(toolNumber);
+    }
+
+    /// <summary>
+    /// Поиск инструмента по имени; если имя не найдено - по вхождению в комментарий
+    /// </summary>
+    public ToolDefinition? FindToolByName(string name)
+    {
+        if (_byName.TryGetValue(name, out var tool))
+            return tool;
+
+        return _withComment.FirstOrDefault(t => t.Comment!.Contains(name, StringComparison.OrdinalIgnoreCase));
+    }
+
+    /// <summary>
+    /// Инструмент, который можно использовать вместо указанного: сам инструмент, если он активен,
+    /// иначе первый активный по цепочке AlternateTool
+    /// </summary>
+    public ToolDefinition? FindUsableTool(int toolNumber)
+    {
+        var visited = new HashSet<int>();
+        var tool = FindTool(toolNumber);
+
+        while (tool != null && visited.Add(tool.Number))
+        {
+            if (tool.Status == ToolStatus.Active)
+                return tool;
+
+            tool = tool.AlternateTool is int alternate ? FindTool(alternate) : null;
+        }
+
+        return null;
+    }
+}
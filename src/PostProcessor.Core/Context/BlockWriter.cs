@@ -8,8 +8,10 @@ public class BlockWriter
 {
     private readonly TextWriter _writer;
     private readonly List<NCWord> _words = new();
+    private readonly List<string> _parts = new();
     private string _separator = " ";
     private int _blockNumber = 0;
+    private long _blocksWritten;
     private int _blockIncrement = 10;
     private bool _blockNumberingEnabled = true;
 
@@ -122,12 +124,35 @@ public class BlockWriter
     /// <returns>true если блок был записан, false если нет изменений</returns>
     public bool WriteBlock(bool includeBlockNumber = true)
     {
-        var changed = _words.Where(w => w.HasChanged).ToList();
+        return WriteBlock(includeBlockNumber, Array.Empty<NCWord>());
+    }
+
+    /// <summary>
+    /// Сформировать и записать блок с дополнительными словами после отслеживаемых
+    /// (I/J/K или R дуги). Дополнительные слова выводятся всегда, блок пишется даже
+    /// без изменений отслеживаемых слов.
+    /// </summary>
+    /// <param name="includeBlockNumber">Включить номер блока</param>
+    /// <param name="extraWords">Слова, выводимые в конце блока</param>
+    /// <returns>true если блок был записан, false если нет изменений</returns>
+    public bool WriteBlock(bool includeBlockNumber, params NCWord[] extraWords)
+    {
+        // Слова проверяются по списку в порядке вывода, без промежуточных коллекций
+        var hasChanges = extraWords.Length > 0;
+        foreach (var word in _words)
+        {
+            if (word.HasChanged)
+            {
+                hasChanges = true;
+                break;
+            }
+        }
 
-        if (changed.Count == 0)
+        if (!hasChanges)
             return false;
 
-        var parts = new List<string>();
+        var parts = _parts;
+        parts.Clear();
 
         // Номер блока
         if (_blockNumberingEnabled && includeBlockNumber)
@@ -137,8 +162,11 @@ public class BlockWriter
         }
 
         // Изменённые слова
-        foreach (var word in changed)
+        foreach (var word in _words)
         {
+            if (!word.HasChanged)
+                continue;
+
             var wordStr = word.ToNCString();
             if (!string.IsNullOrEmpty(wordStr))
                 parts.Add(wordStr);
@@ -148,9 +176,21 @@ public class BlockWriter
                 word.ResetChangeFlag();
         }
 
+        foreach (var word in extraWords)
+        {
+            word.ForceChanged();
+            var wordStr = word.ToNCString();
+            if (!string.IsNullOrEmpty(wordStr))
+                parts.Add(wordStr);
+
+            if (word.IsModal)
+                word.ResetChangeFlag();
+        }
+
         if (parts.Count > 0)
         {
             _writer.WriteLine(string.Join(_separator, parts));
+            _blocksWritten++;
             return true;
         }
 
@@ -174,6 +214,11 @@ public class BlockWriter
     /// </summary>
     public int CurrentBlockNumber => _blockNumber;
 
+    /// <summary>
+    /// Число кадров, выведенных через WriteBlock
+    /// </summary>
+    public long BlocksWritten => _blocksWritten;
+
     /// <summary>
     /// Записать строку напрямую (для комментариев, M-кодов вне блоков)
     /// </summary>
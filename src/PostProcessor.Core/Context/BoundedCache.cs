@@ -0,0 +1,267 @@
+namespace PostProcessor.Core.Context;
+
+/// <summary>
+/// Счётчики кэша
+/// </summary>
+/// <param name="Count">Записей в памяти</param>
+/// <param name="Hits">Найдено в памяти</param>
+/// <param name="Misses">Не найдено (ни в памяти, ни в файле вытеснения)</param>
+/// <param name="Evictions">Вытеснено из памяти по LRU</param>
+/// <param name="SpillHits">Найдено в файле вытеснения и возвращено в память</param>
+/// <param name="SpilledCount">Записей в файле вытеснения</param>
+public record CacheStatistics(
+    int Count,
+    long Hits,
+    long Misses,
+    long Evictions,
+    long SpillHits,
+    int SpilledCount);
+
+/// <summary>
+/// Кэш с ограниченным количеством записей и вытеснением давно не использованных (LRU).
+/// Вытесненные записи теряются или, если задан файл вытеснения, сериализуются
+/// в отображённый в память файл и возвращаются в память при следующем обращении.
+/// Потокобезопасен (общая блокировка).
+/// </summary>
+/// <typeparam name="TValue">Тип значения</typeparam>
+public sealed class BoundedCache<TValue> : IDisposable where TValue : class
+{
+    private readonly object _lock = new();
+    private readonly Dictionary<string, LinkedListNode<KeyValuePair<string, TValue>>> _entries;
+    private readonly LinkedList<KeyValuePair<string, TValue>> _order = new();
+    private int _capacity;
+    private CacheSpillFile? _spill;
+    private Func<TValue, byte[]>? _serialize;
+    private Func<byte[], TValue>? _deserialize;
+    private long _hits;
+    private long _misses;
+    private long _evictions;
+    private long _spillHits;
+
+    /// <summary>
+    /// Создать кэш
+    /// </summary>
+    /// <param name="capacity">Максимальное количество записей в памяти</param>
+    public BoundedCache(int capacity)
+    {
+        if (capacity < 1)
+            throw new ArgumentOutOfRangeException(nameof(capacity), "Capacity must be positive");
+
+        _capacity = capacity;
+        _entries = new Dictionary<string, LinkedListNode<KeyValuePair<string, TValue>>>(StringComparer.Ordinal);
+    }
+
+    /// <summary>
+    /// Максимальное количество записей в памяти (уменьшение вытесняет лишние записи)
+    /// </summary>
+    public int Capacity
+    {
+        get => _capacity;
+        set
+        {
+            if (value < 1)
+                throw new ArgumentOutOfRangeException(nameof(value), "Capacity must be positive");
+
+            lock (_lock)
+            {
+                _capacity = value;
+                EvictOverflow();
+            }
+        }
+    }
+
+    /// <summary>
+    /// Записей в памяти
+    /// </summary>
+    public int Count
+    {
+        get
+        {
+            lock (_lock)
+                return _entries.Count;
+        }
+    }
+
+    /// <summary>
+    /// Включён файл вытеснения
+    /// </summary>
+    public bool IsSpillEnabled => _spill != null;
+
+    /// <summary>
+    /// Занято байт в файле вытеснения (освобождённое место возвращается сжатием файла)
+    /// </summary>
+    public long SpillLength
+    {
+        get
+        {
+            lock (_lock)
+                return _spill?.Length ?? 0;
+        }
+    }
+
+    /// <summary>
+    /// Включить вытеснение в файл
+    /// </summary>
+    /// <param name="path">Путь к файлу (пересоздаётся, удаляется при Dispose)</param>
+    /// <param name="serialize">Сериализация значения</param>
+    /// <param name="deserialize">Восстановление значения</param>
+    public void EnableSpill(string path, Func<TValue, byte[]> serialize, Func<byte[], TValue> deserialize)
+    {
+        lock (_lock)
+        {
+            _spill?.Dispose();
+            _spill = new CacheSpillFile(path);
+            _serialize = serialize;
+            _deserialize = deserialize;
+        }
+    }
+
+    /// <summary>
+    /// Значение по ключу; запись значения добавляет или заменяет запись
+    /// </summary>
+    public TValue this[string key]
+    {
+        get => TryGetValue(key, out var value)
+            ? value
+            : throw new KeyNotFoundException($"Key '{key}' is not in the cache");
+        set => Set(key, value);
+    }
+
+    /// <summary>
+    /// Найти значение; найденная запись становится последней использованной
+    /// </summary>
+    public bool TryGetValue(string key, out TValue value)
+    {
+        lock (_lock)
+        {
+            if (_entries.TryGetValue(key, out var node))
+            {
+                _order.Remove(node);
+                _order.AddFirst(node);
+                _hits++;
+                value = node.Value.Value;
+                return true;
+            }
+
+            if (_spill != null && _spill.TryTake(key, out var data))
+            {
+                _spillHits++;
+                value = _deserialize!(data);
+                Add(key, value);
+                return true;
+            }
+
+            _misses++;
+            value = null!;
+            return false;
+        }
+    }
+
+    /// <summary>
+    /// Добавить запись, если ключа нет ни в памяти, ни в файле вытеснения
+    /// </summary>
+    public bool TryAdd(string key, TValue value)
+    {
+        lock (_lock)
+        {
+            if (_entries.ContainsKey(key) || _spill?.Contains(key) == true)
+                return false;
+
+            Add(key, value);
+            return true;
+        }
+    }
+
+    /// <summary>
+    /// Проверить наличие ключа (без изменения порядка и счётчиков)
+    /// </summary>
+    public bool ContainsKey(string key)
+    {
+        lock (_lock)
+            return _entries.ContainsKey(key) || _spill?.Contains(key) == true;
+    }
+
+    /// <summary>
+    /// Удалить запись
+    /// </summary>
+    public bool TryRemove(string key)
+    {
+        lock (_lock)
+        {
+            var removed = _spill?.Remove(key) == true;
+            if (_entries.Remove(key, out var node))
+            {
+                _order.Remove(node);
+                removed = true;
+            }
+            return removed;
+        }
+    }
+
+    /// <summary>
+    /// Удалить все записи (счётчики сохраняются)
+    /// </summary>
+    public void Clear()
+    {
+        lock (_lock)
+        {
+            _entries.Clear();
+            _order.Clear();
+            _spill?.Clear();
+        }
+    }
+
+    /// <summary>
+    /// Текущие счётчики
+    /// </summary>
+    public CacheStatistics GetStatistics()
+    {
+        lock (_lock)
+            return new CacheStatistics(_entries.Count, _hits, _misses, _evictions, _spillHits, _spill?.Count ?? 0);
+    }
+
+    public void Dispose()
+    {
+        lock (_lock)
+        {
+            _spill?.Dispose();
+            _spill = null;
+        }
+    }
+
+    private void Set(string key, TValue value)
+    {
+        lock (_lock)
+        {
+            if (_entries.TryGetValue(key, out var node))
+            {
+                node.Value = new KeyValuePair<string, TValue>(key, value);
+                _order.Remove(node);
+                _order.AddFirst(node);
+                return;
+            }
+
+            _spill?.Remove(key);
+            Add(key, value);
+        }
+    }
+
+    private void Add(string key, TValue value)
+    {
+        _entries[key] = _order.AddFirst(new KeyValuePair<string, TValue>(key, value));
+        EvictOverflow();
+    }
+
+    private void EvictOverflow()
+    {
+        while (_entries.Count > _capacity)
+        {
+            var last = _order.Last!;
+            _order.RemoveLast();
+            _entries.Remove(last.Value.Key);
+            _evictions++;
+
+            _spill?.Write(last.Value.Key, _serialize!(last.Value.Value));
+        }
+    }
+}
@@ -0,0 +1,152 @@
+using System.IO.MemoryMappedFiles;
+
+namespace PostProcessor.Core.Context;
+
+/// <summary>
+/// Файл вытеснения кэша: записи добавляются в конец отображённого в память файла,
+/// индекс хранит смещение и длину по ключу. Когда освобождённые записи занимают больше
+/// половины занятого места, живые записи сдвигаются к началу файла и место переиспользуется;
+/// файл удаляется при закрытии (и при завершении процесса).
+/// </summary>
+internal sealed class CacheSpillFile : IDisposable
+{
+    private const long InitialCapacity = 1 << 20;
+
+    private readonly FileStream _stream;
+    private readonly Dictionary<string, (long Offset, int Length)> _index = new();
+    private MemoryMappedFile _map;
+    private MemoryMappedViewAccessor _view;
+    private long _capacity;
+    private long _length;
+    private long _dead;
+
+    public CacheSpillFile(string path)
+    {
+        var directory = System.IO.Path.GetDirectoryName(System.IO.Path.GetFullPath(path));
+        if (!string.IsNullOrEmpty(directory))
+            Directory.CreateDirectory(directory);
+
+        Path = path;
+        _stream = new FileStream(path, FileMode.Create, FileAccess.ReadWrite, FileShare.None, 4096, FileOptions.DeleteOnClose);
+        _capacity = InitialCapacity;
+        (_map, _view) = Map(_capacity);
+    }
+
+    /// <summary>
+    /// Путь к файлу
+    /// </summary>
+    public string Path { get; }
+
+    /// <summary>
+    /// Количество записей в файле
+    /// </summary>
+    public int Count => _index.Count;
+
+    /// <summary>
+    /// Занято байт (включая освобождённые записи)
+    /// </summary>
+    public long Length => _length;
+
+    /// <summary>
+    /// Байт в освобождённых записях (до следующего сжатия)
+    /// </summary>
+    public long DeadLength => _dead;
+
+    public void Write(string key, byte[] data)
+    {
+        if (_index.TryGetValue(key, out var previous))
+            _dead += previous.Length;
+        if (_dead * 2 > _length)
+            Compact();
+
+        if (_length + data.Length > _capacity)
+            Grow(_length + data.Length);
+
+        _view.WriteArray(_length, data, 0, data.Length);
+        _index[key] = (_length, data.Length);
+        _length += data.Length;
+    }
+
+    /// <summary>
+    /// Извлечь запись (запись удаляется из индекса)
+    /// </summary>
+    public bool TryTake(string key, out byte[] data)
+    {
+        if (!_index.Remove(key, out var entry))
+        {
+            data = Array.Empty<byte>();
+            return false;
+        }
+
+        data = new byte[entry.Length];
+        _view.ReadArray(entry.Offset, data, 0, entry.Length);
+        _dead += entry.Length;
+        return true;
+    }
+
+    public bool Contains(string key) => _index.ContainsKey(key);
+
+    public bool Remove(string key)
+    {
+        if (!_index.Remove(key, out var entry))
+            return false;
+
+        _dead += entry.Length;
+        return true;
+    }
+
+    public void Clear()
+    {
+        _index.Clear();
+        _length = 0;
+        _dead = 0;
+    }
+
+    public void Dispose()
+    {
+        _view.Dispose();
+        _map.Dispose();
+        _stream.Dispose();
+    }
+
+    // Сдвиг живых записей к началу файла по возрастанию смещения:
+    // новое смещение не больше старого, поэтому записи не перекрываются до копирования
+    private void Compact()
+    {
+        long offset = 0;
+        foreach (var (key, entry) in _index.OrderBy(pair => pair.Value.Offset).ToList())
+        {
+            if (entry.Offset != offset)
+            {
+                var data = new byte[entry.Length];
+                _view.ReadArray(entry.Offset, data, 0, entry.Length);
+                _view.WriteArray(offset, data, 0, entry.Length);
+                _index[key] = (offset, entry.Length);
+            }
+            offset += entry.Length;
+        }
+
+        _length = offset;
+        _dead = 0;
+    }
+
+    private void Grow(long required)
+    {
+        var capacity = _capacity;
+        while (capacity < required)
+            capacity *= 2;
+
+        _view.Dispose();
+        _map.Dispose();
+        _capacity = capacity;
+        (_map, _view) = Map(_capacity);
+    }
+
+    private (MemoryMappedFile Map, MemoryMappedViewAccessor View) Map(long capacity)
+    {
+        _stream.SetLength(capacity);
+        var map = MemoryMappedFile.CreateFromFile(
+            _stream, null, capacity, MemoryMappedFileAccess.ReadWrite, HandleInheritability.None, leaveOpen: true);
+        return (map, map.CreateViewAccessor(0, capacity));
+    }
+}
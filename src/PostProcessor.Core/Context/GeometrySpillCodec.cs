@@ -0,0 +1,51 @@
+using System.Buffers.Binary;
+
+namespace PostProcessor.Core.Context;
+
+/// <summary>
+/// Двоичное представление геометрических примитивов для файла вытеснения GeometryCache:
+/// байт типа и координаты (double, little-endian)
+/// </summary>
+internal static class GeometrySpillCodec
+{
+    private const byte PointTag = 1;
+    private const byte LineTag = 2;
+    private const byte CircleTag = 3;
+
+    public static byte[] Serialize(PostContext.GeometryDefinition geometry)
+    {
+        double[] values = geometry switch
+        {
+            PostContext.Point p => new[] { p.X, p.Y, p.Z },
+            PostContext.Line l => new[] { l.Start.X, l.Start.Y, l.Start.Z, l.End.X, l.End.Y, l.End.Z },
+            PostContext.Circle c => new[] { c.Center.X, c.Center.Y, c.Center.Z, c.Radius },
+            _ => throw new NotSupportedException($"Geometry type {geometry.GetType().Name} cannot be spilled")
+        };
+
+        var data = new byte[1 + values.Length * sizeof(double)];
+        data[0] = geometry switch
+        {
+            PostContext.Point => PointTag,
+            PostContext.Line => LineTag,
+            _ => CircleTag
+        };
+        for (int i = 0; i < values.Length; i++)
+            BinaryPrimitives.WriteDoubleLittleEndian(data.AsSpan(1 + i * sizeof(double)), values[i]);
+        return data;
+    }
+
+    public static PostContext.GeometryDefinition Deserialize(byte[] data)
+    {
+        double Read(int index) => BinaryPrimitives.ReadDoubleLittleEndian(data.AsSpan(1 + index * sizeof(double)));
+
+        return data[0] switch
+        {
+            PointTag => new PostContext.Point(Read(0), Read(1), Read(2)),
+            LineTag => new PostContext.Line(
+                new PostContext.Point(Read(0), Read(1), Read(2)),
+                new PostContext.Point(Read(3), Read(4), Read(5))),
+            CircleTag => new PostContext.Circle(new PostContext.Point(Read(0), Read(1), Read(2)), Read(3)),
+            _ => throw new InvalidDataException($"Unknown geometry tag {data[0]}")
+        };
+    }
+}
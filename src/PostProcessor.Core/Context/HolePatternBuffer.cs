@@ -0,0 +1,369 @@
+using System.Globalization;
+using PostProcessor.Core.Models;
+
+namespace PostProcessor.Core.Context;
+
+/// <summary>
+/// Синтаксис шаблонов отверстий
+/// </summary>
+public enum HolePatternDialect
+{
+    /// <summary>
+    /// Fanuc/Haas: модальный G81/G83, далее кадры только с X/Y, G80
+    /// </summary>
+    Fanuc,
+
+    /// <summary>
+    /// Siemens Sinumerik: MCALL CYCLE8x со списком позиций или HOLES1/HOLES2
+    /// </summary>
+    Siemens,
+
+    /// <summary>
+    /// Heidenhain TNC: CYCL DEF 200/203, PATTERN DEF, CYCL CALL PAT
+    /// </summary>
+    Heidenhain
+}
+
+/// <summary>
+/// Сбор серии отверстий с одним определением цикла сверления в шаблон УЧПУ.
+/// Макрос цикла (CYCLE81/CYCLE83) открывает серию в текущей позиции; далее движок макросов
+/// передаёт команды в TryAccept: GOTO задерживается как возможная позиция следующего
+/// отверстия, цикл с тем же определением добавляет её в серию без вызова макроса.
+/// Любая другая команда закрывает серию: шаблон выводится, задержанный GOTO выполняется.
+/// </summary>
+public sealed class HolePatternBuffer
+{
+    private readonly PostContext _context;
+    private readonly List<(double X, double Y)> _holes = new();
+    private string _cycle = "";
+    private double[] _parameters = Array.Empty<double>();
+    private double _z;
+    private APTCommand? _held;
+
+    public HolePatternBuffer(PostContext context)
+    {
+        _context = context;
+    }
+
+    /// <summary>
+    /// Серия открыта
+    /// </summary>
+    public bool IsOpen { get; private set; }
+
+    /// <summary>
+    /// Отверстий в открытой серии
+    /// </summary>
+    public int HoleCount => _holes.Count;
+
+    /// <summary>
+    /// Выполнение задержанной команды при закрытии серии (устанавливает движок макросов)
+    /// </summary>
+    public Action<APTCommand>? Replay { get; set; }
+
+    /// <summary>
+    /// Допуск сравнения позиций при поиске рядов и окружностей
+    /// </summary>
+    public double Tolerance { get; set; } = 0.001;
+
+    /// <summary>
+    /// Открыть серию: первое отверстие - в текущей позиции X/Y
+    /// </summary>
+    /// <param name="cycle">Имя цикла (CYCLE81, CYCLE83)</param>
+    /// <param name="parameters">Параметры цикла в порядке APT</param>
+    public void Begin(string cycle, IReadOnlyList<double> parameters)
+    {
+        Flush();
+
+        _cycle = cycle.ToUpperInvariant();
+        _parameters = parameters.ToArray();
+        _z = _context.Registers.Z.Value;
+        _holes.Add((_context.Registers.X.Value, _context.Registers.Y.Value));
+        IsOpen = true;
+    }
+
+    /// <summary>
+    /// Передать команду открытой серии
+    /// </summary>
+    /// <returns>true, если команда поглощена серией; false - серия закрыта, команду нужно выполнить</returns>
+    public bool TryAccept(APTCommand command)
+    {
+        if (!IsOpen)
+            return false;
+
+        if (command.Word == APTMajorWord.Goto && _held == null && command.NumericValues.Count >= 2)
+        {
+            _held = command;
+            return true;
+        }
+
+        if (_held != null && IsSameCycle(command))
+        {
+            _holes.Add((_held.NumericValues[0], _held.NumericValues[1]));
+            _z = _held.NumericValues.Count > 2 ? _held.NumericValues[2] : _z;
+            _held = null;
+            return true;
+        }
+
+        Flush();
+        return false;
+    }
+
+    /// <summary>
+    /// Вывести шаблон и выполнить задержанную команду
+    /// </summary>
+    public void Flush()
+    {
+        if (!IsOpen)
+            return;
+        IsOpen = false;
+
+        WritePattern();
+
+        // Позиция после шаблона - последнее отверстие; регистры не выводятся повторно
+        var (x, y) = _holes[^1];
+        _context.Registers.X.Reset(x, markChanged: false);
+        _context.Registers.Y.Reset(y, markChanged: false);
+        _context.Registers.Z.Reset(_z, markChanged: false);
+        _holes.Clear();
+
+        var held = _held;
+        _held = null;
+        if (held != null)
+            Replay?.Invoke(held);
+    }
+
+    /// <summary>
+    /// Определить синтаксис по имени контроллера (по умолчанию - Fanuc)
+    /// </summary>
+    public static HolePatternDialect DetectDialect(string? controllerName)
+    {
+        var name = controllerName?.ToLowerInvariant() ?? "";
+        if (name.Contains("siemens") || name.Contains("sinumerik"))
+            return HolePatternDialect.Siemens;
+        if (name.Contains("heidenhain") || name.Contains("tnc"))
+            return HolePatternDialect.Heidenhain;
+        return HolePatternDialect.Fanuc;
+    }
+
+    private bool IsSameCycle(APTCommand command)
+    {
+        if (!command.MajorWord.Equals(_cycle, StringComparison.OrdinalIgnoreCase) ||
+            command.NumericValues.Count != _parameters.Length)
+            return false;
+
+        for (int i = 0; i < _parameters.Length; i++)
+        {
+            if (command.NumericValues[i] != _parameters[i])
+                return false;
+        }
+        return true;
+    }
+
+    private void WritePattern()
+    {
+        var lines = DetectDialect(_context.Config.Name) switch
+        {
+            HolePatternDialect.Siemens => FormatSiemens(),
+            HolePatternDialect.Heidenhain => FormatHeidenhain(),
+            _ => FormatFanuc()
+        };
+
+        foreach (var line in lines)
+            _context.Write(line);
+    }
+
+    // CYCLE81(RTP, RFP, SDIS, DP, DPR), CYCLE83(..., FDEP, FDPR, DAM, DTB, ...)
+    private double Parameter(int index, double defaultValue = 0) =>
+        index < _parameters.Length ? _parameters[index] : defaultValue;
+
+    private bool IsPeck => _cycle == "CYCLE83";
+
+    // Глубина одного врезания: FDPR, иначе FDEP от плоскости отсчёта, иначе вся глубина
+    private double PeckDepth()
+    {
+        var fdpr = Math.Abs(Parameter(6));
+        if (fdpr > 0)
+            return fdpr;
+        var fdep = Parameter(5);
+        return fdep != 0 ? Math.Abs(Parameter(1) - fdep) : Math.Abs(Parameter(1) - Parameter(3));
+    }
+
+    private IEnumerable<string> FormatFanuc()
+    {
+        var rfp = Parameter(1);
+        var r = rfp + Parameter(2, 2);
+        var code = IsPeck ? "G83" : "G81";
+        var (x0, y0) = _holes[0];
+
+        var first = $"G98 {code} X{Coordinate(x0)} Y{Coordinate(y0)} Z{Coordinate(Parameter(3))} R{Coordinate(r)}";
+        if (IsPeck)
+            first += $" Q{Coordinate(PeckDepth())}";
+        yield return first + $" F{_context.Registers.F.FormatValue()}";
+
+        for (int i = 1; i < _holes.Count; i++)
+            yield return $"X{Coordinate(_holes[i].X)} Y{Coordinate(_holes[i].Y)}";
+
+        yield return "G80";
+    }
+
+    private IEnumerable<string> FormatSiemens()
+    {
+        var call = $"{_cycle}({string.Join(",", _parameters.Select(CycleParameter))})";
+
+        if (TryFindRow(out var row))
+        {
+            yield return "MCALL " + call;
+            yield return $"HOLES1({Coordinate(_holes[0].X)},{Coordinate(_holes[0].Y)},{Value(row.Angle)},0,{Coordinate(row.Spacing)},{_holes.Count})";
+            yield return "MCALL";
+            yield break;
+        }
+
+        if (TryFindCircle(out var circle))
+        {
+            yield return "MCALL " + call;
+            yield return $"HOLES2({Coordinate(circle.X)},{Coordinate(circle.Y)},{Coordinate(circle.Radius)},{Value(circle.StartAngle)},{Value(circle.Increment)},{_holes.Count})";
+            yield return "MCALL";
+            yield break;
+        }
+
+        // Первое отверстие - в текущей позиции, остальные - модальным вызовом в списке позиций
+        yield return call;
+        if (_holes.Count == 1)
+            yield break;
+
+        yield return "MCALL " + call;
+        for (int i = 1; i < _holes.Count; i++)
+            yield return $"X{Coordinate(_holes[i].X)} Y{Coordinate(_holes[i].Y)}";
+        yield return "MCALL";
+    }
+
+    private IEnumerable<string> FormatHeidenhain()
+    {
+        var rfp = Parameter(1);
+        var depth = Parameter(3) - rfp;
+        var feed = _context.Registers.F.Value;
+
+        if (IsPeck)
+        {
+            yield return "CYCL DEF 203 UNIVERSAL DRILLING ~";
+            yield return $"  Q200={Signed(Parameter(2, 2))} ;SET-UP CLEARANCE ~";
+            yield return $"  Q201={Signed(depth)} ;DEPTH ~";
+            yield return $"  Q206={Signed(feed)} ;FEED RATE FOR PLNGNG ~";
+            yield return $"  Q202={Signed(PeckDepth())} ;PLUNGING DEPTH ~";
+            yield return $"  Q210={Signed(Parameter(9))} ;DWELL TIME AT TOP ~";
+            yield return $"  Q203={Signed(rfp)} ;SURFACE COORDINATE ~";
+            yield return $"  Q204={Signed(Parameter(0) - rfp)} ;2ND SET-UP CLEARANCE ~";
+            yield return $"  Q212={Signed(Parameter(7))} ;DECREMENT ~";
+            yield return $"  Q213=+0 ;BREAKS ~";
+            yield return $"  Q205=+0 ;MIN. PLUNGING DEPTH ~";
+            yield return $"  Q211={Signed(Parameter(8))} ;DWELL TIME AT DEPTH ~";
+            yield return $"  Q208=+99999 ;RETRACTION FEED RATE ~";
+            yield return $"  Q256=+0.2 ;DIST FOR CHIP BRKNG";
+        }
+        else
+        {
+            yield return "CYCL DEF 200 DRILLING ~";
+            yield return $"  Q200={Signed(Parameter(2, 2))} ;SET-UP CLEARANCE ~";
+            yield return $"  Q201={Signed(depth)} ;DEPTH ~";
+            yield return $"  Q206={Signed(feed)} ;FEED RATE FOR PLNGNG ~";
+            yield return $"  Q202={Signed(Math.Abs(depth))} ;PLUNGING DEPTH ~";
+            yield return $"  Q210=+0 ;DWELL TIME AT TOP ~";
+            yield return $"  Q203={Signed(rfp)} ;SURFACE COORDINATE ~";
+            yield return $"  Q204={Signed(Parameter(0) - rfp)} ;2ND SET-UP CLEARANCE ~";
+            yield return $"  Q211=+0 ;DWELL TIME AT DEPTH";
+        }
+
+        // PATTERN DEF - до 9 позиций; Z точки складывается с Q203
+        for (int start = 0; start < _holes.Count; start += 9)
+        {
+            var count = Math.Min(9, _holes.Count - start);
+            yield return "PATTERN DEF ~";
+            for (int i = 0; i < count; i++)
+            {
+                var (x, y) = _holes[start + i];
+                yield return $"  POS{i + 1} (X{Signed(x)} Y{Signed(y)} Z+0){(i < count - 1 ? " ~" : "")}";
+            }
+            yield return "CYCL CALL PAT FMAX";
+        }
+    }
+
+    // Ряд: не менее 3 отверстий на прямой с постоянным шагом
+    private bool TryFindRow(out (double Angle, double Spacing) row)
+    {
+        row = default;
+        if (_holes.Count < 3)
+            return false;
+
+        var (x0, y0) = _holes[0];
+        var dx = _holes[1].X - x0;
+        var dy = _holes[1].Y - y0;
+        var spacing = Math.Sqrt(dx * dx + dy * dy);
+        if (spacing <= Tolerance)
+            return false;
+
+        for (int i = 2; i < _holes.Count; i++)
+        {
+            if (Math.Abs(_holes[i].X - (x0 + dx * i)) > Tolerance || Math.Abs(_holes[i].Y - (y0 + dy * i)) > Tolerance)
+                return false;
+        }
+
+        row = (Math.Atan2(dy, dx) * 180 / Math.PI, spacing);
+        return true;
+    }
+
+    // Окружность: не менее 4 отверстий на одном радиусе с постоянным угловым шагом
+    private bool TryFindCircle(out (double X, double Y, double Radius, double StartAngle, double Increment) circle)
+    {
+        circle = default;
+        if (_holes.Count < 4)
+            return false;
+
+        // Центр окружности через три первые точки
+        var (ax, ay) = _holes[0];
+        var (bx, by) = _holes[1];
+        var (cx, cy) = _holes[2];
+        var d = 2 * (ax * (by - cy) + bx * (cy - ay) + cx * (ay - by));
+        if (Math.Abs(d) < 1e-9)
+            return false;
+
+        var a2 = ax * ax + ay * ay;
+        var b2 = bx * bx + by * by;
+        var c2 = cx * cx + cy * cy;
+        var ux = (a2 * (by - cy) + b2 * (cy - ay) + c2 * (ay - by)) / d;
+        var uy = (a2 * (cx - bx) + b2 * (ax - cx) + c2 * (bx - ax)) / d;
+        var radius = Math.Sqrt((ax - ux) * (ax - ux) + (ay - uy) * (ay - uy));
+
+        double Angle(int i) => Math.Atan2(_holes[i].Y - uy, _holes[i].X - ux) * 180 / Math.PI;
+        double Normalize(double angle) => angle > 180 ? angle - 360 : angle <= -180 ? angle + 360 : angle;
+
+        var start = Angle(0);
+        var increment = Normalize(Angle(1) - start);
+        if (Math.Abs(increment) < 1e-6)
+            return false;
+
+        for (int i = 1; i < _holes.Count; i++)
+        {
+            var r = Math.Sqrt((_holes[i].X - ux) * (_holes[i].X - ux) + (_holes[i].Y - uy) * (_holes[i].Y - uy));
+            var expected = start + increment * i;
+            var x = ux + radius * Math.Cos(expected * Math.PI / 180);
+            var y = uy + radius * Math.Sin(expected * Math.PI / 180);
+            if (Math.Abs(r - radius) > Tolerance || Math.Abs(_holes[i].X - x) > Tolerance || Math.Abs(_holes[i].Y - y) > Tolerance)
+                return false;
+        }
+
+        circle = (ux, uy, radius, start, increment);
+        return true;
+    }
+
+    private string Coordinate(double value) =>
+        value.ToString("F" + _context.Config.Formatting.Coordinates.Decimals.ToString(CultureInfo.InvariantCulture), CultureInfo.InvariantCulture);
+
+    // Длины цикла (RTP ... DAM) - в формате координат; время, коэффициенты и режимы - как есть
+    private string CycleParameter(double value, int index) =>
+        index <= 7 ? Coordinate(value) : Value(value);
+
+    private static string Value(double value) => value.ToString("0.0##", CultureInfo.InvariantCulture);
+
+    private static string Signed(double value) =>
+        (value >= 0 ? "+" : "") + value.ToString("0.###", CultureInfo.InvariantCulture);
+}
@@ -47,6 +47,18 @@ public abstract class NCWord
     /// <returns>NC-слово в формате "A123.456" или пустая строка если не изменено</returns>
     public abstract string ToNCString();
     
+    /// <summary>
+    /// Совпадают ли значения при выводе с точностью decimals знаков.
+    /// Разница меньше единицы последнего выводимого разряда (шум CAM) в УП не видна,
+    /// поэтому модальное слово с таким изменением не выводится повторно.
+    /// </summary>
+    protected static bool SameAtResolution(double a, double b, int decimals)
+    {
+        decimals = Math.Clamp(decimals, 0, 15);
+        return Math.Round(a, decimals, MidpointRounding.AwayFromZero) ==
+               Math.Round(b, decimals, MidpointRounding.AwayFromZero);
+    }
+
     /// <summary>
     /// Проверяет, требует ли слово вывода с учётом модальности
     /// </summary>
@@ -84,10 +84,16 @@ public class NumericNCWord : NCWord
         {
             v0 = _value;
             _value = value;
-            _hasChanged = Math.Abs(value - v0) > 1e-6;
+            _hasChanged = !SameAtResolution(value, v0, Decimals);
         }
     }
 
+    /// <summary>
+    /// Знаков после запятой при выводе (паттерн формата или OutputFormatting);
+    /// изменения мельче не выводятся
+    /// </summary>
+    public int Decimals => _formatSpec?.DigitsAfter ?? _decimals;
+
     /// <summary>
     /// Предыдущее значение (для сравнения модальности)
     /// </summary>
@@ -114,6 +120,16 @@ public class NumericNCWord : NCWord
         _hasChanged = false;
     }
 
+    /// <summary>
+    /// Восстановить полное состояние слова из снимка
+    /// </summary>
+    internal void Restore(double value, double previousValue, bool hasChanged)
+    {
+        _value = value;
+        v0 = previousValue;
+        _hasChanged = hasChanged;
+    }
+
     /// <summary>
     /// Показать значение (принудительно отметить как изменённое)
     /// </summary>
@@ -128,7 +144,7 @@ public class NumericNCWord : NCWord
     /// <param name="value">Значение для проверки</param>
     public void Show(double value)
     {
-        if (Math.Abs(value - _value) > 1e-6)
+        if (!SameAtResolution(value, _value, Decimals))
         {
             _hasChanged = true;
         }
@@ -148,7 +164,7 @@ public class NumericNCWord : NCWord
     /// <param name="value">Значение для проверки</param>
     public void Hide(double value)
     {
-        if (Math.Abs(value - _value) < 1e-6)
+        if (SameAtResolution(value, _value, Decimals))
         {
             _hasChanged = false;
         }
@@ -180,12 +196,12 @@ public class NumericNCWord : NCWord
     /// <summary>
     /// Проверить, отличаются ли значения
     /// </summary>
-    public bool ValuesDiffer => Math.Abs(_value - v0) > 1e-6;
+    public bool ValuesDiffer => !SameAtResolution(_value, v0, Decimals);
 
     /// <summary>
     /// Проверить, равно ли значение указанному
     /// </summary>
-    public bool ValuesSame => Math.Abs(_value - v0) < 1e-6;
+    public bool ValuesSame => SameAtResolution(_value, v0, Decimals);
 
     /// <summary>
     /// Сформировать строку для вывода в NC-файл
@@ -1,6 +1,7 @@
 ﻿using PostProcessor.Core.Config.Models;
 using PostProcessor.Core.Models;
 using System.Collections.Concurrent;
+using System.Text.Json;
 
 namespace PostProcessor.Core.Context;
 
@@ -9,7 +10,7 @@ public class PostContext : IAsyncDisposable
     public RegisterSet Registers { get; } = new();
     public MachineState Machine { get; } = new();
     public CatiaContext Catia { get; } = new();
-    public StreamWriter Output { get; }
+    public TextWriter Output { get; }
     
     /// <summary>
     /// Умный формирователь NC-блоков с модальной проверкой
@@ -21,6 +22,11 @@ public class PostContext : IAsyncDisposable
     /// </summary>
     public StateCache StateCache { get; } = new();
 
+    /// <summary>
+    /// Серия отверстий с общим определением цикла сверления (вывод шаблоном УЧПУ)
+    /// </summary>
+    public HolePatternBuffer Holes { get; }
+
     /// <summary>
     /// Параметры безопасности станка (ограничения хода, максимальные скорости)
     /// </summary>
@@ -32,16 +38,55 @@ public class PostContext : IAsyncDisposable
     /// </summary>
     private readonly ConcurrentDictionary<string, object> _systemVariables = new();
 
+    /// <summary>
+    /// Записей в памяти GeometryCache по умолчанию
+    /// </summary>
+    public const int DefaultGeometryCacheCapacity = 65536;
+
+    /// <summary>
+    /// Записей в памяти ToolCache по умолчанию
+    /// </summary>
+    public const int DefaultToolCacheCapacity = 1024;
+
     /// <summary>
     /// Кэш геометрических примитивов (точки, линии, окружности)
-    /// Соответствует переменным системы в IMSpost (раздел 3.5 "Geometry Handling")
+    /// Соответствует переменным системы в IMSpost (раздел 3.5 "Geometry Handling").
+    /// Ограничен по количеству записей (LRU), см. EnableCacheSpill.
+    /// Конвейер CLI кэш не заполняет: это хранилище для встраивающего кода
+    /// </summary>
+    public BoundedCache<GeometryDefinition> GeometryCache { get; } = new(DefaultGeometryCacheCapacity);
+
+    /// <summary>
+    /// Кэш инструментов (отдельно от геометрии), ограничен по количеству записей (LRU)
     /// </summary>
-    public ConcurrentDictionary<string, GeometryDefinition> GeometryCache { get; } = new();
+    public BoundedCache<ToolInfo> ToolCache { get; } = new(DefaultToolCacheCapacity);
 
     /// <summary>
-    /// Кэш инструментов (отдельно от геометрии)
+    /// Библиотека инструментов станка (если загружена)
     /// </summary>
-    public ConcurrentDictionary<string, ToolInfo> ToolCache { get; } = new();
+    public ToolLibraryConfig? ToolLibrary { get; set; }
+
+    /// <summary>
+    /// Инструменты программы в порядке первого использования
+    /// (заполняется предварительным просмотром APT до обработки)
+    /// </summary>
+    public IReadOnlyList<ToolInfo> ProjectTools
+    {
+        get => _projectTools;
+        set
+        {
+            _projectTools = value;
+            _projectToolsByNumber = new Dictionary<int, ToolInfo>();
+            foreach (var tool in value)
+                _projectToolsByNumber.TryAdd(tool.Number, tool);
+
+            // Найденные раньше инструменты могли прийти из прежнего списка
+            ToolCache.Clear();
+        }
+    }
+
+    private IReadOnlyList<ToolInfo> _projectTools = Array.Empty<ToolInfo>();
+    private Dictionary<int, ToolInfo> _projectToolsByNumber = new();
 
     /// <summary>
     /// Буфер для аппроксимации дуг (накопление точек для расчёта)
@@ -63,14 +108,61 @@ public class PostContext : IAsyncDisposable
     private int _commandCount;
     private int _motionCount;
     private int _toolChanges;
+    private int _macroErrors;
 
     public (int CommandCount, int MotionCount, int ToolChanges) GetStatistics() => (_commandCount, _motionCount, _toolChanges);
 
-    public PostContext(StreamWriter output, ControllerConfig? config = null)
+    /// <summary>
+    /// Счётчики попаданий, промахов и вытеснений кэшей геометрии и инструментов
+    /// </summary>
+    public (CacheStatistics Geometry, CacheStatistics Tools) GetCacheStatistics() =>
+        (GeometryCache.GetStatistics(), ToolCache.GetStatistics());
+
+    /// <summary>
+    /// Сохранять вытесненные из GeometryCache и ToolCache записи в отображённые в память
+    /// файлы каталога (вместо потери); файлы удаляются при закрытии контекста или процесса
+    /// </summary>
+    /// <param name="directory">Каталог файлов вытеснения</param>
+    public void EnableCacheSpill(string directory)
+    {
+        var pid = Environment.ProcessId;
+        GeometryCache.EnableSpill(
+            Path.Combine(directory, $"geometry.{pid}.spill"),
+            GeometrySpillCodec.Serialize,
+            GeometrySpillCodec.Deserialize);
+        ToolCache.EnableSpill(
+            Path.Combine(directory, $"tools.{pid}.spill"),
+            tool => JsonSerializer.SerializeToUtf8Bytes(tool),
+            data => JsonSerializer.Deserialize<ToolInfo>(data)!);
+    }
+
+    /// <summary>
+    /// Ошибок выполнения макросов
+    /// </summary>
+    public int MacroErrors => _macroErrors;
+
+    /// <summary>
+    /// Учесть команду в статистике (движок макросов вызывает для каждой команды,
+    /// ProcessCommand - автоматически)
+    /// </summary>
+    public void RecordCommand(APTCommand command)
+    {
+        _commandCount++;
+        if (command.Word is APTMajorWord.Goto or APTMajorWord.Rapid) _motionCount++;
+        if (command.Word is APTMajorWord.Toolno or APTMajorWord.Loadtl) _toolChanges++;
+    }
+
+    /// <summary>
+    /// Учесть ошибку выполнения макроса
+    /// </summary>
+    public void RecordMacroError() => _macroErrors++;
+
+    public PostContext(TextWriter output, ControllerConfig? config = null)
     {
         Output = output;
         Config = config ?? new ControllerConfig();
         BlockWriter = new BlockWriter(output);
+        Holes = new HolePatternBuffer(this);
 
         // Регистрация регистров в BlockWriter для автоматического отслеживания
         BlockWriter.AddWords(
@@ -113,6 +205,21 @@ public class PostContext : IAsyncDisposable
             : defaultValue;
     }
 
+    /// <summary>
+    /// Все системные переменные (для снимков состояния)
+    /// </summary>
+    internal IEnumerable<KeyValuePair<string, object>> SystemVariables => _systemVariables;
+
+    /// <summary>
+    /// Заменить все системные переменные (восстановление из снимка)
+    /// </summary>
+    internal void ReplaceSystemVariables(IEnumerable<KeyValuePair<string, object>> variables)
+    {
+        _systemVariables.Clear();
+        foreach (var (name, value) in variables)
+            _systemVariables[name] = value;
+    }
+
     // === StateCache методы (IMSPost-style LAST_* variables) ===
 
     /// <summary>
@@ -232,207 +339,229 @@ public class PostContext : IAsyncDisposable
         BlockWriter.WriteLine(text);
     }
 
+    /// <summary>
+    /// Найти данные инструмента: в ToolCache, затем среди инструментов программы и в библиотеке
+    /// (найденный инструмент кэшируется; вытесненная без файла вытеснения запись находится заново)
+    /// </summary>
+    /// <param name="toolNumber">Номер инструмента</param>
+    public ToolInfo? FindTool(int toolNumber)
+    {
+        var toolKey = $"tool_{toolNumber}";
+        if (ToolCache.TryGetValue(toolKey, out var cached))
+            return cached;
+
+        var tool = _projectToolsByNumber.GetValueOrDefault(toolNumber)
+            ?? ToolLibrary?.FindTool(toolNumber)?.ToToolInfo();
+        if (tool != null)
+            ToolCache[toolKey] = tool;
+        return tool;
+    }
+
+    /// <summary>
+    /// Обработать команду (поток событий в прежнем формате со словарём параметров)
+    /// </summary>
     public async IAsyncEnumerable<PostEvent> ProcessCommandAsync(APTCommand command)
     {
-        _commandCount++;
-        if (command.MajorWord is "goto" or "rapid") _motionCount++;
-        if (command.MajorWord is "toolno" or "loadtl") _toolChanges++;
+        if (ProcessCommand(command, out var evt))
+            yield return evt.ToPostEvent();
+    }
 
-        // CATIA-специфичные команды
-        switch (command.MajorWord)
+    /// <summary>
+    /// Обработать команду синхронно, без выделения памяти под событие.
+    /// API для встраивания постпроцессора (потребители потока событий): конвейер CLI
+    /// и ParallelPostRunner выполняют команды макросами и этот метод не вызывают.
+    /// </summary>
+    /// <param name="command">Команда APT</param>
+    /// <param name="evt">Событие команды</param>
+    /// <returns>false для служебных команд без событий</returns>
+    public bool ProcessCommand(APTCommand command, out PostEventData evt)
+    {
+        RecordCommand(command);
+
+        switch (command.Word)
         {
-            case "catprocess":
-                yield return HandleCatProcess(command);
-                break;
+            // CATIA-специфичные команды
+            case APTMajorWord.Catprocess:
+                evt = HandleCatProcess(command);
+                return true;
 
-            case "catproduct":
-                yield return HandleCatProduct(command);
-                break;
+            case APTMajorWord.Catproduct:
+                evt = HandleCatProduct(command);
+                return true;
 
-            case "toolpath_type":
-                yield return HandleToolpathType(command);
-                break;
+            case APTMajorWord.ToolpathType:
+                evt = HandleToolpathType(command);
+                return true;
 
-            case "multax":
-                yield return HandleMultiaxis(command);
-                break;
+            case APTMajorWord.Multax:
+                evt = HandleMultiaxis(command);
+                return true;
 
-            case "tlcomp":
-                yield return HandleToolCompensation(command);
-                break;
+            case APTMajorWord.Tlcomp:
+                evt = HandleToolCompensation(command);
+                return true;
 
-            case "loadtl":
-                yield return HandleLoadTool(command);
-                break;
+            case APTMajorWord.Loadtl:
+                evt = HandleLoadTool(command);
+                return true;
 
-            case "toolinf":
-                yield return HandleToolInfo(command);
-                break;
+            case APTMajorWord.Toolinf:
+                evt = HandleToolInfo(command);
+                return true;
 
-            case "op_name":
-                yield return HandleOperationName(command);
-                break;
+            case APTMajorWord.OpName:
+                evt = HandleOperationName(command);
+                return true;
 
-            case "start_op":
-                yield return HandleStartOperation(command);
-                break;
+            case APTMajorWord.StartOp:
+                evt = HandleStartOperation(command);
+                return true;
 
-            case "opdata":
-                yield return HandleOperationData(command);
-                break;
+            case APTMajorWord.Opdata:
+                evt = HandleOperationData(command);
+                return true;
 
             // Стандартные APT-команды
-            case "goto":
-                yield return await HandleGotoAsync(command);
-                break;
+            case APTMajorWord.Goto:
+            case APTMajorWord.Rapid:
+                evt = HandleGoto(command);
+                return true;
 
-            case "rapid":
-                yield return await HandleRapidAsync(command);
-                break;
+            case APTMajorWord.Fedrat:
+                evt = HandleFeedRate(command);
+                return true;
 
-            case "fedrat":
-                yield return await HandleFeedRateAsync(command);
-                break;
+            case APTMajorWord.Spindl:
+                evt = HandleSpindle(command);
+                return true;
 
-            case "spindl":
-                yield return await HandleSpindleAsync(command);
-                break;
+            case APTMajorWord.Coolnt:
+                evt = HandleCoolant(command);
+                return true;
 
-            case "coolnt":
-                yield return await HandleCoolantAsync(command);
-                break;
+            case APTMajorWord.Tlon:
+                evt = HandleToolOn(command);
+                return true;
 
-            case "tlon":
-                yield return await HandleToolOnAsync(command);
-                break;
+            case APTMajorWord.Tloff:
+                evt = HandleToolOff(command);
+                return true;
 
-            case "tloff":
-                yield return await HandleToolOffAsync(command);
-                break;
+            // Геометрические определения (упрощённая реализация)
+            case APTMajorWord.Point:
+                evt = Custom(PostEventType.GeometryDefined, command, "type", "point");
+                return true;
 
-            // Геометрические определения
-            case "point":
-                yield return await HandlePointDefinitionAsync(command);
-                break;
+            case APTMajorWord.Line:
+                evt = Custom(PostEventType.GeometryDefined, command, "type", "line");
+                return true;
 
-            case "line":
-                yield return await HandleLineDefinitionAsync(command);
-                break;
-
-            case "circle":
-                yield return await HandleCircleDefinitionAsync(command);
-                break;
+            case APTMajorWord.Circle:
+                evt = Custom(PostEventType.GeometryDefined, command, "type", "circle");
+                return true;
 
             // Служебные команды (игнорируем, но не считаем ошибкой)
-            case "channel":
-            case "catmat":
-            case "pptable":
-            case "part_open":
-            case "partno":
-            case "machin":
-            case "program":
-            case "fini":
+            case APTMajorWord.Channel:
+            case APTMajorWord.Catmat:
+            case APTMajorWord.Pptable:
+            case APTMajorWord.PartOpen:
+            case APTMajorWord.Partno:
+            case APTMajorWord.Machin:
+            case APTMajorWord.Program:
+            case APTMajorWord.Fini:
                 // Не генерируем событий — просто пропускаем
-                break;
+                evt = default;
+                return false;
 
             // Продолжение многострочной команды
-            case "continuation":
+            case APTMajorWord.Continuation:
                 // Обработка зависит от предыдущей команды — реализуется в макросах
-                yield return new PostEvent(PostEventType.Custom, command, new() { ["type"] = "continuation" });
-                break;
+                evt = Custom(PostEventType.Custom, command, "type", "continuation");
+                return true;
 
             default:
                 // Неизвестная команда — передаём макросам
-                yield return new PostEvent(
-                    PostEventType.Custom,
-                    command,
-                    new() { ["warning"] = $"Unknown CATIA command: {command.MajorWord}" }
-                );
-                break;
+                evt = Custom(PostEventType.Custom, command, "warning", $"Unknown CATIA command: {command.MajorWord}");
+                return true;
         }
     }
 
-    private PostEvent HandleCatProcess(APTCommand cmd)
+    private static PostEventData Custom(PostEventType type, APTCommand cmd, string key, object? value) =>
+        new(type, cmd) { Key = key, Value = value };
+
+    private PostEventData HandleCatProcess(APTCommand cmd)
     {
         if (cmd.MinorWords.Count > 0)
             Catia.CurrentProcessName = cmd.MinorWords[0];
 
-        return new PostEvent(PostEventType.Custom, cmd, new() { ["process"] = Catia.CurrentProcessName });
+        return Custom(PostEventType.Custom, cmd, "process", Catia.CurrentProcessName);
     }
 
-    private PostEvent HandleCatProduct(APTCommand cmd)
+    private PostEventData HandleCatProduct(APTCommand cmd)
     {
         if (cmd.MinorWords.Count > 0)
             Catia.CurrentProductName = cmd.MinorWords[0];
 
-        return new PostEvent(PostEventType.Custom, cmd, new() { ["product"] = Catia.CurrentProductName });
+        return Custom(PostEventType.Custom, cmd, "product", Catia.CurrentProductName);
     }
 
-    private PostEvent HandleToolpathType(APTCommand cmd)
+    private PostEventData HandleToolpathType(APTCommand cmd)
     {
         if (cmd.MinorWords.Contains("3axis"))
             Catia.ToolpathType = CatiaToolpathType.Axis3;
         else if (cmd.MinorWords.Contains("5axis"))
             Catia.ToolpathType = CatiaToolpathType.Axis5;
 
-        return new PostEvent(PostEventType.Custom, cmd, new() { ["toolpath_type"] = Catia.ToolpathType.ToString() });
+        return Custom(PostEventType.Custom, cmd, "toolpath_type", Catia.ToolpathType.ToString());
     }
 
-    private PostEvent HandleMultiaxis(APTCommand cmd)
+    private PostEventData HandleMultiaxis(APTCommand cmd)
     {
         Catia.IsMultiaxisEnabled = cmd.MinorWords.Contains("on");
-        return new PostEvent(PostEventType.Custom, cmd, new() { ["multiaxis"] = Catia.IsMultiaxisEnabled });
+        return Custom(PostEventType.Custom, cmd, "multiaxis", Catia.IsMultiaxisEnabled);
     }
 
-    private PostEvent HandleToolCompensation(APTCommand cmd)
+    private PostEventData HandleToolCompensation(APTCommand cmd)
     {
-        if (cmd.MinorWords.Contains("left"))
+        if (cmd.HasMinorWord(APTMinorWord.Left))
             Catia.CompensationMode = ToolCompensationMode.Left;
-        else if (cmd.MinorWords.Contains("right"))
+        else if (cmd.HasMinorWord(APTMinorWord.Right))
             Catia.CompensationMode = ToolCompensationMode.Right;
-        else if (cmd.MinorWords.Contains("adjust"))
+        else if (cmd.HasMinorWord(APTMinorWord.Adjust))
             Catia.CompensationMode = ToolCompensationMode.Adjust;
         else
             Catia.CompensationMode = ToolCompensationMode.Off;
 
-        return new PostEvent(PostEventType.Custom, cmd, new() { ["compensation"] = Catia.CompensationMode.ToString() });
+        return Custom(PostEventType.Custom, cmd, "compensation", Catia.CompensationMode.ToString());
     }
 
-    private PostEvent HandleLoadTool(APTCommand cmd)
+    private PostEventData HandleLoadTool(APTCommand cmd)
     {
         if (cmd.NumericValues.Count > 0)
         {
             int toolNumber = (int)Math.Round(cmd.NumericValues[0]);
             double? diameter = cmd.NumericValues.Count > 1 ? cmd.NumericValues[1] : null;
 
-            // Поиск в кэше инструментов
-            var toolKey = $"tool_{toolNumber}";
-            if (ToolCache.TryGetValue(toolKey, out var tool))
-            {
-                Machine.CurrentTool = tool;
-            }
-            else
-            {
-                // Создание нового инструмента с разумными значениями по умолчанию
-                tool = new ToolInfo(
-                    Number: toolNumber,
-                    Diameter: diameter ?? 10.0,
-                    Length: 50.0,
-                    Comment: $"Tool {toolNumber}",
-                    Type: cmd.MinorWords.FirstOrDefault()
-                );
-                Machine.CurrentTool = tool;
-                ToolCache[toolKey] = tool;
-            }
+            // Данные из кэша, просмотра программы или библиотеки; недостающие (нулевые) размеры
+            // берутся из самой команды, иначе разумные значения по умолчанию
+            var known = FindTool(toolNumber);
+            var tool = new ToolInfo(
+                Number: toolNumber,
+                Diameter: known?.Diameter > 0 ? known.Diameter : diameter ?? 10.0,
+                Length: known?.Length > 0 ? known.Length : 50.0,
+                Comment: known?.Comment ?? $"Tool {toolNumber}",
+                Type: known?.Type ?? cmd.MinorWords.FirstOrDefault(),
+                Flutes: known?.Flutes,
+                CornerRadius: known?.CornerRadius
+            );
+            Machine.CurrentTool = tool;
+            ToolCache[$"tool_{toolNumber}"] = tool;
         }
 
-        return new PostEvent(PostEventType.ToolChange, cmd, new()
-        {
-            ["tool_number"] = Machine.CurrentTool?.Number ?? 0
-        });
+        return new PostEventData(PostEventType.ToolChange, cmd) { ToolNumber = Machine.CurrentTool?.Number ?? 0 };
     }
 
-    private PostEvent HandleToolInfo(APTCommand cmd)
+    private PostEventData HandleToolInfo(APTCommand cmd)
     {
         // Сохранение информации об инструменте в отдельный кэш
         if (cmd.MinorWords.Count > 0)
@@ -448,25 +577,25 @@ public class PostContext : IAsyncDisposable
             ToolCache[toolKey] = tool;
         }
 
-        return new PostEvent(PostEventType.Custom, cmd, new() { ["tool_info"] = cmd.MinorWords.FirstOrDefault() });
+        return Custom(PostEventType.Custom, cmd, "tool_info", cmd.MinorWords.FirstOrDefault());
     }
 
-    private PostEvent HandleOperationName(APTCommand cmd)
+    private PostEventData HandleOperationName(APTCommand cmd)
     {
         if (cmd.MinorWords.Count > 0)
             Catia.CurrentOperationName = cmd.MinorWords[0];
 
-        return new PostEvent(PostEventType.Custom, cmd, new() { ["operation"] = Catia.CurrentOperationName });
+        return Custom(PostEventType.Custom, cmd, "operation", Catia.CurrentOperationName);
     }
 
-    private PostEvent HandleStartOperation(APTCommand cmd)
+    private PostEventData HandleStartOperation(APTCommand cmd)
     {
         // Начало новой операции — сброс состояния
         Registers.ResetChangeFlags();
-        return new PostEvent(PostEventType.Custom, cmd, new() { ["operation_start"] = true });
+        return Custom(PostEventType.Custom, cmd, "operation_start", true);
     }
 
-    private PostEvent HandleOperationData(APTCommand cmd)
+    private PostEventData HandleOperationData(APTCommand cmd)
     {
         // Сохранение параметров операции
         for (int i = 0; i < cmd.MinorWords.Count && i * 2 + 1 < cmd.NumericValues.Count; i++)
@@ -474,10 +603,10 @@ public class PostContext : IAsyncDisposable
             Catia.OperationParameters[cmd.MinorWords[i]] = cmd.NumericValues[i * 2 + 1];
         }
 
-        return new PostEvent(PostEventType.Custom, cmd, new() { ["operation_data"] = Catia.OperationParameters.Count });
+        return Custom(PostEventType.Custom, cmd, "operation_data", Catia.OperationParameters.Count);
     }
 
-    private async Task<PostEvent> HandleGotoAsync(APTCommand cmd)
+    private PostEventData HandleGoto(APTCommand cmd)
     {
         // CATIA-специфика: поддержка неполных координат
         double x = cmd.NumericValues.Count > 0 ? cmd.NumericValues[0] : Registers.X.Value;
@@ -488,6 +617,14 @@ public class PostContext : IAsyncDisposable
         Registers.Y.SetValue(y);
         Registers.Z.SetValue(z);
 
+        var evt = new PostEventData(PostEventType.Motion, cmd)
+        {
+            X = x,
+            Y = y,
+            Z = z,
+            IsMultiaxis = Catia.IsMultiaxisEnabled
+        };
+
         // CATIA 5-axis: обработка вектора направления инструмента (I,J,K)
         if (Catia.IsMultiaxisEnabled && cmd.NumericValues.Count >= 6)
         {
@@ -503,110 +640,80 @@ public class PostContext : IAsyncDisposable
 
             Registers.A.SetValue(a);
             Registers.B.SetValue(b);
-        }
 
-        var payload = new Dictionary<string, object>
-        {
-            ["motion_type"] = "linear",
-            ["x"] = x,
-            ["y"] = y,
-            ["z"] = z,
-            ["is_multiaxis"] = Catia.IsMultiaxisEnabled
-        };
-
-        if (Catia.IsMultiaxisEnabled && cmd.NumericValues.Count >= 6)
-        {
-            payload["i"] = cmd.NumericValues[3];
-            payload["j"] = cmd.NumericValues[4];
-            payload["k"] = cmd.NumericValues[5];
-            payload["a"] = Registers.A.Value;
-            payload["b"] = Registers.B.Value;
+            evt = evt with
+            {
+                HasToolAxis = true,
+                I = i,
+                J = j,
+                K = k,
+                A = Registers.A.Value,
+                B = Registers.B.Value
+            };
         }
 
-        return new PostEvent(PostEventType.Motion, cmd, payload);
+        return evt;
     }
 
-    private async Task<PostEvent> HandleRapidAsync(APTCommand cmd) => await HandleGotoAsync(cmd);
-
-    private async Task<PostEvent> HandleFeedRateAsync(APTCommand cmd)
+    private PostEventData HandleFeedRate(APTCommand cmd)
     {
         if (cmd.NumericValues.Count > 0)
         {
             double feed = cmd.NumericValues[0];
 
             // CATIA использует MMPM (метры/минуту) по умолчанию
-            if (cmd.MinorWords.Contains("mps")) // meters per second
+            if (cmd.HasMinorWord(APTMinorWord.Mps)) // meters per second
                 feed *= 60000;
-            else if (!cmd.MinorWords.Contains("mmpm")) // если не указано явно — мм/мин
-                ; // уже в мм/мин
 
             Registers.F.SetValue(feed);
         }
 
-        return new PostEvent(PostEventType.FeedChange, cmd, new() { ["feed"] = Registers.F.Value });
+        return new PostEventData(PostEventType.FeedChange, cmd) { Feed = Registers.F.Value };
     }
 
-    private async Task<PostEvent> HandleSpindleAsync(APTCommand cmd)
+    private PostEventData HandleSpindle(APTCommand cmd)
     {
         if (cmd.NumericValues.Count > 0)
             Registers.S.SetValue(cmd.NumericValues[0]);
 
         var direction = SpindleDirection.Clockwise;
-        if (cmd.MinorWords.Contains("cclw"))
+        if (cmd.HasMinorWord(APTMinorWord.Cclw))
             direction = SpindleDirection.CounterClockwise;
-        else if (cmd.MinorWords.Contains("off"))
+        else if (cmd.HasMinorWord(APTMinorWord.Off))
             direction = SpindleDirection.Off;
 
         Machine.SpindleState = direction;
 
-        return new PostEvent(PostEventType.SpindleChange, cmd, new()
-        {
-            ["rpm"] = Registers.S.Value,
-            ["direction"] = direction.ToString()
-        });
+        return new PostEventData(PostEventType.SpindleChange, cmd) { Rpm = Registers.S.Value, Spindle = direction };
     }
 
-    private async Task<PostEvent> HandleCoolantAsync(APTCommand cmd)
+    private PostEventData HandleCoolant(APTCommand cmd)
     {
-        var state = cmd.MinorWords.Contains("off") ? CoolantMode.Off : CoolantMode.Flood;
+        var state = cmd.HasMinorWord(APTMinorWord.Off) ? CoolantMode.Off : CoolantMode.Flood;
         Machine.CoolantState = state;
 
-        return new PostEvent(PostEventType.CoolantChange, cmd, new() { ["mode"] = state.ToString() });
+        return new PostEventData(PostEventType.CoolantChange, cmd) { Coolant = state };
     }
 
-    private async Task<PostEvent> HandleToolOnAsync(APTCommand cmd)
+    private PostEventData HandleToolOn(APTCommand cmd)
     {
         // Включение компенсации радиуса инструмента
-        if (cmd.MinorWords.Contains("left"))
+        if (cmd.HasMinorWord(APTMinorWord.Left))
             Catia.CompensationMode = ToolCompensationMode.Left;
-        else if (cmd.MinorWords.Contains("right"))
+        else if (cmd.HasMinorWord(APTMinorWord.Right))
             Catia.CompensationMode = ToolCompensationMode.Right;
         else
             Catia.CompensationMode = ToolCompensationMode.Adjust;
 
-        return new PostEvent(PostEventType.Custom, cmd, new()
-        {
-            ["compensation"] = "on",
-            ["side"] = Catia.CompensationMode.ToString()
-        });
+        return Custom(PostEventType.Custom, cmd, "compensation", "on") with { Side = Catia.CompensationMode.ToString() };
     }
 
-    private async Task<PostEvent> HandleToolOffAsync(APTCommand cmd)
+    private PostEventData HandleToolOff(APTCommand cmd)
     {
         Catia.CompensationMode = ToolCompensationMode.Off;
-        return new PostEvent(PostEventType.Custom, cmd, new() { ["compensation"] = "off" });
+        return Custom(PostEventType.Custom, cmd, "compensation", "off");
     }
 
-    // Геометрические определения (упрощённая реализация)
-    private async Task<PostEvent> HandlePointDefinitionAsync(APTCommand cmd) =>
-        new PostEvent(PostEventType.GeometryDefined, cmd, new() { ["type"] = "point" });
-
-    private async Task<PostEvent> HandleLineDefinitionAsync(APTCommand cmd) =>
-        new PostEvent(PostEventType.GeometryDefined, cmd, new() { ["type"] = "line" });
-
-    private async Task<PostEvent> HandleCircleDefinitionAsync(APTCommand cmd) =>
-        new PostEvent(PostEventType.GeometryDefined, cmd, new() { ["type"] = "circle" });
-
     // Вспомогательные методы для макросов
     /// <summary>
     /// Записать NC-блок через BlockWriter с автоматической модальностью
@@ -667,6 +774,8 @@ public class PostContext : IAsyncDisposable
         if (!_disposed)
         {
             await Output.DisposeAsync();
+            GeometryCache.Dispose();
+            ToolCache.Dispose();
             _disposed = true;
         }
     }
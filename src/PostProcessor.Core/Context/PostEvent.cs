@@ -1,3 +1,5 @@
+using PostProcessor.Core.Context;
+
 namespace PostProcessor.Core.Models;
 
 public enum PostEventType
@@ -16,3 +18,102 @@ public record PostEvent(
     APTCommand SourceCommand,
     Dictionary<string, object> Payload
 );
+
+/// <summary>
+///      :    ,
+/// , ,    ;      Key/Value.
+///  PostContext.ProcessCommand   ;  PostEvent
+///     (ToPostEvent).
+/// </summary>
+public readonly record struct PostEventData(PostEventType Type, APTCommand SourceCommand)
+{
+    //  (Motion)
+    public double X { get; init; }
+    public double Y { get; init; }
+    public double Z { get; init; }
+    public bool IsMultiaxis { get; init; }
+
+    /// <summary>
+    ///     I, J, K    A, B
+    /// </summary>
+    public bool HasToolAxis { get; init; }
+    public double I { get; init; }
+    public double J { get; init; }
+    public double K { get; init; }
+    public double A { get; init; }
+    public double B { get; init; }
+
+    //  (FeedChange)
+    public double Feed { get; init; }
+
+    //  (SpindleChange)
+    public double Rpm { get; init; }
+    public SpindleDirection Spindle { get; init; }
+
+    //   (ToolChange)
+    public int ToolNumber { get; init; }
+
+    //  (CoolantChange)
+    public CoolantMode Coolant { get; init; }
+
+    //   (Custom, GeometryDefined):    
+    public string? Key { get; init; }
+    public object? Value { get; init; }
+
+    /// <summary>
+    ///    TLON ( "side")
+    /// </summary>
+    public string? Side { get; init; }
+
+    /// <summary>
+    ///     (  PostEvent)
+    /// </summary>
+    public PostEvent ToPostEvent()
+    {
+        var payload = new Dictionary<string, object>();
+        switch (Type)
+        {
+            case PostEventType.Motion:
+                payload["motion_type"] = "linear";
+                payload["x"] = X;
+                payload["y"] = Y;
+                payload["z"] = Z;
+                payload["is_multiaxis"] = IsMultiaxis;
+                if (HasToolAxis)
+                {
+                    payload["i"] = I;
+                    payload["j"] = J;
+                    payload["k"] = K;
+                    payload["a"] = A;
+                    payload["b"] = B;
+                }
+                break;
+
+            case PostEventType.FeedChange:
+                payload["feed"] = Feed;
+                break;
+
+            case PostEventType.SpindleChange:
+                payload["rpm"] = Rpm;
+                payload["direction"] = Spindle.ToString();
+                break;
+
+            case PostEventType.ToolChange:
+                payload["tool_number"] = ToolNumber;
+                break;
+
+            case PostEventType.CoolantChange:
+                payload["mode"] = Coolant.ToString();
+                break;
+
+            default:
+                if (Key != null)
+                    payload[Key] = Value!;
+                if (Side != null)
+                    payload["side"] = Side;
+                break;
+        }
+
+        return new PostEvent(Type, SourceCommand, payload);
+    }
+}
@@ -11,6 +11,11 @@ public class Register : NCWord
     public string Name { get; }           // "X", "Y", "F", "S"...
     public double Value { get; private set; }
     public string Format { get; }         // "F4.3", "D5" для вывода
+
+    /// <summary>
+    /// Знаков после запятой при выводе (по Format); изменения мельче не выводятся
+    /// </summary>
+    public int Decimals { get; }
     
     private double _previousValue;
 
@@ -22,6 +27,7 @@ public class Register : NCWord
         _previousValue = initialValue;
         IsModal = isModal;
         Format = format;
+        Decimals = GetDecimals(format);
         _hasChanged = false;
     }
 
@@ -30,7 +36,7 @@ public class Register : NCWord
     /// </summary>
     public void SetValue(double newValue)
     {
-        _hasChanged = Math.Abs(newValue - Value) > 1e-6;
+        _hasChanged = !SameAtResolution(newValue, Value, Decimals);
         _previousValue = Value;
         Value = newValue;
     }
@@ -58,7 +64,7 @@ public class Register : NCWord
     /// </summary>
     public void Show(double value)
     {
-        if (Math.Abs(value - Value) > 1e-6)
+        if (!SameAtResolution(value, Value, Decimals))
         {
             _hasChanged = true;
         }
@@ -77,7 +83,7 @@ public class Register : NCWord
     /// </summary>
     public void Hide(double value)
     {
-        if (Math.Abs(value - Value) < 1e-6)
+        if (SameAtResolution(value, Value, Decimals))
         {
             _hasChanged = false;
         }
@@ -103,15 +109,30 @@ public class Register : NCWord
         _hasChanged = markChanged;
     }
 
+    /// <summary>
+    /// Предыдущее значение (для снимков состояния)
+    /// </summary>
+    internal double PreviousValue => _previousValue;
+
+    /// <summary>
+    /// Восстановить полное состояние регистра из снимка
+    /// </summary>
+    internal void Restore(double value, double previousValue, bool hasChanged)
+    {
+        Value = value;
+        _previousValue = previousValue;
+        _hasChanged = hasChanged;
+    }
+
     /// <summary>
     /// Проверить, отличаются ли значения
     /// </summary>
-    public bool ValuesDiffer => Math.Abs(Value - _previousValue) > 1e-6;
+    public bool ValuesDiffer => !SameAtResolution(Value, _previousValue, Decimals);
 
     /// <summary>
     /// Проверить, равно ли значение указанному
     /// </summary>
-    public bool ValuesSame => Math.Abs(Value - _previousValue) < 1e-6;
+    public bool ValuesSame => SameAtResolution(Value, _previousValue, Decimals);
 
     /// <summary>
     /// Форматировать значение согласно формату
@@ -130,4 +151,40 @@ public class Register : NCWord
     }
 
     public override string ToString() => $"{Name}={FormatValue()}";
+
+    /// <summary>
+    /// Точность формата: "F3" и "N3" - 3, "F4.3" (IMSpost) - 3, "D5" - 0, "0.00" - 2;
+    /// неизвестный формат - 6 знаков
+    /// </summary>
+    private static int GetDecimals(string format)
+    {
+        if (string.IsNullOrEmpty(format))
+            return 6;
+
+        var kind = char.ToUpperInvariant(format[0]);
+        var spec = format.AsSpan(1);
+        if (kind is 'D' or 'X')
+            return 0;
+
+        if (kind is 'F' or 'N')
+        {
+            var point = spec.IndexOf('.');
+            var digits = point >= 0 ? spec[(point + 1)..] : spec;
+            if (digits.IsEmpty)
+                return 2;
+            if (int.TryParse(digits, NumberStyles.None, CultureInfo.InvariantCulture, out var decimals))
+                return decimals;
+        }
+
+        // Пользовательский формат: число заполнителей после точки
+        var dot = format.IndexOf('.');
+        if (dot >= 0)
+        {
+            var placeholders = format.AsSpan(dot + 1);
+            var end = placeholders.IndexOfAnyExcept('0', '#');
+            return end >= 0 ? end : placeholders.Length;
+        }
+
+        return 6;
+    }
 }
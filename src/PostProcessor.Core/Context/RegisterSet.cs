@@ -1,41 +1,62 @@
 ﻿namespace PostProcessor.Core.Context;
 
+/// <summary>
+/// Набор регистров контекста. Стандартные регистры (X Y Z A B C I J K F S T D) хранятся
+/// в фиксированных ячейках массива: доступ к ним не требует поиска по имени.
+/// Словарь используется только для пользовательских регистров.
+/// Регистры создаются при первом обращении, порядок All - порядок создания.
+/// </summary>
 public class RegisterSet
 {
-    private readonly Dictionary<string, Register> _registers = new();
+    private const int SlotX = 0, SlotY = 1, SlotZ = 2, SlotA = 3, SlotB = 4, SlotC = 5;
+    private const int SlotI = 6, SlotJ = 7, SlotK = 8, SlotF = 9, SlotS = 10, SlotT = 11, SlotD = 12;
+
+    private readonly Register?[] _slots = new Register?[13];
+    private readonly Dictionary<string, Register> _custom = new();
+    private readonly List<Register> _all = new();
 
     // Стандартные регистры для фрезерного станка
-    public Register X => GetOrAdd("X", 0.0, true, "F3");
-    public Register Y => GetOrAdd("Y", 0.0, true, "F3");
-    public Register Z => GetOrAdd("Z", 0.0, true, "F3");
-    public Register A => GetOrAdd("A", 0.0, true, "F3"); // 4-я ось
-    public Register B => GetOrAdd("B", 0.0, true, "F3"); // 5-я ось
-    public Register C => GetOrAdd("C", 0.0, true, "F3"); // 6-я ось
-    public Register F => GetOrAdd("F", 0.0, false, "F1"); // Подача
-    public Register S => GetOrAdd("S", 0.0, false, "F0");   // Обороты
-    public Register T => GetOrAdd("T", 0.0, false, "F0");   // Номер инструмента
+    public Register X => _slots[SlotX] ?? Create(SlotX, "X", 0.0, true, "F3");
+    public Register Y => _slots[SlotY] ?? Create(SlotY, "Y", 0.0, true, "F3");
+    public Register Z => _slots[SlotZ] ?? Create(SlotZ, "Z", 0.0, true, "F3");
+    public Register A => _slots[SlotA] ?? Create(SlotA, "A", 0.0, true, "F3"); // 4-я ось
+    public Register B => _slots[SlotB] ?? Create(SlotB, "B", 0.0, true, "F3"); // 5-я ось
+    public Register C => _slots[SlotC] ?? Create(SlotC, "C", 0.0, true, "F3"); // 6-я ось
+    public Register F => _slots[SlotF] ?? Create(SlotF, "F", 0.0, false, "F1"); // Подача
+    public Register S => _slots[SlotS] ?? Create(SlotS, "S", 0.0, false, "F0");   // Обороты
+    public Register T => _slots[SlotT] ?? Create(SlotT, "T", 0.0, false, "F0");   // Номер инструмента
     
     // Регистры для дуг (I, J, K - центр дуги)
-    public Register I => GetOrAdd("I", 0.0, true, "F3");
-    public Register J => GetOrAdd("J", 0.0, true, "F3");
-    public Register K => GetOrAdd("K", 0.0, true, "F3");
+    public Register I => _slots[SlotI] ?? Create(SlotI, "I", 0.0, true, "F3");
+    public Register J => _slots[SlotJ] ?? Create(SlotJ, "J", 0.0, true, "F3");
+    public Register K => _slots[SlotK] ?? Create(SlotK, "K", 0.0, true, "F3");
     
     // Регистр D для компенсации радиуса
-    public Register D => GetOrAdd("D", 0.0, true, "F0");
+    public Register D => _slots[SlotD] ?? Create(SlotD, "D", 0.0, true, "F0");
 
     public Register GetOrAdd(string name, double initialValue = 0.0, bool isModal = true, string format = "F3")
     {
-        if (!_registers.TryGetValue(name, out var reg))
+        var slot = GetSlot(name);
+        if (slot >= 0)
+            return _slots[slot] ?? Create(slot, name, initialValue, isModal, format);
+
+        if (!_custom.TryGetValue(name, out var reg))
         {
             reg = new Register(name, initialValue, isModal, format);
-            _registers[name] = reg;
+            _custom[name] = reg;
+            _all.Add(reg);
         }
         return reg;
     }
 
+    /// <summary>
+    /// Все созданные регистры
+    /// </summary>
+    public IReadOnlyCollection<Register> All => _all;
+
     public IEnumerable<Register> ChangedRegisters()
     {
-        foreach (var reg in _registers.Values)
+        foreach (var reg in _all)
         {
             if (reg.HasChanged || !reg.IsModal)
                 yield return reg;
@@ -44,12 +65,45 @@ public class RegisterSet
 
     public void ResetChangeFlags()
     {
-        foreach (var reg in _registers.Values)
+        foreach (var reg in _all)
             reg.ResetChangeFlag();
     }
 
     public override string ToString()
     {
-        return string.Join(" ", _registers.Values.Select(r => r.ToString()));
+        return string.Join(" ", _all.Select(r => r.ToString()));
+    }
+
+    private Register Create(int slot, string name, double initialValue, bool isModal, string format)
+    {
+        var reg = new Register(name, initialValue, isModal, format);
+        _slots[slot] = reg;
+        _all.Add(reg);
+        return reg;
+    }
+
+    // Ячейка стандартного регистра по имени (-1 - пользовательский регистр)
+    private static int GetSlot(string name)
+    {
+        if (name.Length != 1)
+            return -1;
+
+        return name[0] switch
+        {
+            'X' => SlotX,
+            'Y' => SlotY,
+            'Z' => SlotZ,
+            'A' => SlotA,
+            'B' => SlotB,
+            'C' => SlotC,
+            'I' => SlotI,
+            'J' => SlotJ,
+            'K' => SlotK,
+            'F' => SlotF,
+            'S' => SlotS,
+            'T' => SlotT,
+            'D' => SlotD,
+            _ => -1
+        };
     }
 }
@@ -0,0 +1,94 @@
+using System.Text.Json;
+
+namespace PostProcessor.Core.Diagnostics;
+
+/// <summary>
+/// Запись трассировки в формате Chrome Trace Event (JSON Array Format).
+/// Файл открывается в chrome://tracing, Perfetto или speedscope: каждая команда -
+/// отрезок "X" с длительностью, в args - строка APT, макрос, объём вывода и изменения регистров.
+/// Данные пишутся потоково, в памяти хранится только текущее событие.
+/// </summary>
+public sealed class ChromeTraceSink : ITraceSink
+{
+    private readonly Stream _stream;
+    private readonly Utf8JsonWriter _json;
+    private bool _first = true;
+    private bool _disposed;
+
+    public ChromeTraceSink(string path)
+        : this(new FileStream(path, FileMode.Create, FileAccess.Write, FileShare.Read, 64 * 1024))
+    {
+    }
+
+    public ChromeTraceSink(Stream stream)
+    {
+        _stream = stream;
+        _stream.WriteByte((byte)'[');
+        _json = new Utf8JsonWriter(_stream);
+    }
+
+    public void Record(TraceEvent e)
+    {
+        if (!_first)
+        {
+            _stream.WriteByte((byte)',');
+        }
+        _stream.WriteByte((byte)'\n');
+        _first = false;
+
+        var cmd = e.Command;
+        _json.WriteStartObject();
+        _json.WriteString("name", cmd.MajorWord);
+        _json.WriteString("cat", e.Macro == null ? "apt" : "macro");
+        _json.WriteString("ph", "X");
+        _json.WriteNumber("ts", e.StartMicroseconds);
+        _json.WriteNumber("dur", e.DurationMicroseconds);
+        _json.WriteNumber("pid", 1);
+        _json.WriteNumber("tid", 1);
+
+        _json.WriteStartObject("args");
+        _json.WriteNumber("seq", e.Sequence);
+        _json.WriteNumber("line", cmd.LineNumber);
+        if (e.Macro != null)
+            _json.WriteString("macro", e.Macro);
+        _json.WriteNumber("chars", e.EmittedChars);
+        _json.WriteString("hash", e.OutputHash.ToString("x16"));
+
+        _json.WriteStartArray("minor");
+        foreach (var word in cmd.MinorWords)
+            _json.WriteStringValue(word);
+        _json.WriteEndArray();
+
+        _json.WriteStartArray("num");
+        foreach (var value in cmd.NumericValues)
+            _json.WriteNumberValue(value);
+        _json.WriteEndArray();
+
+        _json.WriteStartArray("str");
+        foreach (var value in cmd.StringValues)
+            _json.WriteStringValue(value);
+        _json.WriteEndArray();
+
+        _json.WriteStartObject("regs");
+        foreach (var (name, value) in e.RegisterDeltas)
+            _json.WriteNumber(name, value);
+        _json.WriteEndObject();
+
+        _json.WriteEndObject();
+        _json.WriteEndObject();
+        _json.Flush();
+        _json.Reset();
+    }
+
+    public void Dispose()
+    {
+        if (_disposed)
+            return;
+
+        _disposed = true;
+        _stream.WriteByte((byte)'\n');
+        _stream.WriteByte((byte)']');
+        _json.Dispose();
+        _stream.Dispose();
+    }
+}
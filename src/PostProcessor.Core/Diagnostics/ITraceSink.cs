@@ -0,0 +1,12 @@
+namespace PostProcessor.Core.Diagnostics;
+
+/// <summary>
+/// Приёмник событий трассировки
+/// </summary>
+public interface ITraceSink : IDisposable
+{
+    /// <summary>
+    /// Записать событие
+    /// </summary>
+    void Record(TraceEvent traceEvent);
+}
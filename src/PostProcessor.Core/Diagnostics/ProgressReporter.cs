@@ -0,0 +1,194 @@
+using System.Buffers;
+using System.Diagnostics;
+using System.Globalization;
+using System.Text;
+using System.Text.Json;
+using PostProcessor.Core.Models;
+
+namespace PostProcessor.Core.Diagnostics;
+
+/// <summary>
+/// Формат вывода хода обработки
+/// </summary>
+public enum ProgressFormat
+{
+    /// <summary>
+    /// Без вывода
+    /// </summary>
+    None,
+
+    /// <summary>
+    /// Строка для человека
+    /// </summary>
+    Console,
+
+    /// <summary>
+    /// JSON lines (одна запись на строку) для мониторинга заданий
+    /// </summary>
+    Json
+}
+
+/// <summary>
+/// Ход обработки больших программ: прочитано байт/строк APT, команд в секунду, выведено кадров,
+/// текущая операция/инструмент и оценка оставшегося времени. Цикл обработки вызывает Track
+/// для каждой команды: это счётчик и сравнение; часы опрашиваются раз в SampleEvery команд,
+/// отчёт выводится не чаще заданного интервала.
+/// </summary>
+public sealed class ProgressReporter
+{
+    /// <summary>
+    /// Часы проверяются раз в столько команд (степень двойки)
+    /// </summary>
+    public const int SampleEvery = 256;
+
+    private readonly TextWriter _output;
+    private readonly ProgressFormat _format;
+    private readonly long _totalBytes;
+    private readonly long _intervalTicks;
+    private readonly long _startTimestamp;
+    private long _nextReport;
+
+    private long _commands;
+    private long _lastCommands;
+    private long _lastTimestamp;
+    private int? _tool;
+    private string? _operation;
+
+    /// <summary>
+    /// Создать отчёт о ходе обработки
+    /// </summary>
+    /// <param name="output">Куда выводить отчёт</param>
+    /// <param name="format">Формат вывода</param>
+    /// <param name="interval">Минимальный интервал между отчётами (по умолчанию 2 с)</param>
+    /// <param name="totalBytes">Размер входного файла для процента и оценки времени (0 - неизвестен)</param>
+    public ProgressReporter(TextWriter output, ProgressFormat format, TimeSpan? interval = null, long totalBytes = 0)
+    {
+        _output = output;
+        _format = format;
+        _totalBytes = totalBytes;
+        _intervalTicks = (long)((interval ?? TimeSpan.FromSeconds(2)).TotalSeconds * Stopwatch.Frequency);
+        _startTimestamp = Stopwatch.GetTimestamp();
+        _lastTimestamp = _startTimestamp;
+        _nextReport = _startTimestamp + _intervalTicks;
+    }
+
+    /// <summary>
+    /// Обработано команд
+    /// </summary>
+    public long Commands => _commands;
+
+    /// <summary>
+    /// Учесть команду
+    /// </summary>
+    /// <returns>true, если пора вывести отчёт (вызвать Report)</returns>
+    public bool Track(APTCommand command)
+    {
+        switch (command.Word)
+        {
+            case APTMajorWord.Loadtl or APTMajorWord.Toolno when command.NumericValues.Count > 0:
+                _tool = (int)Math.Round(command.NumericValues[0]);
+                break;
+            case APTMajorWord.OpName when command.MinorWords.Count > 0:
+                _operation = command.MinorWords[0];
+                break;
+        }
+
+        return (++_commands & (SampleEvery - 1)) == 0 && Stopwatch.GetTimestamp() >= _nextReport;
+    }
+
+    /// <summary>
+    /// Вывести отчёт о ходе обработки
+    /// </summary>
+    /// <param name="bytesRead">Прочитано байт входного файла</param>
+    /// <param name="linesRead">Прочитано строк APT</param>
+    /// <param name="blocksWritten">Выведено кадров</param>
+    public void Report(long bytesRead, long linesRead, long blocksWritten)
+    {
+        Write(bytesRead, linesRead, blocksWritten, done: false);
+    }
+
+    /// <summary>
+    /// Вывести итоговый отчёт
+    /// </summary>
+    public void Complete(long bytesRead, long linesRead, long blocksWritten)
+    {
+        Write(bytesRead, linesRead, blocksWritten, done: true);
+    }
+
+    private void Write(long bytesRead, long linesRead, long blocksWritten, bool done)
+    {
+        var now = Stopwatch.GetTimestamp();
+        var elapsed = (double)(now - _startTimestamp) / Stopwatch.Frequency;
+
+        // Скорость за последний интервал, итоговая - за всё время
+        var rate = done
+            ? (elapsed > 0 ? _commands / elapsed : 0)
+            : _commands == _lastCommands ? 0 : (_commands - _lastCommands) / ((double)(now - _lastTimestamp) / Stopwatch.Frequency);
+        _lastCommands = _commands;
+        _lastTimestamp = now;
+        _nextReport = now + _intervalTicks;
+
+        double? fraction = _totalBytes > 0 && bytesRead >= 0 ? Math.Min(1.0, (double)bytesRead / _totalBytes) : null;
+        double? eta = done ? 0 : fraction > 0 ? elapsed * (1 - fraction) / fraction : null;
+
+        if (_format == ProgressFormat.Json)
+            WriteJson(bytesRead, linesRead, blocksWritten, elapsed, rate, eta, done);
+        else if (_format == ProgressFormat.Console)
+            WriteText(bytesRead, linesRead, blocksWritten, rate, fraction, eta, done);
+
+        _output.Flush();
+    }
+
+    private void WriteText(long bytesRead, long linesRead, long blocksWritten, double rate, double? fraction, double? eta, bool done)
+    {
+        var text = new StringBuilder(done ? "Progress: done" : "Progress:");
+        if (fraction.HasValue && !done)
+            text.Append(CultureInfo.InvariantCulture, $" {fraction.Value * 100:F1}%");
+        if (bytesRead >= 0)
+            text.Append(CultureInfo.InvariantCulture, $" {FormatBytes(bytesRead)}");
+        if (_totalBytes > 0)
+            text.Append(CultureInfo.InvariantCulture, $"/{FormatBytes(_totalBytes)}");
+        text.Append(CultureInfo.InvariantCulture, $", {linesRead:N0} lines, {_commands:N0} commands ({rate:N0}/s), {blocksWritten:N0} blocks");
+        if (_operation != null)
+            text.Append(", op ").Append(_operation);
+        if (_tool.HasValue)
+            text.Append(CultureInfo.InvariantCulture, $", T{_tool.Value}");
+        if (eta.HasValue && !done)
+            text.Append(CultureInfo.InvariantCulture, $", ETA {TimeSpan.FromSeconds(Math.Round(eta.Value)):hh\\:mm\\:ss}");
+
+        _output.WriteLine(text.ToString());
+    }
+
+    private void WriteJson(long bytesRead, long linesRead, long blocksWritten, double elapsed, double rate, double? eta, bool done)
+    {
+        var buffer = new ArrayBufferWriter<byte>(256);
+        using (var json = new Utf8JsonWriter(buffer))
+        {
+            json.WriteStartObject();
+            json.WriteNumber("elapsedSeconds", Math.Round(elapsed, 3));
+            json.WriteNumber("bytes", bytesRead);
+            json.WriteNumber("totalBytes", _totalBytes);
+            json.WriteNumber("lines", linesRead);
+            json.WriteNumber("commands", _commands);
+            json.WriteNumber("commandsPerSecond", Math.Round(rate, 1));
+            json.WriteNumber("blocks", blocksWritten);
+            if (_operation != null)
+                json.WriteString("operation", _operation);
+            if (_tool.HasValue)
+                json.WriteNumber("tool", _tool.Value);
+            if (eta.HasValue)
+                json.WriteNumber("etaSeconds", Math.Round(eta.Value, 1));
+            json.WriteBoolean("done", done);
+            json.WriteEndObject();
+        }
+
+        _output.WriteLine(Encoding.UTF8.GetString(buffer.WrittenSpan));
+    }
+
+    private static string FormatBytes(long bytes) => bytes switch
+    {
+        >= 1L << 30 => string.Create(CultureInfo.InvariantCulture, $"{bytes / (double)(1L << 30):F2} GB"),
+        >= 1L << 20 => string.Create(CultureInfo.InvariantCulture, $"{bytes / (double)(1L << 20):F1} MB"),
+        _ => string.Create(CultureInfo.InvariantCulture, $"{bytes / 1024.0:F0} KB")
+    };
+}
@@ -0,0 +1,184 @@
+using System.Globalization;
+using System.Text;
+
+namespace PostProcessor.Core.Diagnostics;
+
+/// <summary>
+/// Накопительные метрики в текстовом формате Prometheus (для textfile collector node_exporter).
+/// Приращения счётчиков копятся в памяти и при Flush добавляются к значениям из файла;
+/// чтение и перезапись выполняются под файлом блокировки, поэтому одновременные задания
+/// не теряют приращения друг друга. Файл заменяется атомарно: сборщик не видит его недописанным.
+/// </summary>
+public sealed class PrometheusMetricsFile
+{
+    private static readonly TimeSpan LockTimeout = TimeSpan.FromSeconds(10);
+
+    private readonly Dictionary<string, double> _counters = new(StringComparer.Ordinal);
+    private readonly Dictionary<string, double> _gauges = new(StringComparer.Ordinal);
+    private readonly Dictionary<string, string> _help = new(StringComparer.Ordinal);
+
+    /// <summary>
+    /// Создать файл метрик
+    /// </summary>
+    /// <param name="path">Путь к файлу (*.prom)</param>
+    public PrometheusMetricsFile(string path)
+    {
+        Path = System.IO.Path.GetFullPath(path);
+    }
+
+    /// <summary>
+    /// Путь к файлу метрик
+    /// </summary>
+    public string Path { get; }
+
+    /// <summary>
+    /// Есть приращения, ещё не записанные в файл
+    /// </summary>
+    public bool HasPending => _counters.Count > 0 || _gauges.Count > 0;
+
+    /// <summary>
+    /// Добавить приращение счётчика
+    /// </summary>
+    /// <param name="name">Имя метрики (с суффиксом _total)</param>
+    /// <param name="help">Описание метрики</param>
+    /// <param name="value">Приращение</param>
+    /// <param name="labelName">Имя метки (необязательно)</param>
+    /// <param name="labelValue">Значение метки</param>
+    public void Add(string name, string help, double value, string? labelName = null, string? labelValue = null)
+    {
+        var key = Key(name, labelName, labelValue);
+        _counters[key] = _counters.GetValueOrDefault(key) + value;
+        _help[name] = help;
+    }
+
+    /// <summary>
+    /// Установить значение метрики-показателя (gauge): заменяет значение в файле
+    /// </summary>
+    public void Set(string name, string help, double value, string? labelName = null, string? labelValue = null)
+    {
+        _gauges[Key(name, labelName, labelValue)] = value;
+        _help[name] = help;
+    }
+
+    /// <summary>
+    /// Добавить накопленные приращения к файлу. При ошибке ввода-вывода приращения
+    /// сохраняются и будут записаны следующим вызовом.
+    /// </summary>
+    public void Flush()
+    {
+        if (!HasPending)
+            return;
+
+        var directory = System.IO.Path.GetDirectoryName(Path)!;
+        Directory.CreateDirectory(directory);
+
+        using (AcquireLock())
+        {
+            var samples = new Dictionary<string, double>(StringComparer.Ordinal);
+            var types = new Dictionary<string, string>(StringComparer.Ordinal);
+            var help = new Dictionary<string, string>(StringComparer.Ordinal);
+            if (File.Exists(Path))
+                Read(Path, samples, types, help);
+
+            foreach (var (key, value) in _counters)
+            {
+                samples[key] = samples.GetValueOrDefault(key) + value;
+                types[MetricName(key)] = "counter";
+            }
+            foreach (var (key, value) in _gauges)
+            {
+                samples[key] = value;
+                types[MetricName(key)] = "gauge";
+            }
+            foreach (var (name, text) in _help)
+                help[name] = text;
+
+            var temp = $"{Path}.{Environment.ProcessId}.tmp";
+            File.WriteAllText(temp, Format(samples, types, help), new UTF8Encoding(false));
+            File.Move(temp, Path, overwrite: true);
+        }
+
+        _counters.Clear();
+        _gauges.Clear();
+    }
+
+    // Файл блокировки рядом с файлом метрик (сборщик читает только *.prom)
+    private FileStream AcquireLock()
+    {
+        var deadline = DateTime.UtcNow + LockTimeout;
+        while (true)
+        {
+            try
+            {
+                return new FileStream(Path + ".lock", FileMode.OpenOrCreate, FileAccess.ReadWrite, FileShare.None);
+            }
+            catch (IOException) when (DateTime.UtcNow < deadline)
+            {
+                Thread.Sleep(50);
+            }
+        }
+    }
+
+    private static void Read(
+        string path,
+        Dictionary<string, double> samples,
+        Dictionary<string, string> types,
+        Dictionary<string, string> help)
+    {
+        foreach (var line in File.ReadLines(path))
+        {
+            if (line.StartsWith("# HELP ", StringComparison.Ordinal))
+            {
+                var parts = line.Split(' ', 4);
+                if (parts.Length == 4)
+                    help[parts[2]] = parts[3];
+            }
+            else if (line.StartsWith("# TYPE ", StringComparison.Ordinal))
+            {
+                var parts = line.Split(' ', 4);
+                if (parts.Length == 4)
+                    types[parts[2]] = parts[3];
+            }
+            else if (line.Length > 0 && line[0] != '#')
+            {
+                var separator = line.LastIndexOf(' ');
+                if (separator > 0 && double.TryParse(line.AsSpan(separator + 1), NumberStyles.Float, CultureInfo.InvariantCulture, out var value))
+                    samples[line[..separator]] = value;
+            }
+        }
+    }
+
+    private static string Format(
+        Dictionary<string, double> samples,
+        Dictionary<string, string> types,
+        Dictionary<string, string> help)
+    {
+        var text = new StringBuilder();
+        foreach (var metric in samples.GroupBy(s => MetricName(s.Key)).OrderBy(g => g.Key, StringComparer.Ordinal))
+        {
+            if (help.TryGetValue(metric.Key, out var description))
+                text.Append("# HELP ").Append(metric.Key).Append(' ').Append(description).Append('\n');
+            if (types.TryGetValue(metric.Key, out var type))
+                text.Append("# TYPE ").Append(metric.Key).Append(' ').Append(type).Append('\n');
+
+            foreach (var (key, value) in metric.OrderBy(s => s.Key, StringComparer.Ordinal))
+                text.Append(key).Append(' ').Append(value.ToString("R", CultureInfo.InvariantCulture)).Append('\n');
+        }
+        return text.ToString();
+    }
+
+    private static string Key(string name, string? labelName, string? labelValue)
+    {
+        if (labelName == null)
+            return name;
+
+        var escaped = (labelValue ?? "").Replace("\\", "\\\\").Replace("\"", "\\\"").Replace("\n", "\\n");
+        return $"{name}{{{labelName}=\"{escaped}\"}}";
+    }
+
+    private static string MetricName(string key)
+    {
+        var brace = key.IndexOf('{');
+        return brace < 0 ? key : key[..brace];
+    }
+}
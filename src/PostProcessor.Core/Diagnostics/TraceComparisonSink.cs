@@ -0,0 +1,108 @@
+namespace PostProcessor.Core.Diagnostics;
+
+/// <summary>
+/// Расхождение между эталонной и текущей трассировкой
+/// </summary>
+/// <param name="Sequence">Порядковый номер команды</param>
+/// <param name="MajorWord">Команда APT</param>
+/// <param name="LineNumber">Строка APT</param>
+/// <param name="Reason">Описание расхождения</param>
+public record TraceDifference(long Sequence, string MajorWord, int LineNumber, string Reason);
+
+/// <summary>
+/// Приёмник трассировки, сравнивающий прогон с эталонной трассировкой:
+/// вывод команды (хэш и объём) и изменения регистров должны совпадать.
+/// Хранит только первые MaxDifferences расхождений.
+/// </summary>
+public sealed class TraceComparisonSink : ITraceSink
+{
+    private readonly IEnumerator<TraceEvent> _baseline;
+    private readonly ITraceSink? _inner;
+    private readonly List<TraceDifference> _differences = new();
+
+    /// <summary>
+    /// Создать сравнивающий приёмник
+    /// </summary>
+    /// <param name="baseline">События эталонного прогона в порядке выполнения</param>
+    /// <param name="inner">Дополнительный приёмник для записи новой трассировки</param>
+    public TraceComparisonSink(IEnumerable<TraceEvent> baseline, ITraceSink? inner = null)
+    {
+        _baseline = baseline.GetEnumerator();
+        _inner = inner;
+    }
+
+    /// <summary>
+    /// Максимальное количество сохраняемых расхождений
+    /// </summary>
+    public int MaxDifferences { get; init; } = 100;
+
+    /// <summary>
+    /// Общее количество команд с расхождениями
+    /// </summary>
+    public long DifferenceCount { get; private set; }
+
+    /// <summary>
+    /// Количество сравнённых команд
+    /// </summary>
+    public long ComparedCount { get; private set; }
+
+    /// <summary>
+    /// Первые найденные расхождения
+    /// </summary>
+    public IReadOnlyList<TraceDifference> Differences => _differences;
+
+    public void Record(TraceEvent traceEvent)
+    {
+        _inner?.Record(traceEvent);
+
+        string? reason;
+        if (!_baseline.MoveNext())
+        {
+            reason = "no matching command in baseline trace";
+        }
+        else
+        {
+            ComparedCount++;
+            reason = Compare(_baseline.Current, traceEvent);
+        }
+
+        if (reason == null)
+            return;
+
+        DifferenceCount++;
+        if (_differences.Count < MaxDifferences)
+        {
+            _differences.Add(new TraceDifference(
+                traceEvent.Sequence,
+                traceEvent.Command.MajorWord,
+                traceEvent.Command.LineNumber,
+                reason));
+        }
+    }
+
+    private static string? Compare(TraceEvent baseline, TraceEvent current)
+    {
+        if (baseline.Command.MajorWord != current.Command.MajorWord)
+            return $"command {baseline.Command.MajorWord} replaced by {current.Command.MajorWord}";
+
+        if (baseline.OutputHash != current.OutputHash)
+            return $"output differs ({baseline.EmittedChars} -> {current.EmittedChars} chars)";
+
+        foreach (var (name, value) in current.RegisterDeltas)
+        {
+            if (!baseline.RegisterDeltas.TryGetValue(name, out var expected) || Math.Abs(expected - value) > 1e-9)
+                return $"register {name} differs";
+        }
+
+        if (baseline.RegisterDeltas.Count != current.RegisterDeltas.Count)
+            return "changed register set differs";
+
+        return null;
+    }
+
+    public void Dispose()
+    {
+        _baseline.Dispose();
+        _inner?.Dispose();
+    }
+}
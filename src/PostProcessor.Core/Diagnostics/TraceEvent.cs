@@ -0,0 +1,24 @@
+using PostProcessor.Core.Models;
+
+namespace PostProcessor.Core.Diagnostics;
+
+/// <summary>
+/// Запись трассировки для одной APT-команды
+/// </summary>
+/// <param name="Sequence">Порядковый номер команды в прогоне</param>
+/// <param name="Command">Исходная команда (для воспроизведения)</param>
+/// <param name="Macro">Макрос, обработавший команду (путь к файлу или имя), null если макроса нет</param>
+/// <param name="StartMicroseconds">Начало выполнения от старта прогона, мкс</param>
+/// <param name="DurationMicroseconds">Длительность выполнения, мкс</param>
+/// <param name="EmittedChars">Количество выведенных символов</param>
+/// <param name="OutputHash">FNV-1a хэш выведенного текста (для сравнения прогонов)</param>
+/// <param name="RegisterDeltas">Изменившиеся регистры: имя -> новое значение</param>
+public record TraceEvent(
+    long Sequence,
+    APTCommand Command,
+    string? Macro,
+    long StartMicroseconds,
+    long DurationMicroseconds,
+    long EmittedChars,
+    ulong OutputHash,
+    IReadOnlyDictionary<string, double> RegisterDeltas);
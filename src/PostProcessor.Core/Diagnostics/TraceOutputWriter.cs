@@ -0,0 +1,100 @@
+using System.Text;
+
+namespace PostProcessor.Core.Diagnostics;
+
+/// <summary>
+/// Прозрачный TextWriter, считающий выведенные символы и FNV-1a хэш текста
+/// с момента последнего вызова Mark (объём и отпечаток вывода одной команды)
+/// </summary>
+public sealed class TraceOutputWriter : TextWriter
+{
+    private const ulong FnvOffset = 14695981039346656037UL;
+    private const ulong FnvPrime = 1099511628211UL;
+
+    private readonly TextWriter _inner;
+    private long _chars;
+    private ulong _hash = FnvOffset;
+
+    public TraceOutputWriter(TextWriter inner)
+    {
+        _inner = inner;
+    }
+
+    public override Encoding Encoding => _inner.Encoding;
+
+    /// <summary>
+    /// Символов выведено с последнего Mark
+    /// </summary>
+    public long CharsSinceMark => _chars;
+
+    /// <summary>
+    /// Хэш текста с последнего Mark
+    /// </summary>
+    public ulong HashSinceMark => _hash;
+
+    /// <summary>
+    /// Начать новый интервал подсчёта
+    /// </summary>
+    public void Mark()
+    {
+        _chars = 0;
+        _hash = FnvOffset;
+    }
+
+    public override void Write(char value)
+    {
+        _inner.Write(value);
+        Append(value);
+    }
+
+    public override void Write(string? value)
+    {
+        if (value == null)
+            return;
+
+        _inner.Write(value);
+        Append(value.AsSpan());
+    }
+
+    public override void Write(char[] buffer, int index, int count)
+    {
+        _inner.Write(buffer, index, count);
+        Append(buffer.AsSpan(index, count));
+    }
+
+    public override void Write(ReadOnlySpan<char> buffer)
+    {
+        _inner.Write(buffer);
+        Append(buffer);
+    }
+
+    public override void Flush() => _inner.Flush();
+
+    private void Append(char value)
+    {
+        _chars++;
+        unchecked
+        {
+            _hash = (_hash ^ value) * FnvPrime;
+        }
+    }
+
+    private void Append(ReadOnlySpan<char> text)
+    {
+        foreach (var c in text)
+            Append(c);
+    }
+
+    protected override void Dispose(bool disposing)
+    {
+        if (disposing)
+            _inner.Dispose();
+        base.Dispose(disposing);
+    }
+
+    public override async ValueTask DisposeAsync()
+    {
+        await _inner.DisposeAsync().ConfigureAwait(false);
+        GC.SuppressFinalize(this);
+    }
+}
@@ -0,0 +1,57 @@
+using System.Globalization;
+using System.Runtime.CompilerServices;
+using System.Text.Json;
+using PostProcessor.Core.Models;
+
+namespace PostProcessor.Core.Diagnostics;
+
+/// <summary>
+/// Чтение трассировки, записанной ChromeTraceSink (для воспроизведения и сравнения прогонов)
+/// </summary>
+public static class TraceReader
+{
+    /// <summary>
+    /// Потоково прочитать события трассировки
+    /// </summary>
+    /// <param name="path">Путь к файлу трассировки</param>
+    /// <param name="cancellationToken">Токен отмены</param>
+    public static async IAsyncEnumerable<TraceEvent> ReadAsync(
+        string path,
+        [EnumeratorCancellation] CancellationToken cancellationToken = default)
+    {
+        await using var stream = new FileStream(path, FileMode.Open, FileAccess.Read, FileShare.Read, 64 * 1024, useAsync: true);
+
+        await foreach (var element in JsonSerializer.DeserializeAsyncEnumerable<JsonElement>(stream, cancellationToken: cancellationToken)
+                           .ConfigureAwait(false))
+        {
+            if (element.ValueKind != JsonValueKind.Object || !element.TryGetProperty("args", out var args))
+                continue;
+
+            yield return Parse(element, args);
+        }
+    }
+
+    private static TraceEvent Parse(JsonElement element, JsonElement args)
+    {
+        var command = new APTCommand(
+            element.GetProperty("name").GetString() ?? "",
+            args.GetProperty("minor").EnumerateArray().Select(v => v.GetString() ?? "").ToList(),
+            args.GetProperty("num").EnumerateArray().Select(v => v.GetDouble()).ToList(),
+            args.GetProperty("str").EnumerateArray().Select(v => v.GetString() ?? "").ToList(),
+            args.GetProperty("line").GetInt32());
+
+        var deltas = new Dictionary<string, double>();
+        foreach (var register in args.GetProperty("regs").EnumerateObject())
+            deltas[register.Name] = register.Value.GetDouble();
+
+        return new TraceEvent(
+            args.GetProperty("seq").GetInt64(),
+            command,
+            args.TryGetProperty("macro", out var macro) ? macro.GetString() : null,
+            element.GetProperty("ts").GetInt64(),
+            element.GetProperty("dur").GetInt64(),
+            args.GetProperty("chars").GetInt64(),
+            ulong.Parse(args.GetProperty("hash").GetString()!, NumberStyles.HexNumber, CultureInfo.InvariantCulture),
+            deltas);
+    }
+}
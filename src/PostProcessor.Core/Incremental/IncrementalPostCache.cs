@@ -0,0 +1,133 @@
+using System.Globalization;
+using System.Security.Cryptography;
+using System.Text;
+using System.Text.Json;
+using PostProcessor.Core.Models;
+
+namespace PostProcessor.Core.Incremental;
+
+/// <summary>
+/// Запись кэша: NC-вывод сегмента и состояние контекста после него
+/// </summary>
+public record IncrementalCacheEntry(string Output, PostStateSnapshot ExitState);
+
+/// <summary>
+/// Результат инкрементального постпроцессирования
+/// </summary>
+/// <param name="Segments">Всего сегментов</param>
+/// <param name="ReusedSegments">Сегментов, взятых из кэша</param>
+public record IncrementalPostResult(int Segments, int ReusedSegments);
+
+/// <summary>
+/// Дисковый кэш NC-вывода сегментов APT.
+/// Ключ сегмента = SHA-256(отпечаток конфигурации/макросов + хэш входного состояния + команды сегмента).
+/// Номера строк APT в ключ не входят, поэтому правка одной операции не сдвигает ключи остальных.
+/// </summary>
+public class IncrementalPostCache
+{
+    private static readonly JsonSerializerOptions JsonOptions = new() { WriteIndented = false };
+
+    private readonly string _directory;
+    private readonly string _fingerprint;
+
+    /// <summary>
+    /// Создать кэш
+    /// </summary>
+    /// <param name="directory">Каталог кэша</param>
+    /// <param name="fingerprint">Отпечаток конфигурации и макросов (изменение сбрасывает кэш)</param>
+    public IncrementalPostCache(string directory, string fingerprint)
+    {
+        _directory = directory;
+        _fingerprint = fingerprint;
+        Directory.CreateDirectory(directory);
+    }
+
+    /// <summary>
+    /// Вычислить ключ сегмента
+    /// </summary>
+    public string ComputeKey(PostStateSnapshot enteringState, IReadOnlyList<APTCommand> commands)
+    {
+        using var sha = IncrementalHash.CreateHash(HashAlgorithmName.SHA256);
+        Append(sha, _fingerprint);
+        Append(sha, "\n");
+        Append(sha, enteringState.Hash);
+        Append(sha, "\n");
+
+        var sb = new StringBuilder();
+        foreach (var command in commands)
+        {
+            sb.Clear();
+            sb.Append(command.MajorWord).Append('/');
+            foreach (var word in command.MinorWords)
+                sb.Append(word).Append(',');
+            sb.Append('|');
+            foreach (var value in command.NumericValues)
+                sb.Append(value.ToString("R", CultureInfo.InvariantCulture)).Append(',');
+            sb.Append('|');
+            foreach (var text in command.StringValues)
+                sb.Append(text.Length).Append(':').Append(text);
+            sb.Append('\n');
+            Append(sha, sb.ToString());
+        }
+
+        return Convert.ToHexString(sha.GetHashAndReset());
+    }
+
+    /// <summary>
+    /// Найти запись в кэше
+    /// </summary>
+    public bool TryGet(string key, out IncrementalCacheEntry entry)
+    {
+        entry = null!;
+        var path = GetPath(key);
+        if (!File.Exists(path))
+            return false;
+
+        try
+        {
+            var stored = JsonSerializer.Deserialize<IncrementalCacheEntry>(File.ReadAllText(path), JsonOptions);
+            if (stored == null)
+                return false;
+
+            entry = stored;
+            return true;
+        }
+        catch (JsonException)
+        {
+            // Повреждённая запись - пересчитываем сегмент
+            return false;
+        }
+    }
+
+    /// <summary>
+    /// Сохранить запись в кэш
+    /// </summary>
+    public void Store(string key, IncrementalCacheEntry entry)
+    {
+        var path = GetPath(key);
+        var tempPath = path + ".tmp";
+        File.WriteAllText(tempPath, JsonSerializer.Serialize(entry, JsonOptions));
+        File.Move(tempPath, path, overwrite: true);
+    }
+
+    /// <summary>
+    /// Вычислить отпечаток набора файлов (конфигурация, макросы)
+    /// </summary>
+    public static string ComputeFingerprint(IEnumerable<string> files)
+    {
+        using var sha = IncrementalHash.CreateHash(HashAlgorithmName.SHA256);
+        foreach (var file in files.Where(File.Exists).OrderBy(f => f, StringComparer.Ordinal))
+        {
+            Append(sha, file);
+            sha.AppendData(File.ReadAllBytes(file));
+        }
+        return Convert.ToHexString(sha.GetHashAndReset());
+    }
+
+    private string GetPath(string key) => Path.Combine(_directory, key + ".json");
+
+    private static void Append(IncrementalHash sha, string text)
+    {
+        sha.AppendData(Encoding.UTF8.GetBytes(text));
+    }
+}
@@ -0,0 +1,39 @@
+namespace PostProcessor.Core.Incremental;
+
+/// <summary>
+/// Задание рабочему процессу параллельного постпроцессирования:
+/// обработать сегменты [FirstSegment..LastSegment] входного файла
+/// </summary>
+/// <param name="InputPath">APT-файл (рабочий процесс сам делит его на сегменты)</param>
+/// <param name="ConfigPath">Файл конфигурации контроллера</param>
+/// <param name="Machine">Станок (выбор макросов)</param>
+/// <param name="MacroPaths">Каталоги Python-макросов</param>
+/// <param name="FirstSegment">Первый сегмент</param>
+/// <param name="LastSegment">Последний сегмент (включительно)</param>
+/// <param name="ToolLibraryPath">Библиотека инструментов</param>
+public record ParallelPostJob(
+    string InputPath,
+    string ConfigPath,
+    string Machine,
+    IReadOnlyList<string> MacroPaths,
+    int FirstSegment,
+    int LastSegment,
+    string? ToolLibraryPath = null);
+
+/// <summary>
+/// Результат обработки одного сегмента в рабочем процессе
+/// </summary>
+/// <param name="Index">Номер сегмента</param>
+/// <param name="EnteringState">Предполагаемое входное состояние (JSON PostStateSnapshot)</param>
+/// <param name="ExitState">Состояние после сегмента (JSON PostStateSnapshot)</param>
+/// <param name="Output">NC-вывод сегмента</param>
+public record SegmentPostResult(int Index, string EnteringState, string ExitState, string Output);
+
+/// <summary>
+/// Итог параллельного постпроцессирования
+/// </summary>
+/// <param name="Segments">Всего сегментов</param>
+/// <param name="Workers">Рабочих процессов</param>
+/// <param name="RepostedSegments">Сегментов, пересчитанных последовательно
+/// (входное состояние не совпало с предполагаемым или рабочий процесс завершился с ошибкой)</param>
+public record ParallelPostResult(int Segments, int Workers, int RepostedSegments);
@@ -0,0 +1,224 @@
+using System.Globalization;
+using System.Security.Cryptography;
+using System.Text;
+using System.Text.Json;
+using System.Text.Json.Serialization;
+using PostProcessor.Core.Context;
+
+namespace PostProcessor.Core.Incremental;
+
+/// <summary>
+/// Состояние регистра или NC-слова в снимке
+/// </summary>
+public record WordState(double Value, double Previous, bool Changed, bool IsModal = true, string? Format = null);
+
+/// <summary>
+/// Снимок состояния PostContext на границе сегмента APT.
+/// Включает регистры, NumericNCWord, системные/глобальные переменные, StateCache,
+/// состояние станка и CATIA. Значения переменных хранятся в виде строк с типом
+/// ("d:1.5", "s:text"), чтобы снимок сериализовался и хэшировался детерминированно.
+/// Состояние, которое макросы держат в собственных глобальных переменных Python,
+/// в снимок не попадает.
+/// </summary>
+public sealed class PostStateSnapshot
+{
+    private static readonly JsonSerializerOptions JsonOptions = new() { WriteIndented = false };
+
+    private string? _hash;
+
+    public SortedDictionary<string, WordState> Registers { get; init; } = new(StringComparer.Ordinal);
+    public SortedDictionary<string, WordState> NumericWords { get; init; } = new(StringComparer.Ordinal);
+    public SortedDictionary<string, string> Variables { get; init; } = new(StringComparer.Ordinal);
+    public SortedDictionary<string, string> States { get; init; } = new(StringComparer.Ordinal);
+    public SortedDictionary<string, string> Machine { get; init; } = new(StringComparer.Ordinal);
+    public SortedDictionary<string, string> OperationParameters { get; init; } = new(StringComparer.Ordinal);
+
+    /// <summary>
+    /// Текущий номер блока BlockWriter (не входит в хэш: нумерация восстанавливается отдельно)
+    /// </summary>
+    public int BlockNumber { get; init; }
+
+    /// <summary>
+    /// false если в состоянии есть значения, которые нельзя сохранить (объекты Python и т.п.)
+    /// </summary>
+    public bool IsCacheable { get; init; } = true;
+
+    /// <summary>
+    /// SHA-256 канонического представления состояния (hex)
+    /// </summary>
+    [JsonIgnore]
+    public string Hash => _hash ??= ComputeHash();
+
+    /// <summary>
+    /// Снять снимок состояния контекста
+    /// </summary>
+    public static PostStateSnapshot Capture(PostContext context)
+    {
+        var cacheable = true;
+
+        var registers = new SortedDictionary<string, WordState>(StringComparer.Ordinal);
+        foreach (var reg in context.Registers.All)
+            registers[reg.Name] = new WordState(reg.Value, reg.PreviousValue, reg.HasChanged, reg.IsModal, reg.Format);
+
+        var words = new SortedDictionary<string, WordState>(StringComparer.Ordinal);
+        foreach (var (address, word) in context.NumericWords)
+            words[address] = new WordState(word.v, word.v0, word.HasChanged, word.IsModal);
+
+        var variables = new SortedDictionary<string, string>(StringComparer.Ordinal);
+        foreach (var (name, value) in context.SystemVariables)
+            cacheable &= TryEncode(value, variables, name);
+
+        var states = new SortedDictionary<string, string>(StringComparer.Ordinal);
+        foreach (var key in context.StateCache.Keys)
+            cacheable &= TryEncode(context.StateCache.Get<object?>(key), states, key);
+
+        var operation = new SortedDictionary<string, string>(StringComparer.Ordinal);
+        foreach (var (name, value) in context.Catia.OperationParameters)
+            cacheable &= TryEncode(value, operation, name);
+
+        var machine = new SortedDictionary<string, string>(StringComparer.Ordinal)
+        {
+            ["spindle"] = context.Machine.SpindleState.ToString(),
+            ["coolant"] = context.Machine.CoolantState.ToString(),
+            ["workOffset"] = context.Machine.ActiveCoordinateSystem.ToString(CultureInfo.InvariantCulture),
+            ["lastMCode"] = context.Machine.LastMCode ?? "",
+            ["tool"] = context.Machine.CurrentTool == null ? "" : JsonSerializer.Serialize(context.Machine.CurrentTool, JsonOptions),
+            ["toolpathType"] = context.Catia.ToolpathType.ToString(),
+            ["multiaxis"] = context.Catia.IsMultiaxisEnabled ? "1" : "0",
+            ["compensation"] = context.Catia.CompensationMode.ToString(),
+            ["operation"] = context.Catia.CurrentOperationName ?? "",
+            ["process"] = context.Catia.CurrentProcessName ?? "",
+            ["product"] = context.Catia.CurrentProductName ?? ""
+        };
+
+        return new PostStateSnapshot
+        {
+            Registers = registers,
+            NumericWords = words,
+            Variables = variables,
+            States = states,
+            Machine = machine,
+            OperationParameters = operation,
+            BlockNumber = context.BlockWriter.CurrentBlockNumber,
+            IsCacheable = cacheable
+        };
+    }
+
+    /// <summary>
+    /// Восстановить состояние контекста из снимка
+    /// </summary>
+    public void RestoreTo(PostContext context)
+    {
+        foreach (var (name, state) in Registers)
+        {
+            context.Registers
+                .GetOrAdd(name, state.Value, state.IsModal, state.Format ?? "F3")
+                .Restore(state.Value, state.Previous, state.Changed);
+        }
+
+        foreach (var (address, state) in NumericWords)
+            context.GetNumericWord(address).Restore(state.Value, state.Previous, state.Changed);
+
+        context.ReplaceSystemVariables(Variables.Select(v => new KeyValuePair<string, object>(v.Key, Decode(v.Value))));
+
+        context.StateCache.Clear();
+        foreach (var (key, value) in States)
+            context.StateCache.Update(key, Decode(value));
+
+        context.Catia.OperationParameters.Clear();
+        foreach (var (name, value) in OperationParameters)
+            context.Catia.OperationParameters[name] = Decode(value);
+
+        context.Machine.SpindleState = Enum.Parse<SpindleDirection>(Machine["spindle"]);
+        context.Machine.CoolantState = Enum.Parse<CoolantMode>(Machine["coolant"]);
+        context.Machine.ActiveCoordinateSystem = int.Parse(Machine["workOffset"], CultureInfo.InvariantCulture);
+        context.Machine.LastMCode = NullIfEmpty(Machine["lastMCode"]);
+        context.Machine.CurrentTool = Machine["tool"].Length == 0
+            ? null
+            : JsonSerializer.Deserialize<ToolInfo>(Machine["tool"], JsonOptions);
+        context.Catia.ToolpathType = Enum.Parse<CatiaToolpathType>(Machine["toolpathType"]);
+        context.Catia.IsMultiaxisEnabled = Machine["multiaxis"] == "1";
+        context.Catia.CompensationMode = Enum.Parse<ToolCompensationMode>(Machine["compensation"]);
+        context.Catia.CurrentOperationName = NullIfEmpty(Machine["operation"]);
+        context.Catia.CurrentProcessName = NullIfEmpty(Machine["process"]);
+        context.Catia.CurrentProductName = NullIfEmpty(Machine["product"]);
+
+        context.BlockWriter.BlockNumberStart = BlockNumber;
+    }
+
+    /// <summary>
+    /// Сериализовать снимок в JSON
+    /// </summary>
+    public string ToJson() => JsonSerializer.Serialize(this, JsonOptions);
+
+    /// <summary>
+    /// Загрузить снимок из JSON
+    /// </summary>
+    public static PostStateSnapshot FromJson(string json)
+        => JsonSerializer.Deserialize<PostStateSnapshot>(json, JsonOptions)
+           ?? throw new InvalidDataException("Empty state snapshot");
+
+    private string ComputeHash()
+    {
+        var sb = new StringBuilder();
+        foreach (var (name, s) in Registers)
+            sb.Append("R:").Append(name).Append('=').Append(FormatWord(s)).Append('\n');
+        foreach (var (name, s) in NumericWords)
+            sb.Append("W:").Append(name).Append('=').Append(FormatWord(s)).Append('\n');
+        AppendSection(sb, "V:", Variables);
+        AppendSection(sb, "S:", States);
+        AppendSection(sb, "O:", OperationParameters);
+        AppendSection(sb, "M:", Machine);
+
+        return Convert.ToHexString(SHA256.HashData(Encoding.UTF8.GetBytes(sb.ToString())));
+    }
+
+    private static void AppendSection(StringBuilder sb, string prefix, SortedDictionary<string, string> values)
+    {
+        foreach (var (name, value) in values)
+            sb.Append(prefix).Append(name).Append('=').Append(value).Append('\n');
+    }
+
+    private static string FormatWord(WordState s)
+    {
+        return string.Create(CultureInfo.InvariantCulture,
+            $"{s.Value:R}|{s.Previous:R}|{(s.Changed ? 1 : 0)}|{(s.IsModal ? 1 : 0)}|{s.Format}");
+    }
+
+    private static bool TryEncode(object? value, IDictionary<string, string> target, string name)
+    {
+        var encoded = value switch
+        {
+            null => "n:",
+            string s => "s:" + s,
+            bool b => b ? "b:1" : "b:0",
+            int i => "i:" + i.ToString(CultureInfo.InvariantCulture),
+            long l => "l:" + l.ToString(CultureInfo.InvariantCulture),
+            double d => "d:" + d.ToString("R", CultureInfo.InvariantCulture),
+            float f => "d:" + ((double)f).ToString("R", CultureInfo.InvariantCulture),
+            _ => null
+        };
+
+        if (encoded == null)
+            return false;
+
+        target[name] = encoded;
+        return true;
+    }
+
+    private static object Decode(string encoded)
+    {
+        var payload = encoded[2..];
+        return encoded[0] switch
+        {
+            's' => payload,
+            'b' => payload == "1",
+            'i' => int.Parse(payload, CultureInfo.InvariantCulture),
+            'l' => long.Parse(payload, CultureInfo.InvariantCulture),
+            'd' => double.Parse(payload, CultureInfo.InvariantCulture),
+            _ => null!
+        };
+    }
+
+    private static string? NullIfEmpty(string value) => value.Length == 0 ? null : value;
+}
@@ -0,0 +1,84 @@
+using System.Text;
+
+namespace PostProcessor.Core.Incremental;
+
+/// <summary>
+/// TextWriter, передающий вывод дальше и одновременно записывающий текст
+/// текущего сегмента для сохранения в кэш инкрементального постпроцессирования
+/// </summary>
+public sealed class SegmentCaptureWriter : TextWriter
+{
+    private readonly TextWriter _inner;
+    private readonly StringBuilder _captured = new();
+    private bool _capturing;
+
+    public SegmentCaptureWriter(TextWriter inner)
+    {
+        _inner = inner;
+    }
+
+    public override Encoding Encoding => _inner.Encoding;
+
+    /// <summary>
+    /// Начать запись сегмента
+    /// </summary>
+    public void BeginCapture()
+    {
+        _captured.Clear();
+        _capturing = true;
+    }
+
+    /// <summary>
+    /// Завершить запись сегмента и получить его текст
+    /// </summary>
+    public string EndCapture()
+    {
+        _capturing = false;
+        var text = _captured.ToString();
+        _captured.Clear();
+        return text;
+    }
+
+    public override void Write(char value)
+    {
+        _inner.Write(value);
+        if (_capturing)
+            _captured.Append(value);
+    }
+
+    public override void Write(string? value)
+    {
+        _inner.Write(value);
+        if (_capturing)
+            _captured.Append(value);
+    }
+
+    public override void Write(char[] buffer, int index, int count)
+    {
+        _inner.Write(buffer, index, count);
+        if (_capturing)
+            _captured.Append(buffer, index, count);
+    }
+
+    public override void Write(ReadOnlySpan<char> buffer)
+    {
+        _inner.Write(buffer);
+        if (_capturing)
+            _captured.Append(buffer);
+    }
+
+    public override void Flush() => _inner.Flush();
+
+    protected override void Dispose(bool disposing)
+    {
+        if (disposing)
+            _inner.Dispose();
+        base.Dispose(disposing);
+    }
+
+    public override async ValueTask DisposeAsync()
+    {
+        await _inner.DisposeAsync().ConfigureAwait(false);
+        GC.SuppressFinalize(this);
+    }
+}
@@ -6,4 +6,69 @@ public record APTCommand(
     List<double> NumericValues,
     List<string> StringValues,
     int LineNumber
-);
+)
+{
+    private readonly string _majorWord = MajorWord;
+    private readonly List<string> _minorWords = MinorWords;
+    private readonly APTMajorWord _word = APTWords.GetMajor(MajorWord);
+    private readonly ulong _minorMask = APTWords.GetMinorMask(MinorWords);
+
+    /// <summary>
+    /// Основное слово (нижний регистр)
+    /// </summary>
+    public string MajorWord
+    {
+        get => _majorWord;
+        init
+        {
+            _majorWord = value;
+            _word = APTWords.GetMajor(value);
+        }
+    }
+
+    /// <summary>
+    /// Младшие слова (нижний регистр)
+    /// </summary>
+    public List<string> MinorWords
+    {
+        get => _minorWords;
+        init
+        {
+            _minorWords = value;
+            _minorMask = APTWords.GetMinorMask(value);
+        }
+    }
+
+    /// <summary>
+    /// Идентификатор основного слова (Unknown для слов вне таблицы)
+    /// </summary>
+    public APTMajorWord Word => _word;
+
+    /// <summary>
+    /// Битовая маска известных младших слов
+    /// </summary>
+    public ulong MinorMask => _minorMask;
+
+    /// <summary>
+    /// Проверить наличие известного младшего слова за O(1)
+    /// </summary>
+    public bool HasMinorWord(APTMinorWord word) => (_minorMask & APTWords.GetBit(word)) != 0;
+
+    /// <summary>
+    /// Проверить наличие младшего слова без учёта регистра.
+    /// Известные слова проверяются по маске, остальные - перебором.
+    /// </summary>
+    public bool HasMinorWord(string word)
+    {
+        var id = APTWords.GetMinor(word);
+        if (id != APTMinorWord.Unknown)
+            return HasMinorWord(id);
+
+        foreach (var minor in _minorWords)
+        {
+            if (string.Equals(minor, word, StringComparison.OrdinalIgnoreCase))
+                return true;
+        }
+        return false;
+    }
+}
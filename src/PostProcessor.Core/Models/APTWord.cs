@@ -0,0 +1,193 @@
+using System.Collections.Frozen;
+
+namespace PostProcessor.Core.Models;
+
+/// <summary>
+/// Известные основные слова APT (целочисленные идентификаторы для диспетчеризации)
+/// </summary>
+public enum APTMajorWord : short
+{
+    Unknown = 0,
+
+    // Движение
+    Goto,
+    Rapid,
+    Fedrat,
+    From,
+    Gohome,
+    Arc,
+    Circle,
+    Point,
+    Line,
+
+    // Шпиндель, СОЖ, инструмент
+    Spindl,
+    Coolnt,
+    Loadtl,
+    Toolno,
+    Toolinf,
+    Tlon,
+    Tloff,
+    Tlcomp,
+    Cutcom,
+    Turret,
+
+    // Циклы и подпрограммы
+    Cycle,
+    Cycle81,
+    Cycle83,
+    Delay,
+    Subprog,
+    Seqno,
+    Wplane,
+
+    // Токарные
+    Chuck,
+    Tailstk,
+
+    // CATIA
+    OpName,
+    StartOp,
+    Opdata,
+    Catprocess,
+    Catproduct,
+    ToolpathType,
+    Multax,
+
+    // Служебные
+    Channel,
+    Catmat,
+    Pptable,
+    PartOpen,
+    Partno,
+    Machin,
+    Program,
+    Fini,
+    Continuation
+}
+
+/// <summary>
+/// Известные младшие слова APT. Значения меньше 64 - номер бита в <see cref="APTCommand.MinorMask"/>
+/// </summary>
+public enum APTMinorWord : byte
+{
+    Unknown = 0,
+    On,
+    Off,
+    Clw,
+    Cclw,
+    Cw,
+    Ccw,
+    Orient,
+    Maxrpm,
+    Rpm,
+    Sfm,
+    Smm,
+    Flood,
+    Mist,
+    Air,
+    Thru,
+    Left,
+    Right,
+    Adjust,
+    Mmpm,
+    Mps,
+    Ipm,
+    Ipr,
+    Mpr,
+    Xyplan,
+    Yzplan,
+    Zxplan,
+    Incr,
+    Open,
+    Close,
+    Clamp,
+    Unclamp,
+    Start,
+    Retract,
+    Return,
+    Callsub,
+    Endsub,
+    High,
+    Low,
+    Forward,
+    Reverse
+}
+
+/// <summary>
+/// Таблицы известных слов APT: строка ↔ идентификатор
+/// </summary>
+public static class APTWords
+{
+    private static readonly FrozenDictionary<string, APTMajorWord> MajorByName =
+        BuildTable<APTMajorWord>().ToFrozenDictionary(StringComparer.OrdinalIgnoreCase);
+
+    private static readonly FrozenDictionary<string, APTMinorWord> MinorByName =
+        BuildTable<APTMinorWord>().ToFrozenDictionary(StringComparer.OrdinalIgnoreCase);
+
+    /// <summary>
+    /// Канонические (нижний регистр) написания всех известных слов
+    /// </summary>
+    public static IEnumerable<string> KnownWords => MajorByName.Keys.Concat(MinorByName.Keys);
+
+    /// <summary>
+    /// Идентификатор основного слова (без учёта регистра), Unknown для неизвестных
+    /// </summary>
+    public static APTMajorWord GetMajor(string? word)
+    {
+        return word != null && MajorByName.TryGetValue(word, out var id) ? id : APTMajorWord.Unknown;
+    }
+
+    /// <summary>
+    /// Идентификатор младшего слова (без учёта регистра), Unknown для неизвестных
+    /// </summary>
+    public static APTMinorWord GetMinor(string? word)
+    {
+        return word != null && MinorByName.TryGetValue(word, out var id) ? id : APTMinorWord.Unknown;
+    }
+
+    /// <summary>
+    /// Битовая маска известных младших слов списка
+    /// </summary>
+    public static ulong GetMinorMask(IReadOnlyList<string>? words)
+    {
+        if (words == null)
+            return 0;
+
+        ulong mask = 0;
+        for (int i = 0; i < words.Count; i++)
+            mask |= GetBit(GetMinor(words[i]));
+        return mask;
+    }
+
+    /// <summary>
+    /// Бит младшего слова в маске (0 для Unknown)
+    /// </summary>
+    public static ulong GetBit(APTMinorWord word)
+    {
+        var index = (int)word;
+        return index is > 0 and < 64 ? 1UL << index : 0;
+    }
+
+    // "OpName" -> "op_name": имена членов перечисления в нотации APT
+    private static Dictionary<string, T> BuildTable<T>() where T : struct, Enum
+    {
+        var table = new Dictionary<string, T>(StringComparer.OrdinalIgnoreCase);
+        foreach (var value in Enum.GetValues<T>())
+        {
+            if (Convert.ToInt32(value) == 0)
+                continue;
+
+            var name = value.ToString();
+            var chars = new List<char>(name.Length + 2);
+            for (int i = 0; i < name.Length; i++)
+            {
+                if (i > 0 && char.IsUpper(name[i]))
+                    chars.Add('_');
+                chars.Add(char.ToLowerInvariant(name[i]));
+            }
+            table[new string(chars.ToArray())] = value;
+        }
+        return table;
+    }
+}
@@ -0,0 +1,352 @@
+using System.Globalization;
+using System.Text;
+
+namespace PostProcessor.Core.Optimization;
+
+/// <summary>
+/// Автоматическое включение режима высокоскоростной обработки (упреждающего просмотра).
+/// Работает над готовой УП: делит программу на операции по сменам инструмента, для каждой
+/// операции считает среднюю длину рабочего перемещения и темп кадров (кадр/с при
+/// запрограммированной подаче) и обрамляет плотные операции кадрами включения и выключения
+/// режима: от первого до последнего рабочего перемещения операции. Операции, в которых
+/// режим уже запрограммирован, не изменяются. Понимает кадры G0-G3 и L/C Heidenhain.
+/// </summary>
+public class HighSpeedMachiningInserter
+{
+    // Слова Heidenhain без числового значения, не влияющие на разбор перемещения
+    private static readonly HashSet<string> IgnoredWords = new(StringComparer.OrdinalIgnoreCase)
+    {
+        "RL", "RR", "R0", "DR+", "DR-", "FAUTO", "FZ", "FU"
+    };
+
+    private static readonly string[] HighSpeedMarkers =
+    {
+        "G05.1", "G5.1", "G187", "CYCLE832", "CYCL DEF 32"
+    };
+
+    private readonly HighSpeedMachiningOptions _options;
+    private readonly double[] _position = new double[3];
+    private int _motionCode = -1;
+    private double _feed;
+    private bool _incremental;
+
+    /// <summary>
+    /// Создать преобразователь
+    /// </summary>
+    /// <param name="options">Параметры (null - значения по умолчанию)</param>
+    public HighSpeedMachiningInserter(HighSpeedMachiningOptions? options = null)
+    {
+        _options = options ?? new HighSpeedMachiningOptions();
+        if (_options.MinBlocks < 1)
+            throw new ArgumentOutOfRangeException(nameof(options), "MinBlocks must be positive");
+    }
+
+    /// <summary>
+    /// Включить режим высокоскоростной обработки в файле
+    /// </summary>
+    /// <param name="inputPath">Исходная УП</param>
+    /// <param name="outputPath">Результирующая УП</param>
+    /// <param name="options">Параметры</param>
+    public static HighSpeedMachiningResult InsertFile(
+        string inputPath,
+        string outputPath,
+        HighSpeedMachiningOptions? options = null)
+    {
+        var lines = File.ReadAllLines(inputPath);
+
+        using var writer = new StreamWriter(outputPath, false, new UTF8Encoding(false));
+        return new HighSpeedMachiningInserter(options).Insert(lines, writer);
+    }
+
+    /// <summary>
+    /// Включить режим высокоскоростной обработки для плотных операций
+    /// </summary>
+    /// <param name="lines">Строки УП</param>
+    /// <param name="writer">Выходной поток</param>
+    /// <returns>Статистика</returns>
+    public HighSpeedMachiningResult Insert(IReadOnlyList<string> lines, TextWriter writer)
+    {
+        var operations = Measure(lines);
+        var wrapped = operations.Where(Qualifies).ToList();
+
+        var on = OnBlocks();
+        var off = OffBlocks();
+        var starts = wrapped.Select(operation => operation.FirstMove!.Value).ToHashSet();
+        var ends = wrapped.Select(operation => operation.LastMove).ToHashSet();
+
+        var outputLines = 0;
+        for (int index = 0; index < lines.Count; index++)
+        {
+            if (starts.Contains(index))
+            {
+                foreach (var block in on)
+                    writer.WriteLine(block);
+                outputLines += on.Count;
+            }
+
+            writer.WriteLine(lines[index]);
+            outputLines++;
+
+            if (ends.Contains(index))
+            {
+                foreach (var block in off)
+                    writer.WriteLine(block);
+                outputLines += off.Count;
+            }
+        }
+
+        return new HighSpeedMachiningResult(
+            operations.Count,
+            wrapped.Count,
+            wrapped.Sum(operation => operation.Moves),
+            lines.Count,
+            outputLines);
+    }
+
+    private bool Qualifies(Operation operation)
+    {
+        if (operation.HasHighSpeedMode || operation.Moves < _options.MinBlocks)
+            return false;
+
+        if (operation.Length / operation.Moves <= _options.MaxSegmentLength)
+            return true;
+
+        // Темп кадров при запрограммированной подаче (мм/мин)
+        return operation.TimeKnown && operation.Minutes > 0 &&
+               operation.Moves / (operation.Minutes * 60) >= _options.MinBlockRate;
+    }
+
+    // Разбор программы на операции: граница - смена инструмента или конец программы
+    private List<Operation> Measure(IReadOnlyList<string> lines)
+    {
+        Array.Fill(_position, double.NaN);
+        _motionCode = -1;
+        _feed = 0;
+        _incremental = false;
+
+        var operations = new List<Operation>();
+        var current = new Operation();
+
+        for (int index = 0; index < lines.Count; index++)
+        {
+            var line = lines[index];
+            var upper = line.ToUpperInvariant();
+
+            if (IsOperationBoundary(upper))
+            {
+                if (current.Moves > 0 || current.HasHighSpeedMode)
+                    operations.Add(current);
+                current = new Operation();
+                continue;
+            }
+
+            if (HighSpeedMarkers.Any(marker => upper.Contains(marker)))
+            {
+                current.HasHighSpeedMode = true;
+                continue;
+            }
+
+            if (!TryParseMove(line, out var length))
+                continue;
+
+            current.FirstMove ??= index;
+            current.LastMove = index;
+            current.Moves++;
+            current.Length += length;
+            if (_feed > 0)
+                current.Minutes += length / _feed;
+            else
+                current.TimeKnown = false;
+        }
+
+        if (current.Moves > 0 || current.HasHighSpeedMode)
+            operations.Add(current);
+
+        return operations;
+    }
+
+    private static bool IsOperationBoundary(string upper)
+    {
+        if (upper.Contains("TOOL CALL") || upper.Contains("END PGM"))
+            return true;
+
+        foreach (var token in StripComment(upper).Split(' ', '\t'))
+        {
+            if (token is "M6" or "M06" or "M30" or "M2" or "M02")
+                return true;
+        }
+        return false;
+    }
+
+    private static string StripComment(string line)
+    {
+        var commentStart = line.IndexOfAny(new[] { '(', ';' });
+        return (commentStart >= 0 ? line[..commentStart] : line).Trim();
+    }
+
+    /// <summary>
+    /// Разобрать кадр; true - рабочее перемещение (G1/G2/G3, L/C без FMAX) с длиной хорды
+    /// </summary>
+    private bool TryParseMove(string line, out double length)
+    {
+        length = 0;
+        var text = StripComment(line);
+        if (text.Length == 0 || text[0] == '%')
+            return false;
+
+        var words = new double?[3];
+        int? blockCode = null;
+        var rapid = false;
+
+        foreach (var token in text.Split(new[] { ' ', '\t' }, StringSplitOptions.RemoveEmptyEntries))
+        {
+            var upper = token.ToUpperInvariant();
+            switch (upper)
+            {
+                case "L":
+                    blockCode = 1;
+                    continue;
+                case "C":
+                    blockCode = 2;
+                    continue;
+                case "CC":
+                    // Центр окружности Heidenhain - не перемещение
+                    return false;
+                case "FMAX":
+                    rapid = true;
+                    continue;
+            }
+
+            if (IgnoredWords.Contains(upper) || char.IsAsciiDigit(upper[0]))
+                continue;
+
+            if (!char.IsAsciiLetter(upper[0]) ||
+                !double.TryParse(upper.AsSpan(1), NumberStyles.Float, CultureInfo.InvariantCulture, out var value))
+            {
+                // Вызовы циклов, метки и прочие конструкции - не перемещение
+                return false;
+            }
+
+            switch (upper[0])
+            {
+                case 'G':
+                    switch (value)
+                    {
+                        case 0 or 1 or 2 or 3:
+                            _motionCode = (int)value;
+                            break;
+                        case 90:
+                            _incremental = false;
+                            break;
+                        case 91:
+                            _incremental = true;
+                            break;
+                        case 28 or 53:
+                            // Координаты кадра заданы не в системе детали
+                            Array.Fill(_position, double.NaN);
+                            return false;
+                    }
+                    break;
+                case 'X':
+                    words[0] = value;
+                    break;
+                case 'Y':
+                    words[1] = value;
+                    break;
+                case 'Z':
+                    words[2] = value;
+                    break;
+                case 'F':
+                    _feed = value;
+                    break;
+            }
+        }
+
+        // L/C Heidenhain задаются в каждом кадре, G0-G3 модальны; FMAX - ускоренный ход кадра
+        var code = rapid ? 0 : blockCode ?? _motionCode;
+
+        var squared = 0.0;
+        var hasAxis = false;
+        for (int axis = 0; axis < 3; axis++)
+        {
+            if (words[axis] is not { } word)
+                continue;
+
+            hasAxis = true;
+            var target = _incremental ? _position[axis] + word : word;
+            var delta = _incremental ? word : word - _position[axis];
+            squared += double.IsNaN(delta) ? 0 : delta * delta;
+            _position[axis] = target;
+        }
+
+        if (!hasAxis || code is < 1 or > 3)
+            return false;
+
+        length = Math.Sqrt(squared);
+        return true;
+    }
+
+    private List<string> OnBlocks()
+    {
+        var tolerance = FormatTolerance();
+        if (_options.OnBlock != null)
+            return new List<string> { _options.OnBlock.Replace("{tolerance}", tolerance) };
+
+        return _options.Dialect switch
+        {
+            HighSpeedDialect.Siemens => new List<string> { $"CYCLE832({tolerance},{SiemensMode()},1)" },
+            HighSpeedDialect.Haas => new List<string> { $"G187 P{HaasLevel()} E{tolerance}" },
+            HighSpeedDialect.Heidenhain => new List<string>
+            {
+                "CYCL DEF 32.0 TOLERANCE",
+                $"CYCL DEF 32.1 T{tolerance}",
+                $"CYCL DEF 32.2 HSC-MODE:{(_options.Tolerance > 0.05 ? 1 : 0)}"
+            },
+            // Допуск AI контурного управления задаётся параметрами УЧПУ, не кадром
+            _ => new List<string> { "G05.1 Q1" }
+        };
+    }
+
+    private List<string> OffBlocks()
+    {
+        if (_options.OffBlock != null)
+            return new List<string> { _options.OffBlock };
+
+        return _options.Dialect switch
+        {
+            HighSpeedDialect.Siemens => new List<string> { "CYCLE832(0,_OFF,1)" },
+            HighSpeedDialect.Haas => new List<string> { "G187" },
+            HighSpeedDialect.Heidenhain => new List<string> { "CYCL DEF 32.0 TOLERANCE", "CYCL DEF 32.1" },
+            _ => new List<string> { "G05.1 Q0" }
+        };
+    }
+
+    // Режим по допуску: до 0.01 - чистовой, до 0.05 - получистовой, больше - черновой
+    private string SiemensMode() => _options.Tolerance switch
+    {
+        <= 0.01 => "_FINISH",
+        <= 0.05 => "_SEMIFIN",
+        _ => "_ROUGH"
+    };
+
+    private int HaasLevel() => _options.Tolerance switch
+    {
+        <= 0.01 => 3,
+        <= 0.05 => 2,
+        _ => 1
+    };
+
+    private string FormatTolerance() =>
+        _options.Tolerance.ToString("0." + new string('#', Math.Max(_options.Decimals, 1)), CultureInfo.InvariantCulture);
+
+    private sealed class Operation
+    {
+        public int? FirstMove { get; set; }
+        public int LastMove { get; set; }
+        public int Moves { get; set; }
+        public double Length { get; set; }
+        public double Minutes { get; set; }
+        public bool TimeKnown { get; set; } = true;
+        public bool HasHighSpeedMode { get; set; }
+    }
+}
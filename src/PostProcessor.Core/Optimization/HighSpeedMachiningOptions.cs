@@ -0,0 +1,111 @@
+namespace PostProcessor.Core.Optimization;
+
+/// <summary>
+/// Синтаксис включения режима высокоскоростной обработки (упреждающего просмотра)
+/// </summary>
+public enum HighSpeedDialect
+{
+    /// <summary>
+    /// Fanuc 31i/32i: AI контурное управление G05.1 Q1 ... G05.1 Q0
+    /// </summary>
+    Fanuc,
+
+    /// <summary>
+    /// Haas NGC: G187 P1-P3 E(допуск) ... G187
+    /// </summary>
+    Haas,
+
+    /// <summary>
+    /// Siemens 840D: CYCLE832(допуск, режим, 1) ... CYCLE832(0,_OFF,1)
+    /// </summary>
+    Siemens,
+
+    /// <summary>
+    /// Heidenhain TNC: CYCL DEF 32 TOLERANCE ... сброс CYCL DEF 32.1 без T
+    /// </summary>
+    Heidenhain
+}
+
+/// <summary>
+/// Параметры автоматического включения режима высокоскоростной обработки
+/// </summary>
+public record HighSpeedMachiningOptions
+{
+    /// <summary>
+    /// Синтаксис режима
+    /// </summary>
+    public HighSpeedDialect Dialect { get; init; } = HighSpeedDialect.Fanuc;
+
+    /// <summary>
+    /// Допуск контура, мм (Siemens, Haas, Heidenhain; также выбирает черновой/чистовой режим)
+    /// </summary>
+    public double Tolerance { get; init; } = 0.01;
+
+    /// <summary>
+    /// Минимальное количество рабочих перемещений в операции
+    /// </summary>
+    public int MinBlocks { get; init; } = 20;
+
+    /// <summary>
+    /// Средняя длина рабочего перемещения, мм, при которой операция включается в режим
+    /// </summary>
+    public double MaxSegmentLength { get; init; } = 0.5;
+
+    /// <summary>
+    /// Темп обработки кадров, кадр/с, при котором операция включается в режим
+    /// </summary>
+    public double MinBlockRate { get; init; } = 50;
+
+    /// <summary>
+    /// Кадр включения вместо стандартного ({tolerance} заменяется допуском)
+    /// </summary>
+    public string? OnBlock { get; init; }
+
+    /// <summary>
+    /// Кадр выключения вместо стандартного
+    /// </summary>
+    public string? OffBlock { get; init; }
+
+    /// <summary>
+    /// Количество знаков после запятой для допуска
+    /// </summary>
+    public int Decimals { get; init; } = 3;
+
+    /// <summary>
+    /// Определить синтаксис режима по имени контроллера
+    /// </summary>
+    /// <param name="controllerName">Имя контроллера из конфигурации (например, "Fanuc 31i")</param>
+    /// <returns>Синтаксис или null, если контроллер не поддерживается</returns>
+    public static HighSpeedDialect? DetectDialect(string? controllerName)
+    {
+        if (string.IsNullOrWhiteSpace(controllerName))
+            return null;
+
+        var name = controllerName.ToLowerInvariant();
+        if (name.Contains("haas"))
+            return HighSpeedDialect.Haas;
+        if (name.Contains("fanuc"))
+            return HighSpeedDialect.Fanuc;
+        if (name.Contains("siemens") || name.Contains("sinumerik"))
+            return HighSpeedDialect.Siemens;
+        if (name.Contains("heidenhain") || name.Contains("tnc"))
+            return HighSpeedDialect.Heidenhain;
+
+        return null;
+    }
+}
+
+/// <summary>
+/// Результат включения режима высокоскоростной обработки
+/// </summary>
+/// <param name="OperationCount">Количество операций (участков между сменами инструмента)</param>
+/// <param name="WrappedOperations">Количество операций, обрамлённых включением/выключением режима</param>
+/// <param name="WrappedBlocks">Количество рабочих перемещений в обрамлённых операциях</param>
+/// <param name="InputLines">Количество строк исходной программы</param>
+/// <param name="OutputLines">Количество строк результирующей программы</param>
+public record HighSpeedMachiningResult(
+    int OperationCount,
+    int WrappedOperations,
+    int WrappedBlocks,
+    int InputLines,
+    int OutputLines);
@@ -0,0 +1,524 @@
+using System.Globalization;
+using System.Text;
+
+namespace PostProcessor.Core.Optimization;
+
+/// <summary>
+/// Замена черновых проходов токарной программы постоянными циклами.
+/// Работает над готовой УП: находит серию проходов, параллельных оси Z (G71) или X (G72),
+/// за которой следует чистовой контур, проверяет, что концы проходов лежат на контуре
+/// со смещением на постоянный припуск, и заменяет серию циклом с контуром в диапазоне
+/// кадров P-Q (Fanuc: G71/G72 + G70) или между метками (Siemens: CYCLE95).
+/// Распознаётся наружная обработка по монотонному контуру (тип I); после цикла инструмент
+/// находится в точке начала цикла. Остальные фрагменты программы переносятся без изменений.
+/// </summary>
+public class LatheCycleCompactor
+{
+    private readonly LatheCycleOptions _options;
+    private readonly string _numberFormat;
+    private readonly List<Move> _moves = new();
+    private readonly Dictionary<int, string> _fixups = new();
+    private string _rapidCode;
+    private string _linearCode;
+    private int _nextSequence;
+    private int _cycleCount;
+
+    /// <summary>
+    /// Создать преобразователь
+    /// </summary>
+    /// <param name="options">Параметры (null - значения по умолчанию)</param>
+    public LatheCycleCompactor(LatheCycleOptions? options = null)
+    {
+        _options = options ?? new LatheCycleOptions();
+        if (_options.MinPasses < 2)
+            throw new ArgumentOutOfRangeException(nameof(options), "MinPasses must be at least 2");
+
+        _numberFormat = "F" + _options.Decimals.ToString(CultureInfo.InvariantCulture);
+        var siemens = _options.Dialect == SubprogramDialect.Siemens;
+        _rapidCode = siemens ? "G0" : "G00";
+        _linearCode = siemens ? "G1" : "G01";
+    }
+
+    /// <summary>
+    /// Заменить черновые проходы циклами в файле
+    /// </summary>
+    /// <param name="inputPath">Исходная УП</param>
+    /// <param name="outputPath">Результирующая УП</param>
+    /// <param name="options">Параметры</param>
+    public static LatheCycleCompactionResult CompactFile(
+        string inputPath,
+        string outputPath,
+        LatheCycleOptions? options = null)
+    {
+        var lines = File.ReadAllLines(inputPath);
+
+        using var writer = new StreamWriter(outputPath, false, new UTF8Encoding(false));
+        return new LatheCycleCompactor(options).Compact(lines, writer);
+    }
+
+    /// <summary>
+    /// Заменить черновые проходы циклами
+    /// </summary>
+    /// <param name="lines">Строки УП</param>
+    /// <param name="writer">Выходной поток</param>
+    /// <returns>Статистика замены</returns>
+    public LatheCycleCompactionResult Compact(IReadOnlyList<string> lines, TextWriter writer)
+    {
+        Parse(lines);
+        var cycles = FindCycles(lines);
+
+        var outputLines = 0;
+        var replacedBlocks = 0;
+        var next = 0;
+        var line = 0;
+        while (line < lines.Count)
+        {
+            if (next < cycles.Count && cycles[next].FirstLine == line)
+            {
+                var cycle = cycles[next++];
+                foreach (var text in cycle.Lines)
+                    writer.WriteLine(text);
+                outputLines += cycle.Lines.Count;
+                replacedBlocks += cycle.ReplacedBlocks;
+                line = cycle.LastLine + 1;
+                continue;
+            }
+
+            writer.WriteLine(_fixups.TryGetValue(line, out var fixup) ? fixup : lines[line]);
+            outputLines++;
+            line++;
+        }
+
+        return new LatheCycleCompactionResult(cycles.Count, replacedBlocks, lines.Count, outputLines);
+    }
+
+    // Разбор кадров G0/G1 с абсолютными X/Z; любой другой кадр разрывает серию перемещений
+    private void Parse(IReadOnlyList<string> lines)
+    {
+        _moves.Clear();
+        _fixups.Clear();
+        _cycleCount = 0;
+
+        var words = new List<Word>();
+        double x = double.NaN, z = double.NaN, feed = double.NaN;
+        var code = -1;
+        var incremental = false;
+        var run = 0;
+        var maxSequence = 0;
+
+        for (int index = 0; index < lines.Count; index++)
+        {
+            var line = lines[index];
+            if (string.IsNullOrWhiteSpace(line))
+                continue;
+
+            if (!TryReadWords(line, words, out var hasComment))
+            {
+                // Неизвестная конструкция (метки, вызовы циклов) - позиция больше не достоверна
+                x = z = double.NaN;
+                run++;
+                continue;
+            }
+
+            var pure = !hasComment;
+            var explicitCode = -1;
+            var positioning = false;
+            var otherAxis = false;
+            double? wordX = null, wordZ = null, wordFeed = null;
+
+            foreach (var word in words)
+            {
+                switch (word.Letter)
+                {
+                    case 'N':
+                        maxSequence = Math.Max(maxSequence, (int)Math.Min(word.Value, int.MaxValue));
+                        break;
+                    case 'G' when word.Value is 0 or 1 or 2 or 3:
+                        explicitCode = (int)word.Value;
+                        if (explicitCode == 0)
+                            _rapidCode = word.Text;
+                        else if (explicitCode == 1)
+                            _linearCode = word.Text;
+                        break;
+                    case 'G':
+                        if (word.Value == 90)
+                            incremental = false;
+                        else if (word.Value == 91)
+                            incremental = true;
+                        else
+                            positioning = true;
+                        pure = false;
+                        break;
+                    case 'X':
+                        wordX = word.Value;
+                        break;
+                    case 'Z':
+                        wordZ = word.Value;
+                        break;
+                    case 'F':
+                        wordFeed = word.Value;
+                        break;
+                    default:
+                        otherAxis |= word.Letter is 'U' or 'W' or 'Y';
+                        pure = false;
+                        break;
+                }
+            }
+
+            if (explicitCode >= 0)
+                code = explicitCode;
+            if (wordFeed.HasValue)
+                feed = wordFeed.Value;
+
+            double fromX = x, fromZ = z;
+            if (positioning || incremental || otherAxis)
+            {
+                // G28/G50/U/W: координаты кадра не являются абсолютной позицией детали
+                if (wordX.HasValue || wordZ.HasValue || otherAxis)
+                    x = z = double.NaN;
+            }
+            else
+            {
+                x = wordX ?? x;
+                z = wordZ ?? z;
+            }
+
+            pure = pure && !incremental && code is 0 or 1 && (wordX.HasValue || wordZ.HasValue) &&
+                !double.IsNaN(fromX) && !double.IsNaN(fromZ) && !double.IsNaN(x) && !double.IsNaN(z) &&
+                (code == 0 || !double.IsNaN(feed));
+
+            if (pure)
+                _moves.Add(new Move(index, run, code, explicitCode >= 0, wordFeed.HasValue, fromX, fromZ, x, z, feed));
+            else
+                run++;
+        }
+
+        _nextSequence = Math.Max(_options.FirstSequenceNumber, maxSequence + 1);
+    }
+
+    private List<Cycle> FindCycles(IReadOnlyList<string> lines)
+    {
+        var cycles = new List<Cycle>();
+        var k = 0;
+        while (k < _moves.Count)
+        {
+            if (TryMatch(k, facing: false, out var cycle) || TryMatch(k, facing: true, out cycle))
+            {
+                cycles.Add(cycle);
+                k = cycle.NextMove;
+
+                // Следующий кадр не должен зависеть от модальных G0/G1 и F внутри заменённого фрагмента
+                if (k < _moves.Count)
+                    MakeExplicit(lines, _moves[k]);
+            }
+            else
+            {
+                k++;
+            }
+        }
+        return cycles;
+    }
+
+    /// <summary>
+    /// Найти серию проходов с чистовым контуром, начиная с перемещения k.
+    /// Продольная обработка (G71): врезание по X, проход по Z, отвод по X, возврат по Z.
+    /// Торцевая (G72): то же с заменой осей.
+    /// </summary>
+    private bool TryMatch(int k, bool facing, out Cycle cycle)
+    {
+        cycle = default;
+        var tolerance = _options.Tolerance;
+        var first = _moves[k];
+        var start = Cut(first.FromX, first.FromZ, facing);
+
+        // Черновые проходы
+        var passes = new List<Pass>();
+        var i = k;
+        while (i + 3 < _moves.Count && _moves[i + 3].Run == first.Run)
+        {
+            Move a = _moves[i], b = _moves[i + 1], c = _moves[i + 2], d = _moves[i + 3];
+            var depth = Depth(a.X, a.Z, facing);
+
+            var infeed = Near(Cut(a.FromX, a.FromZ, facing), start) && Near(Cut(a.X, a.Z, facing), start) &&
+                depth < Depth(a.FromX, a.FromZ, facing) - tolerance;
+            var cut = b.Code == 1 && Near(Depth(b.X, b.Z, facing), depth) && Cut(b.X, b.Z, facing) < start - tolerance;
+            var retract = Near(Cut(c.X, c.Z, facing), Cut(b.X, b.Z, facing)) && Depth(c.X, c.Z, facing) > depth + tolerance;
+            var back = d.Code == 0 && Near(Depth(d.X, d.Z, facing), Depth(c.X, c.Z, facing)) && Near(Cut(d.X, d.Z, facing), start);
+            if (!infeed || !cut || !retract || !back)
+                break;
+            if (passes.Count > 0 && (depth >= passes[^1].Depth - tolerance || !Near(b.Feed, passes[0].Feed)))
+                break;
+
+            passes.Add(new Pass(depth, Cut(b.X, b.Z, facing), Depth(c.X, c.Z, facing) - depth, b.Feed));
+            i += 4;
+        }
+
+        if (passes.Count < _options.MinPasses)
+            return false;
+
+        // Постоянная глубина (последний проход может быть меньше) и постоянный отвод
+        var step = 0.0;
+        for (int p = 1; p < passes.Count; p++)
+            step = Math.Max(step, passes[p - 1].Depth - passes[p].Depth);
+        for (int p = 1; p < passes.Count; p++)
+        {
+            var delta = passes[p - 1].Depth - passes[p].Depth;
+            if (p < passes.Count - 1 ? !Near(delta, step) : delta > step + tolerance)
+                return false;
+        }
+        if (passes.Any(p => !Near(p.Retract, passes[0].Retract)))
+            return false;
+
+        // Чистовой контур: подвод по оси врезания, затем G1 монотонно от торца
+        if (i + 1 >= _moves.Count || _moves[i + 1].Run != first.Run)
+            return false;
+        var approach = _moves[i];
+        if (!Near(Cut(approach.FromX, approach.FromZ, facing), start) || !Near(Cut(approach.X, approach.Z, facing), start))
+            return false;
+
+        var points = new List<(double Depth, double Cut)> { (Depth(approach.X, approach.Z, facing), start) };
+        var q = i + 1;
+        while (q < _moves.Count && _moves[q].Run == first.Run && _moves[q].Code == 1)
+        {
+            var move = _moves[q];
+            var depthDelta = Depth(move.X, move.Z, facing) - Depth(move.FromX, move.FromZ, facing);
+            var cutDelta = Cut(move.X, move.Z, facing) - Cut(move.FromX, move.FromZ, facing);
+            if (depthDelta < -tolerance || cutDelta > tolerance)
+                break;
+
+            points.Add((Depth(move.X, move.Z, facing), Cut(move.X, move.Z, facing)));
+            q++;
+        }
+        if (points.Count < 2 || !points.Any(p => p.Cut < start - tolerance))
+            return false;
+
+        if (!TryFindAllowance(passes, points, out var allowance))
+            return false;
+
+        var profile = _moves.GetRange(i, q - i);
+        var lines = _options.Dialect == SubprogramDialect.Siemens
+            ? FormatSiemens(profile, passes, step, allowance, facing)
+            : FormatFanuc(profile, passes, step, allowance, facing);
+
+        cycle = new Cycle(first.Line, _moves[q - 1].Line, q, passes.Count * 4, lines);
+        return true;
+    }
+
+    /// <summary>
+    /// Концы всех проходов должны лежать на контуре, смещённом по оси врезания
+    /// на один и тот же припуск (на вертикальных участках контура - в пределах участка).
+    /// Из допустимых значений выбирается наибольшее: цикл не врезается глубже проходов CAM.
+    /// </summary>
+    private bool TryFindAllowance(List<Pass> passes, List<(double Depth, double Cut)> points, out double allowance)
+    {
+        var tolerance = _options.Tolerance;
+        double low = double.NegativeInfinity, high = double.PositiveInfinity;
+        allowance = 0;
+
+        foreach (var pass in passes)
+        {
+            double min = double.PositiveInfinity, max = double.NegativeInfinity;
+            for (int s = 1; s < points.Count; s++)
+            {
+                var (d0, c0) = points[s - 1];
+                var (d1, c1) = points[s];
+                if (pass.End < Math.Min(c0, c1) - tolerance || pass.End > Math.Max(c0, c1) + tolerance)
+                    continue;
+
+                if (Math.Abs(c1 - c0) <= tolerance)
+                {
+                    min = Math.Min(min, Math.Min(d0, d1));
+                    max = Math.Max(max, Math.Max(d0, d1));
+                }
+                else
+                {
+                    var t = Math.Clamp((pass.End - c0) / (c1 - c0), 0, 1);
+                    var d = d0 + (d1 - d0) * t;
+                    min = Math.Min(min, d);
+                    max = Math.Max(max, d);
+                }
+            }
+
+            if (min > max)
+                return false;
+            low = Math.Max(low, pass.Depth - max);
+            high = Math.Min(high, pass.Depth - min);
+        }
+
+        if (low > high + tolerance || high < -tolerance)
+            return false;
+
+        allowance = Math.Max(0, high);
+        return true;
+    }
+
+    private List<string> FormatFanuc(List<Move> profile, List<Pass> passes, double step, double allowance, bool facing)
+    {
+        // Глубина и отвод G71 - на радиус (X задаётся диаметром), G72 - по Z
+        var scale = facing ? 1.0 : 0.5;
+        var first = _nextSequence;
+        var last = _nextSequence + 1;
+        _nextSequence += 2;
+        _cycleCount++;
+
+        var cycleCode = facing ? _options.FacingCycle : _options.TurningCycle;
+        var lines = new List<string>
+        {
+            $"{cycleCode} {(facing ? 'W' : 'U')}{Format(step * scale)} R{Format(passes[0].Retract * scale)}",
+            $"{cycleCode} P{first} Q{last} U{Format(facing ? 0 : allowance)} W{Format(facing ? allowance : 0)} F{Format(passes[0].Feed)}"
+        };
+
+        var contour = FormatProfile(profile, facing);
+        contour[0] = $"N{first} {contour[0]}";
+        contour[^1] = $"N{last} {contour[^1]}";
+        lines.AddRange(contour);
+
+        lines.Add($"{_options.FinishingCycle} P{first} Q{last}");
+        return lines;
+    }
+
+    private List<string> FormatSiemens(List<Move> profile, List<Pass> passes, double step, double allowance, bool facing)
+    {
+        // CYCLE95: глубина, припуски и отвод - на радиус; VARI 9/10 - продольная/торцевая, черновая и чистовая
+        var scale = facing ? 1.0 : 0.5;
+        var label = $"CONTOUR{++_cycleCount}";
+        var finishFeed = profile.Skip(1).First().Feed;
+
+        var lines = new List<string>
+        {
+            string.Create(CultureInfo.InvariantCulture,
+                $"CYCLE95(\"{label}_S:{label}_E\", {Format(step * scale)}, {Format(facing ? allowance : 0)}, {Format(facing ? 0 : allowance * scale)}, 0, " +
+                $"{Format(passes[0].Feed)}, {Format(passes[0].Feed)}, {Format(finishFeed)}, {(facing ? 10 : 9)}, 0, 0, {Format(passes[0].Retract * scale)})"),
+            $"GOTOF {label}_E",
+            $"{label}_S:"
+        };
+        lines.AddRange(FormatProfile(profile, facing));
+        lines.Add($"{label}_E:");
+        return lines;
+    }
+
+    // Контур: подвод только по оси врезания, далее изменившиеся оси; G-код и подача - при изменении
+    private List<string> FormatProfile(List<Move> profile, bool facing)
+    {
+        var lines = new List<string>();
+        var approach = profile[0];
+        lines.Add($"{(approach.Code == 0 ? _rapidCode : _linearCode)} {(facing ? "Z" + Format(approach.Z) : "X" + Format(approach.X))}");
+
+        var code = approach.Code;
+        var feed = approach.Code == 1 ? approach.Feed : double.NaN;
+        for (int m = 1; m < profile.Count; m++)
+        {
+            var move = profile[m];
+            var text = new StringBuilder();
+            if (code != 1)
+                text.Append(_linearCode);
+            if (!Near(move.X, move.FromX))
+                text.Append(text.Length > 0 ? " " : "").Append('X').Append(Format(move.X));
+            if (!Near(move.Z, move.FromZ))
+                text.Append(text.Length > 0 ? " " : "").Append('Z').Append(Format(move.Z));
+            if (!Near(move.Feed, feed))
+                text.Append(" F").Append(Format(move.Feed));
+
+            code = 1;
+            feed = move.Feed;
+            lines.Add(text.ToString());
+        }
+        return lines;
+    }
+
+    private void MakeExplicit(IReadOnlyList<string> lines, Move move)
+    {
+        if (move.ExplicitCode && (move.Code == 0 || move.HasFeedWord))
+            return;
+
+        var text = lines[move.Line].Trim();
+        if (!move.ExplicitCode)
+        {
+            var code = move.Code == 0 ? _rapidCode : _linearCode;
+            var space = text.IndexOf(' ');
+            text = text[0] == 'N' && space > 0
+                ? $"{text[..space]} {code}{text[space..]}"
+                : $"{code} {text}";
+        }
+        if (move.Code == 1 && !move.HasFeedWord)
+            text += " F" + Format(move.Feed);
+
+        _fixups[move.Line] = text;
+    }
+
+    private static bool TryReadWords(string line, List<Word> words, out bool hasComment)
+    {
+        words.Clear();
+        hasComment = false;
+
+        var text = line.AsSpan();
+        var position = 0;
+        while (position < text.Length)
+        {
+            var c = text[position];
+            if (char.IsWhiteSpace(c) || c == '%')
+            {
+                position++;
+            }
+            else if (c == '(')
+            {
+                hasComment = true;
+                var end = text[position..].IndexOf(')');
+                position = end < 0 ? text.Length : position + end + 1;
+            }
+            else if (c == ';')
+            {
+                hasComment = true;
+                break;
+            }
+            else if (char.IsAsciiLetter(c))
+            {
+                var start = position++;
+                while (position < text.Length && (char.IsAsciiDigit(text[position]) || text[position] is '.' or '+' or '-'))
+                    position++;
+                if (position == start + 1 ||
+                    !double.TryParse(text[(start + 1)..position], NumberStyles.Float, CultureInfo.InvariantCulture, out var value))
+                    return false;
+
+                words.Add(new Word(char.ToUpperInvariant(c), value, text[start..position].ToString()));
+            }
+            else
+            {
+                return false;
+            }
+        }
+        return true;
+    }
+
+    private static double Depth(double x, double z, bool facing) => facing ? z : x;
+
+    private static double Cut(double x, double z, bool facing) => facing ? x : z;
+
+    private bool Near(double a, double b) => Math.Abs(a - b) <= _options.Tolerance;
+
+    private string Format(double value) => value.ToString(_numberFormat, CultureInfo.InvariantCulture);
+
+    private readonly record struct Word(char Letter, double Value, string Text);
+
+    /// <summary>
+    /// Кадр G0/G1 с абсолютными координатами до и после перемещения
+    /// </summary>
+    private readonly record struct Move(
+        int Line,
+        int Run,
+        int Code,
+        bool ExplicitCode,
+        bool HasFeedWord,
+        double FromX,
+        double FromZ,
+        double X,
+        double Z,
+        double Feed);
+
+    /// <summary>
+    /// Черновой проход: уровень врезания, конец прохода, отвод и подача
+    /// </summary>
+    private readonly record struct Pass(double Depth, double End, double Retract, double Feed);
+
+    private readonly record struct Cycle(int FirstLine, int LastLine, int NextMove, int ReplacedBlocks, List<string> Lines);
+}
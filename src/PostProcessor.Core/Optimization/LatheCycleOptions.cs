@@ -0,0 +1,60 @@
+namespace PostProcessor.Core.Optimization;
+
+/// <summary>
+/// Параметры замены черновых проходов токарной программы постоянными циклами
+/// </summary>
+public record LatheCycleOptions
+{
+    /// <summary>
+    /// Синтаксис циклов: Fanuc - G71/G72 + G70, Siemens - CYCLE95
+    /// </summary>
+    public SubprogramDialect Dialect { get; init; } = SubprogramDialect.Fanuc;
+
+    /// <summary>
+    /// Цикл продольной черновой обработки (Fanuc)
+    /// </summary>
+    public string TurningCycle { get; init; } = "G71";
+
+    /// <summary>
+    /// Цикл торцевой черновой обработки (Fanuc)
+    /// </summary>
+    public string FacingCycle { get; init; } = "G72";
+
+    /// <summary>
+    /// Цикл чистовой обработки по контуру P-Q (Fanuc)
+    /// </summary>
+    public string FinishingCycle { get; init; } = "G70";
+
+    /// <summary>
+    /// Минимальное количество черновых проходов для замены циклом
+    /// </summary>
+    public int MinPasses { get; init; } = 2;
+
+    /// <summary>
+    /// Номер первого кадра контура (P/Q); при нумерации программы выше - следующий за максимальным
+    /// </summary>
+    public int FirstSequenceNumber { get; init; } = 9000;
+
+    /// <summary>
+    /// Количество знаков после запятой для координат и подачи
+    /// </summary>
+    public int Decimals { get; init; } = 3;
+
+    /// <summary>
+    /// Допуск сравнения координат (глубина проходов, отвод, припуск)
+    /// </summary>
+    public double Tolerance { get; init; } = 0.005;
+}
+
+/// <summary>
+/// Результат замены черновых проходов циклами
+/// </summary>
+/// <param name="CycleCount">Количество вставленных циклов</param>
+/// <param name="ReplacedBlocks">Количество кадров черновых проходов, заменённых циклами</param>
+/// <param name="InputLines">Количество строк исходной программы</param>
+/// <param name="OutputLines">Количество строк результирующей программы</param>
+public record LatheCycleCompactionResult(
+    int CycleCount,
+    int ReplacedBlocks,
+    int InputLines,
+    int OutputLines);
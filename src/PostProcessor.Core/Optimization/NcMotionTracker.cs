@@ -0,0 +1,226 @@
+using System.Globalization;
+
+namespace PostProcessor.Core.Optimization;
+
+/// <summary>
+/// Относительное перемещение одного кадра G0/G1 в целых единицах дискреты
+/// </summary>
+internal readonly record struct RelativeMove(int Code, long Dx, long Dy, long Dz, long Feed)
+{
+    /// <summary>
+    /// 64-битный хэш перемещения для полиномиального хэширования последовательностей
+    /// </summary>
+    public ulong Hash()
+    {
+        unchecked
+        {
+            var h = (ulong)Code + 0x9E3779B97F4A7C15UL;
+            h = Mix(h ^ (ulong)Dx);
+            h = Mix(h ^ (ulong)Dy);
+            h = Mix(h ^ (ulong)Dz);
+            h = Mix(h ^ (ulong)Feed);
+            return h;
+        }
+    }
+
+    private static ulong Mix(ulong z)
+    {
+        unchecked
+        {
+            z = (z ^ (z >> 30)) * 0xBF58476D1CE4E5B9UL;
+            z = (z ^ (z >> 27)) * 0x94D049BB133111EBUL;
+            return z ^ (z >> 31);
+        }
+    }
+}
+
+/// <summary>
+/// Построчный разбор готовой УП: отслеживает абсолютную позицию и модальные G0/G1/F,
+/// выделяя "чистые" кадры перемещения, пригодные для выноса в подпрограмму.
+/// Любой другой кадр (смена инструмента, дуги, циклы, комментарии) считается барьером.
+/// </summary>
+internal sealed class NcMotionTracker
+{
+    private readonly double _scale;
+
+    private readonly long[] _position = new long[3];
+    private readonly bool[] _known = new bool[3];
+    private readonly long?[] _words = new long?[3];
+    private int _motionCode = -1;
+    private long? _feed;
+    private bool _incremental;
+
+    public NcMotionTracker(int decimals)
+    {
+        _scale = Math.Pow(10, decimals);
+    }
+
+    /// <summary>
+    /// Разобрать очередную строку программы
+    /// </summary>
+    /// <param name="line">Строка УП</param>
+    /// <param name="move">Относительное перемещение, если кадр пригоден для выноса</param>
+    /// <param name="sequence">Номер кадра (например, "N120"), если присутствует</param>
+    /// <returns>true если строка является чистым кадром перемещения G0/G1</returns>
+    public bool TryParse(string line, out RelativeMove move, out string? sequence)
+    {
+        move = default;
+        sequence = null;
+
+        var text = line.AsSpan().Trim();
+        var commentStart = text.IndexOfAny('(', ';');
+        var hasComment = commentStart >= 0;
+        if (hasComment)
+            text = text[..commentStart].TrimEnd();
+
+        if (text.IsEmpty || text[0] == '%')
+            return false;
+
+        Array.Clear(_words);
+        long? feed = null;
+        var hasOther = false;
+        var positioningCode = false;
+        var explicitCode = -1;
+
+        while (!text.IsEmpty)
+        {
+            var end = text.IndexOfAny(' ', '\t');
+            var token = end < 0 ? text : text[..end];
+            text = end < 0 ? ReadOnlySpan<char>.Empty : text[(end + 1)..];
+            if (token.IsEmpty)
+                continue;
+
+            var letter = char.ToUpperInvariant(token[0]);
+            if (!char.IsAsciiLetter(letter) ||
+                !double.TryParse(token[1..], NumberStyles.Float, CultureInfo.InvariantCulture, out var value))
+            {
+                // Неизвестная конструкция - позиция больше не достоверна
+                Invalidate();
+                return false;
+            }
+
+            switch (letter)
+            {
+                case 'N':
+                    sequence = token.ToString();
+                    break;
+                case 'G':
+                    switch (value)
+                    {
+                        case 0 or 1 or 2 or 3:
+                            explicitCode = (int)value;
+                            break;
+                        case 90:
+                            _incremental = false;
+                            hasOther = true;
+                            break;
+                        case 91:
+                            _incremental = true;
+                            hasOther = true;
+                            break;
+                        default:
+                            // G28/G53/G92 и подобные: координаты кадра не являются позицией в системе детали
+                            positioningCode = true;
+                            hasOther = true;
+                            break;
+                    }
+                    break;
+                case 'X':
+                    _words[0] = Quantize(value);
+                    break;
+                case 'Y':
+                    _words[1] = Quantize(value);
+                    break;
+                case 'Z':
+                    _words[2] = Quantize(value);
+                    break;
+                case 'F':
+                    feed = Quantize(value);
+                    break;
+                default:
+                    hasOther = true;
+                    break;
+            }
+        }
+
+        if (explicitCode >= 0)
+            _motionCode = explicitCode;
+
+        var hasAxis = false;
+        var axesKnown = true;
+        long dx = 0, dy = 0, dz = 0;
+        for (int axis = 0; axis < 3; axis++)
+        {
+            if (_words[axis] is not { } word)
+                continue;
+
+            hasAxis = true;
+            if (positioningCode)
+            {
+                axesKnown = false;
+                _known[axis] = false;
+                continue;
+            }
+
+            if (_incremental)
+            {
+                axesKnown = false;
+                _position[axis] += word;
+                continue;
+            }
+
+            if (_known[axis])
+            {
+                var delta = word - _position[axis];
+                if (axis == 0) dx = delta;
+                else if (axis == 1) dy = delta;
+                else dz = delta;
+            }
+            else
+            {
+                axesKnown = false;
+            }
+
+            _position[axis] = word;
+            _known[axis] = true;
+        }
+
+        if (feed.HasValue)
+            _feed = feed;
+
+        if (hasComment || hasOther || _incremental || !hasAxis || !axesKnown)
+            return false;
+
+        switch (_motionCode)
+        {
+            case 0 when !feed.HasValue:
+                move = new RelativeMove(0, dx, dy, dz, 0);
+                return true;
+            case 1 when _feed.HasValue:
+                move = new RelativeMove(1, dx, dy, dz, _feed.Value);
+                return true;
+            default:
+                return false;
+        }
+    }
+
+    /// <summary>
+    /// Форматировать значение в единицах дискреты
+    /// </summary>
+    public string Format(long units, int decimals)
+    {
+        return (units / _scale).ToString("F" + decimals, CultureInfo.InvariantCulture);
+    }
+
+    private long Quantize(double value)
+    {
+        return (long)Math.Round(value * _scale, MidpointRounding.AwayFromZero);
+    }
+
+    private void Invalidate()
+    {
+        Array.Clear(_known);
+        _motionCode = -1;
+        _feed = null;
+    }
+}
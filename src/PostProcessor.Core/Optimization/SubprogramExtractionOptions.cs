@@ -0,0 +1,83 @@
+namespace PostProcessor.Core.Optimization;
+
+/// <summary>
+/// Синтаксис подпрограмм, используемый при выносе повторяющихся фрагментов
+/// </summary>
+public enum SubprogramDialect
+{
+    /// <summary>
+    /// Fanuc/Haas: тело O1000 ... M99, вызов M98 P1000
+    /// </summary>
+    Fanuc,
+
+    /// <summary>
+    /// Siemens Sinumerik: тело %_N_L1000_SPF ... M17, вызов L1000
+    /// </summary>
+    Siemens
+}
+
+/// <summary>
+/// Параметры выноса повторяющихся траекторий в подпрограммы
+/// </summary>
+public record SubprogramExtractionOptions
+{
+    /// <summary>
+    /// Синтаксис подпрограмм
+    /// </summary>
+    public SubprogramDialect Dialect { get; init; } = SubprogramDialect.Fanuc;
+
+    /// <summary>
+    /// Минимальная длина повторяющегося фрагмента в кадрах перемещения
+    /// </summary>
+    public int MinBlocks { get; init; } = 4;
+
+    /// <summary>
+    /// Минимальное количество повторений фрагмента
+    /// </summary>
+    public int MinOccurrences { get; init; } = 2;
+
+    /// <summary>
+    /// Номер первой создаваемой подпрограммы
+    /// </summary>
+    public int FirstProgramNumber { get; init; } = 1000;
+
+    /// <summary>
+    /// Количество знаков после запятой для координат и подачи
+    /// (определяет точность сравнения перемещений)
+    /// </summary>
+    public int Decimals { get; init; } = 3;
+
+    /// <summary>
+    /// Определить синтаксис подпрограмм по имени контроллера
+    /// </summary>
+    /// <param name="controllerName">Имя контроллера из конфигурации (например, "Fanuc 31i")</param>
+    /// <returns>Синтаксис или null, если контроллер не поддерживается</returns>
+    public static SubprogramDialect? DetectDialect(string? controllerName)
+    {
+        if (string.IsNullOrWhiteSpace(controllerName))
+            return null;
+
+        var name = controllerName.ToLowerInvariant();
+        if (name.Contains("fanuc") || name.Contains("haas"))
+            return SubprogramDialect.Fanuc;
+        if (name.Contains("siemens") || name.Contains("sinumerik"))
+            return SubprogramDialect.Siemens;
+
+        return null;
+    }
+}
+
+/// <summary>
+/// Результат выноса подпрограмм
+/// </summary>
+/// <param name="SubprogramCount">Количество созданных подпрограмм</param>
+/// <param name="CallCount">Количество вставленных вызовов</param>
+/// <param name="ReplacedBlocks">Количество кадров основной программы, заменённых вызовами</param>
+/// <param name="InputLines">Количество строк исходной программы</param>
+/// <param name="OutputLines">Количество строк результирующей программы</param>
+public record SubprogramExtractionResult(
+    int SubprogramCount,
+    int CallCount,
+    int ReplacedBlocks,
+    int InputLines,
+    int OutputLines);
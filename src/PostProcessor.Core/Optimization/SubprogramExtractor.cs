@@ -0,0 +1,427 @@
+using System.Collections;
+using System.Text;
+
+namespace PostProcessor.Core.Optimization;
+
+/// <summary>
+/// Вынос повторяющихся траекторий в подпрограммы.
+/// Работает над готовой УП в два прохода:
+/// 1. Analyze - разбор кадров G0/G1 в относительные перемещения, поиск повторов
+///    по полиномиальным хэшам окон фиксированной длины (O(n) по числу кадров)
+/// 2. Rewrite - потоковая перезапись программы с заменой повторов вызовами
+///    и добавлением тел подпрограмм в инкрементальном режиме (G91)
+/// </summary>
+public class SubprogramExtractor
+{
+    private const ulong HashBase = 0x100000001B3UL;
+
+    // Служебные кадры подпрограммы: заголовок, G91, G90, возврат
+    private const int SubprogramOverhead = 4;
+
+    private readonly SubprogramExtractionOptions _options;
+
+    private readonly List<RelativeMove> _moves = new();
+    private readonly List<int> _runStart = new();
+    private readonly List<ulong> _prefix = new() { 0 };
+    private readonly List<ulong> _powers = new() { 1 };
+    private readonly List<Pattern> _patterns = new();
+    private readonly Dictionary<int, Pattern> _occurrences = new();
+    private int _inputLines;
+
+    /// <summary>
+    /// Создать экстрактор подпрограмм
+    /// </summary>
+    /// <param name="options">Параметры выноса (null - значения по умолчанию)</param>
+    public SubprogramExtractor(SubprogramExtractionOptions? options = null)
+    {
+        _options = options ?? new SubprogramExtractionOptions();
+        if (_options.MinBlocks < 1)
+            throw new ArgumentOutOfRangeException(nameof(options), "MinBlocks must be positive");
+        if (_options.MinOccurrences < 2)
+            throw new ArgumentOutOfRangeException(nameof(options), "MinOccurrences must be at least 2");
+    }
+
+    /// <summary>
+    /// Количество найденных подпрограмм (после Analyze)
+    /// </summary>
+    public int SubprogramCount => _patterns.Count;
+
+    /// <summary>
+    /// Первый проход: разобрать программу и найти повторяющиеся фрагменты
+    /// </summary>
+    /// <param name="lines">Строки УП</param>
+    public void Analyze(IEnumerable<string> lines)
+    {
+        Reset();
+
+        var tracker = new NcMotionTracker(_options.Decimals);
+        var runStart = -1;
+
+        foreach (var line in lines)
+        {
+            _inputLines++;
+            if (!tracker.TryParse(line, out var move, out _))
+            {
+                runStart = -1;
+                continue;
+            }
+
+            var index = _moves.Count;
+            if (runStart < 0)
+                runStart = index;
+
+            _moves.Add(move);
+            _runStart.Add(runStart);
+            unchecked
+            {
+                _prefix.Add(_prefix[index] * HashBase + move.Hash());
+                _powers.Add(_powers[index] * HashBase);
+            }
+        }
+
+        FindPatterns();
+    }
+
+    /// <summary>
+    /// Второй проход: записать программу с вызовами подпрограмм.
+    /// Должен получить те же строки, что и Analyze.
+    /// </summary>
+    /// <param name="lines">Строки УП</param>
+    /// <param name="writer">Выходной поток</param>
+    /// <returns>Статистика выноса</returns>
+    public SubprogramExtractionResult Rewrite(IEnumerable<string> lines, TextWriter writer)
+    {
+        var tracker = new NcMotionTracker(_options.Decimals);
+        var pendingTail = new List<string>();
+        var motionIndex = 0;
+        var skip = 0;
+        var outputLines = 0;
+        var callCount = 0;
+        var replacedBlocks = 0;
+
+        foreach (var line in lines)
+        {
+            if (tracker.TryParse(line, out _, out var sequence))
+            {
+                var index = motionIndex++;
+                if (skip > 0)
+                {
+                    skip--;
+                    continue;
+                }
+
+                if (_occurrences.TryGetValue(index, out var pattern))
+                {
+                    FlushTail(pendingTail, writer, ref outputLines);
+                    writer.WriteLine(FormatCall(pattern.Number, sequence));
+                    outputLines++;
+                    callCount++;
+                    replacedBlocks += pattern.Length;
+                    skip = pattern.Length - 1;
+                    continue;
+                }
+            }
+
+            // Завершающие "%" и пустые строки придерживаем, чтобы подпрограммы
+            // оказались внутри файла программы
+            var trimmed = line.Trim();
+            if (trimmed.Length == 0 || trimmed == "%")
+            {
+                pendingTail.Add(line);
+                continue;
+            }
+
+            FlushTail(pendingTail, writer, ref outputLines);
+            writer.WriteLine(line);
+            outputLines++;
+        }
+
+        var format = new NcMotionTracker(_options.Decimals);
+        foreach (var pattern in _patterns)
+        {
+            writer.WriteLine();
+            outputLines++;
+            foreach (var bodyLine in FormatBody(pattern, format))
+            {
+                writer.WriteLine(bodyLine);
+                outputLines++;
+            }
+        }
+
+        FlushTail(pendingTail, writer, ref outputLines);
+
+        return new SubprogramExtractionResult(
+            _patterns.Count,
+            callCount,
+            replacedBlocks,
+            _inputLines,
+            outputLines);
+    }
+
+    /// <summary>
+    /// Вынести повторяющиеся траектории из файла УП
+    /// </summary>
+    /// <param name="inputPath">Исходная УП</param>
+    /// <param name="outputPath">Результирующая УП (не должна совпадать с исходной)</param>
+    /// <param name="options">Параметры выноса</param>
+    /// <returns>Статистика выноса</returns>
+    public static SubprogramExtractionResult ExtractFile(
+        string inputPath,
+        string outputPath,
+        SubprogramExtractionOptions? options = null)
+    {
+        var extractor = new SubprogramExtractor(options);
+        extractor.Analyze(File.ReadLines(inputPath));
+
+        using var writer = new StreamWriter(outputPath, false, new UTF8Encoding(false));
+        return extractor.Rewrite(File.ReadLines(inputPath), writer);
+    }
+
+    private void Reset()
+    {
+        _moves.Clear();
+        _runStart.Clear();
+        _prefix.RemoveRange(1, _prefix.Count - 1);
+        _powers.RemoveRange(1, _powers.Count - 1);
+        _patterns.Clear();
+        _occurrences.Clear();
+        _inputLines = 0;
+    }
+
+    private void FindPatterns()
+    {
+        var window = _options.MinBlocks;
+        var count = _moves.Count;
+        var claimed = new BitArray(count);
+        var firstSeen = new Dictionary<ulong, int>();
+        var byWindow = new Dictionary<ulong, List<Pattern>>();
+        var candidates = new List<Pattern>();
+
+        var i = 0;
+        while (i + window <= count)
+        {
+            if (!SameRun(i, i + window - 1))
+            {
+                i++;
+                continue;
+            }
+
+            var windowHash = HashOf(i, window);
+
+            // 1. Повтор уже известного фрагмента
+            if (byWindow.TryGetValue(windowHash, out var known))
+            {
+                Pattern? best = null;
+                foreach (var pattern in known)
+                {
+                    if ((best == null || pattern.Length > best.Length) &&
+                        i + pattern.Length <= count &&
+                        SameRun(i, i + pattern.Length - 1) &&
+                        IsFree(claimed, i, pattern.Length) &&
+                        HashOf(i, pattern.Length) == pattern.Hash &&
+                        Matches(pattern.Start, i, pattern.Length))
+                    {
+                        best = pattern;
+                    }
+                }
+
+                if (best != null)
+                {
+                    best.Starts.Add(i);
+                    Claim(claimed, i, best.Length);
+                    i += best.Length;
+                    continue;
+                }
+            }
+
+            // 2. Новый фрагмент: окно уже встречалось раньше
+            if (firstSeen.TryGetValue(windowHash, out var first) &&
+                first + window <= i &&
+                IsFree(claimed, first, window) &&
+                Matches(first, i, window))
+            {
+                // Расширяем совпадение вправо, пока фрагменты не пересекаются
+                var length = window;
+                while (i + length < count &&
+                       first + length < i &&
+                       SameRun(i, i + length) &&
+                       SameRun(first, first + length) &&
+                       !claimed[first + length] &&
+                       _moves[first + length] == _moves[i + length])
+                {
+                    length++;
+                }
+
+                var pattern = new Pattern(first, length, HashOf(first, length));
+                pattern.Starts.Add(first);
+                pattern.Starts.Add(i);
+                Claim(claimed, first, length);
+                Claim(claimed, i, length);
+                candidates.Add(pattern);
+
+                if (!byWindow.TryGetValue(windowHash, out var list))
+                    byWindow[windowHash] = list = new List<Pattern>();
+                list.Add(pattern);
+
+                i += length;
+                continue;
+            }
+
+            // Первое вхождение (или прежнее уже занято) - запоминаем текущее
+            if (!firstSeen.TryGetValue(windowHash, out first) || !IsFree(claimed, first, window))
+                firstSeen[windowHash] = i;
+
+            i++;
+        }
+
+        var number = _options.FirstProgramNumber;
+        foreach (var pattern in candidates)
+        {
+            var occurrences = pattern.Starts.Count;
+            var saved = occurrences * pattern.Length - occurrences - pattern.Length - SubprogramOverhead;
+            if (occurrences < _options.MinOccurrences || saved <= 0)
+                continue;
+
+            pattern.Number = number++;
+            _patterns.Add(pattern);
+            foreach (var start in pattern.Starts)
+                _occurrences[start] = pattern;
+        }
+    }
+
+    private IEnumerable<string> FormatBody(Pattern pattern, NcMotionTracker format)
+    {
+        var decimals = _options.Decimals;
+        var isSiemens = _options.Dialect == SubprogramDialect.Siemens;
+
+        if (isSiemens)
+        {
+            yield return $"%_N_L{pattern.Number}_SPF";
+            yield return ";$PATH=/_N_SPF_DIR";
+        }
+        else
+        {
+            yield return $"O{pattern.Number}";
+        }
+
+        yield return "G91";
+
+        var lastCode = -1;
+        long? lastFeed = null;
+        var sb = new StringBuilder();
+        for (int k = 0; k < pattern.Length; k++)
+        {
+            var move = _moves[pattern.Start + k];
+            sb.Clear();
+
+            if (move.Code != lastCode)
+            {
+                sb.Append(move.Code == 0 ? "G0" : "G1");
+                lastCode = move.Code;
+            }
+
+            AppendAxis(sb, 'X', move.Dx, format, decimals);
+            AppendAxis(sb, 'Y', move.Dy, format, decimals);
+            AppendAxis(sb, 'Z', move.Dz, format, decimals);
+
+            if (move.Code == 1 && move.Feed != lastFeed)
+            {
+                if (sb.Length > 0) sb.Append(' ');
+                sb.Append('F').Append(format.Format(move.Feed, decimals));
+                lastFeed = move.Feed;
+            }
+
+            // Нулевое перемещение (повтор позиции) сохраняем как явный кадр
+            if (sb.Length == 0)
+                sb.Append("X").Append(format.Format(0, decimals));
+
+            yield return sb.ToString();
+        }
+
+        yield return "G90";
+        yield return isSiemens ? "M17" : "M99";
+    }
+
+    private string FormatCall(int number, string? sequence)
+    {
+        var call = _options.Dialect == SubprogramDialect.Siemens
+            ? $"L{number}"
+            : $"M98 P{number}";
+
+        return sequence == null ? call : $"{sequence} {call}";
+    }
+
+    private static void AppendAxis(StringBuilder sb, char axis, long delta, NcMotionTracker format, int decimals)
+    {
+        if (delta == 0)
+            return;
+
+        if (sb.Length > 0) sb.Append(' ');
+        sb.Append(axis).Append(format.Format(delta, decimals));
+    }
+
+    private static void FlushTail(List<string> tail, TextWriter writer, ref int outputLines)
+    {
+        foreach (var line in tail)
+        {
+            writer.WriteLine(line);
+            outputLines++;
+        }
+        tail.Clear();
+    }
+
+    private ulong HashOf(int start, int length)
+    {
+        unchecked
+        {
+            return _prefix[start + length] - _prefix[start] * _powers[length];
+        }
+    }
+
+    private bool SameRun(int start, int end) => _runStart[end] <= start;
+
+    private bool Matches(int a, int b, int length)
+    {
+        for (int k = 0; k < length; k++)
+        {
+            if (_moves[a + k] != _moves[b + k])
+                return false;
+        }
+        return true;
+    }
+
+    private static bool IsFree(BitArray claimed, int start, int length)
+    {
+        for (int k = start; k < start + length; k++)
+        {
+            if (claimed[k])
+                return false;
+        }
+        return true;
+    }
+
+    private static void Claim(BitArray claimed, int start, int length)
+    {
+        for (int k = start; k < start + length; k++)
+            claimed[k] = true;
+    }
+
+    /// <summary>
+    /// Повторяющийся фрагмент: эталонное вхождение и все позиции вызова
+    /// </summary>
+    private sealed class Pattern
+    {
+        public Pattern(int start, int length, ulong hash)
+        {
+            Start = start;
+            Length = length;
+            Hash = hash;
+        }
+
+        public int Start { get; }
+        public int Length { get; }
+        public ulong Hash { get; }
+        public List<int> Starts { get; } = new();
+        public int Number { get; set; }
+    }
+}
@@ -0,0 +1,214 @@
+using System.Buffers;
+using System.Collections.Concurrent;
+using System.Runtime.ExceptionServices;
+using System.Text;
+
+namespace PostProcessor.Core.Writers;
+
+/// <summary>
+/// TextWriter с записью в отдельном потоке: вывод макросов копируется в сегменты в памяти,
+/// заполненный сегмент передаётся потоку записи, который выполняет кодирование, сжатие
+/// и файловый ввод-вывод во внутреннем writer'е. Порядок сегментов сохраняется;
+/// число сегментов в очереди ограничено - при медленном диске макросы ждут только
+/// после заполнения очереди. Flush не передаёт неполный сегмент: весь вывод
+/// гарантированно записан после закрытия writer'а.
+/// </summary>
+public sealed class BackgroundNcWriter : TextWriter
+{
+    private readonly TextWriter _inner;
+    private readonly int _segmentSize;
+    private readonly BlockingCollection<Segment> _pending;
+    private readonly Thread _thread;
+    private char[] _segment;
+    private int _segmentLength;
+    private volatile ExceptionDispatchInfo? _error;
+    private bool _completed;
+
+    /// <summary>
+    /// Создать writer с фоновой записью
+    /// </summary>
+    /// <param name="inner">Итоговый выходной поток (используется только потоком записи до закрытия)</param>
+    /// <param name="segmentSize">Размер сегмента в символах</param>
+    /// <param name="maxPendingSegments">Максимум сегментов в очереди на запись</param>
+    public BackgroundNcWriter(TextWriter inner, int segmentSize = 16 * 1024, int maxPendingSegments = 8)
+    {
+        if (segmentSize <= 0)
+            throw new ArgumentOutOfRangeException(nameof(segmentSize));
+        if (maxPendingSegments <= 0)
+            throw new ArgumentOutOfRangeException(nameof(maxPendingSegments));
+
+        _inner = inner;
+        _segmentSize = segmentSize;
+        _segment = ArrayPool<char>.Shared.Rent(segmentSize);
+        _pending = new BlockingCollection<Segment>(new ConcurrentQueue<Segment>(), maxPendingSegments);
+        CoreNewLine = inner.NewLine.ToCharArray();
+
+        _thread = new Thread(WriteLoop)
+        {
+            IsBackground = true,
+            Name = "NC output writer"
+        };
+        _thread.Start();
+    }
+
+    public override Encoding Encoding => _inner.Encoding;
+
+    public override void Write(char value)
+    {
+        if (_segmentLength == _segmentSize)
+            Submit();
+        _segment[_segmentLength++] = value;
+    }
+
+    public override void Write(string? value)
+    {
+        if (value != null)
+            Write(value.AsSpan());
+    }
+
+    public override void Write(char[] buffer, int index, int count)
+    {
+        Write(buffer.AsSpan(index, count));
+    }
+
+    public override void Write(ReadOnlySpan<char> buffer)
+    {
+        while (!buffer.IsEmpty)
+        {
+            if (_segmentLength == _segmentSize)
+                Submit();
+
+            var count = Math.Min(buffer.Length, _segmentSize - _segmentLength);
+            buffer[..count].CopyTo(_segment.AsSpan(_segmentLength));
+            _segmentLength += count;
+            buffer = buffer[count..];
+        }
+    }
+
+    public override void WriteLine(string? value)
+    {
+        Write(value);
+        Write(CoreNewLine);
+    }
+
+    // Копирование в сегмент дешевле переключения потока: асинхронные варианты выполняются синхронно
+    public override Task WriteAsync(char value)
+    {
+        Write(value);
+        return Task.CompletedTask;
+    }
+
+    public override Task WriteAsync(string? value)
+    {
+        Write(value);
+        return Task.CompletedTask;
+    }
+
+    public override Task WriteAsync(ReadOnlyMemory<char> buffer, CancellationToken cancellationToken = default)
+    {
+        Write(buffer.Span);
+        return Task.CompletedTask;
+    }
+
+    public override Task WriteLineAsync()
+    {
+        Write(CoreNewLine);
+        return Task.CompletedTask;
+    }
+
+    public override Task WriteLineAsync(string? value)
+    {
+        WriteLine(value);
+        return Task.CompletedTask;
+    }
+
+    public override Task WriteLineAsync(ReadOnlyMemory<char> buffer, CancellationToken cancellationToken = default)
+    {
+        Write(buffer.Span);
+        Write(CoreNewLine);
+        return Task.CompletedTask;
+    }
+
+    /// <summary>
+    /// Проверить ошибки потока записи; неполный сегмент остаётся в памяти
+    /// </summary>
+    public override void Flush() => _error?.Throw();
+
+    public override Task FlushAsync()
+    {
+        Flush();
+        return Task.CompletedTask;
+    }
+
+    // Передача заполненного сегмента потоку записи (ожидание, если очередь заполнена)
+    private void Submit()
+    {
+        _error?.Throw();
+
+        _pending.Add(new Segment(_segment, _segmentLength));
+        _segment = ArrayPool<char>.Shared.Rent(_segmentSize);
+        _segmentLength = 0;
+    }
+
+    private void WriteLoop()
+    {
+        foreach (var segment in _pending.GetConsumingEnumerable())
+        {
+            try
+            {
+                // После ошибки очередь только освобождается, чтобы не блокировать макросы
+                if (_error == null)
+                    _inner.Write(segment.Buffer, 0, segment.Length);
+            }
+            catch (Exception ex)
+            {
+                _error = ExceptionDispatchInfo.Capture(ex);
+            }
+            finally
+            {
+                ArrayPool<char>.Shared.Return(segment.Buffer);
+            }
+        }
+    }
+
+    // Последний сегмент, завершение потока записи; внутренний writer закрывается в вызывающем потоке
+    private void Complete()
+    {
+        if (_completed)
+            return;
+        _completed = true;
+
+        if (_segmentLength > 0 && _error == null)
+            _pending.Add(new Segment(_segment, _segmentLength));
+        else
+            ArrayPool<char>.Shared.Return(_segment);
+
+        _pending.CompleteAdding();
+        _thread.Join();
+        _pending.Dispose();
+    }
+
+    protected override void Dispose(bool disposing)
+    {
+        if (disposing && !_completed)
+        {
+            Complete();
+            _inner.Dispose();
+            _error?.Throw();
+        }
+        base.Dispose(disposing);
+    }
+
+    public override async ValueTask DisposeAsync()
+    {
+        if (!_completed)
+        {
+            Complete();
+            await _inner.DisposeAsync().ConfigureAwait(false);
+            _error?.Throw();
+        }
+        GC.SuppressFinalize(this);
+    }
+
+    private readonly record struct Segment(char[] Buffer, int Length);
+}
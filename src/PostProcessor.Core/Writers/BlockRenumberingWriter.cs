@@ -0,0 +1,157 @@
+using System.Text;
+using PostProcessor.Core.Config.Models;
+
+namespace PostProcessor.Core.Writers;
+
+/// <summary>
+/// TextWriter, перенумеровывающий кадры по порядку: номер "N123" в начале строки
+/// заменяется следующим номером последовательности. Нужен, когда вывод собирается
+/// из фрагментов разных запусков (кэш сегментов, параллельная обработка).
+/// Буферизуется только префикс номера в начале строки.
+/// При отключённой нумерации номера в начале строки удаляются.
+/// </summary>
+public sealed class BlockRenumberingWriter : TextWriter
+{
+    private readonly TextWriter _inner;
+    private readonly int _increment;
+    private readonly string _numberPrefix;
+    private readonly bool _enabled;
+    private readonly StringBuilder _prefix = new();
+    private int _next;
+    private bool _atLineStart = true;
+
+    /// <summary>
+    /// Создать перенумерующий writer
+    /// </summary>
+    /// <param name="inner">Выходной поток</param>
+    /// <param name="firstNumber">Номер первого кадра</param>
+    /// <param name="increment">Шаг нумерации</param>
+    /// <param name="prefix">Префикс выводимого номера</param>
+    /// <param name="enabled">Выводить номера (false - удалять номера в начале строки)</param>
+    public BlockRenumberingWriter(TextWriter inner, int firstNumber = 10, int increment = 10, string prefix = "N", bool enabled = true)
+    {
+        _inner = inner;
+        _next = firstNumber;
+        _increment = increment;
+        _numberPrefix = prefix;
+        _enabled = enabled;
+    }
+
+    /// <summary>
+    /// Создать перенумерующий writer по настройкам нумерации контроллера
+    /// </summary>
+    /// <param name="inner">Выходной поток</param>
+    /// <param name="numbering">Настройки нумерации (formatting.blockNumber)</param>
+    public BlockRenumberingWriter(TextWriter inner, BlockNumbering numbering)
+        : this(inner, numbering.Start, numbering.Increment > 0 ? numbering.Increment : 1, numbering.Prefix, numbering.Enabled)
+    {
+    }
+
+    public override Encoding Encoding => _inner.Encoding;
+
+    /// <summary>
+    /// Номер, который получит следующий кадр
+    /// </summary>
+    public int NextNumber => _next;
+
+    public override void Write(char value)
+    {
+        if (!_atLineStart && _prefix.Length == 0)
+        {
+            _inner.Write(value);
+            if (value == '\n')
+                _atLineStart = true;
+            return;
+        }
+
+        // Начало строки: накапливаем "N" и цифры
+        if (_prefix.Length == 0 ? value == 'N' : char.IsAsciiDigit(value))
+        {
+            _prefix.Append(value);
+            _atLineStart = false;
+            return;
+        }
+
+        // Без нумерации удаляется и пробел после номера
+        if (!FlushPrefix() || _enabled || value != ' ')
+            _inner.Write(value);
+        _atLineStart = value == '\n';
+    }
+
+    public override void Write(string? value)
+    {
+        if (value != null)
+            Write(value.AsSpan());
+    }
+
+    public override void Write(char[] buffer, int index, int count)
+    {
+        Write(buffer.AsSpan(index, count));
+    }
+
+    public override void Write(ReadOnlySpan<char> buffer)
+    {
+        while (!buffer.IsEmpty)
+        {
+            if (!_atLineStart && _prefix.Length == 0)
+            {
+                // Середина строки - пишем до конца строки без посимвольной обработки
+                var newLine = buffer.IndexOf('\n');
+                if (newLine < 0)
+                {
+                    _inner.Write(buffer);
+                    return;
+                }
+
+                _inner.Write(buffer[..(newLine + 1)]);
+                _atLineStart = true;
+                buffer = buffer[(newLine + 1)..];
+                continue;
+            }
+
+            Write(buffer[0]);
+            buffer = buffer[1..];
+        }
+    }
+
+    public override void Flush() => _inner.Flush();
+
+    // true - в буфере был номер кадра
+    private bool FlushPrefix()
+    {
+        if (_prefix.Length == 0)
+            return false;
+
+        var isNumber = _prefix.Length > 1;
+        if (!isNumber)
+        {
+            _inner.Write(_prefix.ToString());
+        }
+        else if (_enabled)
+        {
+            _inner.Write(_numberPrefix);
+            _inner.Write(_next);
+            _next += _increment;
+        }
+
+        _prefix.Clear();
+        return isNumber;
+    }
+
+    protected override void Dispose(bool disposing)
+    {
+        if (disposing)
+        {
+            FlushPrefix();
+            _inner.Dispose();
+        }
+        base.Dispose(disposing);
+    }
+
+    public override async ValueTask DisposeAsync()
+    {
+        FlushPrefix();
+        await _inner.DisposeAsync().ConfigureAwait(false);
+        GC.SuppressFinalize(this);
+    }
+}
@@ -0,0 +1,283 @@
+using System.Buffers;
+using System.Globalization;
+using System.Text;
+using PostProcessor.Core.Context;
+
+namespace PostProcessor.Core.Writers;
+
+/// <summary>
+/// TextWriter с отложенным заголовком: тело УП пишется во временный файл, попутно
+/// собирается NcProgramStatistics; при закрытии заголовок формируется по итогам программы,
+/// после чего тело копируется в выходной поток одним последовательным проходом.
+/// Память ограничена одной строкой и буфером копирования независимо от размера УП.
+/// Резервирование полей фиксированной ширины не используется: выходной поток может быть
+/// сжат или разбит на файлы, и запись "по месту" в нём невозможна.
+/// </summary>
+public sealed class DeferredHeaderWriter : TextWriter
+{
+    private const int CopyBufferSize = 64 * 1024;
+
+    /// <summary>
+    /// Подстановки, известные только после вывода всей программы
+    /// </summary>
+    public static readonly string[] Placeholders =
+    {
+        "{blockCount}", "{toolChanges}", "{cycleTime}", "{toolCount}",
+        "{minX}", "{maxX}", "{minY}", "{maxY}", "{minZ}", "{maxZ}",
+        "{toolNumber}", "{toolName}", "{toolDiameter}", "{toolLength}"
+    };
+
+    // Строка заголовка с любой из этих подстановок повторяется для каждого инструмента
+    private static readonly string[] ToolPlaceholders = { "{toolNumber}", "{toolName}", "{toolDiameter}", "{toolLength}" };
+
+    private readonly TextWriter _inner;
+    private readonly Func<NcProgramStatistics, IEnumerable<string>> _header;
+    private readonly FileStream _spill;
+    private readonly StreamWriter _spillWriter;
+    private char[] _line = ArrayPool<char>.Shared.Rent(256);
+    private int _lineLength;
+    private bool _completed;
+
+    /// <summary>
+    /// Создать writer с отложенным заголовком
+    /// </summary>
+    /// <param name="inner">Итоговый выходной поток</param>
+    /// <param name="header">Формирование строк заголовка по итогам программы</param>
+    /// <param name="statistics">Сборщик итогов (по умолчанию - с ускоренным ходом 20000 мм/мин)</param>
+    /// <param name="spillDirectory">Каталог временного файла (по умолчанию - системный TEMP)</param>
+    public DeferredHeaderWriter(
+        TextWriter inner,
+        Func<NcProgramStatistics, IEnumerable<string>> header,
+        NcProgramStatistics? statistics = null,
+        string? spillDirectory = null)
+    {
+        _inner = inner;
+        _header = header;
+        Statistics = statistics ?? new NcProgramStatistics();
+
+        var spillPath = Path.Combine(spillDirectory ?? Path.GetTempPath(), $"ncbody_{Guid.NewGuid():N}.tmp");
+        _spill = new FileStream(spillPath, FileMode.CreateNew, FileAccess.ReadWrite, FileShare.None,
+            CopyBufferSize, FileOptions.DeleteOnClose);
+        _spillWriter = new StreamWriter(_spill, new UTF8Encoding(false), CopyBufferSize, leaveOpen: true);
+    }
+
+    public override Encoding Encoding => _inner.Encoding;
+
+    /// <summary>
+    /// Итоги программы (заполняются по мере вывода)
+    /// </summary>
+    public NcProgramStatistics Statistics { get; }
+
+    /// <summary>
+    /// Сформированный заголовок (после закрытия writer'а)
+    /// </summary>
+    public IReadOnlyList<string>? Header { get; private set; }
+
+    public override void Write(char value)
+    {
+        _spillWriter.Write(value);
+        Track(new ReadOnlySpan<char>(in value));
+    }
+
+    public override void Write(string? value)
+    {
+        if (value != null)
+            Write(value.AsSpan());
+    }
+
+    public override void Write(char[] buffer, int index, int count)
+    {
+        Write(buffer.AsSpan(index, count));
+    }
+
+    public override void Write(ReadOnlySpan<char> buffer)
+    {
+        _spillWriter.Write(buffer);
+        Track(buffer);
+    }
+
+    public override void Flush() => _spillWriter.Flush();
+
+    /// <summary>
+    /// Есть ли в строках заголовка подстановки, требующие отложенного вывода
+    /// </summary>
+    public static bool HasDeferredPlaceholders(IEnumerable<string> lines)
+    {
+        return lines.Any(line => Placeholders.Any(p => line.Contains(p, StringComparison.Ordinal)));
+    }
+
+    /// <summary>
+    /// Подставить итоги программы в строки заголовка
+    /// </summary>
+    /// <param name="lines">Строки шаблона</param>
+    /// <param name="statistics">Итоги программы</param>
+    /// <param name="tools">Инструменты программы</param>
+    /// <param name="decimals">Знаков после запятой для координат</param>
+    public static IEnumerable<string> ResolvePlaceholders(
+        IEnumerable<string> lines,
+        NcProgramStatistics statistics,
+        IReadOnlyList<ToolInfo> tools,
+        int decimals = 3)
+    {
+        var format = "F" + decimals.ToString(CultureInfo.InvariantCulture);
+        string Axis(double? value) => value?.ToString(format, CultureInfo.InvariantCulture) ?? "-";
+
+        foreach (var template in lines)
+        {
+            var line = template
+                .Replace("{blockCount}", statistics.BlockCount.ToString(CultureInfo.InvariantCulture))
+                .Replace("{toolChanges}", statistics.ToolChanges.ToString(CultureInfo.InvariantCulture))
+                .Replace("{toolCount}", tools.Count.ToString(CultureInfo.InvariantCulture))
+                .Replace("{cycleTime}", statistics.CycleTime.ToString(@"hh\:mm\:ss", CultureInfo.InvariantCulture))
+                .Replace("{minX}", Axis(statistics.Min(0)))
+                .Replace("{maxX}", Axis(statistics.Max(0)))
+                .Replace("{minY}", Axis(statistics.Min(1)))
+                .Replace("{maxY}", Axis(statistics.Max(1)))
+                .Replace("{minZ}", Axis(statistics.Min(2)))
+                .Replace("{maxZ}", Axis(statistics.Max(2)));
+
+            if (!ToolPlaceholders.Any(p => line.Contains(p, StringComparison.Ordinal)))
+            {
+                yield return line;
+                continue;
+            }
+
+            foreach (var tool in tools)
+            {
+                yield return line
+                    .Replace("{toolNumber}", tool.Number.ToString(CultureInfo.InvariantCulture))
+                    .Replace("{toolName}", tool.Comment ?? $"T{tool.Number}")
+                    .Replace("{toolDiameter}", tool.Diameter.ToString(format, CultureInfo.InvariantCulture))
+                    .Replace("{toolLength}", tool.Length.ToString(format, CultureInfo.InvariantCulture));
+            }
+        }
+    }
+
+    /// <summary>
+    /// Добавить заголовок по итогам программы в начало готового файла. Используется,
+    /// когда тело переписывается после вывода (циклы, HSM, подпрограммы): итоги считаются
+    /// по окончательному тексту, а не по выводу макросов.
+    /// </summary>
+    /// <param name="path">Файл УП без заголовка (перезаписывается)</param>
+    /// <param name="header">Формирование строк заголовка по итогам программы</param>
+    /// <param name="statistics">Сборщик итогов (по умолчанию - с ускоренным ходом 20000 мм/мин)</param>
+    /// <returns>Итоги программы</returns>
+    public static NcProgramStatistics PrependHeader(
+        string path,
+        Func<NcProgramStatistics, IEnumerable<string>> header,
+        NcProgramStatistics? statistics = null)
+    {
+        statistics ??= new NcProgramStatistics();
+        foreach (var line in File.ReadLines(path))
+            statistics.AddLine(line);
+
+        var tempPath = path + ".tmp";
+        using (var writer = new StreamWriter(tempPath, false, new UTF8Encoding(false), CopyBufferSize))
+        {
+            foreach (var line in header(statistics))
+                writer.WriteLine(line);
+
+            using var reader = new StreamReader(path, new UTF8Encoding(false), true, CopyBufferSize);
+            var buffer = ArrayPool<char>.Shared.Rent(CopyBufferSize);
+            try
+            {
+                int read;
+                while ((read = reader.Read(buffer, 0, buffer.Length)) > 0)
+                    writer.Write(buffer, 0, read);
+            }
+            finally
+            {
+                ArrayPool<char>.Shared.Return(buffer);
+            }
+        }
+
+        File.Move(tempPath, path, overwrite: true);
+        return statistics;
+    }
+
+    // Передача завершённых строк в статистику; в памяти - только текущая строка
+    private void Track(ReadOnlySpan<char> buffer)
+    {
+        while (!buffer.IsEmpty)
+        {
+            var newLine = buffer.IndexOf('\n');
+            var part = newLine < 0 ? buffer : buffer[..newLine];
+
+            if (_lineLength + part.Length > _line.Length)
+            {
+                var grown = ArrayPool<char>.Shared.Rent(Math.Max(_line.Length * 2, _lineLength + part.Length));
+                _line.AsSpan(0, _lineLength).CopyTo(grown);
+                ArrayPool<char>.Shared.Return(_line);
+                _line = grown;
+            }
+
+            part.CopyTo(_line.AsSpan(_lineLength));
+            _lineLength += part.Length;
+
+            if (newLine < 0)
+                return;
+
+            Statistics.AddLine(_line.AsSpan(0, _lineLength));
+            _lineLength = 0;
+            buffer = buffer[(newLine + 1)..];
+        }
+    }
+
+    // Заголовок по итогам, затем тело из временного файла
+    private void Complete()
+    {
+        if (_completed)
+            return;
+        _completed = true;
+
+        if (_lineLength > 0)
+            Statistics.AddLine(_line.AsSpan(0, _lineLength));
+        _spillWriter.Flush();
+
+        Header = _header(Statistics).ToList();
+        foreach (var line in Header)
+            _inner.WriteLine(line);
+
+        _spill.Position = 0;
+        using var reader = new StreamReader(_spill, new UTF8Encoding(false), false, CopyBufferSize, leaveOpen: true);
+        var buffer = ArrayPool<char>.Shared.Rent(CopyBufferSize);
+        try
+        {
+            int read;
+            while ((read = reader.Read(buffer, 0, buffer.Length)) > 0)
+                _inner.Write(buffer, 0, read);
+        }
+        finally
+        {
+            ArrayPool<char>.Shared.Return(buffer);
+        }
+
+        _inner.Flush();
+    }
+
+    protected override void Dispose(bool disposing)
+    {
+        if (disposing && !_completed)
+        {
+            Complete();
+            _spillWriter.Dispose();
+            _spill.Dispose();
+            ArrayPool<char>.Shared.Return(_line);
+            _inner.Dispose();
+        }
+        base.Dispose(disposing);
+    }
+
+    public override async ValueTask DisposeAsync()
+    {
+        if (!_completed)
+        {
+            Complete();
+            await _spillWriter.DisposeAsync().ConfigureAwait(false);
+            await _spill.DisposeAsync().ConfigureAwait(false);
+            ArrayPool<char>.Shared.Return(_line);
+            await _inner.DisposeAsync().ConfigureAwait(false);
+        }
+        GC.SuppressFinalize(this);
+    }
+}
@@ -0,0 +1,93 @@
+using System.IO.Compression;
+using System.Text;
+
+namespace PostProcessor.Core.Writers;
+
+/// <summary>
+/// Фабрика выходных потоков УП (сжатие, разбиение на файлы)
+/// </summary>
+public static class NcOutput
+{
+    /// <summary>
+    /// Открыть выходной поток УП
+    /// </summary>
+    /// <param name="path">Путь к файлу (расширение сжатия добавляется автоматически)</param>
+    /// <param name="options">Параметры записи</param>
+    /// <param name="encoding">Кодировка текста</param>
+    /// <param name="header">Заголовок для второго и последующих файлов (номер файла -> строки)</param>
+    /// <param name="footer">Завершение для всех файлов, кроме последнего</param>
+    /// <returns>TextWriter для PostContext.Output</returns>
+    public static TextWriter Open(
+        string path,
+        NcOutputOptions options,
+        Encoding encoding,
+        Func<int, IEnumerable<string>>? header = null,
+        IEnumerable<string>? footer = null)
+    {
+        var fullPath = ResolvePath(path, options);
+        if (options.SplitMode == NcSplitMode.None)
+            return CreateFileWriter(fullPath, options.Compression, encoding);
+
+        return new SplittingNcWriter(fullPath, options, encoding, header, footer);
+    }
+
+    /// <summary>
+    /// Открыть выходной поток УП поверх готового потока (stdout, pipe).
+    /// Разбиение на файлы для потока невозможно, поддерживается только сжатие.
+    /// </summary>
+    /// <param name="stream">Выходной поток (закрывается вместе с writer'ом)</param>
+    /// <param name="compression">Сжатие</param>
+    /// <param name="encoding">Кодировка текста</param>
+    public static TextWriter Open(Stream stream, NcCompression compression, Encoding encoding)
+    {
+        return CreateWriter(stream, compression, encoding);
+    }
+
+    /// <summary>
+    /// Получить фактический путь первого файла с учётом расширения сжатия
+    /// </summary>
+    public static string ResolvePath(string path, NcOutputOptions options)
+    {
+        var extension = options.CompressionExtension;
+        if (extension.Length == 0 || path.EndsWith(extension, StringComparison.OrdinalIgnoreCase))
+            return path;
+
+        return path + extension;
+    }
+
+    /// <summary>
+    /// Получить путь файла с заданным номером: prog.nc.gz -> prog_002.nc.gz
+    /// </summary>
+    public static string GetPartPath(string path, int part, NcOutputOptions options)
+    {
+        if (part <= 1)
+            return path;
+
+        var compression = options.CompressionExtension;
+        var basePath = compression.Length > 0 && path.EndsWith(compression, StringComparison.OrdinalIgnoreCase)
+            ? path[..^compression.Length]
+            : path;
+
+        var extension = Path.GetExtension(basePath);
+        var stem = basePath[..^extension.Length];
+        return $"{stem}_{part:D3}{extension}{compression}";
+    }
+
+    internal static StreamWriter CreateFileWriter(string path, NcCompression compression, Encoding encoding)
+    {
+        var file = new FileStream(path, FileMode.Create, FileAccess.Write, FileShare.Read, 64 * 1024);
+        return CreateWriter(file, compression, encoding);
+    }
+
+    private static StreamWriter CreateWriter(Stream output, NcCompression compression, Encoding encoding)
+    {
+        Stream stream = compression switch
+        {
+            NcCompression.Gzip => new NonFlushingStream(new GZipStream(output, CompressionLevel.Optimal)),
+            NcCompression.Brotli => new NonFlushingStream(new BrotliStream(output, CompressionLevel.Optimal)),
+            _ => output
+        };
+
+        return new StreamWriter(stream, encoding);
+    }
+}
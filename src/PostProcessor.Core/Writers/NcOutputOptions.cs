@@ -0,0 +1,81 @@
+namespace PostProcessor.Core.Writers;
+
+/// <summary>
+/// Сжатие выходного файла УП
+/// </summary>
+public enum NcCompression
+{
+    /// <summary>
+    /// Без сжатия
+    /// </summary>
+    None,
+
+    /// <summary>
+    /// gzip (.gz)
+    /// </summary>
+    Gzip,
+
+    /// <summary>
+    /// Brotli (.br)
+    /// </summary>
+    Brotli
+}
+
+/// <summary>
+/// Режим разбиения УП на несколько файлов
+/// </summary>
+public enum NcSplitMode
+{
+    /// <summary>
+    /// Один файл
+    /// </summary>
+    None,
+
+    /// <summary>
+    /// Новый файл на каждой смене инструмента
+    /// </summary>
+    ToolChange,
+
+    /// <summary>
+    /// Новый файл на первой смене инструмента после превышения MaxPartBytes.
+    /// Разрез внутри операции не выполняется: модальное состояние макросов
+    /// (G-группы, подача, компенсации) не восстанавливается в новом файле.
+    /// </summary>
+    Size
+}
+
+/// <summary>
+/// Параметры записи выходной УП
+/// </summary>
+public record NcOutputOptions
+{
+    /// <summary>
+    /// Сжатие выходных файлов
+    /// </summary>
+    public NcCompression Compression { get; init; } = NcCompression.None;
+
+    /// <summary>
+    /// Режим разбиения на файлы
+    /// </summary>
+    public NcSplitMode SplitMode { get; init; } = NcSplitMode.None;
+
+    /// <summary>
+    /// Максимальный размер одного файла в байтах (несжатый текст) для NcSplitMode.Size
+    /// </summary>
+    public long MaxPartBytes { get; init; } = 512 * 1024;
+
+    /// <summary>
+    /// Коды смены инструмента, по которым выполняется разбиение
+    /// </summary>
+    public string[] ToolChangeCodes { get; init; } = { "M6", "M06" };
+
+    /// <summary>
+    /// Получить расширение файла для выбранного сжатия
+    /// </summary>
+    public string CompressionExtension => Compression switch
+    {
+        NcCompression.Gzip => ".gz",
+        NcCompression.Brotli => ".br",
+        _ => ""
+    };
+}
@@ -0,0 +1,198 @@
+using System.Globalization;
+
+namespace PostProcessor.Core.Writers;
+
+/// <summary>
+/// Итоги готовой УП, собираемые построчно по мере вывода: число кадров, смены инструмента,
+/// габарит перемещений X/Y/Z и оценка времени обработки. Время считается по длине
+/// перемещений: G0 - на скорости ускоренного хода, G1/G2/G3 - на модальной подаче F (мм/мин);
+/// дуги G2/G3 в плоскости G17 с I/J считаются по длине дуги, остальные - по хорде.
+/// </summary>
+public sealed class NcProgramStatistics
+{
+    private readonly double _rapidRate;
+    private readonly double[] _position = new double[3];
+    private readonly bool[] _known = new bool[3];
+    private readonly double[] _min = { double.PositiveInfinity, double.PositiveInfinity, double.PositiveInfinity };
+    private readonly double[] _max = { double.NegativeInfinity, double.NegativeInfinity, double.NegativeInfinity };
+    private readonly double?[] _words = new double?[3];
+
+    private int _motionCode = -1;
+    private double _feed;
+    private bool _incremental;
+    private double _minutes;
+
+    /// <param name="rapidRate">Скорость ускоренного хода, мм/мин</param>
+    public NcProgramStatistics(double rapidRate = 20000.0)
+    {
+        _rapidRate = rapidRate > 0 ? rapidRate : 20000.0;
+    }
+
+    /// <summary>
+    /// Число кадров (непустых строк без учёта комментариев)
+    /// </summary>
+    public long BlockCount { get; private set; }
+
+    /// <summary>
+    /// Число смен инструмента (M6)
+    /// </summary>
+    public int ToolChanges { get; private set; }
+
+    /// <summary>
+    /// Оценка времени обработки
+    /// </summary>
+    public TimeSpan CycleTime => TimeSpan.FromMinutes(_minutes);
+
+    /// <summary>
+    /// Минимум координаты по оси (0 - X, 1 - Y, 2 - Z); null, если ось не перемещалась
+    /// </summary>
+    public double? Min(int axis) => double.IsInfinity(_min[axis]) ? null : _min[axis];
+
+    /// <summary>
+    /// Максимум координаты по оси (0 - X, 1 - Y, 2 - Z); null, если ось не перемещалась
+    /// </summary>
+    public double? Max(int axis) => double.IsInfinity(_max[axis]) ? null : _max[axis];
+
+    /// <summary>
+    /// Учесть очередную строку УП
+    /// </summary>
+    public void AddLine(ReadOnlySpan<char> line)
+    {
+        var text = line.Trim();
+        var commentStart = text.IndexOfAny('(', ';');
+        if (commentStart >= 0)
+            text = text[..commentStart].TrimEnd();
+
+        if (text.IsEmpty || text[0] == '%')
+            return;
+
+        BlockCount++;
+
+        Array.Clear(_words);
+        double i = 0, j = 0;
+        var hasArcCenter = false;
+        var positioningCode = false;
+
+        // Адрес - буква, значение - число до следующей буквы ("G0N20 Z50.000" допустимо);
+        // строки в кавычках (T="D20R0.8") пропускаются
+        var position = 0;
+        while (position < text.Length)
+        {
+            var c = text[position++];
+            if (c == '"')
+            {
+                var close = text[position..].IndexOf('"');
+                position = close < 0 ? text.Length : position + close + 1;
+                continue;
+            }
+
+            var letter = char.ToUpperInvariant(c);
+            if (!char.IsAsciiLetter(letter))
+                continue;
+
+            var start = position;
+            while (position < text.Length && (char.IsAsciiDigit(text[position]) || text[position] is '.' or '-' or '+'))
+                position++;
+
+            if (!double.TryParse(text[start..position], NumberStyles.Float, CultureInfo.InvariantCulture, out var value))
+                continue;
+
+            switch (letter)
+            {
+                case 'G':
+                    switch (value)
+                    {
+                        case 0 or 1 or 2 or 3:
+                            _motionCode = (int)value;
+                            break;
+                        case 90:
+                            _incremental = false;
+                            break;
+                        case 91:
+                            _incremental = true;
+                            break;
+                        case 28 or 53 or 92:
+                            positioningCode = true;
+                            break;
+                    }
+                    break;
+                case 'M' when value == 6:
+                    ToolChanges++;
+                    break;
+                case 'X':
+                    _words[0] = value;
+                    break;
+                case 'Y':
+                    _words[1] = value;
+                    break;
+                case 'Z':
+                    _words[2] = value;
+                    break;
+                case 'I':
+                    i = value;
+                    hasArcCenter = true;
+                    break;
+                case 'J':
+                    j = value;
+                    hasArcCenter = true;
+                    break;
+                case 'F':
+                    _feed = value;
+                    break;
+            }
+        }
+
+        // Координаты в машинной системе не относятся к детали
+        if (positioningCode)
+            return;
+
+        Span<double> from = stackalloc double[3];
+        var allKnown = true;
+        var moved = false;
+        for (int axis = 0; axis < 3; axis++)
+        {
+            from[axis] = _position[axis];
+            if (_words[axis] is not { } word)
+                continue;
+
+            moved = true;
+            allKnown &= _known[axis] || _incremental;
+            _position[axis] = _incremental ? _position[axis] + word : word;
+            _known[axis] = true;
+            _min[axis] = Math.Min(_min[axis], _position[axis]);
+            _max[axis] = Math.Max(_max[axis], _position[axis]);
+        }
+
+        if (!moved || !allKnown)
+            return;
+
+        var dx = _position[0] - from[0];
+        var dy = _position[1] - from[1];
+        var dz = _position[2] - from[2];
+        var length = Math.Sqrt(dx * dx + dy * dy + dz * dz);
+
+        if (_motionCode is 2 or 3 && hasArcCenter)
+            length = ArcLength(from[0], from[1], i, j, _position[0], _position[1], dz, _motionCode == 2);
+
+        if (_motionCode == 0)
+            _minutes += length / _rapidRate;
+        else if (_motionCode > 0 && _feed > 0)
+            _minutes += length / _feed;
+    }
+
+    private static double ArcLength(double x0, double y0, double i, double j, double x1, double y1, double dz, bool clockwise)
+    {
+        var cx = x0 + i;
+        var cy = y0 + j;
+        var radius = Math.Sqrt(i * i + j * j);
+
+        var startAngle = Math.Atan2(y0 - cy, x0 - cx);
+        var endAngle = Math.Atan2(y1 - cy, x1 - cx);
+        var sweep = clockwise ? startAngle - endAngle : endAngle - startAngle;
+        if (sweep <= 1e-9)
+            sweep += 2 * Math.PI;
+
+        var planar = radius * sweep;
+        return Math.Sqrt(planar * planar + dz * dz);
+    }
+}
@@ -0,0 +1,181 @@
+using System.Text;
+
+namespace PostProcessor.Core.Writers;
+
+/// <summary>
+/// TextWriter, разбивающий УП на несколько файлов на сменах инструмента.
+/// Текст накапливается только до конца текущей строки, поэтому память ограничена
+/// длиной одного кадра независимо от размера программы.
+/// </summary>
+public sealed class SplittingNcWriter : TextWriter
+{
+    private readonly string _basePath;
+    private readonly NcOutputOptions _options;
+    private readonly Encoding _encoding;
+    private readonly Func<int, IEnumerable<string>>? _header;
+    private readonly string[] _footer;
+    private readonly HashSet<string> _toolChangeCodes;
+    private readonly List<string> _partPaths = new();
+    private readonly StringBuilder _line = new();
+
+    private StreamWriter _current;
+    private long _partBytes;
+    private int _toolChangesInPart;
+    private bool _disposed;
+
+    /// <summary>
+    /// Создать разбивающий writer
+    /// </summary>
+    /// <param name="path">Путь первого файла</param>
+    /// <param name="options">Параметры записи</param>
+    /// <param name="encoding">Кодировка текста</param>
+    /// <param name="header">Заголовок для второго и последующих файлов</param>
+    /// <param name="footer">Завершение для всех файлов, кроме последнего</param>
+    public SplittingNcWriter(
+        string path,
+        NcOutputOptions options,
+        Encoding encoding,
+        Func<int, IEnumerable<string>>? header = null,
+        IEnumerable<string>? footer = null)
+    {
+        _basePath = path;
+        _options = options;
+        _encoding = encoding;
+        _header = header;
+        _footer = footer?.ToArray() ?? Array.Empty<string>();
+        _toolChangeCodes = new HashSet<string>(options.ToolChangeCodes, StringComparer.OrdinalIgnoreCase);
+
+        _partPaths.Add(path);
+        _current = NcOutput.CreateFileWriter(path, options.Compression, encoding);
+    }
+
+    public override Encoding Encoding => _encoding;
+
+    /// <summary>
+    /// Пути всех созданных файлов
+    /// </summary>
+    public IReadOnlyList<string> PartPaths => _partPaths;
+
+    public override void Write(char value)
+    {
+        _line.Append(value);
+        if (value == '\n')
+            CompleteLine();
+    }
+
+    public override void Write(string? value)
+    {
+        if (value != null)
+            Write(value.AsSpan());
+    }
+
+    public override void Write(char[] buffer, int index, int count)
+    {
+        Write(buffer.AsSpan(index, count));
+    }
+
+    public override void Write(ReadOnlySpan<char> buffer)
+    {
+        while (!buffer.IsEmpty)
+        {
+            var newLine = buffer.IndexOf('\n');
+            if (newLine < 0)
+            {
+                _line.Append(buffer);
+                return;
+            }
+
+            _line.Append(buffer[..(newLine + 1)]);
+            CompleteLine();
+            buffer = buffer[(newLine + 1)..];
+        }
+    }
+
+    public override void Flush()
+    {
+        _current.Flush();
+    }
+
+    private void CompleteLine()
+    {
+        var line = _line.ToString();
+        _line.Clear();
+
+        if (IsToolChange(line))
+        {
+            if (_toolChangesInPart > 0 && ShouldSplit())
+                StartNextPart();
+            _toolChangesInPart++;
+        }
+
+        WriteRaw(line);
+    }
+
+    private bool ShouldSplit()
+    {
+        return _options.SplitMode switch
+        {
+            NcSplitMode.ToolChange => true,
+            NcSplitMode.Size => _partBytes >= _options.MaxPartBytes,
+            _ => false
+        };
+    }
+
+    private bool IsToolChange(string line)
+    {
+        foreach (var token in line.Split((char[]?)null, StringSplitOptions.RemoveEmptyEntries))
+        {
+            if (token[0] is '(' or ';')
+                return false;
+            if (_toolChangeCodes.Contains(token))
+                return true;
+        }
+        return false;
+    }
+
+    private void StartNextPart()
+    {
+        foreach (var line in _footer)
+            WriteRaw(line + NewLine);
+        _current.Dispose();
+
+        var part = _partPaths.Count + 1;
+        var path = NcOutput.GetPartPath(_basePath, part, _options);
+        _partPaths.Add(path);
+        _current = NcOutput.CreateFileWriter(path, _options.Compression, _encoding);
+        _partBytes = 0;
+        _toolChangesInPart = 0;
+
+        if (_header != null)
+        {
+            foreach (var line in _header(part))
+                WriteRaw(line + NewLine);
+            WriteRaw(NewLine);
+        }
+    }
+
+    private void WriteRaw(string text)
+    {
+        _current.Write(text);
+        _partBytes += _encoding.GetByteCount(text);
+    }
+
+    protected override void Dispose(bool disposing)
+    {
+        if (disposing && !_disposed)
+        {
+            _disposed = true;
+            if (_line.Length > 0)
+                CompleteLine();
+            _current.Dispose();
+        }
+        base.Dispose(disposing);
+    }
+
+    public override ValueTask DisposeAsync()
+    {
+        Dispose(true);
+        GC.SuppressFinalize(this);
+        return ValueTask.CompletedTask;
+    }
+}
@@ -57,6 +57,26 @@ public class CompositeMacroEngine : IMacroEngine
         foreach (var engine in _engines)
         {
             await engine.ExecuteAsync(context, command, cancellationToken);
+
+            // Движки используют общий контекст: следующий начинает после выполнения команды
+            if (_engines.Count > 1)
+                await engine.FlushAsync(cancellationToken);
+        }
+    }
+
+    public async Task FlushAsync(CancellationToken cancellationToken = default)
+    {
+        foreach (var engine in _engines)
+        {
+            await engine.FlushAsync(cancellationToken);
+        }
+    }
+
+    public async Task DiscardPendingAsync()
+    {
+        foreach (var engine in _engines)
+        {
+            await engine.DiscardPendingAsync();
         }
     }
 
@@ -0,0 +1,148 @@
+using System;
+using System.Collections.Generic;
+using System.Diagnostics;
+using System.IO;
+using System.Threading;
+using System.Threading.Tasks;
+using PostProcessor.Core.Context;
+using PostProcessor.Core.Diagnostics;
+using PostProcessor.Core.Models;
+using PostProcessor.Macros.Interfaces;
+
+namespace PostProcessor.Macros.Engine;
+
+/// <summary>
+/// Обёртка движка макросов, собирающая метрики: число вызовов и время каждого макроса,
+/// счётчики PostContext.GetStatistics(), кэшей геометрии и инструментов, выведенные кадры и ошибки макросов.
+/// Файл метрик обновляется из потока обработки не чаще заданного интервала
+/// (часы опрашиваются раз в SampleEvery команд); итог задания добавляет Collect.
+/// </summary>
+public class MetricsMacroEngine : IMacroEngine
+{
+    /// <summary>
+    /// Часы проверяются раз в столько команд (степень двойки)
+    /// </summary>
+    public const int SampleEvery = 256;
+
+    private readonly IMacroEngine _inner;
+    private readonly PrometheusMetricsFile _metrics;
+    private readonly long _intervalTicks;
+    private readonly Dictionary<string, MacroTiming> _macros = new(StringComparer.Ordinal);
+    private long _nextPublish;
+    private long _commands;
+
+    private int _commandCount;
+    private int _motionCount;
+    private int _toolChanges;
+    private long _blocks;
+    private int _errors;
+    private CacheStatistics? _geometryCache;
+    private CacheStatistics? _toolCache;
+
+    /// <summary>
+    /// Создать движок со сбором метрик
+    /// </summary>
+    /// <param name="inner">Движок, выполняющий макросы</param>
+    /// <param name="metrics">Файл метрик</param>
+    /// <param name="interval">Минимальный интервал между обновлениями файла (по умолчанию 15 с)</param>
+    public MetricsMacroEngine(IMacroEngine inner, PrometheusMetricsFile metrics, TimeSpan? interval = null)
+    {
+        _inner = inner;
+        _metrics = metrics;
+        _intervalTicks = (long)((interval ?? TimeSpan.FromSeconds(15)).TotalSeconds * Stopwatch.Frequency);
+        _nextPublish = Stopwatch.GetTimestamp() + _intervalTicks;
+    }
+
+    public void RegisterLoader(IMacroLoader loader) => _inner.RegisterLoader(loader);
+
+    public Task LoadAsync(IEnumerable<string> paths, CancellationToken cancellationToken = default)
+        => _inner.LoadAsync(paths, cancellationToken);
+
+    public IEnumerable<IMacro> FindMacros(string commandName) => _inner.FindMacros(commandName);
+
+    public int GetMacroCount() => _inner.GetMacroCount();
+
+    public string? GetMacroSource(string commandName) => _inner.GetMacroSource(commandName);
+
+    public Task FlushAsync(CancellationToken cancellationToken = default) => _inner.FlushAsync(cancellationToken);
+
+    public Task DiscardPendingAsync() => _inner.DiscardPendingAsync();
+
+    public async Task ExecuteAsync(PostContext context, APTCommand command, CancellationToken cancellationToken = default)
+    {
+        var start = Stopwatch.GetTimestamp();
+
+        // Время макроса - с ожиданием выполнения (команда могла быть только поставлена в очередь)
+        await _inner.ExecuteAsync(context, command, cancellationToken);
+        await _inner.FlushAsync(cancellationToken);
+
+        var end = Stopwatch.GetTimestamp();
+        if (!_macros.TryGetValue(command.MajorWord, out var timing))
+            _macros[command.MajorWord] = timing = new MacroTiming();
+        timing.Calls++;
+        timing.Ticks += end - start;
+
+        if ((++_commands & (SampleEvery - 1)) == 0 && end >= _nextPublish)
+        {
+            Collect(context);
+            try
+            {
+                _metrics.Flush();
+            }
+            catch (IOException ex)
+            {
+                // Приращения остаются в памяти до следующего обновления
+                Console.WriteLine($"[Metrics] Update skipped: {ex.Message}");
+            }
+            _nextPublish = Stopwatch.GetTimestamp() + _intervalTicks;
+        }
+    }
+
+    /// <summary>
+    /// Добавить в файл метрик приращения с прошлого вызова (без записи: запись - Flush)
+    /// </summary>
+    public void Collect(PostContext context)
+    {
+        var (commands, motions, toolChanges) = context.GetStatistics();
+        var blocks = context.BlockWriter.BlocksWritten;
+        var errors = context.MacroErrors;
+
+        _metrics.Add("postprocessor_commands_total", "APT commands processed", commands - _commandCount);
+        _metrics.Add("postprocessor_motion_commands_total", "GOTO/RAPID commands processed", motions - _motionCount);
+        _metrics.Add("postprocessor_tool_changes_total", "Tool changes processed", toolChanges - _toolChanges);
+        _metrics.Add("postprocessor_blocks_total", "NC blocks written", blocks - _blocks);
+        _metrics.Add("postprocessor_errors_total", "Errors by kind", errors - _errors, "kind", "macro");
+        (_commandCount, _motionCount, _toolChanges, _blocks, _errors) = (commands, motions, toolChanges, blocks, errors);
+
+        var (geometry, tools) = context.GetCacheStatistics();
+        AddCacheCounters("geometry", geometry, _geometryCache);
+        AddCacheCounters("tool", tools, _toolCache);
+        (_geometryCache, _toolCache) = (geometry, tools);
+
+        foreach (var (macro, timing) in _macros)
+        {
+            if (timing.Calls == 0)
+                continue;
+            _metrics.Add("postprocessor_macro_calls_total", "Macro calls by major word", timing.Calls, "macro", macro);
+            _metrics.Add("postprocessor_macro_seconds_total", "Macro execution time by major word", (double)timing.Ticks / Stopwatch.Frequency, "macro", macro);
+            timing.Calls = 0;
+            timing.Ticks = 0;
+        }
+    }
+
+    public ValueTask DisposeAsync() => _inner.DisposeAsync();
+
+    private void AddCacheCounters(string cache, CacheStatistics current, CacheStatistics? previous)
+    {
+        _metrics.Add("postprocessor_cache_hits_total", "Cache hits by cache", current.Hits - (previous?.Hits ?? 0), "cache", cache);
+        _metrics.Add("postprocessor_cache_misses_total", "Cache misses by cache", current.Misses - (previous?.Misses ?? 0), "cache", cache);
+        _metrics.Add("postprocessor_cache_evictions_total", "LRU evictions by cache", current.Evictions - (previous?.Evictions ?? 0), "cache", cache);
+        _metrics.Add("postprocessor_cache_spill_hits_total", "Entries read back from the spill file by cache", current.SpillHits - (previous?.SpillHits ?? 0), "cache", cache);
+    }
+
+    private sealed class MacroTiming
+    {
+        public long Calls;
+        public long Ticks;
+    }
+}
@@ -0,0 +1,92 @@
+using System;
+using System.Collections.Generic;
+using System.Diagnostics;
+using System.Threading;
+using System.Threading.Tasks;
+using PostProcessor.Core.Context;
+using PostProcessor.Core.Diagnostics;
+using PostProcessor.Core.Models;
+using PostProcessor.Macros.Interfaces;
+
+namespace PostProcessor.Macros.Engine;
+
+/// <summary>
+/// Обёртка движка макросов, записывающая трассировку выполнения:
+/// длительность, объём вывода и изменения регистров для каждой команды
+/// </summary>
+public class TracingMacroEngine : IMacroEngine
+{
+    private readonly IMacroEngine _inner;
+    private readonly ITraceSink _sink;
+    private readonly TraceOutputWriter _output;
+    private readonly Stopwatch _clock = Stopwatch.StartNew();
+    private readonly Dictionary<string, double> _before = new();
+    private long _sequence;
+
+    /// <summary>
+    /// Создать трассирующий движок
+    /// </summary>
+    /// <param name="inner">Движок, выполняющий макросы</param>
+    /// <param name="sink">Приёмник трассировки</param>
+    /// <param name="output">Счётчик вывода (должен входить в цепочку PostContext.Output)</param>
+    public TracingMacroEngine(IMacroEngine inner, ITraceSink sink, TraceOutputWriter output)
+    {
+        _inner = inner;
+        _sink = sink;
+        _output = output;
+    }
+
+    public void RegisterLoader(IMacroLoader loader) => _inner.RegisterLoader(loader);
+
+    public Task LoadAsync(IEnumerable<string> paths, CancellationToken cancellationToken = default)
+        => _inner.LoadAsync(paths, cancellationToken);
+
+    public IEnumerable<IMacro> FindMacros(string commandName) => _inner.FindMacros(commandName);
+
+    public int GetMacroCount() => _inner.GetMacroCount();
+
+    public string? GetMacroSource(string commandName) => _inner.GetMacroSource(commandName);
+
+    public Task FlushAsync(CancellationToken cancellationToken = default) => _inner.FlushAsync(cancellationToken);
+
+    public Task DiscardPendingAsync() => _inner.DiscardPendingAsync();
+
+    public async Task ExecuteAsync(PostContext context, APTCommand command, CancellationToken cancellationToken = default)
+    {
+        _before.Clear();
+        foreach (var register in context.Registers.All)
+            _before[register.Name] = register.Value;
+
+        _output.Mark();
+        var start = _clock.Elapsed;
+
+        // Вывод и регистры относятся к команде, только если она уже выполнена
+        await _inner.ExecuteAsync(context, command, cancellationToken);
+        await _inner.FlushAsync(cancellationToken);
+
+        var duration = _clock.Elapsed - start;
+
+        var deltas = new Dictionary<string, double>();
+        foreach (var register in context.Registers.All)
+        {
+            if (!_before.TryGetValue(register.Name, out var previous) || Math.Abs(previous - register.Value) > 1e-9)
+                deltas[register.Name] = register.Value;
+        }
+
+        _sink.Record(new TraceEvent(
+            ++_sequence,
+            command,
+            _inner.GetMacroSource(command.MajorWord),
+            (long)(start.Ticks / 10),
+            (long)(duration.Ticks / 10),
+            _output.CharsSinceMark,
+            _output.HashSinceMark,
+            deltas));
+    }
+
+    public ValueTask DisposeAsync()
+    {
+        _sink.Dispose();
+        return _inner.DisposeAsync();
+    }
+}
@@ -25,9 +25,26 @@ public interface IMacroEngine : IAsyncDisposable
     /// Выполнение макросов для команды
     /// </summary>
     Task ExecuteAsync(PostContext context, APTCommand command, CancellationToken cancellationToken = default);
+
+    /// <summary>
+    /// Дождаться выполнения переданных команд (для движков, которые ставят команды в очередь);
+    /// вызывается перед чтением состояния контекста
+    /// </summary>
+    Task FlushAsync(CancellationToken cancellationToken = default) => Task.CompletedTask;
+
+    /// <summary>
+    /// Отбросить команды, ещё не выполненные из очереди, и дождаться выполняемой;
+    /// вызывается при ошибке или отмене, до вывода окончания программы
+    /// </summary>
+    Task DiscardPendingAsync() => Task.CompletedTask;
     
     /// <summary>
     /// Получить количество загруженных макросов
     /// </summary>
     int GetMacroCount();
+
+    /// <summary>
+    /// Получить источник макроса для команды (путь к файлу) - для трассировки
+    /// </summary>
+    string? GetMacroSource(string commandName) => null;
 }
@@ -0,0 +1,265 @@
+using System.Numerics;
+using System.Security.Cryptography;
+using System.Text;
+using PostProcessor.Core.Context;
+using PostProcessor.Core.Models;
+
+namespace PostProcessor.Macros.Python;
+
+/// <summary>
+/// Встроенные C#-реализации базовых макросов движения (base/goto.py, rapid.py, fedrat.py).
+/// Используются вместо Python, только если найденный макрос - неизменённый файл из поставки
+/// (сверка SHA-256 содержимого). Вывод побайтно совпадает с Python-версией, включая
+/// поведение обёрток PythonPostContext (write без перевода строки, пустая строка после writeBlock).
+/// </summary>
+public static class NativeBaseMacros
+{
+    // SHA-256 поставляемых файлов (переводы строк приведены к LF)
+    private static readonly Dictionary<string, string> StockHashes = new(StringComparer.OrdinalIgnoreCase)
+    {
+        ["goto"] = "29FCE600D17796B0A67139C4B28AC493EF5C1D92A5A350F53CE5CB104BFDDEFD",
+        ["rapid"] = "8F9D7B469027A9946F2DA1B51D9AB32CEE95CB296668544608949C45AFEEA766",
+        ["fedrat"] = "24D9FD1ECBAD0AF26ADE88F2316406C5309EB7D7342EF950524A056BB863B582"
+    };
+
+    private const double RadiansToDegrees = 180.0 / Math.PI;
+
+    /// <summary>
+    /// Является ли файл неизменённым базовым макросом из поставки
+    /// </summary>
+    public static bool IsStock(string macroName, string filePath)
+    {
+        if (!StockHashes.TryGetValue(macroName, out var expected) || !File.Exists(filePath))
+            return false;
+
+        var text = File.ReadAllText(filePath, Encoding.UTF8).Replace("\r\n", "\n");
+        var hash = Convert.ToHexString(SHA256.HashData(Encoding.UTF8.GetBytes(text)));
+        return hash == expected;
+    }
+
+    /// <summary>
+    /// Получить встроенную реализацию для файла макроса, если он из поставки
+    /// </summary>
+    public static Action<PostContext, APTCommand>? Resolve(string macroName, string filePath)
+    {
+        if (!IsStock(macroName, filePath))
+            return null;
+
+        return APTWords.GetMajor(macroName) switch
+        {
+            APTMajorWord.Goto => Goto,
+            APTMajorWord.Rapid => Rapid,
+            APTMajorWord.Fedrat => Fedrat,
+            _ => null
+        };
+    }
+
+    /// <summary>
+    /// GOTO/X, Y, Z[, I, J, K] - линейное перемещение (base/goto.py)
+    /// </summary>
+    public static void Goto(PostContext context, APTCommand command)
+    {
+        var numeric = command.NumericValues;
+        if (numeric.Count == 0)
+            return;
+
+        var registers = context.Registers;
+        if (numeric.Count > 3)
+            registers.I.SetValue(numeric[3]);
+        if (numeric.Count > 4)
+            registers.J.SetValue(numeric[4]);
+        if (numeric.Count > 5)
+            registers.K.SetValue(numeric[5]);
+
+        // PythonPostContext.currentMotionType создаётся заново для каждой команды,
+        // поэтому ускоренный ход определяется только по SYSTEM.MOTION
+        var motion = context.GetSystemVariable("MOTION", "LINEAR");
+        var isRapid = motion is "RAPID" or "RAPID_BREAK";
+
+        double? a = null, b = null;
+        if (numeric.Count > 5)
+            (a, b) = IjkToAb(numeric[3], numeric[4], numeric[5]);
+
+        EmitMotion(context, isRapid ? "G0" : "G1",
+            numeric[0], numeric.Count > 1 ? numeric[1] : 0, numeric.Count > 2 ? numeric[2] : 0, a, b);
+
+        if (isRapid)
+            context.SetSystemVariable("MOTION", "LINEAR");
+    }
+
+    /// <summary>
+    /// RAPID[/X, Y, Z] - ускоренное перемещение (base/rapid.py)
+    /// </summary>
+    public static void Rapid(PostContext context, APTCommand command)
+    {
+        context.SetSystemVariable("MOTION", "RAPID");
+
+        var numeric = command.NumericValues;
+        if (numeric.Count == 0)
+            return;
+
+        var registers = context.Registers;
+        EmitMotion(context, "G0",
+            numeric[0],
+            numeric.Count > 1 ? numeric[1] : registers.Y.Value,
+            numeric.Count > 2 ? numeric[2] : registers.Z.Value);
+    }
+
+    /// <summary>
+    /// FEDRAT/F - подача (base/fedrat.py)
+    /// </summary>
+    public static void Fedrat(PostContext context, APTCommand command)
+    {
+        var numeric = command.NumericValues;
+        if (numeric.Count == 0)
+            return;
+
+        context.Registers.F.SetValue(numeric[0]);
+        context.BlockWriter.Show(context.Registers.F);
+        WriteBlock(context);
+    }
+
+    /// <summary>
+    /// Перемещение одним вызовом (PythonPostContext.emitMotion): установка регистров,
+    /// G-код и блок с модальной проверкой. Необязательные оси и подача не изменяются, если не заданы.
+    /// </summary>
+    public static void EmitMotion(
+        PostContext context, string gcode, double x, double y, double z,
+        double? a = null, double? b = null, double? c = null, double? feed = null)
+    {
+        var registers = context.Registers;
+        registers.X.SetValue(x);
+        registers.Y.SetValue(y);
+        registers.Z.SetValue(z);
+
+        if (a.HasValue)
+            registers.A.SetValue(a.Value);
+        if (b.HasValue)
+            registers.B.SetValue(b.Value);
+        if (c.HasValue)
+            registers.C.SetValue(c.Value);
+        if (feed.HasValue)
+            registers.F.SetValue(feed.Value);
+
+        Write(context, gcode);
+        WriteBlock(context);
+    }
+
+    /// <summary>
+    /// Дуга одним вызовом (PythonPostContext.emitArc): X/Y/Z выводятся всегда,
+    /// в конце блока - заданные I/J/K или R (при заданном радиусе центр не выводится)
+    /// </summary>
+    public static void EmitArc(
+        PostContext context, string gcode, double x, double y, double z,
+        double? i = null, double? j = null, double? k = null, double? r = null, double? feed = null)
+    {
+        var registers = context.Registers;
+        registers.X.SetValue(x);
+        registers.Y.SetValue(y);
+        registers.Z.SetValue(z);
+        context.BlockWriter.Show(registers.X, registers.Y, registers.Z);
+
+        if (feed.HasValue)
+            registers.F.SetValue(feed.Value);
+
+        NCWord[] arcWords;
+        if (r.HasValue)
+        {
+            var radius = registers.GetOrAdd("R");
+            radius.SetValue(r.Value);
+            arcWords = new NCWord[] { radius };
+        }
+        else
+        {
+            var words = new List<NCWord>(3);
+            if (i.HasValue)
+                words.Add(SetArcCenter(registers.I, i.Value));
+            if (j.HasValue)
+                words.Add(SetArcCenter(registers.J, j.Value));
+            if (k.HasValue)
+                words.Add(SetArcCenter(registers.K, k.Value));
+            arcWords = words.ToArray();
+        }
+
+        Write(context, gcode);
+        context.BlockWriter.WriteBlock(true, arcWords);
+        context.Output.WriteLine();
+        context.Output.Flush();
+    }
+
+    private static Register SetArcCenter(Register register, double value)
+    {
+        register.SetValue(value);
+        return register;
+    }
+
+    // Аналог PythonPostContext.write
+    private static void Write(PostContext context, string text)
+    {
+        if (string.IsNullOrWhiteSpace(text))
+            return;
+
+        context.Output.Write(text);
+        context.Output.Flush();
+    }
+
+    // Аналог PythonPostContext.writeBlock
+    private static void WriteBlock(PostContext context)
+    {
+        context.BlockWriter.WriteBlock(true);
+        context.Output.WriteLine();
+        context.Output.Flush();
+    }
+
+    // ijk_to_abc из base/goto.py
+    private static (double A, double B) IjkToAb(double i, double j, double k)
+    {
+        var a = Math.Atan2(j, k) * RadiansToDegrees;
+        var b = Math.Atan2(i, Math.Sqrt(j * j + k * k)) * RadiansToDegrees;
+
+        if (a < 0)
+            a += 360;
+        if (b < 0)
+            b += 360;
+
+        return (PythonRound(a, 3), PythonRound(b, 3));
+    }
+
+    /// <summary>
+    /// round(value, digits) как в CPython: точное округление двоичного значения
+    /// к ближайшему (половина - к чётному). Math.Round масштабирует с погрешностью
+    /// и на границах может дать другой последний знак.
+    /// </summary>
+    internal static double PythonRound(double value, int digits)
+    {
+        if (double.IsNaN(value) || double.IsInfinity(value) || value == 0)
+            return value;
+
+        var bits = BitConverter.DoubleToInt64Bits(value);
+        var negative = bits < 0;
+        var exponent = (int)((bits >> 52) & 0x7FF);
+        var mantissa = bits & 0xFFFFFFFFFFFFFL;
+
+        if (exponent == 0)
+            exponent++;
+        else
+            mantissa |= 1L << 52;
+        exponent -= 1075;
+
+        // Целые значения округлять не нужно
+        if (exponent >= 0)
+            return value;
+
+        // value * 10^digits = mantissa * 10^digits / 2^-exponent
+        var numerator = new BigInteger(mantissa) * BigInteger.Pow(10, digits);
+        var denominator = BigInteger.One << -exponent;
+        var quotient = BigInteger.DivRem(numerator, denominator, out var remainder);
+
+        var comparison = (remainder * 2).CompareTo(denominator);
+        if (comparison > 0 || (comparison == 0 && !quotient.IsEven))
+            quotient += 1;
+
+        var result = (double)quotient / Math.Pow(10, digits);
+        return negative ? -result : result;
+    }
+}
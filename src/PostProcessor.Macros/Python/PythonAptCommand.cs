@@ -20,9 +20,9 @@ public class PythonAptCommand
     }
 
     /// <summary>
-    /// Основное слово команды (например, "goto", "spindl")
+    /// Основное слово команды (например, "goto", "spindl"), лексер приводит его к нижнему регистру
     /// </summary>
-    public string majorWord => _command.MajorWord?.ToLowerInvariant() ?? "";
+    public string majorWord => _command.MajorWord ?? "";
 
     /// <summary>
     /// Номер строки в исходном файле
@@ -48,18 +48,9 @@ public class PythonAptCommand
     public List<string> minorWords { get; }
     
     /// <summary>
-    /// Проверить наличие ключевого слова
+    /// Проверить наличие ключевого слова (без учёта регистра, O(1) для известных слов)
     /// </summary>
-    public bool hasMinorWord(string word)
-    {
-        var lowerWord = word.ToLowerInvariant();
-        foreach (var minor in minorWords)
-        {
-            if (minor.ToLowerInvariant() == lowerWord)
-                return true;
-        }
-        return false;
-    }
+    public bool hasMinorWord(string word) => _command.HasMinorWord(word);
     
     /// <summary>
     /// Получить первое числовое значение или значение по умолчанию
@@ -0,0 +1,203 @@
+using System;
+using System.Collections.Frozen;
+using System.Collections.Generic;
+using System.Linq;
+using System.Runtime.CompilerServices;
+using System.Text.Json;
+using PostProcessor.Core.Config.Loaders;
+using PostProcessor.Core.Config.Models;
+using Python.Runtime;
+
+namespace PostProcessor.Macros.Python;
+
+/// <summary>
+/// Таблицы кодов и параметров контроллера, построенные один раз на экземпляр конфигурации:
+/// G/M-коды (стандартные с заменами из customGCodes/customMCodes), коды функций,
+/// форматы регистров и пользовательские параметры (значения JSON приведены к .NET-типам).
+/// Коды функций и форматы регистров - готовые таблицы ConfigSnapshot.
+/// Для макросов таблицы публикуются неизменяемым Python-объектом CONFIG
+/// (namedtuple из MappingProxyType), который строится при первом обращении.
+/// Новая конфигурация - новый экземпляр ControllerConfig и, соответственно, новые таблицы.
+/// </summary>
+public sealed class PythonConfigTables
+{
+    private static readonly ConditionalWeakTable<ControllerConfig, PythonConfigTables> Tables = new();
+
+    // Стандартные M-коды по именам PythonMCode
+    private static readonly (string Name, string Code)[] StandardMCodes =
+    {
+        ("programEnd", "M30"),
+        ("programStop", "M00"),
+        ("spindleCW", "M3"),
+        ("spindleCCW", "M4"),
+        ("spindleStop", "M5"),
+        ("coolantOn", "M8"),
+        ("coolantOff", "M9"),
+        ("toolChange", "M6")
+    };
+
+    private PyObject? _python;
+
+    private PythonConfigTables(ControllerConfig config)
+    {
+        Name = config.Name;
+
+        var snapshot = ConfigSnapshot.For(config);
+        FunctionCodes = snapshot.FunctionCodes;
+        RegisterFormats = snapshot.RegisterFormats;
+
+        var gcodes = FunctionCodes
+            .Where(entry => entry.Value.Code.StartsWith("G", StringComparison.OrdinalIgnoreCase))
+            .ToDictionary(entry => entry.Key, entry => entry.Value.Code, StringComparer.OrdinalIgnoreCase);
+        foreach (var (key, code) in config.CustomGCodes ?? new Dictionary<string, string>())
+            gcodes[key] = code;
+        GCodes = gcodes.ToFrozenDictionary(StringComparer.OrdinalIgnoreCase);
+
+        var mcodes = StandardMCodes.ToDictionary(entry => entry.Name, entry => entry.Code, StringComparer.OrdinalIgnoreCase);
+        foreach (var (key, code) in config.CustomMCodes ?? new Dictionary<string, string>())
+            mcodes[key] = code;
+        MCodes = mcodes.ToFrozenDictionary(StringComparer.OrdinalIgnoreCase);
+
+        Parameters = config.CustomParameters.ToFrozenDictionary(
+            entry => entry.Key, entry => ToClr(entry.Value), StringComparer.Ordinal);
+
+        MCode = new PythonMCode(MCodes);
+    }
+
+    /// <summary>
+    /// Таблицы для конфигурации (строятся при первом обращении)
+    /// </summary>
+    public static PythonConfigTables For(ControllerConfig config) =>
+        Tables.GetValue(config, c => new PythonConfigTables(c));
+
+    /// <summary>
+    /// Имя контроллера
+    /// </summary>
+    public string Name { get; }
+
+    /// <summary>
+    /// G-коды: коды функций с адресом G и customGCodes
+    /// </summary>
+    public FrozenDictionary<string, string> GCodes { get; }
+
+    /// <summary>
+    /// M-коды: стандартные имена PythonMCode и customMCodes
+    /// </summary>
+    public FrozenDictionary<string, string> MCodes { get; }
+
+    /// <summary>
+    /// Все коды функций по имени (rapid, linear, spindle_cw...)
+    /// </summary>
+    public FrozenDictionary<string, FunctionCode> FunctionCodes { get; }
+
+    /// <summary>
+    /// Форматы регистров по адресу (включая стандартные)
+    /// </summary>
+    public FrozenDictionary<string, RegisterFormat> RegisterFormats { get; }
+
+    /// <summary>
+    /// Пользовательские параметры: bool, long, double, string, null, object[] или словарь
+    /// </summary>
+    public FrozenDictionary<string, object?> Parameters { get; }
+
+    /// <summary>
+    /// M-коды в виде свойств (config.mcode)
+    /// </summary>
+    public PythonMCode MCode { get; }
+
+    /// <summary>
+    /// Неизменяемый Python-объект с таблицами (вызывать под GIL; строится один раз):
+    /// CONFIG.gcode, CONFIG.mcode, CONFIG.functionCodes, CONFIG.registerFormats, CONFIG.parameters
+    /// </summary>
+    public PyObject ToPython()
+    {
+        if (_python != null)
+            return _python;
+
+        using var collections = Py.Import("collections");
+        using var tupleType = collections.InvokeMethod(
+            "namedtuple",
+            new PyString("ControllerTables"),
+            new PyString("name gcode mcode functionCodes registerFormats parameters"));
+
+        var formats = new PyDict();
+        foreach (var (address, format) in RegisterFormats)
+        {
+            var entry = new PyDict();
+            entry.SetItem("address", new PyString(format.Address));
+            entry.SetItem("format", new PyString(format.Format));
+            entry.SetItem("isModal", format.IsModal.ToPython());
+            entry.SetItem("minValue", format.MinValue.ToPython());
+            entry.SetItem("maxValue", format.MaxValue.ToPython());
+            formats.SetItem(address, Freeze(entry));
+        }
+
+        var parameters = new PyDict();
+        foreach (var (key, value) in Parameters)
+            parameters.SetItem(key, ToPython(value));
+
+        _python = tupleType.Invoke(
+            new PyString(Name),
+            Freeze(ToPyDict(GCodes)),
+            Freeze(ToPyDict(MCodes)),
+            Freeze(ToPyDict(FunctionCodes.Select(entry => KeyValuePair.Create(entry.Key, entry.Value.Code)))),
+            Freeze(formats),
+            Freeze(parameters));
+        return _python;
+    }
+
+    private static PyDict ToPyDict(IEnumerable<KeyValuePair<string, string>> codes)
+    {
+        var dict = new PyDict();
+        foreach (var (key, code) in codes)
+            dict.SetItem(key, new PyString(code));
+        return dict;
+    }
+
+    private static PyObject Freeze(PyDict dict)
+    {
+        using var types = Py.Import("types");
+        using var proxy = types.GetAttr("MappingProxyType");
+        return proxy.Invoke(dict);
+    }
+
+    private static PyObject ToPython(object? value)
+    {
+        switch (value)
+        {
+            case IReadOnlyDictionary<string, object?> map:
+                var dict = new PyDict();
+                foreach (var (key, item) in map)
+                    dict.SetItem(key, ToPython(item));
+                return Freeze(dict);
+            case object?[] items:
+                var list = new PyList();
+                foreach (var item in items)
+                    list.Append(ToPython(item));
+                using (var builtins = Py.Import("builtins"))
+                using (var tuple = builtins.GetAttr("tuple"))
+                    return tuple.Invoke(list);
+            default:
+                return value.ToPython();
+        }
+    }
+
+    // Значения из JSON десериализуются как JsonElement
+    private static object? ToClr(object? value)
+    {
+        if (value is not JsonElement element)
+            return value;
+
+        return element.ValueKind switch
+        {
+            JsonValueKind.True => true,
+            JsonValueKind.False => false,
+            JsonValueKind.Number => element.TryGetInt64(out var integer) ? (object)integer : element.GetDouble(),
+            JsonValueKind.String => element.GetString(),
+            JsonValueKind.Array => element.EnumerateArray().Select(item => ToClr(item)).ToArray(),
+            JsonValueKind.Object => element.EnumerateObject()
+                .ToFrozenDictionary(property => property.Name, property => ToClr(property.Value), StringComparer.Ordinal),
+            _ => null
+        };
+    }
+}
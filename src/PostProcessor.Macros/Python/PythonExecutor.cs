@@ -0,0 +1,291 @@
+using System;
+using System.Runtime.ExceptionServices;
+using System.Threading;
+using System.Threading.Channels;
+using System.Threading.Tasks;
+using Python.Runtime;
+
+namespace PostProcessor.Macros.Python;
+
+/// <summary>
+/// Выделенный поток выполнения Python: захватывает GIL и выполняет задания из ограниченной
+/// очереди (канала) по порядку, не отпуская GIL между ними. Лексер и запись вывода остаются
+/// в других потоках, а вызовы макросов не передают GIL между потоками на каждой команде.
+/// Задания PostAsync не ожидаются: вызывающий поток ждёт, только если очередь заполнена,
+/// или в точке синхронизации (DrainAsync).
+/// Всё Python-состояние (модули макросов, глобальные переменные) используется из одного потока.
+/// GIL отпускается, только если очередь пуста дольше idleTimeout (паузы между заданиями,
+/// другие движки и Python-потоки макросов), и захватывается снова при следующем задании.
+/// </summary>
+public sealed class PythonExecutor : IDisposable
+{
+    /// <summary>
+    /// Заданий в очереди по умолчанию
+    /// </summary>
+    public const int DefaultCapacity = 1024;
+
+    private readonly Channel<WorkItem> _pending;
+    private readonly Thread _thread;
+    private readonly TimeSpan _idleTimeout;
+    private readonly Func<IDisposable> _acquireGil;
+    private readonly Func<IDisposable> _allowThreads;
+    private long _executedCount;
+    private long _idleReleases;
+    // Задания, поставленные до последнего DiscardPendingAsync, не выполняются
+    private long _discardGeneration;
+    // Первая ошибка задания PostAsync (выдаётся в точке синхронизации)
+    private Exception? _fault;
+    private bool _disposed;
+
+    /// <summary>
+    /// Запустить поток выполнения (Python runtime должен быть инициализирован,
+    /// если не заданы acquireGil и allowThreads)
+    /// </summary>
+    /// <param name="idleTimeout">Простой, после которого GIL отпускается (по умолчанию 50 мс)</param>
+    /// <param name="name">Имя потока</param>
+    /// <param name="capacity">Заданий в очереди, после которых постановка ожидает</param>
+    /// <param name="acquireGil">Захват GIL на время работы потока (по умолчанию Py.GIL)</param>
+    /// <param name="allowThreads">Временное освобождение GIL при простое
+    /// (по умолчанию PythonEngine.BeginAllowThreads/EndAllowThreads)</param>
+    public PythonExecutor(
+        TimeSpan? idleTimeout = null,
+        string name = "Python executor",
+        int capacity = DefaultCapacity,
+        Func<IDisposable>? acquireGil = null,
+        Func<IDisposable>? allowThreads = null)
+    {
+        _idleTimeout = idleTimeout ?? TimeSpan.FromMilliseconds(50);
+        if (_idleTimeout < TimeSpan.Zero)
+            throw new ArgumentOutOfRangeException(nameof(idleTimeout));
+        if (capacity < 1)
+            throw new ArgumentOutOfRangeException(nameof(capacity), "Capacity must be positive");
+
+        _acquireGil = acquireGil ?? (() => Py.GIL());
+        _allowThreads = allowThreads ?? (() => new ThreadsAllowed());
+        _pending = Channel.CreateBounded<WorkItem>(new BoundedChannelOptions(capacity)
+        {
+            SingleReader = true,
+            FullMode = BoundedChannelFullMode.Wait
+        });
+
+        _thread = new Thread(ExecuteLoop)
+        {
+            IsBackground = true,
+            Name = name
+        };
+        _thread.Start();
+    }
+
+    /// <summary>
+    /// Текущий поток - поток выполнения
+    /// </summary>
+    public bool IsExecutorThread => Thread.CurrentThread == _thread;
+
+    /// <summary>
+    /// Выполнено заданий
+    /// </summary>
+    public long ExecutedCount => Interlocked.Read(ref _executedCount);
+
+    /// <summary>
+    /// Сколько раз GIL отпускался из-за простоя очереди
+    /// </summary>
+    public long IdleReleases => Interlocked.Read(ref _idleReleases);
+
+    /// <summary>
+    /// Заданий в очереди
+    /// </summary>
+    public int PendingCount => _pending.Reader.Count;
+
+    /// <summary>
+    /// Поставить задание в очередь; задача завершается после его выполнения
+    /// (продолжения выполняются вне потока Python). Из самого потока выполнения
+    /// задание выполняется сразу.
+    /// </summary>
+    public async Task RunAsync(Action action, CancellationToken cancellationToken = default)
+    {
+        if (IsExecutorThread)
+        {
+            action();
+            Interlocked.Increment(ref _executedCount);
+            return;
+        }
+
+        var item = new WorkItem(action, cancellationToken, tracked: true, CurrentGeneration);
+        await _pending.Writer.WriteAsync(item, cancellationToken).ConfigureAwait(false);
+        await item.Completion!.Task.ConfigureAwait(false);
+    }
+
+    /// <summary>
+    /// Поставить задание в очередь без ожидания выполнения (ожидание - только при заполненной
+    /// очереди). Ошибка задания выдаётся в точке синхронизации (DrainAsync).
+    /// Из самого потока выполнения задание выполняется сразу.
+    /// </summary>
+    public ValueTask PostAsync(Action action, CancellationToken cancellationToken = default)
+    {
+        if (IsExecutorThread)
+        {
+            action();
+            Interlocked.Increment(ref _executedCount);
+            return ValueTask.CompletedTask;
+        }
+
+        return _pending.Writer.WriteAsync(new WorkItem(action, cancellationToken, tracked: false, CurrentGeneration), cancellationToken);
+    }
+
+    /// <summary>
+    /// Точка синхронизации: дождаться выполнения всех поставленных заданий
+    /// (и выдать ошибку задания PostAsync, если она была)
+    /// </summary>
+    public async Task DrainAsync(CancellationToken cancellationToken = default)
+    {
+        if (!IsExecutorThread)
+        {
+            var marker = new WorkItem(null, cancellationToken, tracked: true, CurrentGeneration);
+            await _pending.Writer.WriteAsync(marker, cancellationToken).ConfigureAwait(false);
+            await marker.Completion!.Task.ConfigureAwait(false);
+        }
+
+        ThrowIfFaulted();
+    }
+
+    /// <summary>
+    /// Остановить выполнение при ошибке или отмене: задания, ещё не взятые из очереди,
+    /// отбрасываются (ожидающие RunAsync/DrainAsync отменяются), выполняемое задание
+    /// дожидается завершения, ошибка задания PostAsync сбрасывается.
+    /// После завершения поток Python не обращается к контексту до новых заданий.
+    /// </summary>
+    public async Task DiscardPendingAsync()
+    {
+        if (IsExecutorThread || _disposed)
+            return;
+
+        var marker = new WorkItem(null, CancellationToken.None, tracked: true, Interlocked.Increment(ref _discardGeneration));
+        await _pending.Writer.WriteAsync(marker).ConfigureAwait(false);
+        await marker.Completion!.Task.ConfigureAwait(false);
+        Interlocked.Exchange(ref _fault, null);
+    }
+
+    /// <summary>
+    /// Выполнить задание в потоке Python и дождаться результата (для синхронных вызовов)
+    /// </summary>
+    public void Run(Action action)
+    {
+        RunAsync(action).GetAwaiter().GetResult();
+    }
+
+    private void ExecuteLoop()
+    {
+        var reader = _pending.Reader;
+        using (_acquireGil())
+        {
+            while (true)
+            {
+                if (!reader.TryRead(out var item))
+                {
+                    // Следующая команда обычно приходит сразу - GIL удерживается;
+                    // при простое он отпускается до появления задания
+                    var ready = reader.WaitToReadAsync().AsTask();
+                    if (!ready.Wait(_idleTimeout))
+                    {
+                        Interlocked.Increment(ref _idleReleases);
+                        using (_allowThreads())
+                            ready.Wait();
+                    }
+
+                    if (!ready.Result)
+                        break;
+                    continue;
+                }
+
+                Execute(item);
+            }
+        }
+    }
+
+    private long CurrentGeneration => Interlocked.Read(ref _discardGeneration);
+
+    private void Execute(WorkItem item)
+    {
+        if (item.Generation < CurrentGeneration)
+        {
+            item.Completion?.TrySetCanceled();
+            return;
+        }
+
+        if (item.CancellationToken.IsCancellationRequested)
+        {
+            if (item.Completion != null)
+                item.Completion.TrySetCanceled(item.CancellationToken);
+            else
+                Interlocked.CompareExchange(ref _fault, new OperationCanceledException(item.CancellationToken), null);
+            return;
+        }
+
+        try
+        {
+            if (item.Action != null)
+            {
+                item.Action();
+                Interlocked.Increment(ref _executedCount);
+            }
+            item.Completion?.TrySetResult();
+        }
+        catch (Exception ex)
+        {
+            if (item.Completion != null)
+                item.Completion.TrySetException(ex);
+            else
+                Interlocked.CompareExchange(ref _fault, ex, null);
+        }
+    }
+
+    private void ThrowIfFaulted()
+    {
+        var fault = Interlocked.Exchange(ref _fault, null);
+        if (fault != null)
+            ExceptionDispatchInfo.Throw(fault);
+    }
+
+    /// <summary>
+    /// Выполнить оставшиеся задания, освободить GIL и завершить поток
+    /// </summary>
+    public void Dispose()
+    {
+        if (_disposed)
+            return;
+        _disposed = true;
+
+        _pending.Writer.TryComplete();
+        if (IsExecutorThread)
+            return;
+
+        _thread.Join();
+    }
+
+    private sealed class WorkItem
+    {
+        public WorkItem(Action? action, CancellationToken cancellationToken, bool tracked, long generation)
+        {
+            Action = action;
+            CancellationToken = cancellationToken;
+            Generation = generation;
+            if (tracked)
+                Completion = new TaskCompletionSource(TaskCreationOptions.RunContinuationsAsynchronously);
+        }
+
+        // null - маркер точки синхронизации
+        public Action? Action { get; }
+        public CancellationToken CancellationToken { get; }
+        public long Generation { get; }
+        // null - задание PostAsync, результат не ожидается
+        public TaskCompletionSource? Completion { get; }
+    }
+
+    // GIL отпущен до Dispose (PythonEngine.BeginAllowThreads/EndAllowThreads)
+    private sealed class ThreadsAllowed : IDisposable
+    {
+        private readonly IntPtr _state = PythonEngine.BeginAllowThreads();
+
+        public void Dispose() => PythonEngine.EndAllowThreads(_state);
+    }
+}
@@ -1,9 +1,11 @@
 using System;
 using System.Collections.Generic;
+using System.Diagnostics.CodeAnalysis;
 using System.IO;
 using System.Linq;
 using System.Threading;
 using System.Threading.Tasks;
+using PostProcessor.Core.Config.Models;
 using PostProcessor.Core.Context;
 using PostProcessor.Core.Models;
 using PostProcessor.Macros.Interfaces;
@@ -18,11 +20,41 @@ namespace PostProcessor.Macros.Python;
 public class PythonMacroEngine : IMacroEngine
 {
     private readonly Dictionary<string, PyObject> _macroRegistry = new();
+    private readonly Dictionary<string, string> _macroSources = new();
+    // Макросы известных команд по APTMajorWord - диспетчеризация без поиска по строке
+    private readonly PyObject?[] _macrosByWord = new PyObject?[Enum.GetValues<APTMajorWord>().Length];
+    // Встроенные реализации неизменённых базовых макросов (см. NativeBaseMacros)
+    private readonly Action<PostContext, APTCommand>?[] _nativeByWord = new Action<PostContext, APTCommand>?[Enum.GetValues<APTMajorWord>().Length];
     private readonly string _machineName;
     private readonly string[] _macroPaths;
     private bool _isInitialized;
     private bool _pythonLoaded;
-    private readonly string _pythonDllPath;
+    private readonly string? _pythonDllPath;
+    // Конфигурация, таблицы которой опубликованы в глобальной CONFIG модулей макросов
+    private ControllerConfig? _publishedConfig;
+    // Поток, владеющий GIL на всё задание (null - GIL захватывается на каждую команду)
+    private PythonExecutor? _executor;
+
+    /// <summary>
+    /// Использовать встроенные C#-реализации для неизменённых base/goto.py, rapid.py, fedrat.py
+    /// (по умолчанию включено; отключается для сравнения с Python-версиями)
+    /// </summary>
+    public bool UseNativeBaseMacros { get; set; } = true;
+
+    /// <summary>
+    /// Выполнять Python-макросы в выделенном потоке, который держит GIL всё задание
+    /// (по умолчанию включено; при отключении GIL захватывается на каждую команду).
+    /// Задаётся до LoadAsync.
+    /// </summary>
+    public bool UseDedicatedPythonThread { get; set; } = true;
+
+    /// <summary>
+    /// Не ожидать выполнения каждой команды: команды ставятся в очередь выделенного потока,
+    /// лексер читает следующие, пока выполняются макросы. Ожидание - при заполненной очереди,
+    /// в точках синхронизации (LOADTL, FINI) и в FlushAsync; до FlushAsync состояние контекста
+    /// может отставать от переданных команд. Работает только с UseDedicatedPythonThread.
+    /// </summary>
+    public bool PipelineCommands { get; set; }
 
     public PythonMacroEngine(string machineName, params string[] macroPaths) : this(null, machineName, macroPaths)
     {
@@ -36,18 +68,48 @@ public class PythonMacroEngine : IMacroEngine
     }
     
     /// <summary>
-    /// Поиск Python DLL в системных путях
+    /// Поиск Python DLL: переменная PYTHONNET_PYDLL, стандартные пути установки
+    /// (Windows - python3x.dll, Linux/macOS - libpython3.x) и каталоги из PATH
     /// </summary>
-    private static string FindPythonDll()
+    public static string? FindPythonDll()
     {
-        var possiblePaths = new[]
+        var configured = Environment.GetEnvironmentVariable("PYTHONNET_PYDLL");
+        if (!string.IsNullOrWhiteSpace(configured) && File.Exists(configured))
+            return configured;
+
+        string[] possiblePaths;
+        string[] fileNames;
+        if (OperatingSystem.IsWindows())
         {
-            @"C:\Python311\python311.dll",
-            @"C:\Python3119\python311.dll",
-            @"C:\Python310\python310.dll",
-            @"C:\Python39\python39.dll",
-            @"C:\Python38\python38.dll"
-        };
+            possiblePaths = new[]
+            {
+                @"C:\Python311\python311.dll",
+                @"C:\Python3119\python311.dll",
+                @"C:\Python310\python310.dll",
+                @"C:\Python39\python39.dll",
+                @"C:\Python38\python38.dll"
+            };
+            fileNames = new[] { "python311.dll" };
+        }
+        else
+        {
+            var extension = OperatingSystem.IsMacOS() ? "dylib" : "so";
+            fileNames = Enumerable.Range(8, 6).Reverse()
+                .Select(minor => $"libpython3.{minor}.{extension}")
+                .ToArray();
+            var libraryDirs = new[]
+            {
+                "/usr/lib/x86_64-linux-gnu",
+                "/usr/lib/aarch64-linux-gnu",
+                "/usr/lib64",
+                "/usr/lib",
+                "/usr/local/lib",
+                "/opt/homebrew/lib"
+            };
+            possiblePaths = libraryDirs
+                .SelectMany(dir => fileNames.Select(name => Path.Combine(dir, name)))
+                .ToArray();
+        }
 
         foreach (var path in possiblePaths)
         {
@@ -58,11 +120,14 @@ public class PythonMacroEngine : IMacroEngine
         var pathEnv = Environment.GetEnvironmentVariable("PATH");
         if (!string.IsNullOrEmpty(pathEnv))
         {
-            foreach (var dir in pathEnv.Split(';'))
+            foreach (var dir in pathEnv.Split(Path.PathSeparator))
             {
-                var dllPath = Path.Combine(dir.Trim(), "python311.dll");
-                if (File.Exists(dllPath))
-                    return dllPath;
+                foreach (var name in fileNames)
+                {
+                    var dllPath = Path.Combine(dir.Trim(), name);
+                    if (File.Exists(dllPath))
+                        return dllPath;
+                }
             }
         }
 
@@ -111,24 +176,16 @@ public class PythonMacroEngine : IMacroEngine
                     Console.WriteLine($"[Python] Python path: {Runtime.PythonDLL}");
                 }
 
-                using (Py.GIL())
+                if (UseDedicatedPythonThread)
                 {
-                    var sys = Py.Import("sys");
-                    var sysPath = sys.GetAttr("path");
-
-                    // Добавляем пути к макросам
-                    foreach (var path in _macroPaths.Concat(paths))
-                    {
-                        if (Directory.Exists(path))
-                        {
-                            sysPath.InvokeMethod("append", new PyString(path));
-                            Console.WriteLine($"[Python] Added path: {path}");
-                        }
-                    }
+                    // Модули макросов загружаются в том же потоке, где будут выполняться
+                    _executor = new PythonExecutor();
+                    _executor.Run(() => LoadModules(paths));
+                }
+                else
+                {
+                    LoadModules(paths);
                 }
-
-                // Загружаем макросы с приоритетами
-                LoadAllMacros();
 
                 _isInitialized = true;
                 Console.WriteLine($"[Python] Loaded {_macroRegistry.Count} macros");
@@ -142,6 +199,31 @@ public class PythonMacroEngine : IMacroEngine
         }, cancellationToken);
     }
     
+    /// <summary>
+    /// Добавление путей к макросам в sys.path и загрузка макросов
+    /// </summary>
+    private void LoadModules(IEnumerable<string> paths)
+    {
+        using (Py.GIL())
+        {
+            var sys = Py.Import("sys");
+            var sysPath = sys.GetAttr("path");
+
+            // Добавляем пути к макросам
+            foreach (var path in _macroPaths.Concat(paths))
+            {
+                if (Directory.Exists(path))
+                {
+                    sysPath.InvokeMethod("append", new PyString(path));
+                    Console.WriteLine($"[Python] Added path: {path}");
+                }
+            }
+        }
+
+        // Загружаем макросы с приоритетами
+        LoadAllMacros();
+    }
+
     /// <summary>
     /// Загрузка макросов с приоритетами:
     /// 1. user/ - пользовательские (highest priority)
@@ -248,6 +330,16 @@ public class PythonMacroEngine : IMacroEngine
                 var executeFunc = module.GetAttr("execute");
                 // Сохраняем ссылку с увеличением счётчика ссылок
                 _macroRegistry[fileName.ToLowerInvariant()] = executeFunc;
+                _macroSources[fileName.ToLowerInvariant()] = filePath;
+
+                var word = APTWords.GetMajor(fileName);
+                if (word != APTMajorWord.Unknown)
+                {
+                    _macrosByWord[(int)word] = executeFunc;
+                    _nativeByWord[(int)word] = UseNativeBaseMacros ? NativeBaseMacros.Resolve(fileName, filePath) : null;
+                    if (_nativeByWord[(int)word] != null)
+                        Console.WriteLine($"[Python] Using native implementation for stock macro: {fileName}");
+                }
                 Console.WriteLine($"[Python] Loaded macro: {fileName}");
                 // executeFunc не Dispose() потому что сохраняем в реестре
             }
@@ -263,24 +355,128 @@ public class PythonMacroEngine : IMacroEngine
     /// </summary>
     public async Task ExecuteAsync(PostContext context, APTCommand command, CancellationToken cancellationToken = default)
     {
+        if (PipelineCommands && _isInitialized && _executor != null)
+        {
+            // Вся обработка команды - в потоке Python после поставленных раньше
+            await _executor.PostAsync(() => ExecuteCommand(context, command), cancellationToken).ConfigureAwait(false);
+            if (command.Word is APTMajorWord.Loadtl or APTMajorWord.Fini)
+                await _executor.DrainAsync(cancellationToken).ConfigureAwait(false);
+            return;
+        }
+
+        context.RecordCommand(command);
+
         if (!_isInitialized)
         {
             return;
         }
 
-        var macroName = command.MajorWord?.ToLowerInvariant();
-        if (string.IsNullOrEmpty(macroName))
+        // Открытая серия отверстий поглощает позиции и повторы цикла
+        if (context.Holes.IsOpen)
+        {
+            context.Holes.Replay ??= held => Execute(context, held);
+            if (context.Holes.TryAccept(command))
+                return;
+        }
+
+        if (TryExecuteNative(context, command, out var macroFunc))
             return;
 
-        if (!_macroRegistry.TryGetValue(macroName, out var macroFunc))
+        if (_executor != null)
+            await _executor.RunAsync(() => InvokeMacro(context, command, macroFunc), cancellationToken).ConfigureAwait(false);
+        else
+            InvokeMacro(context, command, macroFunc);
+    }
+
+    /// <summary>
+    /// Дождаться выполнения команд, поставленных в очередь (PipelineCommands)
+    /// </summary>
+    public Task FlushAsync(CancellationToken cancellationToken = default)
+    {
+        return _executor != null ? _executor.DrainAsync(cancellationToken) : Task.CompletedTask;
+    }
+
+    /// <summary>
+    /// Отбросить команды очереди (PipelineCommands) и дождаться выполняемой - при ошибке или отмене
+    /// </summary>
+    public Task DiscardPendingAsync()
+    {
+        return _executor != null ? _executor.DiscardPendingAsync() : Task.CompletedTask;
+    }
+
+    // Команда в потоке Python (PipelineCommands): учёт, серия отверстий и макрос
+    private void ExecuteCommand(PostContext context, APTCommand command)
+    {
+        context.RecordCommand(command);
+
+        if (context.Holes.IsOpen)
         {
+            context.Holes.Replay ??= held => Execute(context, held);
+            if (context.Holes.TryAccept(command))
+                return;
+        }
+
+        Execute(context, command);
+    }
+
+    private void Execute(PostContext context, APTCommand command)
+    {
+        if (TryExecuteNative(context, command, out var macroFunc))
             return;
+
+        if (_executor != null)
+            _executor.Run(() => InvokeMacro(context, command, macroFunc));
+        else
+            InvokeMacro(context, command, macroFunc);
+    }
+
+    /// <summary>
+    /// Выполнить встроенную реализацию или найти Python-макрос;
+    /// true - команда обработана (встроенным макросом или макроса нет)
+    /// </summary>
+    private bool TryExecuteNative(PostContext context, APTCommand command, [NotNullWhen(false)] out PyObject? macroFunc)
+    {
+        macroFunc = null;
+        var macroName = command.MajorWord;
+        if (string.IsNullOrEmpty(macroName))
+            return true;
+
+        // Известные команды - по индексу, остальные - по имени
+        if (command.Word != APTMajorWord.Unknown)
+        {
+            var native = _nativeByWord[(int)command.Word];
+            if (native != null)
+            {
+                try
+                {
+                    native(context, command);
+                }
+                catch (Exception ex)
+                {
+                    context.RecordMacroError();
+                    Console.WriteLine($"[Native] Error executing macro '{macroName}': {ex.Message}");
+                }
+                return true;
+            }
+
+            macroFunc = _macrosByWord[(int)command.Word];
         }
+        else
+            _macroRegistry.TryGetValue(macroName.ToLowerInvariant(), out macroFunc);
 
+        return macroFunc == null;
+    }
+
+    private void InvokeMacro(PostContext context, APTCommand command, PyObject macroFunc)
+    {
         try
         {
-            using (Py.GIL())
+            // В выделенном потоке GIL уже захвачен на всё задание
+            using (_executor == null ? Py.GIL() : null)
             {
+                if (!ReferenceEquals(_publishedConfig, context.Config))
+                    PublishConfigTables(context.Config);
+
                 // Создаём Python-обёртки
                 var pythonContext = new PythonPostContext(context);
                 var pythonCommand = new PythonAptCommand(command);
@@ -293,7 +489,39 @@ public class PythonMacroEngine : IMacroEngine
         }
         catch (Exception ex)
         {
-            Console.WriteLine($"[Python] Error executing macro '{macroName}': {ex.Message}");
+            context.RecordMacroError();
+            Console.WriteLine($"[Python] Error executing macro '{command.MajorWord}': {ex.Message}");
+        }
+    }
+
+    /// <summary>
+    /// Записать таблицы кодов конфигурации в глобальную CONFIG всех модулей макросов
+    /// (вызывается под GIL при первом выполнении и при смене конфигурации)
+    /// </summary>
+    private void PublishConfigTables(ControllerConfig config)
+    {
+        var tables = PythonConfigTables.For(config).ToPython();
+        using var name = new PyString("CONFIG");
+        foreach (var macro in _macroRegistry.Values)
+        {
+            using var globals = macro.GetAttr("__globals__");
+            globals.InvokeMethod("__setitem__", name, tables).Dispose();
+        }
+        _publishedConfig = config;
+    }
+
+    private void ReleaseMacros()
+    {
+        using (Py.GIL())
+        {
+            foreach (var macro in _macroRegistry.Values)
+            {
+                macro.Dispose();
+            }
+            _macroRegistry.Clear();
+            _macroSources.Clear();
+            Array.Clear(_macrosByWord);
+            Array.Clear(_nativeByWord);
         }
     }
 
@@ -304,17 +532,25 @@ public class PythonMacroEngine : IMacroEngine
 
     public int GetMacroCount() => _macroRegistry.Count;
 
+    public string? GetMacroSource(string commandName)
+    {
+        return _macroSources.TryGetValue(commandName.ToLowerInvariant(), out var source) ? source : null;
+    }
+
     public async ValueTask DisposeAsync()
     {
         await Task.Run(() =>
         {
-            using (Py.GIL())
+            if (_executor != null)
             {
-                foreach (var macro in _macroRegistry.Values)
-                {
-                    macro.Dispose();
-                }
-                _macroRegistry.Clear();
+                // Ссылки освобождаются в потоке, которому принадлежат; затем поток отпускает GIL
+                _executor.Run(ReleaseMacros);
+                _executor.Dispose();
+                _executor = null;
+            }
+            else
+            {
+                ReleaseMacros();
             }
 
             if (_pythonLoaded)
@@ -3,6 +3,7 @@ using System.Collections.Generic;
 using System.IO;
 using PostProcessor.Core.Config.Models;
 using PostProcessor.Core.Context;
+using Python.Runtime;
 
 namespace PostProcessor.Macros.Python;
 
@@ -210,6 +211,18 @@ public class PythonPostContext
         _context.Output.Flush();
     }
 
+    /// <summary>
+    /// Записать готовый кадр отдельной строкой (без проверки регистров и номера блока)
+    /// </summary>
+    public void writeLine(string line)
+    {
+        if (!string.IsNullOrWhiteSpace(line))
+        {
+            _context.WriteLine(line);
+            _context.Output.Flush();
+        }
+    }
+
     /// <summary>
     /// Записать комментарий в формате станка
     /// Использует стиль из конфига (parentheses/semicolon/both)
@@ -243,6 +256,37 @@ public class PythonPostContext
         _context.Output.Flush();
     }
     
+    /// <summary>
+    /// Перемещение одним вызовом: регистры, G-код и блок с модальной проверкой.
+    /// Эквивалент нескольких присваиваний registers.*, write(gcode) и writeBlock()
+    /// </summary>
+    public void emitMotion(
+        string gcode, double x, double y, double z,
+        double? a = null, double? b = null, double? c = null, double? feed = null)
+    {
+        NativeBaseMacros.EmitMotion(_context, gcode, x, y, z, a, b, c, feed);
+    }
+
+    /// <summary>
+    /// Дуга одним вызовом: X/Y/Z выводятся всегда, в конце блока - I/J/K или R
+    /// </summary>
+    public void emitArc(
+        string gcode, double x, double y, double z,
+        double? i = null, double? j = null, double? k = null, double? r = null, double? feed = null)
+    {
+        NativeBaseMacros.EmitArc(_context, gcode, x, y, z, i, j, k, r, feed);
+    }
+
+    /// <summary>
+    /// Отверстие цикла сверления в текущей позиции. Следующие отверстия с тем же
+    /// определением цикла собираются в серию и выводятся шаблоном УЧПУ
+    /// (Fanuc - модальный G81/G83, Siemens - MCALL/HOLES1/HOLES2, Heidenhain - PATTERN DEF)
+    /// </summary>
+    public void drillHole(PythonAptCommand command)
+    {
+        _context.Holes.Begin(command.majorWord, command.numeric);
+    }
+
     /// <summary>
     /// Скрыть регистры (не выводить до изменения)
     /// </summary>
@@ -286,6 +330,27 @@ public class PythonPostContext
         };
     }
 
+    // === Инструменты ===
+    /// <summary>
+    /// Инструменты программы в порядке первого использования (предварительный просмотр APT)
+    /// </summary>
+    public List<PythonToolInfo> getProjectTools()
+    {
+        var tools = new List<PythonToolInfo>(_context.ProjectTools.Count);
+        foreach (var tool in _context.ProjectTools)
+            tools.Add(new PythonToolInfo(tool));
+        return tools;
+    }
+
+    /// <summary>
+    /// Данные инструмента по номеру (программа, затем библиотека); None, если неизвестен
+    /// </summary>
+    public PythonToolInfo? getTool(int number)
+    {
+        var tool = _context.FindTool(number);
+        return tool != null ? new PythonToolInfo(tool) : null;
+    }
+
     // === Утилиты ===
     public double round(double value, int decimals = 3)
     {
@@ -348,6 +413,25 @@ public class PythonRegisters
         set => _registers.C.SetValue(value);
     }
     
+    // Вектор оси инструмента (GOTO/X, Y, Z, I, J, K)
+    public double i
+    {
+        get => _registers.I.Value;
+        set => _registers.I.SetValue(value);
+    }
+
+    public double j
+    {
+        get => _registers.J.Value;
+        set => _registers.J.SetValue(value);
+    }
+
+    public double k
+    {
+        get => _registers.K.Value;
+        set => _registers.K.SetValue(value);
+    }
+
     // Подача и шпиндель
     public double f
     {
@@ -374,10 +458,12 @@ public class PythonRegisters
 public class PythonConfig
 {
     private readonly ControllerConfig _config;
+    private readonly PythonConfigTables _tables;
     
     public PythonConfig(ControllerConfig config)
     {
         _config = config;
+        _tables = PythonConfigTables.For(config);
     }
     
     public string name => _config.Name;
@@ -387,26 +473,27 @@ public class PythonConfig
     
     public PythonMultiAxis multiAxis { get; }
     
-    // Пользовательские параметры
+    // Пользовательские параметры (значения приведены один раз на конфигурацию)
     public object getParameter(string key, object defaultValue = null)
     {
-        if (_config.CustomParameters.TryGetValue(key, out var value))
+        if (_tables.Parameters.TryGetValue(key, out var value))
             return value ?? defaultValue;
         return defaultValue;
     }
     
     public bool getParameterBool(string key, bool defaultValue = false)
     {
-        if (_config.CustomParameters.TryGetValue(key, out var value) && value is bool b)
+        if (_tables.Parameters.TryGetValue(key, out var value) && value is bool b)
             return b;
         return defaultValue;
     }
     
     public double getParameterDouble(string key, double defaultValue = 0.0)
     {
-        if (_config.CustomParameters.TryGetValue(key, out var value))
+        if (_tables.Parameters.TryGetValue(key, out var value))
         {
             if (value is double d) return d;
+            if (value is long l) return l;
             if (value is int i) return i;
             if (value is string s && double.TryParse(s, out var parsed)) return parsed;
         }
@@ -415,13 +502,18 @@ public class PythonConfig
     
     public string getParameterString(string key, string defaultValue = "")
     {
-        if (_config.CustomParameters.TryGetValue(key, out var value) && value != null)
+        if (_tables.Parameters.TryGetValue(key, out var value) && value != null)
             return value.ToString();
         return defaultValue;
     }
     
     // M-code access
-    public PythonMCode mcode => new PythonMCode(_config);
+    public PythonMCode mcode => _tables.MCode;
+
+    /// <summary>
+    /// Неизменяемые таблицы кодов и параметров (тот же объект, что глобальная CONFIG макросов)
+    /// </summary>
+    public PyObject tables => _tables.ToPython();
 }
 
 /// <summary>
@@ -429,21 +521,31 @@ public class PythonConfig
 /// </summary>
 public class PythonMCode
 {
-    private readonly ControllerConfig _config;
-    
     public PythonMCode(ControllerConfig config)
+        : this(PythonConfigTables.For(config).MCodes)
     {
-        _config = config;
+    }
+
+    public PythonMCode(IReadOnlyDictionary<string, string> codes)
+    {
+        programEnd = codes["programEnd"];
+        programStop = codes["programStop"];
+        spindleCW = codes["spindleCW"];
+        spindleCCW = codes["spindleCCW"];
+        spindleStop = codes["spindleStop"];
+        coolantOn = codes["coolantOn"];
+        coolantOff = codes["coolantOff"];
+        toolChange = codes["toolChange"];
     }
     
-    public string programEnd => _config.GetCustomMCode("M30", "programEnd");
-    public string programStop => _config.GetCustomMCode("M00", "programStop");
-    public string spindleCW => _config.GetCustomMCode("M3", "spindleCW");
-    public string spindleCCW => _config.GetCustomMCode("M4", "spindleCCW");
-    public string spindleStop => _config.GetCustomMCode("M5", "spindleStop");
-    public string coolantOn => _config.GetCustomMCode("M8", "coolantOn");
-    public string coolantOff => _config.GetCustomMCode("M9", "coolantOff");
-    public string toolChange => _config.GetCustomMCode("M6", "toolChange");
+    public string programEnd { get; }
+    public string programStop { get; }
+    public string spindleCW { get; }
+    public string spindleCCW { get; }
+    public string spindleStop { get; }
+    public string coolantOn { get; }
+    public string coolantOff { get; }
+    public string toolChange { get; }
 }
 
 /// <summary>
@@ -502,6 +604,27 @@ public class PythonMachineState
     public int activeCoordinateSystem => _state.ActiveCoordinateSystem;
 }
 
+/// <summary>
+/// Python-обёртка для данных инструмента
+/// </summary>
+public class PythonToolInfo
+{
+    private readonly ToolInfo _tool;
+
+    public PythonToolInfo(ToolInfo tool)
+    {
+        _tool = tool;
+    }
+
+    public int number => _tool.Number;
+    public string name => _tool.Comment ?? $"T{_tool.Number}";
+    public double diameter => _tool.Diameter;
+    public double length => _tool.Length;
+    public double cornerRadius => _tool.CornerRadius ?? 0.0;
+    public int flutes => _tool.Flutes ?? 0;
+    public string type => _tool.Type ?? "";
+}
+
 /// <summary>
 /// Python-обёртка для системных переменных (SYSTEM.*)
 /// </summary>
@@ -190,6 +190,89 @@ SpIndL/ON";
         Assert.Equal("spindl", commands[2].MajorWord);
     }
 
+    [Fact]
+    public async Task ParseStreamAsync_AssignsWordIdsAndInternsWords()
+    {
+        // Arrange
+        var content = @"SPINDL/ON, CLW, 1200
+spindl/off, MYWORD
+OP_NAME/MYWORD";
+        await File.WriteAllTextAsync(_testFilePath, content);
+
+        // Act
+        var commands = new List<APTCommand>();
+        await using (var lexer = new StreamingAPTLexer(_testFilePath))
+        {
+            await foreach (var command in lexer.ParseStreamAsync())
+            {
+                commands.Add(command);
+            }
+        }
+
+        // Assert
+        Assert.Equal(APTMajorWord.Spindl, commands[0].Word);
+        Assert.Equal(APTMajorWord.OpName, commands[2].Word);
+        Assert.True(commands[0].HasMinorWord(APTMinorWord.Clw));
+        Assert.False(commands[0].HasMinorWord(APTMinorWord.Cclw));
+        Assert.True(commands[1].HasMinorWord("OFF"));
+        Assert.True(commands[1].HasMinorWord("myword"));
+        Assert.Same(commands[0].MajorWord, commands[1].MajorWord);
+        Assert.Same(commands[1].MinorWords[1], commands[2].MinorWords[0]);
+    }
+
+    [Fact]
+    public void APTCommand_With_RecomputesWordIds()
+    {
+        // Arrange
+        var command = new APTCommand("goto", new List<string> { "on" }, new List<double>(), new List<string>(), 1);
+
+        // Act
+        var changed = command with { MajorWord = "rapid", MinorWords = new List<string> { "cclw" } };
+
+        // Assert
+        Assert.Equal(APTMajorWord.Goto, command.Word);
+        Assert.Equal(APTMajorWord.Rapid, changed.Word);
+        Assert.True(changed.HasMinorWord(APTMinorWord.Cclw));
+        Assert.False(changed.HasMinorWord(APTMinorWord.On));
+    }
+
+    [Fact]
+    public async Task ParseStreamAsync_ReadsCp1251FromNonSeekableStream()
+    {
+        // Arrange - PPRINT с кириллицей за границей анализируемого начала потока
+        System.Text.Encoding.RegisterProvider(System.Text.CodePagesEncodingProvider.Instance);
+        var padding = string.Concat(Enumerable.Repeat("GOTO/1.0, 2.0, 3.0\n", 300));
+        var bytes = System.Text.Encoding.GetEncoding(1251).GetBytes("PPRINT/ДЕТАЛЬ\n" + padding + "PPRINT/ОПЕРАЦИЯ 2\n");
+        using var input = new NonSeekableStream(bytes);
+
+        // Act
+        var commands = new List<APTCommand>();
+        await using (var lexer = new StreamingAPTLexer(input))
+        {
+            await foreach (var command in lexer.ParseStreamAsync())
+            {
+                commands.Add(command);
+            }
+        }
+
+        // Assert
+        Assert.Equal(302, commands.Count);
+        Assert.Contains("ОПЕРАЦИЯ", string.Join(" ", commands[^1].MinorWords.Concat(commands[^1].StringValues)).ToUpperInvariant());
+    }
+
+    [Fact]
+    public void EncodingDetector_DetectsFromBytes()
+    {
+        // Arrange
+        var utf8 = System.Text.Encoding.UTF8.GetBytes("PPRINT/ДЕТАЛЬ");
+
+        // Act & Assert - UTF-8, в том числе с последовательностью, обрезанной границей буфера
+        Assert.Equal(65001, APT.Encodings.EncodingDetector.DetectFromBytes(utf8).CodePage);
+        Assert.Equal(65001, APT.Encodings.EncodingDetector.DetectFromBytes(utf8.AsSpan(0, utf8.Length - 1)).CodePage);
+        Assert.Equal(65001, APT.Encodings.EncodingDetector.DetectFromBytes("GOTO/1,2,3"u8).CodePage);
+        Assert.Equal(1251, APT.Encodings.EncodingDetector.DetectFromBytes(new byte[] { 0x50, 0xC4, 0xC5, 0xD2 }).CodePage);
+    }
+
     public void Dispose()
     {
         if (File.Exists(_testFilePath))
@@ -197,4 +280,16 @@ SpIndL/ON";
             File.Delete(_testFilePath);
         }
     }
+
+    /// <summary>
+    /// Поток без перемотки (как stdin)
+    /// </summary>
+    private sealed class NonSeekableStream : MemoryStream
+    {
+        public NonSeekableStream(byte[] buffer) : base(buffer, writable: false)
+        {
+        }
+
+        public override bool CanSeek => false;
+    }
 }
@@ -0,0 +1,102 @@
+using System.Text;
+using PostProcessor.Core.Writers;
+
+namespace PostProcessor.Tests;
+
+/// <summary>
+/// Tests for the BackgroundNcWriter class
+/// </summary>
+public class BackgroundNcWriterTests
+{
+    [Fact]
+    public async Task Writes_DoNotWaitForSlowOutput_AndKeepOrder()
+    {
+        // Arrange - внутренний writer заблокирован до открытия шлюза
+        var gate = new ManualResetEventSlim(false);
+        var inner = new GatedWriter(gate);
+        var writer = new BackgroundNcWriter(inner, segmentSize: 64, maxPendingSegments: 4) { NewLine = "\n" };
+        var expected = new StringBuilder();
+
+        // Act - меньше ёмкости очереди: запись не должна ждать диск
+        for (int i = 0; i < 10; i++)
+        {
+            var line = $"N{i * 10} G1 X{i}.000";
+            writer.WriteLine(line);
+            expected.Append(line).Append('\n');
+        }
+        await writer.WriteAsync("M30");
+        expected.Append("M30");
+
+        var writtenBeforeGate = inner.ToString();
+        gate.Set();
+        await writer.DisposeAsync();
+
+        // Assert
+        Assert.Equal("", writtenBeforeGate);
+        Assert.Equal(expected.ToString(), inner.ToString());
+        Assert.True(inner.Disposed);
+    }
+
+    [Fact]
+    public void WriterThreadError_IsRethrownToCaller()
+    {
+        // Arrange
+        var inner = new FailingWriter();
+        var writer = new BackgroundNcWriter(inner, segmentSize: 16, maxPendingSegments: 1);
+
+        // Act & Assert - ошибка потока записи не блокирует макросы:
+        // передаётся при следующей передаче сегмента или при закрытии
+        Assert.Throws<IOException>(() =>
+        {
+            for (int i = 0; i < 100; i++)
+                writer.Write("N10 G0 X0 Y0\n");
+            writer.Dispose();
+        });
+
+        // Поток записи завершается, даже если ошибка получена до закрытия
+        try
+        {
+            writer.Dispose();
+        }
+        catch (IOException)
+        {
+        }
+    }
+
+    private sealed class GatedWriter : StringWriter
+    {
+        private readonly ManualResetEventSlim _gate;
+
+        public GatedWriter(ManualResetEventSlim gate)
+        {
+            _gate = gate;
+            NewLine = "\n";
+        }
+
+        public bool Disposed { get; private set; }
+
+        public override void Write(char[] buffer, int index, int count)
+        {
+            _gate.Wait();
+            lock (this)
+                base.Write(buffer, index, count);
+        }
+
+        public override string ToString()
+        {
+            lock (this)
+                return base.ToString();
+        }
+
+        protected override void Dispose(bool disposing)
+        {
+            Disposed = true;
+            base.Dispose(disposing);
+        }
+    }
+
+    private sealed class FailingWriter : StringWriter
+    {
+        public override void Write(char[] buffer, int index, int count) => throw new IOException("share not available");
+    }
+}
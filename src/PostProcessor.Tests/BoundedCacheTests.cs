@@ -0,0 +1,149 @@
+using PostProcessor.Core.Context;
+
+namespace PostProcessor.Tests;
+
+/// <summary>
+/// Tests for the BoundedCache class
+/// </summary>
+public class BoundedCacheTests
+{
+    [Fact]
+    public void Add_OverCapacity_EvictsLeastRecentlyUsed()
+    {
+        // Arrange
+        var cache = new BoundedCache<ToolInfo>(2);
+        cache["tool_1"] = new ToolInfo(1, 10, 50);
+        cache["tool_2"] = new ToolInfo(2, 8, 40);
+
+        // Act - обращение к tool_1 делает вытесняемым tool_2
+        Assert.True(cache.TryGetValue("tool_1", out _));
+        cache["tool_3"] = new ToolInfo(3, 6, 30);
+
+        // Assert
+        Assert.True(cache.ContainsKey("tool_1"));
+        Assert.False(cache.ContainsKey("tool_2"));
+        Assert.False(cache.TryGetValue("tool_2", out _));
+        Assert.Equal(new CacheStatistics(2, 1, 1, 1, 0, 0), cache.GetStatistics());
+    }
+
+    [Fact]
+    public void TryGetValue_EvictedGeometry_IsReadBackFromSpillFile()
+    {
+        // Arrange
+        var directory = Path.Combine(Path.GetTempPath(), Path.GetRandomFileName());
+        var context = new PostContext(TextWriter.Null);
+        context.GeometryCache.Capacity = 100;
+        context.EnableCacheSpill(directory);
+
+        try
+        {
+            // Act - 10000 точек при 100 записях в памяти
+            for (int i = 0; i < 10000; i++)
+                context.GeometryCache[$"P{i}"] = new PostContext.Point(i, i * 0.5, -i);
+            context.GeometryCache["C1"] = new PostContext.Circle(new PostContext.Point(1, 2, 3), 4.5);
+
+            var found = context.GeometryCache.TryGetValue("P42", out var geometry);
+
+            // Assert
+            Assert.True(found);
+            Assert.IsType<PostContext.Point>(geometry);
+            var point = (PostContext.Point)geometry;
+            Assert.Equal((42.0, 21.0, -42.0), (point.X, point.Y, point.Z));
+
+            var (statistics, _) = context.GetCacheStatistics();
+            Assert.Equal(100, statistics.Count);
+            Assert.Equal(9902, statistics.Evictions);
+            Assert.Equal(1, statistics.SpillHits);
+            Assert.Equal(9901, statistics.SpilledCount);
+        }
+        finally
+        {
+            context.GeometryCache.Dispose();
+            context.ToolCache.Dispose();
+            Directory.Delete(directory, recursive: true);
+        }
+    }
+
+    [Fact]
+    public void EnableCacheSpill_ToolCache_RoundTripsToolInfo()
+    {
+        // Arrange
+        var directory = Path.Combine(Path.GetTempPath(), Path.GetRandomFileName());
+        var context = new PostContext(TextWriter.Null);
+        context.ToolCache.Capacity = 1;
+        context.EnableCacheSpill(directory);
+
+        try
+        {
+            // Act
+            context.ToolCache["tool_5"] = new ToolInfo(5, 12, 75, "ENDMILL D12", "endmill", 4, 0.5);
+            context.ToolCache["tool_6"] = new ToolInfo(6, 8, 60);
+
+            // Assert
+            Assert.True(context.ToolCache.TryGetValue("tool_5", out var tool));
+            Assert.Equal(new ToolInfo(5, 12, 75, "ENDMILL D12", "endmill", 4, 0.5), tool);
+            Assert.True(context.ToolCache.ContainsKey("tool_6"));
+        }
+        finally
+        {
+            context.GeometryCache.Dispose();
+            context.ToolCache.Dispose();
+            Directory.Delete(directory, recursive: true);
+        }
+    }
+
+    [Fact]
+    public void SpillFile_ReadBackEntries_CompactsFreedSpace()
+    {
+        // Arrange
+        var directory = Path.Combine(Path.GetTempPath(), Path.GetRandomFileName());
+        var cache = new BoundedCache<ToolInfo>(1);
+        cache.EnableSpill(
+            Path.Combine(directory, "tools.spill"),
+            tool => System.Text.Json.JsonSerializer.SerializeToUtf8Bytes(tool),
+            data => System.Text.Json.JsonSerializer.Deserialize<ToolInfo>(data)!);
+
+        try
+        {
+            // Act - два инструмента по очереди вытесняют друг друга
+            cache["tool_1"] = new ToolInfo(1, 10, 50);
+            cache["tool_2"] = new ToolInfo(2, 8, 40);
+            for (int i = 0; i < 10000; i++)
+                Assert.True(cache.TryGetValue(i % 2 == 0 ? "tool_1" : "tool_2", out _));
+
+            // Assert - в файле одна живая запись, освобождённое место переиспользуется
+            Assert.Equal(10000, cache.GetStatistics().SpillHits);
+            Assert.Equal(1, cache.GetStatistics().SpilledCount);
+            Assert.True(cache.SpillLength < 1024, $"Spill file holds {cache.SpillLength} bytes");
+        }
+        finally
+        {
+            cache.Dispose();
+            Directory.Delete(directory, recursive: true);
+        }
+    }
+
+    [Fact]
+    public void FindTool_EvictedWithoutSpill_IsResolvedAgain()
+    {
+        // Arrange
+        var context = new PostContext(TextWriter.Null)
+        {
+            ProjectTools = new[] { new ToolInfo(1, 10, 50), new ToolInfo(2, 8, 40) }
+        };
+        context.ToolCache.Capacity = 1;
+
+        // Act
+        context.FindTool(1);
+        context.FindTool(1);
+        context.FindTool(2);
+        var tool = context.FindTool(1);
+
+        // Assert - поиск идёт через кэш, вытесненная запись находится в инструментах программы
+        Assert.Equal(new ToolInfo(1, 10, 50), tool);
+        var (_, statistics) = context.GetCacheStatistics();
+        Assert.Equal(1, statistics.Hits);
+        Assert.Equal(3, statistics.Misses);
+        Assert.Equal(2, statistics.Evictions);
+    }
+}
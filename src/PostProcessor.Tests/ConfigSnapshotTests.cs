@@ -0,0 +1,97 @@
+using PostProcessor.Core.Config.Loaders;
+using PostProcessor.Core.Config.Models;
+
+namespace PostProcessor.Tests;
+
+/// <summary>
+/// Tests for the ConfigSnapshotCache class
+/// </summary>
+public class ConfigSnapshotTests : IDisposable
+{
+    private readonly string _configPath = Path.Combine(Path.GetTempPath(), $"controller_{Guid.NewGuid():N}.json");
+
+    private const string ControllerJson = """
+        {
+          // комментарии и висячие запятые допустимы
+          "name": "Test 31i",
+          "machineType": "Turning",
+          "registerFormats": {
+            "X": { "address": "X", "format": "F5.4", "isModal": true },
+          },
+          "functionCodes": {
+            "rapid": { "code": "G00", "group": "MOTION" }
+          },
+          "safety": { "maxFeedRate": "5000" }
+        }
+        """;
+
+    public void Dispose()
+    {
+        if (File.Exists(_configPath))
+            File.Delete(_configPath);
+    }
+
+    [Fact]
+    public async Task GetOrLoad_ParsesControllerAndResolvesFormats()
+    {
+        // Arrange
+        await File.WriteAllTextAsync(_configPath, ControllerJson);
+
+        // Act
+        var snapshot = new ConfigSnapshotCache().GetOrLoad(_configPath);
+
+        // Assert
+        Assert.Equal("Test 31i", snapshot.Controller.Name);
+        Assert.Equal(MachineType.Turning, snapshot.Controller.MachineType);
+        Assert.Equal(5000, snapshot.Controller.Safety.MaxFeedRate);
+        Assert.Equal("F5.4", snapshot.GetRegisterFormat("x").Format);
+        Assert.Equal("F3.1", snapshot.GetRegisterFormat("F").Format);
+        Assert.Equal("G00", snapshot.GetFunctionCode("RAPID")!.Code);
+        Assert.Null(snapshot.GetFunctionCode("linear"));
+        Assert.Empty(snapshot.Controller.WorkCoordinateSystems);
+        Assert.Same(snapshot, ConfigSnapshot.For(snapshot.Controller));
+    }
+
+    [Fact]
+    public void For_ConfigBuiltInCode_FormatsWithPrebuiltTables()
+    {
+        // Arrange
+        var config = new ControllerConfig
+        {
+            RegisterFormats = new Dictionary<string, RegisterFormat>
+            {
+                ["X"] = new RegisterFormat { Address = "X", Format = "0.000" }
+            }
+        };
+
+        // Act
+        var snapshot = ConfigSnapshot.For(config);
+
+        // Assert
+        Assert.Same(snapshot, ConfigSnapshot.For(config));
+        Assert.Equal(string.Empty, snapshot.Hash);
+        Assert.Equal("12.500", snapshot.FormatValue("x", 12.5));
+        Assert.Equal("F3.1", snapshot.GetRegisterFormat("F").Format);
+    }
+
+    [Fact]
+    public async Task GetOrLoad_ReusesSnapshotUntilContentChanges()
+    {
+        // Arrange
+        var cache = new ConfigSnapshotCache();
+        await File.WriteAllTextAsync(_configPath, ControllerJson);
+
+        // Act
+        var first = cache.GetOrLoad(_configPath);
+        var second = cache.GetOrLoad(_configPath);
+        await File.WriteAllTextAsync(_configPath, ControllerJson.Replace("Test 31i", "Test 32i"));
+        var changed = cache.GetOrLoad(_configPath);
+
+        // Assert
+        Assert.Same(first, second);
+        Assert.NotSame(first, changed);
+        Assert.Equal("Test 32i", changed.Controller.Name);
+        Assert.Equal(1, cache.Hits);
+        Assert.Equal(2, cache.Misses);
+    }
+}
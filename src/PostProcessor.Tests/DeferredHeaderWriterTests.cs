@@ -0,0 +1,103 @@
+using PostProcessor.Core.Context;
+using PostProcessor.Core.Writers;
+
+namespace PostProcessor.Tests;
+
+/// <summary>
+/// Tests for the DeferredHeaderWriter and NcProgramStatistics classes
+/// </summary>
+public class DeferredHeaderWriterTests
+{
+    private static readonly string[] HeaderTemplate =
+    {
+        "(BLOCKS: {blockCount}, TOOL CHANGES: {toolChanges})",
+        "(TIME: {cycleTime})",
+        "(X {minX}..{maxX} Z {minZ}..{maxZ})",
+        "(T{toolNumber} {toolName} D{toolDiameter})"
+    };
+
+    [Fact]
+    public async Task Dispose_WritesResolvedHeaderBeforeBody()
+    {
+        // Arrange
+        var inner = new StringWriter { NewLine = "\n" };
+        var tools = new[] { new ToolInfo(1, 10, 60, "D10"), new ToolInfo(2, 6, 50) };
+        var writer = new DeferredHeaderWriter(
+            inner,
+            statistics => DeferredHeaderWriter.ResolvePlaceholders(HeaderTemplate, statistics, tools),
+            new NcProgramStatistics(rapidRate: 10000)) { NewLine = "\n" };
+
+        // Act
+        writer.Write("N10 T1 M6\n(COMMENT X999)\n");
+        writer.Write("N20 G0 X0 Y0 Z");
+        writer.Write("50\nN30 X100\n");
+        writer.WriteLine("N40 G1 Z-5 F500");
+        writer.WriteLine("N50 X-20");
+        writer.Write("M30");
+        await writer.DisposeAsync();
+
+        // Assert
+        Assert.Equal(
+            "(BLOCKS: 6, TOOL CHANGES: 1)\n" +
+            "(TIME: 00:00:21)\n" +
+            "(X -20.000..100.000 Z -5.000..50.000)\n" +
+            "(T1 D10 D10.000)\n" +
+            "(T2 T2 D6.000)\n" +
+            "N10 T1 M6\n(COMMENT X999)\nN20 G0 X0 Y0 Z50\nN30 X100\nN40 G1 Z-5 F500\nN50 X-20\nM30",
+            inner.ToString());
+    }
+
+    [Fact]
+    public void PrependHeader_CountsRewrittenBody()
+    {
+        // Arrange - тело после прохода, заменившего проходы циклом
+        var path = Path.Combine(Path.GetTempPath(), $"header_{Guid.NewGuid():N}.nc");
+        File.WriteAllText(path, "N10 T1 M6\nN20 G0 X0 Z50\nN30 G71 U1. R0.5\nN40 X-20\nM30\n");
+
+        try
+        {
+            // Act
+            var statistics = DeferredHeaderWriter.PrependHeader(
+                path,
+                stats => DeferredHeaderWriter.ResolvePlaceholders(new[] { "(BLOCKS: {blockCount})" }, stats, Array.Empty<ToolInfo>()));
+
+            // Assert
+            Assert.Equal(5, statistics.BlockCount);
+            Assert.Equal(
+                "(BLOCKS: 5)\nN10 T1 M6\nN20 G0 X0 Z50\nN30 G71 U1. R0.5\nN40 X-20\nM30\n",
+                File.ReadAllText(path).ReplaceLineEndings("\n"));
+        }
+        finally
+        {
+            File.Delete(path);
+        }
+    }
+
+    [Fact]
+    public void HasDeferredPlaceholders_DetectsOnlyEndOfProgramValues()
+    {
+        // Act & Assert
+        Assert.False(DeferredHeaderWriter.HasDeferredPlaceholders(new[] { "(PROGRAM {name})", "(DATE {dateTime})" }));
+        Assert.True(DeferredHeaderWriter.HasDeferredPlaceholders(new[] { "(PROGRAM {name})", "(Z MIN {minZ})" }));
+    }
+
+    [Fact]
+    public void Statistics_ArcAndIncrementalMoves()
+    {
+        // Arrange
+        var statistics = new NcProgramStatistics();
+
+        // Act - полуокружность R10 на F100, затем 10 мм в G91
+        statistics.AddLine("G90 G1 X0 Y0 Z0 F100");
+        statistics.AddLine("G2 X20 Y0 I10 J0");
+        statistics.AddLine("G91 G1 Y10");
+        statistics.AddLine("T=\"X500\" M6");
+
+        // Assert
+        Assert.Equal(Math.PI * 10 / 100 + 10.0 / 100, statistics.CycleTime.TotalMinutes, 6);
+        Assert.Equal(20.0, statistics.Max(0));
+        Assert.Equal(10.0, statistics.Max(1));
+        Assert.Equal(1, statistics.ToolChanges);
+        Assert.Null(new NcProgramStatistics().Min(2));
+    }
+}
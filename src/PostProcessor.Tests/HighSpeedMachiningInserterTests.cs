@@ -0,0 +1,95 @@
+using System.Globalization;
+using PostProcessor.Core.Optimization;
+
+namespace PostProcessor.Tests;
+
+/// <summary>
+/// Tests for the HighSpeedMachiningInserter class
+/// </summary>
+public class HighSpeedMachiningInserterTests
+{
+    /// <summary>
+    /// Two operations: T1 cuts 30 segments of 0.2 mm after a plunge, T2 cuts two 100 mm lines
+    /// </summary>
+    private static List<string> DenseAndSparse()
+    {
+        var lines = new List<string> { "O0001", "T1 M6", "G00 X0.0 Y0.0 Z5.0", "G01 Z-1.0 F1000.0" };
+        for (int i = 1; i <= 30; i++)
+            lines.Add(string.Create(CultureInfo.InvariantCulture, $"X{i * 0.2:F1} Y0.0"));
+        lines.AddRange(new[]
+        {
+            "G00 Z50.0",
+            "T2 M6",
+            "G00 X0.0 Y0.0 Z5.0",
+            "G01 Z-1.0 F500.0",
+            "X100.0",
+            "Y100.0",
+            "G00 Z50.0",
+            "M30"
+        });
+        return lines;
+    }
+
+    private static (List<string> Output, HighSpeedMachiningResult Result) Run(
+        List<string> lines,
+        HighSpeedMachiningOptions? options = null)
+    {
+        var writer = new StringWriter();
+        var result = new HighSpeedMachiningInserter(options).Insert(lines, writer);
+        var output = writer.ToString()
+            .Split(Environment.NewLine, StringSplitOptions.RemoveEmptyEntries)
+            .ToList();
+        return (output, result);
+    }
+
+    [Fact]
+    public void Insert_DenseOperation_IsWrappedInFanucAiContour()
+    {
+        // Arrange
+        var lines = DenseAndSparse();
+
+        // Act
+        var (output, result) = Run(lines);
+
+        // Assert - включение перед врезанием, выключение после последнего рабочего кадра
+        Assert.Equal(2, result.OperationCount);
+        Assert.Equal(1, result.WrappedOperations);
+        Assert.Equal(31, result.WrappedBlocks);
+        Assert.Equal("G05.1 Q1", output[output.IndexOf("G01 Z-1.0 F1000.0") - 1]);
+        Assert.Equal("G05.1 Q0", output[output.IndexOf("X6.0 Y0.0") + 1]);
+        Assert.Equal(1, output.Count(line => line == "G05.1 Q1"));
+        Assert.Equal(lines.Count + 2, result.OutputLines);
+    }
+
+    [Fact]
+    public void Insert_SiemensAndHeidenhain_UseToleranceFromOptions()
+    {
+        // Arrange
+        var lines = DenseAndSparse();
+
+        // Act
+        var (siemens, _) = Run(lines, new HighSpeedMachiningOptions { Dialect = HighSpeedDialect.Siemens, Tolerance = 0.02 });
+        var (heidenhain, _) = Run(lines, new HighSpeedMachiningOptions { Dialect = HighSpeedDialect.Heidenhain });
+
+        // Assert
+        Assert.Contains("CYCLE832(0.02,_SEMIFIN,1)", siemens);
+        Assert.Contains("CYCLE832(0,_OFF,1)", siemens);
+        Assert.Contains("CYCL DEF 32.1 T0.01", heidenhain);
+        Assert.Equal("CYCL DEF 32.1", heidenhain[heidenhain.IndexOf("X6.0 Y0.0") + 2]);
+    }
+
+    [Fact]
+    public void Insert_OperationWithHighSpeedModeProgrammed_IsKeptUnchanged()
+    {
+        // Arrange
+        var lines = DenseAndSparse();
+        lines.Insert(3, "G05.1 Q1");
+
+        // Act
+        var (output, result) = Run(lines, new HighSpeedMachiningOptions { Dialect = HighSpeedDialect.Haas });
+
+        // Assert
+        Assert.Equal(0, result.WrappedOperations);
+        Assert.Equal(lines, output);
+    }
+}
@@ -0,0 +1,155 @@
+using PostProcessor.Core.Config.Models;
+using PostProcessor.Core.Context;
+using PostProcessor.Core.Models;
+
+namespace PostProcessor.Tests;
+
+/// <summary>
+/// Tests for the HolePatternBuffer class
+/// </summary>
+public class HolePatternBufferTests
+{
+    private static APTCommand Command(string word, params double[] values) =>
+        new(word, new List<string>(), values.ToList(), new List<string>(), 0);
+
+    /// <summary>
+    /// Drill holes the way SyntheticAptGenerator writes them: GOTO/x,y,10 then CYCLE8x per hole
+    /// </summary>
+    private static (List<string> Output, List<APTCommand> Replayed) Drill(
+        string controller,
+        IEnumerable<(double X, double Y)> holes,
+        string cycle = "CYCLE81",
+        params double[] parameters)
+    {
+        if (parameters.Length == 0)
+            parameters = new double[] { 10, 0, 2, -15, 0 };
+
+        var writer = new StringWriter();
+        var context = new PostContext(writer, new ControllerConfig { Name = controller });
+        context.Registers.F.SetValue(120.26);
+        var replayed = new List<APTCommand>();
+        context.Holes.Replay = replayed.Add;
+
+        var first = true;
+        foreach (var (x, y) in holes)
+        {
+            if (first)
+            {
+                // Первое отверстие открывает серию из макроса цикла
+                context.Registers.X.SetValue(x);
+                context.Registers.Y.SetValue(y);
+                context.Holes.Begin(cycle, parameters);
+                first = false;
+                continue;
+            }
+
+            Assert.True(context.Holes.TryAccept(Command("GOTO", x, y, 10)));
+            Assert.True(context.Holes.TryAccept(Command(cycle, parameters)));
+        }
+
+        // Следующая позиция не является отверстием - серия закрывается
+        Assert.True(context.Holes.TryAccept(Command("GOTO", 0, 0, 50)));
+        Assert.False(context.Holes.TryAccept(Command("LOADTL", 2)));
+        Assert.False(context.Holes.IsOpen);
+
+        var output = writer.ToString()
+            .Split(Environment.NewLine, StringSplitOptions.RemoveEmptyEntries)
+            .ToList();
+        return (output, replayed);
+    }
+
+    [Fact]
+    public void Flush_FanucGrid_WritesModalG81WithXYOnlyBlocks()
+    {
+        // Arrange
+        var holes = new[] { (10.0, 10.0), (30.0, 10.0), (30.0, 25.0) };
+
+        // Act
+        var (output, replayed) = Drill("Fanuc 31i", holes);
+
+        // Assert
+        Assert.Equal(new[]
+        {
+            "G98 G81 X10.000 Y10.000 Z-15.000 R2.000 F120.3",
+            "X30.000 Y10.000",
+            "X30.000 Y25.000",
+            "G80"
+        }, output);
+        Assert.Single(replayed);
+        Assert.Equal(50, replayed[0].NumericValues[2]);
+    }
+
+    [Fact]
+    public void Flush_SiemensRow_WritesMcallWithHoles1()
+    {
+        // Arrange - ряд из 4 отверстий с шагом 15 мм под 90°
+        var holes = Enumerable.Range(0, 4).Select(i => (20.0, 5.0 + 15 * i));
+
+        // Act
+        var (output, _) = Drill("Siemens Sinumerik 840D sl", holes);
+
+        // Assert
+        Assert.Equal(new[]
+        {
+            "MCALL CYCLE81(10.000,0.000,2.000,-15.000,0.000)",
+            "HOLES1(20.000,5.000,90.0,0,15.000,4)",
+            "MCALL"
+        }, output);
+    }
+
+    [Fact]
+    public void Flush_SiemensCircle_WritesHoles2()
+    {
+        // Arrange - 6 отверстий на окружности R20 вокруг (50, 50)
+        var holes = Enumerable.Range(0, 6).Select(i =>
+            (50 + 20 * Math.Cos(i * Math.PI / 3), 50 + 20 * Math.Sin(i * Math.PI / 3)));
+
+        // Act
+        var (output, _) = Drill("Siemens Sinumerik 840D sl", holes);
+
+        // Assert
+        Assert.Equal("HOLES2(50.000,50.000,20.000,0.0,60.0,6)", output[1]);
+    }
+
+    [Fact]
+    public void Flush_HeidenhainPeckDrilling_WritesPatternDefAndCyclCallPat()
+    {
+        // Arrange
+        var holes = new[] { (10.0, 10.0), (40.0, 12.5) };
+
+        // Act
+        var (output, _) = Drill("Heidenhain TNC 640", holes, "CYCLE83",
+            10, 0, 2, -30, 0, -5, 0, 2, 0.5, 0.5, 1, 3, 0, 0);
+
+        // Assert
+        Assert.Equal("CYCL DEF 203 UNIVERSAL DRILLING ~", output[0]);
+        Assert.Contains("  Q201=-30 ;DEPTH ~", output);
+        Assert.Contains("  Q202=+5 ;PLUNGING DEPTH ~", output);
+        Assert.Contains("PATTERN DEF ~", output);
+        Assert.Contains("  POS1 (X+10 Y+10 Z+0) ~", output);
+        Assert.Contains("  POS2 (X+40 Y+12.5 Z+0)", output);
+        Assert.Equal("CYCL CALL PAT FMAX", output[^1]);
+    }
+
+    [Fact]
+    public void TryAccept_DifferentCycleParameters_ClosesPatternAndReplaysPosition()
+    {
+        // Arrange
+        var writer = new StringWriter();
+        var context = new PostContext(writer, new ControllerConfig { Name = "Fanuc 31i" });
+        var replayed = new List<APTCommand>();
+        context.Holes.Replay = replayed.Add;
+        context.Holes.Begin("CYCLE81", new double[] { 10, 0, 2, -15, 0 });
+
+        // Act
+        var heldGoto = context.Holes.TryAccept(Command("GOTO", 20, 0, 10));
+        var deeperHole = context.Holes.TryAccept(Command("CYCLE81", 10, 0, 2, -25, 0));
+
+        // Assert
+        Assert.True(heldGoto);
+        Assert.False(deeperHole);
+        Assert.False(context.Holes.IsOpen);
+        Assert.Equal(20, Assert.Single(replayed).NumericValues[0]);
+        Assert.Contains("G80", writer.ToString());
+    }
+}
@@ -0,0 +1,205 @@
+using PostProcessor.APT.Parser;
+using PostProcessor.Core.Config.Models;
+using PostProcessor.Core.Context;
+using PostProcessor.Core.Incremental;
+using PostProcessor.Core.Models;
+using PostProcessor.Core.Writers;
+using PostProcessor.Macros.Interfaces;
+
+namespace PostProcessor.Tests;
+
+/// <summary>
+/// Tests for incremental posting (PostStateSnapshot, IncrementalPostCache, BlockRenumberingWriter)
+/// </summary>
+public class IncrementalPostTests : IDisposable
+{
+    private readonly string _directory;
+    private readonly string _inputPath;
+
+    public IncrementalPostTests()
+    {
+        _directory = Path.Combine(Path.GetTempPath(), $"incremental_{Guid.NewGuid():N}");
+        Directory.CreateDirectory(_directory);
+        _inputPath = Path.Combine(_directory, "part.apt");
+    }
+
+    public void Dispose()
+    {
+        if (Directory.Exists(_directory))
+            Directory.Delete(_directory, recursive: true);
+    }
+
+    [Fact]
+    public async Task ParseIncremental_SecondRun_ReusesAllSegmentsWithSameOutput()
+    {
+        // Arrange
+        await File.WriteAllTextAsync(_inputPath, BuildApt(secondOperationZ: -5.0));
+
+        // Act
+        var (first, firstResult) = await PostAsync();
+        var (second, secondResult) = await PostAsync();
+
+        // Assert
+        Assert.Equal(3, firstResult.Segments);
+        Assert.Equal(0, firstResult.ReusedSegments);
+        Assert.Equal(3, secondResult.ReusedSegments);
+        Assert.Equal(first, second);
+    }
+
+    [Fact]
+    public async Task ParseIncremental_ChangedOperation_MatchesFullRepost()
+    {
+        // Arrange
+        await File.WriteAllTextAsync(_inputPath, BuildApt(secondOperationZ: -5.0));
+        await PostAsync();
+        await File.WriteAllTextAsync(_inputPath, BuildApt(secondOperationZ: -7.5));
+
+        // Act
+        var (incremental, result) = await PostAsync();
+        var (fresh, _) = await PostAsync(Path.Combine(_directory, "empty_cache"));
+
+        // Assert - first operation reused, changed one and the following re-posted
+        Assert.Equal(1, result.ReusedSegments);
+        Assert.Equal(fresh, incremental);
+        Assert.Contains("N50 Y10.000 Z-7.500", incremental);
+    }
+
+    [Fact]
+    public void Snapshot_RestoreTo_RoundTripsContextState()
+    {
+        // Arrange
+        var source = new PostContext(new StringWriter());
+        source.Registers.X.SetValue(12.5);
+        source.Registers.F.SetValue(800);
+        source.SetSystemVariable("LAST_PLANE", "G17");
+        source.SetSystemVariable("COUNT", 3);
+        source.Machine.CurrentTool = new ToolInfo(5, 12.0, 60.0);
+        var snapshot = PostStateSnapshot.FromJson(PostStateSnapshot.Capture(source).ToJson());
+
+        // Act
+        var target = new PostContext(new StringWriter());
+        snapshot.RestoreTo(target);
+
+        // Assert
+        Assert.Equal(12.5, target.Registers.X.Value);
+        Assert.True(target.Registers.X.HasChanged);
+        Assert.Equal("G17", target.GetSystemVariable("LAST_PLANE", ""));
+        Assert.Equal(3, target.GetSystemVariable("COUNT", 0));
+        Assert.Equal(5, target.Machine.CurrentTool!.Number);
+        Assert.Equal(PostStateSnapshot.Capture(source).Hash, PostStateSnapshot.Capture(target).Hash);
+    }
+
+    [Fact]
+    public void Snapshot_NonPrimitiveVariable_IsNotCacheable()
+    {
+        // Arrange
+        var context = new PostContext(new StringWriter());
+        context.SetSystemVariable("OBJ", new List<int>());
+
+        // Act
+        var snapshot = PostStateSnapshot.Capture(context);
+
+        // Assert
+        Assert.False(snapshot.IsCacheable);
+    }
+
+    [Fact]
+    public void BlockRenumberingWriter_RenumbersLeadingBlockNumbers()
+    {
+        // Arrange
+        var inner = new StringWriter();
+        var writer = new BlockRenumberingWriter(inner, firstNumber: 10, increment: 10);
+
+        // Act
+        writer.Write("N");
+        writer.Write("70 G1 X1.000\n");
+        writer.Write("(N5 COMMENT)\nNOTE\nN20\nG0 N30 X0\n");
+        writer.Write("N10 Z5.000\n");
+        writer.Flush();
+
+        // Assert
+        Assert.Equal("N10 G1 X1.000\n(N5 COMMENT)\nNOTE\nN20\nG0 N30 X0\nN30 Z5.000\n", inner.ToString());
+    }
+
+    [Fact]
+    public void BlockRenumberingWriter_UsesControllerBlockNumbering()
+    {
+        // Arrange
+        var fanuc = new StringWriter();
+        var haas = new StringWriter();
+        var fanucWriter = new BlockRenumberingWriter(fanuc, new BlockNumbering { Start = 1, Increment = 1 });
+        var haasWriter = new BlockRenumberingWriter(haas, new BlockNumbering { Enabled = false });
+
+        // Act
+        foreach (var writer in new[] { fanucWriter, haasWriter })
+        {
+            writer.Write("N70 G1 X1.000\nN80 Z5.000\n(N5 COMMENT)\n");
+            writer.Flush();
+        }
+
+        // Assert
+        Assert.Equal("N1 G1 X1.000\nN2 Z5.000\n(N5 COMMENT)\n", fanuc.ToString());
+        Assert.Equal("G1 X1.000\nZ5.000\n(N5 COMMENT)\n", haas.ToString());
+    }
+
+    private static string BuildApt(double secondOperationZ)
+    {
+        var z = secondOperationZ.ToString("F1", System.Globalization.CultureInfo.InvariantCulture);
+        return $@"OP_NAME/ROUGH
+LOADTL/1
+GOTO/0.0, 0.0, 5.0
+GOTO/10.0, 0.0, -2.0
+OP_NAME/FINISH
+LOADTL/2
+GOTO/10.0, 10.0, {z}
+OP_NAME/DRILL
+GOTO/20.0, 10.0, 5.0
+GOTO/20.0, 10.0, -10.0";
+    }
+
+    private async Task<(string Output, IncrementalPostResult Result)> PostAsync(string? cacheDirectory = null)
+    {
+        var inner = new StringWriter { NewLine = "\n" };
+        var capture = new SegmentCaptureWriter(new BlockRenumberingWriter(inner));
+        var context = new PostContext(capture);
+        var cache = new IncrementalPostCache(cacheDirectory ?? Path.Combine(_directory, "cache"), "test");
+
+        var result = await APTParser.ParseIncrementalAsync(_inputPath, context, new RegisterMacroEngine(), cache, capture);
+        await capture.FlushAsync();
+        return (inner.ToString(), result);
+    }
+
+    /// <summary>
+    /// Minimal macro engine: GOTO writes registers through BlockWriter, LOADTL writes T/M6
+    /// </summary>
+    private sealed class RegisterMacroEngine : IMacroEngine
+    {
+        public void RegisterLoader(IMacroLoader loader) { }
+
+        public Task LoadAsync(IEnumerable<string> paths, CancellationToken cancellationToken = default) => Task.CompletedTask;
+
+        public IEnumerable<IMacro> FindMacros(string commandName) => Enumerable.Empty<IMacro>();
+
+        public int GetMacroCount() => 0;
+
+        public ValueTask DisposeAsync() => ValueTask.CompletedTask;
+
+        public Task ExecuteAsync(PostContext context, APTCommand command, CancellationToken cancellationToken = default)
+        {
+            switch (command.MajorWord)
+            {
+                case "loadtl":
+                    context.BlockWriter.WriteBlockNumberOnly();
+                    context.Write($"T{command.NumericValues[0]:F0} M6");
+                    break;
+                case "goto":
+                    context.Registers.X.SetValue(command.NumericValues[0]);
+                    context.Registers.Y.SetValue(command.NumericValues[1]);
+                    context.Registers.Z.SetValue(command.NumericValues[2]);
+                    context.WriteBlock();
+                    break;
+            }
+            return Task.CompletedTask;
+        }
+    }
+}
@@ -0,0 +1,182 @@
+using System.Globalization;
+using PostProcessor.Core.Config.Models;
+using PostProcessor.Core.Context;
+using PostProcessor.Core.Models;
+using PostProcessor.Core.Optimization;
+using PostProcessor.Macros.Python;
+
+namespace PostProcessor.Tests;
+
+/// <summary>
+/// Tests for the LatheCycleCompactor class
+/// </summary>
+public class LatheCycleCompactorTests
+{
+    /// <summary>
+    /// OD roughing from D52 in 4 mm (diameter) passes with 2 mm retract,
+    /// followed by the finishing profile D20 x 20, D30 x 20
+    /// </summary>
+    private static List<string> RoughAndFinish()
+    {
+        var lines = new List<string> { "O0001", "G21 G40 G80", "T0101", "G00 X52.0 Z2.0" };
+        foreach (var x in new[] { 46.0, 42.0, 38.0, 34.0, 30.0, 26.0, 22.0 })
+        {
+            var end = x > 30 ? -40.0 : -20.0;
+            lines.Add(string.Create(CultureInfo.InvariantCulture, $"G00 X{x:F1} Z2.0"));
+            lines.Add(string.Create(CultureInfo.InvariantCulture, $"G01 X{x:F1} Z{end:F1} F0.3"));
+            lines.Add(string.Create(CultureInfo.InvariantCulture, $"G01 X{x + 2:F1} Z{end:F1}"));
+            lines.Add(string.Create(CultureInfo.InvariantCulture, $"G00 X{x + 2:F1} Z2.0"));
+        }
+        lines.AddRange(new[]
+        {
+            "G00 X20.0 Z2.0",
+            "G01 X20.0 Z-20.0 F0.1",
+            "G01 X30.0 Z-20.0",
+            "G01 X30.0 Z-40.0",
+            "G01 X52.0 Z-40.0",
+            "X100.0 Z100.0",
+            "M30"
+        });
+        return lines;
+    }
+
+    private static (List<string> Output, LatheCycleCompactionResult Result) Run(
+        List<string> lines,
+        LatheCycleOptions? options = null)
+    {
+        var writer = new StringWriter();
+        var result = new LatheCycleCompactor(options).Compact(lines, writer);
+        var output = writer.ToString()
+            .Split(Environment.NewLine, StringSplitOptions.RemoveEmptyEntries)
+            .ToList();
+        return (output, result);
+    }
+
+    [Fact]
+    public void Compact_RoughingPasses_BecomeFanucG71AndG70()
+    {
+        // Arrange
+        var lines = RoughAndFinish();
+
+        // Act
+        var (output, result) = Run(lines);
+
+        // Assert
+        Assert.Equal(1, result.CycleCount);
+        Assert.Equal(28, result.ReplacedBlocks);
+        Assert.Equal(new[]
+        {
+            "O0001",
+            "G21 G40 G80",
+            "T0101",
+            "G00 X52.0 Z2.0",
+            "G71 U2.000 R1.000",
+            "G71 P9000 Q9001 U2.000 W0.000 F0.300",
+            "N9000 G00 X20.000",
+            "G01 Z-20.000 F0.100",
+            "X30.000",
+            "Z-40.000",
+            "N9001 X52.000",
+            "G70 P9000 Q9001",
+            "G01 X100.0 Z100.0 F0.100",
+            "M30"
+        }, output);
+        Assert.Equal(output.Count, result.OutputLines);
+    }
+
+    [Fact]
+    public void Compact_SiemensDialect_WritesCycle95WithContourLabels()
+    {
+        // Arrange
+        var lines = RoughAndFinish();
+
+        // Act
+        var (output, result) = Run(lines, new LatheCycleOptions { Dialect = SubprogramDialect.Siemens });
+
+        // Assert
+        Assert.Equal(1, result.CycleCount);
+        Assert.Contains("CYCLE95(\"CONTOUR1_S:CONTOUR1_E\", 2.000, 0.000, 1.000, 0, 0.300, 0.300, 0.100, 9, 0, 0, 1.000)", output);
+        Assert.Contains("GOTOF CONTOUR1_E", output);
+        Assert.Contains("CONTOUR1_S:", output);
+        Assert.Contains("CONTOUR1_E:", output);
+        Assert.False(output.Any(line => line.StartsWith("G71")));
+    }
+
+    [Fact]
+    public void Compact_PassesNotMatchingProfile_AreKeptUnchanged()
+    {
+        // Arrange - последний проход врезается глубже контура
+        var lines = RoughAndFinish();
+        var index = lines.IndexOf("G01 X22.0 Z-20.0 F0.3");
+        lines[index] = "G01 X22.0 Z-30.0 F0.3";
+        lines[index + 1] = "G01 X24.0 Z-30.0";
+
+        // Act
+        var (output, result) = Run(lines);
+
+        // Assert
+        Assert.Equal(0, result.CycleCount);
+        Assert.Equal(lines, output);
+    }
+
+    [PythonFact]
+    public async Task Compact_FanucLatheGotoOutput_BecomesG71AndG70()
+    {
+        // Arrange - те же проходы, но кадры пишет макрос fanuc/lathe_goto.py
+        await using var engine = new PythonMacroEngine("fanuc", FindMacrosDirectory());
+        await engine.LoadAsync(Array.Empty<string>());
+        Assert.True(engine.GetMacroCount() > 0, "Python macros failed to load");
+
+        var config = new ControllerConfig
+        {
+            Name = "Fanuc 31i",
+            MachineType = MachineType.Turning,
+            RegisterFormats = { ["F"] = new RegisterFormat { Address = "F", Format = "F3.2", IsModal = false } }
+        };
+        var macroOutput = new StringWriter { NewLine = "\n" };
+        var context = new PostContext(macroOutput, config);
+        foreach (var line in RoughAndFinish())
+        {
+            var words = line.Split(' ');
+            if (words[0] is not ("G00" or "G01" or ['X', ..]))
+            {
+                context.WriteLine(line);
+                continue;
+            }
+
+            double Word(char address) => double.Parse(
+                words.Single(word => word[0] == address)[1..], CultureInfo.InvariantCulture);
+            if (words[0] == "G00")
+                context.SetSystemVariable("MOTION", "RAPID");
+            if (words.Any(word => word[0] == 'F'))
+                context.Registers.F.SetValue(Word('F'));
+
+            var command = new APTCommand("lathe_goto", new List<string>(), new List<double> { Word('X'), Word('Z') }, new List<string>(), 1);
+            await engine.ExecuteAsync(context, command);
+        }
+        var blocks = macroOutput.ToString().Split('\n', StringSplitOptions.RemoveEmptyEntries).ToList();
+
+        // Act
+        var (output, result) = Run(blocks);
+
+        // Assert - подача модальная, в формате конфигурации и не выводится в G00
+        Assert.Contains("G00 X52.000 Z2.000", blocks);
+        Assert.Contains("G01 X46.000 Z-40.000 F0.30", blocks);
+        Assert.Contains("G01 X20.000 Z-20.000 F0.10", blocks);
+        Assert.Equal(2, blocks.Count(block => block.Contains(" F")));
+        Assert.Equal(1, result.CycleCount);
+        Assert.Equal(28, result.ReplacedBlocks);
+        Assert.Contains("G71 P9000 Q9001 U2.000 W0.000 F0.300", output);
+        Assert.Contains("G70 P9000 Q9001", output);
+    }
+
+    private static string FindMacrosDirectory()
+    {
+        var directory = new DirectoryInfo(AppContext.BaseDirectory);
+        while (directory != null && !Directory.Exists(Path.Combine(directory.FullName, "macros", "python", "base")))
+            directory = directory.Parent;
+
+        Assert.NotNull(directory);
+        return Path.Combine(directory!.FullName, "macros", "python");
+    }
+}
@@ -0,0 +1,169 @@
+using PostProcessor.Core.Context;
+using PostProcessor.Core.Models;
+using PostProcessor.Macros.Python;
+
+namespace PostProcessor.Tests;
+
+/// <summary>
+/// Tests for the NativeBaseMacros class (C# versions of base/goto.py, rapid.py, fedrat.py)
+/// </summary>
+public class NativeBaseMacrosTests
+{
+    // Вывод base-макросов через PythonPostContext: write() без перевода строки,
+    // writeBlock() добавляет пустую строку, F немодальный и выводится в каждом блоке
+    private const string ExpectedOutput =
+        "N10 F500.0\n\n" +
+        "G0N20 Z50.000 F500.0\n\n" +
+        "G0N30 X10.000 F500.0\n\n" +
+        "G1N40 Y20.000 Z-5.000 F500.0\n\n" +
+        "G1N50 A45.000 F500.0\n\n" +
+        "G1N60 X15.000 A0.000 B30.000 F500.0\n\n";
+
+    private static readonly string[] Program =
+    {
+        "FEDRAT/500",
+        "RAPID/0, 0, 50",
+        "GOTO/10, 0, 50",
+        "GOTO/10, 20, -5",
+        "GOTO/10, 20, -5, 0, 0.7071067811865476, 0.7071067811865476",
+        "GOTO/15, 20, -5, 0.5, 0, 0.8660254037844386"
+    };
+
+    [Fact]
+    public void IsStock_RecognizesShippedBaseMacros()
+    {
+        // Arrange
+        var macros = FindMacrosDirectory();
+
+        // Act & Assert
+        Assert.True(NativeBaseMacros.IsStock("goto", Path.Combine(macros, "base", "goto.py")));
+        Assert.True(NativeBaseMacros.IsStock("rapid", Path.Combine(macros, "base", "rapid.py")));
+        Assert.True(NativeBaseMacros.IsStock("fedrat", Path.Combine(macros, "base", "fedrat.py")));
+        Assert.False(NativeBaseMacros.IsStock("goto", Path.Combine(macros, "fanuc", "goto.py")));
+        Assert.Null(NativeBaseMacros.Resolve("goto", Path.Combine(macros, "user", "fsq100", "goto.py")));
+    }
+
+    [Fact]
+    public async Task NativeMacros_ProduceBaseMacroOutput()
+    {
+        // Arrange
+        var commands = await ParseAsync(Program);
+        var output = new StringWriter { NewLine = "\n" };
+        var context = new PostContext(output);
+
+        // Act
+        foreach (var command in commands)
+            Execute(context, command);
+
+        // Assert
+        Assert.Equal(ExpectedOutput, output.ToString());
+        Assert.Equal("LINEAR", context.GetSystemVariable("MOTION", ""));
+        Assert.Equal(0.8660254037844386, context.Registers.K.Value);
+    }
+
+    [PythonFact]
+    public async Task NativeMacros_MatchPythonMacrosByteForByte()
+    {
+        // Arrange - без Python runtime тест пропускается, эталон проверяется тестом выше
+        await using var python = new PythonMacroEngine("", FindMacrosDirectory()) { UseNativeBaseMacros = false };
+        await python.LoadAsync(Array.Empty<string>());
+        Assert.True(python.GetMacroCount() > 0, "Python macros failed to load");
+
+        var commands = await ParseAsync(Program);
+        var pythonOutput = new StringWriter { NewLine = "\n" };
+        var pythonContext = new PostContext(pythonOutput);
+        var nativeOutput = new StringWriter { NewLine = "\n" };
+        var nativeContext = new PostContext(nativeOutput);
+
+        // Act
+        foreach (var command in commands)
+        {
+            await python.ExecuteAsync(pythonContext, command);
+            Execute(nativeContext, command);
+        }
+
+        // Assert
+        Assert.Equal(ExpectedOutput, pythonOutput.ToString());
+        Assert.Equal(pythonOutput.ToString(), nativeOutput.ToString());
+    }
+
+    [Fact]
+    public void EmitMotionAndArc_WriteBlockInOneCall()
+    {
+        // Arrange
+        var output = new StringWriter { NewLine = "\n" };
+        var context = new PostContext(output);
+        var python = new PythonPostContext(context);
+
+        // Act
+        python.emitMotion("G1", 10, 0, 0, feed: 200);
+        python.emitMotion("G1", 10, 0, 0);
+        python.emitArc("G2", 20, 10, 0, i: 10, j: 0);
+        python.emitArc("G3", 10, 20, 0, r: 10);
+
+        // Assert - X/Y/Z дуги выводятся всегда, I/J или R - в конце блока
+        Assert.Equal(
+            "G1N10 X10.000 F200.0\n\n" +
+            "G1N20 F200.0\n\n" +
+            "G2N30 X20.000 Y10.000 Z0.000 F200.0 I10.000 J0.000\n\n" +
+            "G3N40 X10.000 Y20.000 Z0.000 F200.0 R10.000\n\n",
+            output.ToString());
+        Assert.Equal(10.0, context.Registers.I.Value);
+    }
+
+    [Fact]
+    public void PythonRound_RoundsHalfToEvenOnExactBinaryValue()
+    {
+        // Act & Assert
+        Assert.Equal(0.062, NativeBaseMacros.PythonRound(0.0625, 3));
+        Assert.Equal(2.675, NativeBaseMacros.PythonRound(2.6750000000000003, 3));
+        Assert.Equal(1.0, NativeBaseMacros.PythonRound(1.0005, 3));
+        Assert.Equal(-45.0, NativeBaseMacros.PythonRound(-44.99999999, 3));
+    }
+
+    private static void Execute(PostContext context, APTCommand command)
+    {
+        switch (command.Word)
+        {
+            case APTMajorWord.Goto:
+                NativeBaseMacros.Goto(context, command);
+                break;
+            case APTMajorWord.Rapid:
+                NativeBaseMacros.Rapid(context, command);
+                break;
+            case APTMajorWord.Fedrat:
+                NativeBaseMacros.Fedrat(context, command);
+                break;
+        }
+    }
+
+    private static async Task<List<APTCommand>> ParseAsync(IEnumerable<string> lines)
+    {
+        var path = Path.Combine(Path.GetTempPath(), $"native_{Guid.NewGuid():N}.apt");
+        await File.WriteAllLinesAsync(path, lines);
+        try
+        {
+            var commands = new List<APTCommand>();
+            await using (var lexer = new APT.Lexer.StreamingAPTLexer(path))
+            {
+                await foreach (var command in lexer.ParseStreamAsync())
+                    commands.Add(command);
+            }
+            return commands;
+        }
+        finally
+        {
+            File.Delete(path);
+        }
+    }
+
+    private static string FindMacrosDirectory()
+    {
+        var directory = new DirectoryInfo(AppContext.BaseDirectory);
+        while (directory != null && !Directory.Exists(Path.Combine(directory.FullName, "macros", "python", "base")))
+            directory = directory.Parent;
+
+        Assert.NotNull(directory);
+        return Path.Combine(directory!.FullName, "macros", "python");
+    }
+}
@@ -0,0 +1,111 @@
+using System.IO.Compression;
+using System.Text;
+using PostProcessor.Core.Writers;
+
+namespace PostProcessor.Tests;
+
+/// <summary>
+/// Tests for the NcOutput factory and SplittingNcWriter class
+/// </summary>
+public class NcOutputTests : IDisposable
+{
+    private readonly string _directory;
+
+    public NcOutputTests()
+    {
+        _directory = Path.Combine(Path.GetTempPath(), $"nc_output_{Guid.NewGuid():N}");
+        Directory.CreateDirectory(_directory);
+    }
+
+    public void Dispose()
+    {
+        if (Directory.Exists(_directory))
+            Directory.Delete(_directory, recursive: true);
+    }
+
+    [Fact]
+    public void Open_Gzip_WritesCompressedFileWithExtension()
+    {
+        // Arrange
+        var options = new NcOutputOptions { Compression = NcCompression.Gzip };
+        var path = NcOutput.ResolvePath(Path.Combine(_directory, "prog.nc"), options);
+
+        // Act
+        using (var writer = NcOutput.Open(path, options, new UTF8Encoding(false)))
+        {
+            writer.WriteLine("G0 X10.000");
+            writer.Flush();
+            writer.WriteLine("M30");
+        }
+
+        // Assert
+        Assert.EndsWith(".nc.gz", path);
+        using var reader = new StreamReader(new GZipStream(File.OpenRead(path), CompressionMode.Decompress));
+        Assert.Equal("G0 X10.000\nM30\n", reader.ReadToEnd().Replace("\r\n", "\n"));
+    }
+
+    [Fact]
+    public void SplittingWriter_ToolChangeMode_StartsNewPartOnEachToolChange()
+    {
+        // Arrange
+        var options = new NcOutputOptions { SplitMode = NcSplitMode.ToolChange };
+        var path = Path.Combine(_directory, "prog.nc");
+        var writer = new SplittingNcWriter(path, options, new UTF8Encoding(false),
+            header: part => new[] { $"O000{part}" },
+            footer: new[] { "M30" });
+
+        // Act
+        writer.WriteLine("O0001");
+        writer.WriteLine("T1 M6");
+        writer.Write("G0 X1.000");
+        writer.WriteLine();
+        writer.WriteLine("T2 M6");
+        writer.WriteLine("G0 X2.000");
+        writer.WriteLine("M30");
+        writer.Dispose();
+
+        // Assert
+        Assert.Equal(2, writer.PartPaths.Count);
+        Assert.Equal(Path.Combine(_directory, "prog_002.nc"), writer.PartPaths[1]);
+
+        var first = File.ReadAllLines(writer.PartPaths[0]);
+        var second = File.ReadAllLines(writer.PartPaths[1]);
+        Assert.Equal(new[] { "O0001", "T1 M6", "G0 X1.000", "M30" }, first);
+        Assert.Equal(new[] { "O0002", "", "T2 M6", "G0 X2.000", "M30" }, second);
+    }
+
+    [Fact]
+    public void SplittingWriter_SizeMode_SplitsOnlyAfterThresholdAtToolChange()
+    {
+        // Arrange
+        var options = new NcOutputOptions { SplitMode = NcSplitMode.Size, MaxPartBytes = 40 };
+        var writer = new SplittingNcWriter(Path.Combine(_directory, "prog.nc"), options, new UTF8Encoding(false));
+
+        // Act
+        writer.WriteLine("T1 M6");
+        writer.WriteLine("T2 M6");
+        writer.WriteLine("G1 X1.000 Y1.000 Z1.000 F100.0");
+        writer.WriteLine("G1 X2.000 Y2.000 Z2.000");
+        writer.WriteLine("T3 M6");
+        writer.WriteLine("G0 X0.000");
+        writer.Dispose();
+
+        // Assert
+        Assert.Equal(2, writer.PartPaths.Count);
+        Assert.Equal("T3 M6", File.ReadAllLines(writer.PartPaths[1])[0]);
+    }
+
+    [Fact]
+    public void GetPartPath_InsertsPartNumberBeforeExtensions()
+    {
+        // Arrange
+        var options = new NcOutputOptions { Compression = NcCompression.Brotli };
+
+        // Act
+        var part = NcOutput.GetPartPath("prog.nc.br", 3, options);
+
+        // Assert
+        Assert.Equal("prog_003.nc.br", part);
+        Assert.Equal("prog.nc.br", NcOutput.GetPartPath("prog.nc.br", 1, options));
+    }
+}
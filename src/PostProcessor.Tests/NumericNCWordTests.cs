@@ -334,4 +334,24 @@ public class NumericNCWordTests
         // Assert
         Assert.StartsWith("X", result);
     }
+
+    [Fact]
+    public void v_ChangeBelowConfiguredDecimals_DoesNotMarkChanged()
+    {
+        // Arrange - подача выводится с 1 знаком, координаты с 3
+        var config = new PostProcessor.Core.Config.Models.ControllerConfig();
+        var feed = new NumericNCWord(config, "F");
+        var x = new NumericNCWord(config, "X");
+        feed.SetInitial(500.0);
+        x.SetInitial(12.5);
+
+        // Act
+        feed.v = 500.02;
+        x.v = 12.5000004;
+
+        // Assert
+        Assert.False(feed.HasChanged);
+        Assert.False(x.HasChanged);
+        Assert.Equal(string.Empty, x.ToNCString());
+    }
 }
@@ -0,0 +1,211 @@
+using PostProcessor.APT.Parser;
+using PostProcessor.Core.Context;
+using PostProcessor.Core.Incremental;
+using PostProcessor.Core.Models;
+using PostProcessor.Core.Writers;
+using PostProcessor.Macros.Interfaces;
+
+namespace PostProcessor.Tests;
+
+/// <summary>
+/// Tests for parallel posting (APTParser.PostSegmentRangeAsync / StitchSegmentsAsync)
+/// </summary>
+public class ParallelPostTests : IDisposable
+{
+    private readonly string _inputPath = Path.Combine(Path.GetTempPath(), $"parallel_{Guid.NewGuid():N}.apt");
+
+    public void Dispose()
+    {
+        if (File.Exists(_inputPath))
+            File.Delete(_inputPath);
+    }
+
+    [Fact]
+    public async Task ReadSegments_SplitsOnOperations()
+    {
+        // Arrange
+        await File.WriteAllTextAsync(_inputPath, BuildApt());
+
+        // Act
+        var segments = await APTParser.ReadSegmentsAsync(_inputPath);
+
+        // Assert - OP_NAME + LOADTL подряд остаются в одном сегменте
+        Assert.Equal(4, segments.Count);
+        Assert.Equal(4, segments[0].Count);
+        Assert.Equal(APTMajorWord.Loadtl, segments[0][1].Word);
+    }
+
+    [Fact]
+    public async Task Stitch_PredictedStatesMatch_ReusesWorkerOutput()
+    {
+        // Arrange
+        await File.WriteAllTextAsync(_inputPath, BuildApt());
+        var segments = await APTParser.ReadSegmentsAsync(_inputPath);
+        var results = new List<SegmentPostResult>();
+        results.AddRange(await PostRangeAsync(segments, 0, 0));
+        results.AddRange(await PostRangeAsync(segments, 1, 1));
+
+        // Act
+        var (output, reposted) = await StitchAsync(segments.Take(2).ToList(), results);
+
+        // Assert
+        Assert.Equal(0, reposted);
+        Assert.Equal(await PostSequentialAsync(BuildApt(operations: 2)), output);
+    }
+
+    [Fact]
+    public async Task Stitch_MispredictedState_RepostsSegment()
+    {
+        // Arrange - PLUNGE зависит от позиции X/Y из второго сегмента: прогрев на COOLNT её не даёт
+        await File.WriteAllTextAsync(_inputPath, BuildApt());
+        var segments = await APTParser.ReadSegmentsAsync(_inputPath);
+        var results = new List<SegmentPostResult>();
+        results.AddRange(await PostRangeAsync(segments, 0, 2));
+        results.AddRange(await PostRangeAsync(segments, 3, 3));
+
+        // Act
+        var (output, reposted) = await StitchAsync(segments, results);
+
+        // Assert - пересчитан только последний сегмент
+        Assert.Equal(1, reposted);
+        Assert.Equal(await PostSequentialAsync(BuildApt()), output);
+        Assert.Contains("N60 Z-4.000", output);
+    }
+
+    [Fact]
+    public async Task Stitch_MissingWorkerResults_RepostsSequentially()
+    {
+        // Arrange
+        await File.WriteAllTextAsync(_inputPath, BuildApt());
+        var segments = await APTParser.ReadSegmentsAsync(_inputPath);
+        var results = await PostRangeAsync(segments, 0, 1);
+
+        // Act
+        var (output, reposted) = await StitchAsync(segments, results);
+
+        // Assert
+        Assert.Equal(2, reposted);
+        Assert.Equal(await PostSequentialAsync(BuildApt()), output);
+    }
+
+    [Fact]
+    public async Task Stitch_RepostedSegmentEndsInsideDrillingSeries_FlushesPatternBeforeNextSegment()
+    {
+        // Arrange - сегмент DRILL заканчивается открытой серией и удержанным GOTO
+        var apt = string.Join("\n",
+            "OP_NAME/DRILL", "LOADTL/1", "GOTO/10.0, 10.0, 10.0", "CYCLE81/10.0, 0.0, 2.0, -15.0, 0.0",
+            "GOTO/30.0, 10.0, 10.0", "CYCLE81/10.0, 0.0, 2.0, -15.0, 0.0", "GOTO/0.0, 0.0, 50.0",
+            "OP_NAME/FINISH", "LOADTL/2", "GOTO/5.0, 5.0, -1.0");
+        await File.WriteAllTextAsync(_inputPath, apt);
+        var segments = await APTParser.ReadSegmentsAsync(_inputPath);
+        var results = await PostRangeAsync(segments, 1, 1);
+
+        // Act
+        var (output, reposted) = await StitchAsync(segments, results);
+
+        // Assert - шаблон и удержанный GOTO выведены до вывода рабочего процесса
+        Assert.Equal(1, reposted);
+        Assert.Equal(await PostSequentialAsync(apt), output);
+        Assert.True(output.IndexOf("G80", StringComparison.Ordinal) < output.IndexOf("T2 M6", StringComparison.Ordinal));
+    }
+
+    private static string BuildApt(int operations = 4)
+    {
+        var lines = new List<string>
+        {
+            "OP_NAME/ROUGH", "LOADTL/1", "GOTO/0.0, 0.0, 5.0", "GOTO/10.0, 0.0, -2.0",
+            "OP_NAME/FINISH", "LOADTL/2", "GOTO/10.0, 10.0, -5.0",
+            "OP_NAME/COOLANT", "COOLNT/ON",
+            "OP_NAME/PLUNGE", "PLUNGE/-4.0", "GOTO/20.0, 10.0, 5.0"
+        };
+
+        var starts = lines.Select((line, index) => (line, index)).Where(x => x.line.StartsWith("OP_NAME")).Select(x => x.index).ToList();
+        var end = operations < starts.Count ? starts[operations] : lines.Count;
+        return string.Join("\n", lines.Take(end));
+    }
+
+    private static async Task<List<SegmentPostResult>> PostRangeAsync(List<List<APTCommand>> segments, int first, int last)
+    {
+        var capture = new SegmentCaptureWriter(TextWriter.Null);
+        var context = new PostContext(capture);
+        return await APTParser.PostSegmentRangeAsync(segments, first, last, context, new RegisterMacroEngine(), capture);
+    }
+
+    private static async Task<(string Output, int Reposted)> StitchAsync(List<List<APTCommand>> segments, List<SegmentPostResult> results)
+    {
+        var inner = new StringWriter { NewLine = "\n" };
+        var writer = new BlockRenumberingWriter(inner);
+        var context = new PostContext(writer);
+
+        var reposted = await APTParser.StitchSegmentsAsync(segments, results, context, new RegisterMacroEngine());
+        await writer.FlushAsync();
+        return (inner.ToString(), reposted);
+    }
+
+    private async Task<string> PostSequentialAsync(string apt)
+    {
+        await File.WriteAllTextAsync(_inputPath, apt);
+
+        var inner = new StringWriter { NewLine = "\n" };
+        var writer = new BlockRenumberingWriter(inner);
+        var context = new PostContext(writer);
+
+        await APTParser.ParseWithMacrosAsync(_inputPath, context, new RegisterMacroEngine());
+        await writer.FlushAsync();
+        return inner.ToString();
+    }
+
+    /// <summary>
+    /// Minimal macro engine: GOTO writes X/Y/Z, PLUNGE writes Z only, LOADTL writes T/M6,
+    /// CYCLE81 opens a drilling series
+    /// </summary>
+    private sealed class RegisterMacroEngine : IMacroEngine
+    {
+        public void RegisterLoader(IMacroLoader loader) { }
+
+        public Task LoadAsync(IEnumerable<string> paths, CancellationToken cancellationToken = default) => Task.CompletedTask;
+
+        public IEnumerable<IMacro> FindMacros(string commandName) => Enumerable.Empty<IMacro>();
+
+        public int GetMacroCount() => 0;
+
+        public ValueTask DisposeAsync() => ValueTask.CompletedTask;
+
+        public Task ExecuteAsync(PostContext context, APTCommand command, CancellationToken cancellationToken = default)
+        {
+            if (context.Holes.IsOpen)
+            {
+                context.Holes.Replay ??= held => Execute(context, held);
+                if (context.Holes.TryAccept(command))
+                    return Task.CompletedTask;
+            }
+
+            Execute(context, command);
+            return Task.CompletedTask;
+        }
+
+        private static void Execute(PostContext context, APTCommand command)
+        {
+            switch (command.MajorWord)
+            {
+                case "loadtl":
+                    context.BlockWriter.WriteBlockNumberOnly();
+                    context.Write($"T{command.NumericValues[0]:F0} M6");
+                    break;
+                case "goto":
+                    context.Registers.X.SetValue(command.NumericValues[0]);
+                    context.Registers.Y.SetValue(command.NumericValues[1]);
+                    context.Registers.Z.SetValue(command.NumericValues[2]);
+                    context.WriteBlock();
+                    break;
+                case "plunge":
+                    context.Registers.Z.SetValue(command.NumericValues[0]);
+                    context.WriteBlock();
+                    break;
+                case "cycle81":
+                    context.Holes.Begin("CYCLE81", command.NumericValues);
+                    break;
+            }
+        }
+    }
+}
@@ -158,6 +158,38 @@ public class PostContextTests : IDisposable
         Assert.True(context.GetSystemVariable<bool>("BOOL_VAR"));
     }
 
+    [Fact]
+    public void ProcessCommand_ReturnsTypedEventsWithoutPayload()
+    {
+        // Arrange
+        var context = new PostContext(_testWriter);
+        var multax = new APTCommand("multax", new List<string> { "on" }, new List<double>(), new List<string>(), 1);
+        var gotoCommand = new APTCommand("goto", new List<string>(), new List<double> { 10.0, 20.0, 30.0, 0, 0, 1 }, new List<string>(), 2);
+        var spindle = new APTCommand("spindl", new List<string> { "cclw" }, new List<double> { 1200 }, new List<string>(), 3);
+        var fini = new APTCommand("fini", new List<string>(), new List<double>(), new List<string>(), 4);
+
+        // Act
+        context.ProcessCommand(multax, out _);
+        var hasMotion = context.ProcessCommand(gotoCommand, out var motion);
+        context.ProcessCommand(spindle, out var spindleEvent);
+        var hasFini = context.ProcessCommand(fini, out _);
+
+        // Assert
+        Assert.True(hasMotion);
+        Assert.Equal(PostEventType.Motion, motion.Type);
+        Assert.Equal(20.0, motion.Y);
+        Assert.True(motion.HasToolAxis);
+        Assert.Equal(SpindleDirection.CounterClockwise, spindleEvent.Spindle);
+        Assert.False(hasFini);
+        Assert.Equal(4, context.GetStatistics().CommandCount);
+
+        // Прежний формат - словарь с теми же ключами
+        var payload = motion.ToPostEvent().Payload;
+        Assert.Equal(10.0, payload["x"]);
+        Assert.Equal(1.0, payload["k"]);
+        Assert.Equal("CounterClockwise", spindleEvent.ToPostEvent().Payload["direction"]);
+    }
+
     public void Dispose()
     {
         _testWriter?.Dispose();
@@ -0,0 +1,87 @@
+using System.Text;
+using System.Text.Json;
+using PostProcessor.APT.Parser;
+using PostProcessor.Core.Context;
+using PostProcessor.Core.Diagnostics;
+using PostProcessor.Core.Models;
+using PostProcessor.Macros.Interfaces;
+
+namespace PostProcessor.Tests;
+
+/// <summary>
+/// Tests for the ProgressReporter class
+/// </summary>
+public class ProgressReporterTests
+{
+    [Fact]
+    public void Track_SamplesClockOncePerBatchOfCommands()
+    {
+        // Arrange
+        var reporter = new ProgressReporter(TextWriter.Null, ProgressFormat.Json, TimeSpan.Zero);
+        var command = new APTCommand("goto", new List<string>(), new List<double> { 1, 2, 3 }, new List<string>(), 1);
+
+        // Act
+        var due = Enumerable.Range(0, ProgressReporter.SampleEvery * 2).Count(_ => reporter.Track(command));
+
+        // Assert - интервал нулевой, но отчёт не чаще раза в SampleEvery команд
+        Assert.Equal(2, due);
+        Assert.Equal(ProgressReporter.SampleEvery * 2, reporter.Commands);
+    }
+
+    [Fact]
+    public async Task ParseWithMacros_ReportsFinalJsonLine()
+    {
+        // Arrange
+        var apt = new StringBuilder("LOADTL/7\nOP_NAME/ROUGH\n");
+        for (int i = 0; i < 1000; i++)
+            apt.Append("GOTO/").Append(i + 1).Append(", 0, 0\n");
+        var bytes = Encoding.ASCII.GetBytes(apt.ToString());
+        var report = new StringWriter();
+        var progress = new ProgressReporter(report, ProgressFormat.Json, TimeSpan.FromHours(1), bytes.Length);
+        var context = new PostContext(TextWriter.Null);
+
+        // Act
+        await APTParser.ParseWithMacrosAsync(new MemoryStream(bytes), context, new GotoMacroEngine(), default, progress);
+
+        // Assert - за час ни одного промежуточного отчёта, только итог
+        var lines = report.ToString().Split('\n', StringSplitOptions.RemoveEmptyEntries);
+        Assert.Single(lines);
+        using var json = JsonDocument.Parse(lines[0]);
+        var root = json.RootElement;
+        Assert.True(root.GetProperty("done").GetBoolean());
+        Assert.Equal(1002, root.GetProperty("commands").GetInt64());
+        Assert.Equal(1002, root.GetProperty("lines").GetInt64());
+        Assert.Equal(bytes.Length, root.GetProperty("bytes").GetInt64());
+        Assert.Equal(1000, root.GetProperty("blocks").GetInt64());
+        Assert.Equal("rough", root.GetProperty("operation").GetString());
+        Assert.Equal(7, root.GetProperty("tool").GetInt32());
+    }
+
+    /// <summary>
+    /// Minimal macro engine: GOTO writes X through BlockWriter
+    /// </summary>
+    private sealed class GotoMacroEngine : IMacroEngine
+    {
+        public void RegisterLoader(IMacroLoader loader) { }
+
+        public Task LoadAsync(IEnumerable<string> paths, CancellationToken cancellationToken = default) => Task.CompletedTask;
+
+        public IEnumerable<IMacro> FindMacros(string commandName) => Enumerable.Empty<IMacro>();
+
+        public int GetMacroCount() => 1;
+
+        public string? GetMacroSource(string commandName) => null;
+
+        public ValueTask DisposeAsync() => ValueTask.CompletedTask;
+
+        public Task ExecuteAsync(PostContext context, APTCommand command, CancellationToken cancellationToken = default)
+        {
+            if (command.Word == APTMajorWord.Goto)
+            {
+                context.Registers.X.SetValue(command.NumericValues[0]);
+                context.WriteBlock();
+            }
+            return Task.CompletedTask;
+        }
+    }
+}
@@ -0,0 +1,120 @@
+using PostProcessor.Core.Context;
+using PostProcessor.Core.Diagnostics;
+using PostProcessor.Core.Models;
+using PostProcessor.Macros.Engine;
+using PostProcessor.Macros.Interfaces;
+
+namespace PostProcessor.Tests;
+
+/// <summary>
+/// Tests for the PrometheusMetricsFile class
+/// </summary>
+public class PrometheusMetricsFileTests
+{
+    [Fact]
+    public void Flush_AddsCountersOfSeparateJobsToFile()
+    {
+        // Arrange
+        var directory = Path.Combine(Path.GetTempPath(), Path.GetRandomFileName());
+        var path = Path.Combine(directory, "postprocessor.prom");
+        var first = new PrometheusMetricsFile(path);
+        var second = new PrometheusMetricsFile(path);
+
+        try
+        {
+            // Act - два задания пишут в один файл
+            first.Add("postprocessor_jobs_total", "Posting jobs by result", 1, "result", "success");
+            first.Add("postprocessor_commands_total", "APT commands processed", 1000);
+            first.Flush();
+
+            second.Add("postprocessor_jobs_total", "Posting jobs by result", 1, "result", "success");
+            second.Add("postprocessor_jobs_total", "Posting jobs by result", 1, "result", "failure");
+            second.Add("postprocessor_commands_total", "APT commands processed", 250);
+            second.Set("postprocessor_last_job_timestamp_seconds", "Unix time of the last finished job", 1700000000);
+            second.Flush();
+
+            // Assert
+            var lines = File.ReadAllLines(path);
+            Assert.Contains("# TYPE postprocessor_commands_total counter", lines);
+            Assert.Contains("# HELP postprocessor_commands_total APT commands processed", lines);
+            Assert.Contains("postprocessor_commands_total 1250", lines);
+            Assert.Contains("postprocessor_jobs_total{result=\"success\"} 2", lines);
+            Assert.Contains("postprocessor_jobs_total{result=\"failure\"} 1", lines);
+            Assert.Contains("# TYPE postprocessor_last_job_timestamp_seconds gauge", lines);
+            Assert.Contains("postprocessor_last_job_timestamp_seconds 1700000000", lines);
+            Assert.False(first.HasPending || second.HasPending);
+        }
+        finally
+        {
+            Directory.Delete(directory, recursive: true);
+        }
+    }
+
+    [Fact]
+    public async Task MetricsMacroEngine_CollectsContextStatisticsAndMacroCalls()
+    {
+        // Arrange
+        var directory = Path.Combine(Path.GetTempPath(), Path.GetRandomFileName());
+        var path = Path.Combine(directory, "postprocessor.prom");
+        var metrics = new PrometheusMetricsFile(path);
+        var engine = new MetricsMacroEngine(new CountingMacroEngine(), metrics);
+        var context = new PostContext(TextWriter.Null);
+
+        try
+        {
+            // Act
+            for (int i = 0; i < 3; i++)
+                await engine.ExecuteAsync(context, new APTCommand("goto", new List<string>(), new List<double> { i + 1, 0, 0 }, new List<string>(), i + 1));
+            await engine.ExecuteAsync(context, new APTCommand("loadtl", new List<string>(), new List<double> { 5 }, new List<string>(), 4));
+            engine.Collect(context);
+            engine.Collect(context);
+            metrics.Flush();
+
+            // Assert - повторный Collect не добавляет уже учтённое
+            var lines = File.ReadAllLines(path);
+            Assert.Contains("postprocessor_commands_total 4", lines);
+            Assert.Contains("postprocessor_motion_commands_total 3", lines);
+            Assert.Contains("postprocessor_tool_changes_total 1", lines);
+            Assert.Contains("postprocessor_blocks_total 3", lines);
+            Assert.Contains("postprocessor_errors_total{kind=\"macro\"} 1", lines);
+            Assert.Contains("postprocessor_macro_calls_total{macro=\"goto\"} 3", lines);
+            Assert.Contains("postprocessor_macro_calls_total{macro=\"loadtl\"} 1", lines);
+            Assert.Contains(lines, line => line.StartsWith("postprocessor_macro_seconds_total{macro=\"goto\"} "));
+        }
+        finally
+        {
+            Directory.Delete(directory, recursive: true);
+        }
+    }
+
+    /// <summary>
+    /// Macro engine that counts commands like PythonMacroEngine; GOTO writes a block, LOADTL fails
+    /// </summary>
+    private sealed class CountingMacroEngine : IMacroEngine
+    {
+        public void RegisterLoader(IMacroLoader loader) { }
+
+        public Task LoadAsync(IEnumerable<string> paths, CancellationToken cancellationToken = default) => Task.CompletedTask;
+
+        public IEnumerable<IMacro> FindMacros(string commandName) => Enumerable.Empty<IMacro>();
+
+        public int GetMacroCount() => 2;
+
+        public string? GetMacroSource(string commandName) => null;
+
+        public ValueTask DisposeAsync() => ValueTask.CompletedTask;
+
+        public Task ExecuteAsync(PostContext context, APTCommand command, CancellationToken cancellationToken = default)
+        {
+            context.RecordCommand(command);
+            if (command.Word == APTMajorWord.Goto)
+            {
+                context.Registers.X.SetValue(command.NumericValues[0]);
+                context.WriteBlock();
+            }
+            else
+                context.RecordMacroError();
+            return Task.CompletedTask;
+        }
+    }
+}
@@ -0,0 +1,81 @@
+using System.Text.Json;
+using PostProcessor.Core.Config.Loaders;
+using PostProcessor.Core.Config.Models;
+using PostProcessor.Macros.Python;
+
+namespace PostProcessor.Tests;
+
+/// <summary>
+/// Tests for the PythonConfigTables class
+/// </summary>
+public class PythonConfigTablesTests
+{
+    private static ControllerConfig CreateConfig() => new()
+    {
+        Name = "Fanuc 31i",
+        FunctionCodes = new Dictionary<string, FunctionCode>
+        {
+            ["rapid"] = new FunctionCode { Code = "G00", Group = "MOTION" },
+            ["spindle_cw"] = new FunctionCode { Code = "M03", Group = "SPINDLE" }
+        },
+        CustomGCodes = new Dictionary<string, string> { ["workOffset"] = "G54.1 P1" },
+        CustomMCodes = new Dictionary<string, string> { ["coolantOn"] = "M7" },
+        CustomParameters = new Dictionary<string, object?>
+        {
+            ["printToolListAtStart"] = JsonDocument.Parse("true").RootElement,
+            ["highSpeedTolerance"] = JsonDocument.Parse("0.01").RootElement,
+            ["toolChangePosition"] = JsonDocument.Parse("\"G91 G28 Z0\"").RootElement,
+            ["pockets"] = JsonDocument.Parse("[1, 2, 3]").RootElement
+        }
+    };
+
+    [Fact]
+    public void For_SameConfig_ReturnsTablesBuiltOnce()
+    {
+        // Arrange
+        var config = CreateConfig();
+
+        // Act
+        var first = PythonConfigTables.For(config);
+        var second = PythonConfigTables.For(config);
+        var other = PythonConfigTables.For(config with { Name = "Fanuc 32i" });
+
+        // Assert
+        Assert.Same(first, second);
+        Assert.NotSame(first, other);
+        Assert.Same(first.MCode, new PythonConfig(config).mcode);
+        Assert.Same(ConfigSnapshot.For(config).RegisterFormats, first.RegisterFormats);
+    }
+
+    [Fact]
+    public void For_MergesStandardAndCustomCodes()
+    {
+        // Arrange
+        var config = CreateConfig();
+
+        // Act
+        var tables = PythonConfigTables.For(config);
+
+        // Assert
+        Assert.Equal("G00", tables.GCodes["rapid"]);
+        Assert.Equal("G54.1 P1", tables.GCodes["workOffset"]);
+        Assert.False(tables.GCodes.ContainsKey("spindle_cw"));
+        Assert.Equal("M03", tables.FunctionCodes["spindle_cw"].Code);
+        Assert.Equal("M7", tables.MCode.coolantOn);
+        Assert.Equal("M30", tables.MCode.programEnd);
+    }
+
+    [Fact]
+    public void GetParameter_JsonValues_AreConvertedOnce()
+    {
+        // Arrange
+        var config = new PythonConfig(CreateConfig());
+
+        // Act & Assert
+        Assert.True(config.getParameterBool("printToolListAtStart"));
+        Assert.Equal(0.01, config.getParameterDouble("highSpeedTolerance"));
+        Assert.Equal("G91 G28 Z0", config.getParameterString("toolChangePosition"));
+        Assert.Equal(new object?[] { 1L, 2L, 3L }, (object?[])config.getParameter("pockets"));
+        Assert.Equal(5.0, config.getParameterDouble("missing", 5.0));
+    }
+}
@@ -0,0 +1,223 @@
+using PostProcessor.Macros.Python;
+
+namespace PostProcessor.Tests;
+
+/// <summary>
+/// Tests for the PythonExecutor class
+/// </summary>
+public class PythonExecutorTests
+{
+    [Fact]
+    public async Task RunAsync_ExecutesAllWorkOnOneDedicatedThreadInOrder()
+    {
+        // Arrange
+        using var executor = CreateExecutor();
+        var threads = new List<int>();
+        var order = new List<int>();
+
+        // Act
+        var tasks = Enumerable.Range(0, 100)
+            .Select(i => executor.RunAsync(() =>
+            {
+                threads.Add(Environment.CurrentManagedThreadId);
+                order.Add(i);
+            }))
+            .ToList();
+        await Task.WhenAll(tasks);
+
+        // Assert
+        Assert.Single(threads.Distinct());
+        Assert.NotEqual(Environment.CurrentManagedThreadId, threads[0]);
+        Assert.Equal(Enumerable.Range(0, 100).ToList(), order);
+        Assert.Equal(100, executor.ExecutedCount);
+        Assert.False(executor.IsExecutorThread);
+    }
+
+    [Fact]
+    public async Task Run_FromExecutorThread_RunsInlineWithoutDeadlock()
+    {
+        // Arrange - повтор серии отверстий вызывает Execute из макроса
+        using var executor = CreateExecutor();
+        var nested = false;
+
+        // Act
+        await executor.RunAsync(() => executor.Run(() => nested = executor.IsExecutorThread));
+
+        // Assert
+        Assert.True(nested);
+        Assert.Equal(2, executor.ExecutedCount);
+    }
+
+    [Fact]
+    public async Task RunAsync_FailedWork_PropagatesExceptionAndKeepsRunning()
+    {
+        // Arrange
+        var gil = new GilScopes();
+        using var executor = CreateExecutor(TimeSpan.Zero, gil: gil);
+
+        // Act
+        await Assert.ThrowsAsync<InvalidOperationException>(
+            () => executor.RunAsync(() => throw new InvalidOperationException("macro failed")));
+        await Task.Delay(50);
+        var executed = false;
+        await executor.RunAsync(() => executed = true);
+
+        // Assert - после простоя GIL отпускался и был захвачен снова
+        Assert.True(executed);
+        Assert.True(executor.IdleReleases > 0);
+        Assert.Equal(1, gil.Acquired);
+        Assert.True(gil.Allowed > 0);
+    }
+
+    [Fact]
+    public async Task PostAsync_ReturnsBeforeExecution_DrainAsyncWaitsForAll()
+    {
+        // Arrange
+        using var executor = CreateExecutor();
+        using var gate = new ManualResetEventSlim();
+        var order = new List<int>();
+
+        // Act - лексер ставит команды, пока первая ещё выполняется
+        var posts = new List<ValueTask>();
+        for (int i = 0; i < 3; i++)
+        {
+            var index = i;
+            posts.Add(executor.PostAsync(() =>
+            {
+                if (index == 0)
+                    gate.Wait();
+                order.Add(index);
+            }));
+        }
+        var postedBeforeExecution = posts.All(post => post.IsCompleted) && order.Count == 0;
+        gate.Set();
+        await executor.DrainAsync();
+
+        // Assert
+        Assert.True(postedBeforeExecution);
+        Assert.Equal(new List<int> { 0, 1, 2 }, order);
+        Assert.Equal(3, executor.ExecutedCount);
+        Assert.Equal(0, executor.PendingCount);
+    }
+
+    [Fact]
+    public async Task PostAsync_FullQueue_WaitsForFreeSlot()
+    {
+        // Arrange
+        using var executor = CreateExecutor(capacity: 1);
+        using var started = new ManualResetEventSlim();
+        using var gate = new ManualResetEventSlim();
+
+        // Act - первое задание выполняется, второе занимает очередь, третье ждёт места
+        await executor.PostAsync(() =>
+        {
+            started.Set();
+            gate.Wait();
+        });
+        started.Wait();
+        await executor.PostAsync(() => { });
+        var third = executor.PostAsync(() => { });
+        var waitedForSlot = !third.IsCompleted;
+        gate.Set();
+        await third;
+        await executor.DrainAsync();
+
+        // Assert
+        Assert.True(waitedForSlot);
+        Assert.Equal(3, executor.ExecutedCount);
+    }
+
+    [Fact]
+    public async Task PostAsync_FailedWork_IsRaisedAtSyncPoint()
+    {
+        // Arrange
+        using var executor = CreateExecutor();
+
+        // Act
+        await executor.PostAsync(() => throw new InvalidOperationException("macro failed"));
+        var executed = false;
+        await executor.PostAsync(() => executed = true);
+
+        // Assert - ошибка выдаётся в точке синхронизации, следующие задания выполняются
+        await Assert.ThrowsAsync<InvalidOperationException>(() => executor.DrainAsync());
+        Assert.True(executed);
+        await executor.DrainAsync();
+    }
+
+    [Fact]
+    public async Task DiscardPendingAsync_CancelledWithQueuedWork_SkipsQueueAndWaitsForCurrent()
+    {
+        // Arrange - обработка отменена, пока одна команда выполняется, а другие стоят в очереди
+        using var executor = CreateExecutor();
+        using var started = new ManualResetEventSlim();
+        using var gate = new ManualResetEventSlim();
+        using var cancellation = new CancellationTokenSource();
+        var executed = new List<int>();
+        await executor.PostAsync(() =>
+        {
+            started.Set();
+            gate.Wait();
+            executed.Add(0);
+        });
+        started.Wait();
+        for (int i = 1; i <= 10; i++)
+        {
+            var index = i;
+            await executor.PostAsync(() => executed.Add(index));
+        }
+        var drain = executor.DrainAsync(cancellation.Token);
+
+        // Act
+        cancellation.Cancel();
+        var discard = executor.DiscardPendingAsync();
+        var waitedForCurrent = !discard.IsCompleted;
+        gate.Set();
+        await discard;
+        var executedAfterDiscard = false;
+        await executor.RunAsync(() => executedAfterDiscard = true);
+
+        // Assert - очередь отброшена, выполняемая команда завершена, новые задания выполняются
+        Assert.True(waitedForCurrent);
+        Assert.Equal(new List<int> { 0 }, executed);
+        Assert.Equal(0, executor.PendingCount);
+        await Assert.ThrowsAsync<TaskCanceledException>(() => drain);
+        Assert.True(executedAfterDiscard);
+        await executor.DrainAsync();
+    }
+
+    /// <summary>
+    /// Исполнитель без Python runtime: захват и освобождение GIL только подсчитываются
+    /// </summary>
+    private static PythonExecutor CreateExecutor(TimeSpan? idleTimeout = null, int capacity = PythonExecutor.DefaultCapacity, GilScopes? gil = null)
+    {
+        gil ??= new GilScopes();
+        return new PythonExecutor(idleTimeout, capacity: capacity, acquireGil: gil.Acquire, allowThreads: gil.Allow);
+    }
+
+    private sealed class GilScopes
+    {
+        private long _acquired;
+        private long _allowed;
+
+        public long Acquired => Interlocked.Read(ref _acquired);
+
+        public long Allowed => Interlocked.Read(ref _allowed);
+
+        public IDisposable Acquire()
+        {
+            Interlocked.Increment(ref _acquired);
+            return new Scope();
+        }
+
+        public IDisposable Allow()
+        {
+            Interlocked.Increment(ref _allowed);
+            return new Scope();
+        }
+
+        private sealed class Scope : IDisposable
+        {
+            public void Dispose() { }
+        }
+    }
+}
@@ -0,0 +1,16 @@
+using PostProcessor.Macros.Python;
+
+namespace PostProcessor.Tests;
+
+/// <summary>
+/// Fact that needs a Python runtime: skipped with a reason when PythonMacroEngine
+/// cannot find the Python library (set PYTHONNET_PYDLL to point at it)
+/// </summary>
+public sealed class PythonFactAttribute : FactAttribute
+{
+    public PythonFactAttribute()
+    {
+        if (PythonMacroEngine.FindPythonDll() == null)
+            Skip = "Python runtime not found (set PYTHONNET_PYDLL to the Python shared library)";
+    }
+}
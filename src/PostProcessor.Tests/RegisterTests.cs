@@ -145,4 +145,43 @@ public class RegisterTests
         // Assert
         Assert.Equal(30.0, register.Value);
     }
+
+    [Fact]
+    public void SetValue_ChangeBelowOutputResolution_DoesNotMarkChanged()
+    {
+        // Arrange
+        var x = new Register("X", 10.0, true, "F3");
+        var feed = new Register("F", 1000.0, true, "F3.1");
+
+        // Act & Assert - шум CAM не меняет выводимый текст
+        x.SetValue(10.0004);
+        Assert.False(x.HasChanged);
+        x.SetValue(10.0006);
+        Assert.True(x.HasChanged);
+
+        feed.SetValue(1000.04);
+        Assert.False(feed.HasChanged);
+        Assert.Equal(1, feed.Decimals);
+        Assert.Equal(0, new Register("T", format: "D2").Decimals);
+        Assert.Equal(2, new Register("S", format: "0.00").Decimals);
+    }
+
+    [Fact]
+    public void RegisterSet_StandardSlotsAndCustomRegisters()
+    {
+        // Arrange
+        var registers = new RegisterSet();
+
+        // Act
+        var h = registers.GetOrAdd("H", 1.0, true, "F0");
+        var k = registers.GetOrAdd("K", 0.0, true, "F4");
+        var x = registers.X;
+
+        // Assert - стандартный регистр создаётся один раз, порядок All - порядок создания
+        Assert.Same(k, registers.K);
+        Assert.Same(x, registers.GetOrAdd("X"));
+        Assert.Same(h, registers.GetOrAdd("H"));
+        Assert.Equal("F4", registers.K.Format);
+        Assert.Equal(new[] { "H", "K", "X" }, registers.All.Select(r => r.Name));
+    }
 }
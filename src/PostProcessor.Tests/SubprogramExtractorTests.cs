@@ -0,0 +1,148 @@
+using PostProcessor.Core.Optimization;
+
+namespace PostProcessor.Tests;
+
+/// <summary>
+/// Tests for the SubprogramExtractor class
+/// </summary>
+public class SubprogramExtractorTests
+{
+    private static List<string> Pocket(double x, double y)
+    {
+        return new List<string>
+        {
+            $"G0 X{x:F3} Y{y:F3}",
+            "G1 Z-5.000 F200.0",
+            $"G1 X{x + 10:F3} F800.0",
+            $"Y{y + 10:F3}",
+            $"X{x:F3}",
+            $"Y{y:F3}",
+            "G0 Z5.000"
+        };
+    }
+
+    private static (List<string> Output, SubprogramExtractionResult Result) Run(
+        List<string> lines,
+        SubprogramExtractionOptions? options = null)
+    {
+        var extractor = new SubprogramExtractor(options);
+        extractor.Analyze(lines);
+
+        var writer = new StringWriter();
+        var result = extractor.Rewrite(lines, writer);
+        var output = writer.ToString()
+            .Split(Environment.NewLine)
+            .ToList();
+        return (output, result);
+    }
+
+    [Fact]
+    public void Rewrite_RepeatedPockets_ExtractsFanucSubprogram()
+    {
+        // Arrange
+        var lines = new List<string> { "O0001", "G90 G54", "T1 M6", "G0 Z5.000" };
+        lines.AddRange(Pocket(0, 0));
+        lines.AddRange(Pocket(50, 0));
+        lines.AddRange(Pocket(100, 20));
+        lines.Add("M30");
+        lines.Add("%");
+
+        // Act
+        var (output, result) = Run(lines);
+
+        // Assert
+        Assert.Equal(1, result.SubprogramCount);
+        Assert.Equal(3, result.CallCount);
+        Assert.Equal(3, output.Count(l => l == "M98 P1000"));
+        Assert.Contains("O1000", output);
+        Assert.Contains("G1 Z-10.000 F200.000", output);
+        Assert.Contains("X10.000 F800.000", output);
+        Assert.Contains("M99", output);
+        Assert.True(output.IndexOf("M30") < output.IndexOf("O1000"));
+        Assert.True(output.IndexOf("M99") < output.LastIndexOf("%"));
+        Assert.True(result.OutputLines < result.InputLines);
+    }
+
+    [Fact]
+    public void Rewrite_SiemensDialect_UsesLCallsAndSpfSection()
+    {
+        // Arrange
+        var lines = new List<string> { "G90", "G0 X0.000 Y0.000 Z5.000" };
+        lines.AddRange(Pocket(0, 0));
+        lines.AddRange(Pocket(30, 30));
+        lines.AddRange(Pocket(60, 30));
+        lines.Add("M30");
+        var options = new SubprogramExtractionOptions { Dialect = SubprogramDialect.Siemens };
+
+        // Act
+        var (output, result) = Run(lines, options);
+
+        // Assert
+        Assert.Equal(3, result.CallCount);
+        Assert.Contains("L1000", output);
+        Assert.Contains("%_N_L1000_SPF", output);
+        Assert.Contains("M17", output);
+    }
+
+    [Fact]
+    public void Rewrite_KeepsSequenceNumberOnCallBlock()
+    {
+        // Arrange
+        var lines = new List<string> { "G90", "N10 G0 X0.000 Y0.000 Z5.000" };
+        var number = 20;
+        foreach (var pocket in new[] { Pocket(0, 0), Pocket(40, 0), Pocket(80, 10) })
+            lines.AddRange(pocket.Select(l => $"N{number++} {l}"));
+
+        // Act
+        var (output, _) = Run(lines);
+
+        // Assert
+        Assert.Contains("N21 M98 P1000", output);
+        Assert.Contains("N28 M98 P1000", output);
+        Assert.Contains("N35 M98 P1000", output);
+    }
+
+    [Fact]
+    public void Rewrite_NoRepeats_LeavesProgramUnchanged()
+    {
+        // Arrange
+        var lines = new List<string> { "G90", "G0 X0.000 Y0.000", "G1 X1.000 F100.0", "Y2.000", "X3.000", "M30" };
+
+        // Act
+        var (output, result) = Run(lines);
+
+        // Assert
+        Assert.Equal(0, result.SubprogramCount);
+        Assert.Equal(lines, output.Take(lines.Count).ToList());
+    }
+
+    [Fact]
+    public void Rewrite_ToolChangeBetweenMoves_IsNotIncludedInSubprogram()
+    {
+        // Arrange
+        var lines = new List<string> { "G90", "G0 X0.000 Y0.000 Z5.000" };
+        lines.AddRange(Pocket(0, 0).Take(4));
+        lines.Add("T2 M6");
+        lines.AddRange(Pocket(0, 0).Skip(4));
+        lines.AddRange(Pocket(0, 0).Take(4));
+        lines.Add("T3 M6");
+        lines.AddRange(Pocket(0, 0).Skip(4));
+
+        // Act
+        var (output, _) = Run(lines);
+
+        // Assert
+        Assert.Contains("T2 M6", output);
+        Assert.Contains("T3 M6", output);
+    }
+
+    [Fact]
+    public void DetectDialect_ReturnsDialectByControllerName()
+    {
+        // Assert
+        Assert.Equal(SubprogramDialect.Fanuc, SubprogramExtractionOptions.DetectDialect("Fanuc 31i"));
+        Assert.Equal(SubprogramDialect.Fanuc, SubprogramExtractionOptions.DetectDialect("Haas NGC"));
+        Assert.Equal(SubprogramDialect.Siemens, SubprogramExtractionOptions.DetectDialect("Siemens 840D sl"));
+        Assert.Null(SubprogramExtractionOptions.DetectDialect("Heidenhain TNC640"));
+    }
+}
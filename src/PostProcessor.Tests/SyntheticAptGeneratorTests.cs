@@ -0,0 +1,96 @@
+using PostProcessor.APT.Generation;
+using PostProcessor.APT.Lexer;
+using PostProcessor.Core.Models;
+
+namespace PostProcessor.Tests;
+
+/// <summary>
+/// Tests for the SyntheticAptGenerator class
+/// </summary>
+public class SyntheticAptGeneratorTests : IDisposable
+{
+    private readonly string _aptPath = Path.Combine(Path.GetTempPath(), $"synthetic_{Guid.NewGuid():N}.apt");
+
+    public void Dispose()
+    {
+        if (File.Exists(_aptPath))
+            File.Delete(_aptPath);
+    }
+
+    [Fact]
+    public void Generate_SameSeed_ProducesSameProgram()
+    {
+        // Arrange
+        var options = new SyntheticAptOptions { TargetCommands = 2000, Seed = 7 };
+
+        // Act
+        var first = Generate(options);
+        var second = Generate(options);
+        var other = Generate(options with { Seed = 8 });
+
+        // Assert
+        Assert.Equal(first, second);
+        Assert.NotEqual(first, other);
+    }
+
+    [Fact]
+    public async Task GenerateFile_MillProgram_ParsesWithExpectedMix()
+    {
+        // Arrange
+        var options = new SyntheticAptOptions
+        {
+            TargetCommands = 5000,
+            Operations = 8,
+            Tools = 4,
+            SurfacingWeight = 1,
+            FiveAxisWeight = 1,
+            ArcWeight = 1,
+            DrillingWeight = 1,
+            ContinuationRate = 0.5,
+            CommentRate = 0.5
+        };
+
+        // Act
+        var result = SyntheticAptGenerator.GenerateFile(_aptPath, options);
+        var commands = await ParseAsync();
+
+        // Assert - каждая записанная команда читается лексером, перенос '$' склеивается
+        Assert.Equal(result.Commands, commands.Count);
+        Assert.True(result.Lines > result.Commands);
+        Assert.True(commands.Count >= options.TargetCommands);
+        Assert.Equal(result.Operations, commands.Count(c => c.Word == APTMajorWord.Loadtl));
+        Assert.Contains(commands, c => c.Word == APTMajorWord.Goto && c.NumericValues.Count == 6);
+        Assert.All(commands.Where(c => c.Word == APTMajorWord.Goto), c => Assert.True(c.NumericValues.Count is 3 or 6));
+    }
+
+    [Fact]
+    public async Task GenerateFile_LatheProgram_WritesTwoAxisMotion()
+    {
+        // Arrange
+        var options = new SyntheticAptOptions { Kind = SyntheticProgramKind.Lathe, TargetCommands = 500, Operations = 3 };
+
+        // Act
+        SyntheticAptGenerator.GenerateFile(_aptPath, options);
+        var commands = await ParseAsync();
+
+        // Assert
+        Assert.All(commands.Where(c => c.Word == APTMajorWord.Goto), c => Assert.Equal(2, c.NumericValues.Count));
+        Assert.Equal(3, commands.Count(c => c.Word == APTMajorWord.Loadtl));
+    }
+
+    private static string Generate(SyntheticAptOptions options)
+    {
+        var writer = new StringWriter { NewLine = "\n" };
+        new SyntheticAptGenerator(options).Generate(writer);
+        return writer.ToString();
+    }
+
+    private async Task<List<APTCommand>> ParseAsync()
+    {
+        var commands = new List<APTCommand>();
+        await using var lexer = new StreamingAPTLexer(_aptPath);
+        await foreach (var command in lexer.ParseStreamAsync())
+            commands.Add(command);
+        return commands;
+    }
+}
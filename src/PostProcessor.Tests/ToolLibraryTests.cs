@@ -0,0 +1,134 @@
+using PostProcessor.APT.Lexer;
+using PostProcessor.Core.Config.Models;
+using PostProcessor.Core.Context;
+using PostProcessor.Core.Models;
+
+namespace PostProcessor.Tests;
+
+/// <summary>
+/// Tests for the ToolLibraryIndex class and AptToolPreScanner
+/// </summary>
+public class ToolLibraryTests : IDisposable
+{
+    private readonly string _aptPath = Path.Combine(Path.GetTempPath(), $"tools_{Guid.NewGuid():N}.apt");
+
+    private static readonly ToolLibraryConfig Library = new()
+    {
+        Tools =
+        {
+            new ToolDefinition { Number = 1, Name = "D10", Diameter = 10, Length = 60, Status = ToolStatus.Worn, AlternateTool = 2 },
+            new ToolDefinition { Number = 2, Name = "D10_SPARE", Diameter = 10, Length = 62, AlternateTool = 1 },
+            new ToolDefinition { Number = 3, Name = "DRILL8", Type = ToolType.Drill, Diameter = 8, Length = 90, Comment = "HSS 8MM" },
+            new ToolDefinition { Number = 3, Name = "DUPLICATE", Diameter = 99 }
+        }
+    };
+
+    public void Dispose()
+    {
+        if (File.Exists(_aptPath))
+            File.Delete(_aptPath);
+    }
+
+    [Fact]
+    public void Index_FindsByNumberNameCommentAndAlternate()
+    {
+        // Act & Assert
+        Assert.Equal("DRILL8", Library.FindTool(3)!.Name);
+        Assert.Equal(3, Library.FindToolByName("drill8")!.Number);
+        Assert.Equal(3, Library.FindToolByName("8mm")!.Number);
+        Assert.Null(Library.FindTool(42));
+        Assert.Equal(2, Library.Index.FindUsableTool(1)!.Number);
+        Assert.Equal(3, Library.Index.Count);
+    }
+
+    [Fact]
+    public void Index_AlternateCycleWithoutActiveTool_ReturnsNull()
+    {
+        // Arrange
+        var library = new ToolLibraryConfig
+        {
+            Tools =
+            {
+                new ToolDefinition { Number = 1, Status = ToolStatus.Broken, AlternateTool = 2 },
+                new ToolDefinition { Number = 2, Status = ToolStatus.Worn, AlternateTool = 1 }
+            }
+        };
+
+        // Act & Assert
+        Assert.Null(library.Index.FindUsableTool(1));
+    }
+
+    [Fact]
+    public async Task PreScan_CollectsToolsInOrderOfFirstUse()
+    {
+        // Arrange
+        await File.WriteAllLinesAsync(_aptPath, new[]
+        {
+            "$$ LOADTL/99 - commented out",
+            "TOOLINF/T5_D12, 12.0, 75.0, $",
+            "   0.5",
+            "LOADTL/5, ADJUST, 5, MILL",
+            "GOTO/0, 0, 50",
+            "PPRINT/LOADTL/77 IN TEXT",
+            "LOADTL/3",
+            "LOADTL/5",
+            "TOOLNO/1"
+        });
+
+        // Act
+        var tools = await AptToolPreScanner.ScanAsync(_aptPath, Library);
+
+        // Assert
+        Assert.Equal(new[] { 5, 3, 1 }, tools.Select(t => t.Number));
+        Assert.Equal(new ToolInfo(5, 12.0, 75.0, "T5_D12", null, null, 0.5), tools[0]);
+        Assert.Equal("DRILL8", tools[1].Comment);
+        Assert.Equal("drill", tools[1].Type);
+        Assert.Equal(90, tools[1].Length);
+    }
+
+    [Fact]
+    public async Task LoadTool_UsesProjectToolData()
+    {
+        // Arrange
+        var context = new PostContext(new StringWriter())
+        {
+            ToolLibrary = Library,
+            ProjectTools = new[] { new ToolInfo(5, 12.0, 75.0, "T5_D12") }
+        };
+
+        // Act
+        await ProcessAsync(context, new APTCommand("loadtl", new List<string>(), new List<double> { 5 }, new List<string>(), 1));
+        var fromProgram = context.Machine.CurrentTool;
+        await ProcessAsync(context, new APTCommand("loadtl", new List<string>(), new List<double> { 3 }, new List<string>(), 2));
+
+        // Assert
+        Assert.Equal("T5_D12", fromProgram!.Comment);
+        Assert.Equal(8, context.Machine.CurrentTool!.Diameter);
+    }
+
+    [Fact]
+    public async Task LoadTool_PrescannedWithoutGeometry_TakesCommandValues()
+    {
+        // Arrange - LOADTL без TOOLINF и без записи в библиотеке
+        var context = new PostContext(new StringWriter())
+        {
+            ProjectTools = new[] { new ToolInfo(7, 0, 0) }
+        };
+
+        // Act
+        await ProcessAsync(context, new APTCommand("loadtl", new List<string>(), new List<double> { 7, 6.0 }, new List<string>(), 1));
+
+        // Assert
+        var tool = context.Machine.CurrentTool!;
+        Assert.Equal(6.0, tool.Diameter);
+        Assert.Equal(50.0, tool.Length);
+        Assert.Equal("Tool 7", tool.Comment);
+    }
+
+    private static async Task ProcessAsync(PostContext context, APTCommand command)
+    {
+        await foreach (var _ in context.ProcessCommandAsync(command))
+        {
+        }
+    }
+}
@@ -0,0 +1,139 @@
+using PostProcessor.Core.Context;
+using PostProcessor.Core.Diagnostics;
+using PostProcessor.Core.Models;
+using PostProcessor.Macros.Engine;
+using PostProcessor.Macros.Interfaces;
+
+namespace PostProcessor.Tests;
+
+/// <summary>
+/// Tests for execution tracing (TracingMacroEngine, ChromeTraceSink, TraceReader, TraceComparisonSink)
+/// </summary>
+public class TraceTests : IDisposable
+{
+    private readonly string _tracePath = Path.Combine(Path.GetTempPath(), $"trace_{Guid.NewGuid():N}.json");
+
+    public void Dispose()
+    {
+        if (File.Exists(_tracePath))
+            File.Delete(_tracePath);
+    }
+
+    [Fact]
+    public async Task TracingEngine_RecordsOutputAndRegisterDeltas()
+    {
+        // Arrange
+        var sink = new ListSink();
+        var output = new TraceOutputWriter(new StringWriter());
+        var context = new PostContext(output);
+        var engine = new TracingMacroEngine(new GotoMacroEngine(), sink, output);
+
+        // Act
+        await engine.ExecuteAsync(context, Goto(10, 20, 30, line: 5));
+        await engine.ExecuteAsync(context, Goto(10, 25, 30, line: 6));
+
+        // Assert
+        Assert.Equal(2, sink.Events.Count);
+        Assert.Equal("goto.py", sink.Events[0].Macro);
+        Assert.Equal(5, sink.Events[0].Command.LineNumber);
+        Assert.Equal(3, sink.Events[0].RegisterDeltas.Count);
+        Assert.Single(sink.Events[1].RegisterDeltas);
+        Assert.Equal(25.0, sink.Events[1].RegisterDeltas["Y"]);
+        Assert.True(sink.Events[1].EmittedChars > 0);
+        Assert.NotEqual(sink.Events[0].OutputHash, sink.Events[1].OutputHash);
+    }
+
+    [Fact]
+    public async Task ChromeTraceSink_RoundTripsThroughTraceReader()
+    {
+        // Arrange
+        var deltas = new Dictionary<string, double> { ["X"] = 1.5 };
+        var command = new APTCommand("goto", new List<string> { "a" }, new List<double> { 1.5, 2, 3 }, new List<string> { "s" }, 42);
+
+        // Act
+        using (var sink = new ChromeTraceSink(_tracePath))
+        {
+            sink.Record(new TraceEvent(1, command, "goto.py", 10, 25, 12, 0xABCDEF0123456789UL, deltas));
+            sink.Record(new TraceEvent(2, command with { MajorWord = "rapid" }, null, 40, 5, 0, 0, new Dictionary<string, double>()));
+        }
+
+        var events = new List<TraceEvent>();
+        await foreach (var traceEvent in TraceReader.ReadAsync(_tracePath))
+            events.Add(traceEvent);
+
+        // Assert
+        Assert.Equal(2, events.Count);
+        Assert.Equal("goto", events[0].Command.MajorWord);
+        Assert.Equal(new List<double> { 1.5, 2, 3 }, events[0].Command.NumericValues);
+        Assert.Equal(42, events[0].Command.LineNumber);
+        Assert.Equal("goto.py", events[0].Macro);
+        Assert.Equal(0xABCDEF0123456789UL, events[0].OutputHash);
+        Assert.Equal(1.5, events[0].RegisterDeltas["X"]);
+        Assert.Null(events[1].Macro);
+    }
+
+    [Fact]
+    public void ComparisonSink_ReportsChangedOutput()
+    {
+        // Arrange
+        var command = Goto(1, 2, 3, line: 7);
+        var noDeltas = new Dictionary<string, double>();
+        var baseline = new[]
+        {
+            new TraceEvent(1, command, null, 0, 1, 10, 111, noDeltas),
+            new TraceEvent(2, command, null, 1, 1, 10, 222, noDeltas)
+        };
+        var comparison = new TraceComparisonSink(baseline);
+
+        // Act
+        comparison.Record(new TraceEvent(1, command, null, 0, 1, 10, 111, noDeltas));
+        comparison.Record(new TraceEvent(2, command, null, 1, 1, 12, 333, noDeltas));
+
+        // Assert
+        Assert.Equal(2, comparison.ComparedCount);
+        Assert.Equal(1, comparison.DifferenceCount);
+        Assert.Equal(2, comparison.Differences[0].Sequence);
+        Assert.Equal(7, comparison.Differences[0].LineNumber);
+    }
+
+    private static APTCommand Goto(double x, double y, double z, int line)
+    {
+        return new APTCommand("goto", new List<string>(), new List<double> { x, y, z }, new List<string>(), line);
+    }
+
+    private sealed class ListSink : ITraceSink
+    {
+        public List<TraceEvent> Events { get; } = new();
+
+        public void Record(TraceEvent traceEvent) => Events.Add(traceEvent);
+
+        public void Dispose() { }
+    }
+
+    /// <summary>
+    /// Minimal macro engine: GOTO writes registers through BlockWriter
+    /// </summary>
+    private sealed class GotoMacroEngine : IMacroEngine
+    {
+        public void RegisterLoader(IMacroLoader loader) { }
+
+        public Task LoadAsync(IEnumerable<string> paths, CancellationToken cancellationToken = default) => Task.CompletedTask;
+
+        public IEnumerable<IMacro> FindMacros(string commandName) => Enumerable.Empty<IMacro>();
+
+        public int GetMacroCount() => 1;
+
+        public string? GetMacroSource(string commandName) => commandName == "goto" ? "goto.py" : null;
+
+        public ValueTask DisposeAsync() => ValueTask.CompletedTask;
+
+        public Task ExecuteAsync(PostContext context, APTCommand command, CancellationToken cancellationToken = default)
+        {
+            context.Registers.X.SetValue(command.NumericValues[0]);
+            context.Registers.Y.SetValue(command.NumericValues[1]);
+            context.Registers.Z.SetValue(command.NumericValues[2]);
+            context.WriteBlock();
+            return Task.CompletedTask;
+        }
+    }
+}